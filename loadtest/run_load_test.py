@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for the auth, hotel and user-management services
+
+Boots all three services on scratch databases (or targets running ones with
+--no-boot), seeds hotels, rooms and client accounts through the APIs, then
+runs virtual users that replay a weighted mix of browse, search, login, book
+and confirm flows (see scenarios.py). Requests made during the warm-up are
+not counted. Reports throughput, p50/p95/p99 latency and error rates per
+endpoint; --json writes the same report for comparison between releases.
+
+Usage:
+    python loadtest/run_load_test.py --users 20 --duration 60
+    python loadtest/run_load_test.py --mix browse=60,search=30,book=10 --json report.json
+    python loadtest/run_load_test.py --no-boot --auth-url http://localhost:8001 ...
+    python loadtest/run_load_test.py --workers 4    # production gunicorn runtime
+
+Exits with status 1 when --max-error-rate or --max-p95-ms is exceeded, so
+the run can gate a release.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+import httpx
+
+from scenarios import DEFAULT_MIX, FLOWS, VirtualUser, World, parse_mix, seed
+from stack import ServiceStack
+from stats import LoadStats, format_report
+
+
+async def user_loop(user: VirtualUser, mix, stop_at: float, think_time: float):
+    names = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in names]
+    while time.monotonic() < stop_at:
+        name = user.rng.choices(names, weights=weights)[0]
+        await FLOWS[name](user)
+        user.stats.record_flow(name)
+        if think_time:
+            await asyncio.sleep(user.rng.uniform(0, think_time))
+
+
+async def run(args, urls):
+    rng = random.Random(args.seed)
+    world = World(urls=urls)
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as http:
+        print("Seeding...")
+        seeded = await seed(http, world, args.hotels, args.rooms_per_hotel, args.clients, rng)
+        print(f"Seeded {seeded['hotels']} hotels, {seeded['rooms']} rooms, {seeded['clients']} clients")
+        if seeded["failed_registrations"]:
+            print(f"Warning: {seeded['failed_registrations']} client registrations failed; logins for them will fail "
+                  f"and bookings use tokens signed with the shared secret")
+
+        started = time.monotonic()
+        measure_from = started + args.warmup
+        stop_at = measure_from + args.duration
+        users = []
+        for i in range(args.users):
+            user = VirtualUser(http, world, stats, random.Random(rng.random()))
+            users.append(asyncio.create_task(user_loop(user, args.mix, stop_at, args.think_time)))
+            # Spread arrivals over the ramp-up so the services are not hit by a thundering herd
+            if args.ramp_up:
+                await asyncio.sleep(args.ramp_up / args.users)
+
+        print(f"Running {args.users} users for {args.duration}s after {args.warmup}s warm-up...")
+        await asyncio.sleep(max(0.0, measure_from - time.monotonic()))
+        stats.recording = True
+        measured_start = time.monotonic()
+        await asyncio.gather(*users)
+        elapsed = time.monotonic() - measured_start
+
+    report = stats.report(elapsed)
+    report["config"] = {
+        "users": args.users, "duration_s": args.duration, "warmup_s": args.warmup,
+        "think_time_s": args.think_time, "mix": args.mix, "seed": args.seed, **seeded
+    }
+    return report
+
+
+def check_thresholds(report, args) -> list:
+    total = report["total"]
+    violations = []
+    if args.max_error_rate is not None and total["error_rate"] > args.max_error_rate:
+        violations.append(f"error rate {total['error_rate']:.2%} above {args.max_error_rate:.2%}")
+    if args.max_p95_ms is not None and total["p95_ms"] > args.max_p95_ms:
+        violations.append(f"p95 {total['p95_ms']} ms above {args.max_p95_ms} ms")
+    return violations
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=0.5, help="max random pause between flows, seconds")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="flow weights, e.g. browse=45,search=25,login=10,book=15,confirm=5")
+    parser.add_argument("--hotels", type=int, default=20)
+    parser.add_argument("--rooms-per-hotel", type=int, default=25)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout, seconds")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--max-error-rate", type=float, help="fail if the overall error rate is higher (0-1)")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if the overall p95 latency is higher")
+    parser.add_argument("--no-boot", action="store_true", help="target already running services")
+    parser.add_argument("--base-port", type=int, help="boot services on base-port, +1 and +2 instead of 8001-8003")
+    parser.add_argument("--auth-url", default="http://localhost:8001")
+    parser.add_argument("--hotel-url", default="http://localhost:8002")
+    parser.add_argument("--users-url", default="http://localhost:8003")
+    parser.add_argument("--keep-workdir", action="store_true", help="keep the scratch databases and service output")
+    parser.add_argument("--workers", type=int, help="boot each service under gunicorn with this many workers")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    stack = None
+    if args.no_boot:
+        urls = {"auth": args.auth_url, "hotel": args.hotel_url, "users": args.users_url}
+    else:
+        stack = ServiceStack(base_port=args.base_port, workers=args.workers)
+        print(f"Starting services in {stack.workdir}...")
+        urls = stack.start()
+
+    try:
+        report = asyncio.run(run(args, urls))
+    finally:
+        if stack is not None:
+            stack.stop()
+            if args.keep_workdir:
+                print(f"Service databases and output kept in {stack.workdir}")
+            else:
+                stack.cleanup()
+
+    print()
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+    violations = check_thresholds(report, args)
+    if violations:
+        print("FAILED: " + "; ".join(violations))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
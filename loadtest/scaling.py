@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Throughput scaling of the read-heavy hotel-service with the worker count
+
+Boots the services under gunicorn once per worker count, runs browse and
+search flows with no think time so the hotel-service is saturated, and
+tables its throughput and latency per worker count next to the speedup over
+the first run. Scaling stops at the number of cores the machine has.
+
+Usage:
+    python loadtest/scaling.py --workers 1,2,4 --users 64 --duration 30
+    python loadtest/scaling.py --workers 1,2,4,8 --json scaling.json
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from run_load_test import build_parser, run
+from scenarios import parse_mix
+from stack import ServiceStack
+
+
+def hotel_totals(report) -> dict:
+    """Requests, throughput and worst per-endpoint p95 of the hotel-service endpoints"""
+    rows = [row for row in report["endpoints"] if row["endpoint"].startswith("hotel ")]
+    return {
+        "requests": sum(row["requests"] for row in rows),
+        "throughput_rps": round(sum(row["throughput_rps"] for row in rows), 1),
+        "p95_ms": max((row["p95_ms"] for row in rows), default=0.0),
+        "errors": sum(row["errors"] for row in rows)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--users", type=int, default=64, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--mix", default="browse=60,search=40")
+    parser.add_argument("--base-port", type=int, help="boot services on base-port, +1 and +2 instead of 8001-8003")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for workers in [int(count) for count in args.workers.split(",")]:
+        run_args = build_parser().parse_args([
+            "--users", str(args.users), "--duration", str(args.duration), "--warmup", str(args.warmup),
+            "--ramp-up", "0", "--think-time", "0"
+        ])
+        run_args.mix = parse_mix(args.mix)
+        stack = ServiceStack(base_port=args.base_port, workers=workers)
+        print(f"== {workers} worker(s)")
+        try:
+            report = asyncio.run(run(run_args, stack.start()))
+        finally:
+            stack.stop()
+            stack.cleanup()
+        results.append({"workers": workers, **hotel_totals(report)})
+
+    baseline = results[0]["throughput_rps"] or 1.0
+    print()
+    print(f"hotel-service on {os.cpu_count()} core(s), {args.users} users, mix {args.mix}")
+    print(f"{'workers':>7} {'reqs':>8} {'rps':>9} {'speedup':>8} {'p95 ms':>8} {'err':>6}")
+    for row in results:
+        row["speedup"] = round(row["throughput_rps"] / baseline, 2)
+        print(f"{row['workers']:>7} {row['requests']:>8} {row['throughput_rps']:>9.1f} "
+              f"{row['speedup']:>7.2f}x {row['p95_ms']:>8.1f} {row['errors']:>6}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"cores": os.cpu_count(), "users": args.users, "mix": args.mix, "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Seed data and the user flows replayed by the load test
+
+Each virtual user repeatedly picks a flow by weight:
+
+    browse   anonymous client: hotel list, hotel page, its rooms, room reviews
+    search   anonymous client: hotel search by location/amenity, room search by price
+    login    registered client: log in, then open their profile
+    book     logged-in client: search rooms, check availability, create a reservation
+    confirm  employee: list reservations and confirm one booked during the run
+
+Endpoints are reported by route template ("hotel GET /client/hotels/{hotel_id}")
+so per-id URLs aggregate together.
+"""
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+import jwt
+
+from stats import LoadStats
+
+API = "/api/v1"
+
+DEFAULT_MIX = {"browse": 45, "search": 25, "login": 10, "book": 15, "confirm": 5}
+
+LOCATIONS = ["Cluj-Napoca", "Bucharest", "Brasov", "Sibiu", "Timisoara", "Iasi", "Constanta", "Oradea"]
+AMENITIES = ["wifi", "pool", "parking", "spa", "gym", "restaurant"]
+ROOM_TYPES = [("Single", 80.0), ("Double", 120.0), ("Deluxe", 180.0), ("Suite", 300.0)]
+FACILITIES = ["balcony", "mini_bar", "safe", "sea_view", "bathtub"]
+CLIENT_PASSWORD = "loadtest-password"
+
+
+def staff_token(role: str, user_id: str) -> str:
+    """
+    Tokens for staff roles, signed with the shared secret. Registration only
+    creates clients, so staff accounts are not available through the API.
+    """
+    return jwt.encode(
+        {"sub": f"{user_id}@loadtest.example.com", "user_id": user_id, "role": role, "exp": time.time() + 24 * 3600},
+        os.getenv("JWT_SECRET_KEY", "your-secret-key-here"),
+        algorithm="HS256"
+    )
+
+
+@dataclass
+class Client:
+    email: str
+    username: str
+    token: str
+    profile_user_id: Optional[str] = None
+    registered: bool = False
+
+
+@dataclass
+class World:
+    """Everything the flows pick from, shared by all virtual users"""
+    urls: Dict[str, str]
+    hotels: List[Dict[str, Any]] = field(default_factory=list)
+    rooms: List[Dict[str, Any]] = field(default_factory=list)
+    rooms_by_hotel: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    clients: List[Client] = field(default_factory=list)
+    pending_reservations: List[str] = field(default_factory=list)
+    admin_token: str = field(default_factory=lambda: staff_token("ADMIN", "loadtest-admin"))
+    employee_token: str = field(default_factory=lambda: staff_token("EMPLOYEE", "loadtest-employee"))
+
+
+def _bearer(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def seed(http: httpx.AsyncClient, world: World, hotels: int, rooms_per_hotel: int, clients: int, rng: random.Random):
+    """Create hotels, rooms and client accounts through the public APIs"""
+    hotel_url, auth_url, users_url = world.urls["hotel"], world.urls["auth"], world.urls["users"]
+    admin = _bearer(world.admin_token)
+
+    response = await http.post(f"{hotel_url}{API}/hotels/bulk", headers=admin, json=[
+        {
+            "name": f"Loadtest Hotel {i}",
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "address": f"{i + 1} Main Street",
+            "description": "Seeded by the load test",
+            "amenities": {amenity: True for amenity in rng.sample(AMENITIES, 3)}
+        }
+        for i in range(hotels)
+    ])
+    response.raise_for_status()
+    hotel_ids = [item["id"] for item in response.json()["results"] if item["id"]]
+
+    room_payloads = []
+    for hotel_id in hotel_ids:
+        for number in range(rooms_per_hotel):
+            room_type, base_price = ROOM_TYPES[number % len(ROOM_TYPES)]
+            room_payloads.append({
+                "hotel_id": hotel_id,
+                "room_number": str(101 + number),
+                "room_type": room_type,
+                "price": base_price + rng.randint(0, 40),
+                "position": rng.choice(["City View", "Garden View", "Courtyard"]),
+                "facilities": {facility: True for facility in rng.sample(FACILITIES, 2)}
+            })
+    response = await http.post(f"{hotel_url}{API}/rooms/bulk", headers=admin, json=room_payloads)
+    response.raise_for_status()
+
+    response = await http.get(f"{hotel_url}{API}/client/hotels", params={"limit": 100})
+    world.hotels = [hotel for hotel in response.json() if hotel["id"] in hotel_ids]
+    for hotel in world.hotels:
+        response = await http.get(f"{hotel_url}{API}/client/hotels/{hotel['id']}/rooms")
+        world.rooms_by_hotel[hotel["id"]] = response.json()
+        world.rooms.extend(response.json())
+
+    failed_registrations = 0
+    for i in range(clients):
+        email, username = f"loadtest-client-{i}@example.com", f"loadtest_client_{i}"
+        client = Client(email=email, username=username, token=staff_token("CLIENT", username))
+        response = await http.post(f"{auth_url}{API}/auth/register", json={
+            "email": email, "username": username, "password": CLIENT_PASSWORD
+        })
+        client.registered = response.status_code == 201
+        failed_registrations += not client.registered
+
+        response = await http.post(f"{users_url}{API}/users/", json={
+            "email": email, "username": username, "first_name": "Load", "last_name": f"Client {i}", "role": "guest"
+        })
+        if response.status_code == 201:
+            client.profile_user_id = response.json()["id"]
+            await http.post(f"{users_url}{API}/users/{client.profile_user_id}/profile", json={
+                "bio": "Load test client", "nationality": "RO", "preferred_language": "en"
+            })
+        world.clients.append(client)
+
+    return {
+        "hotels": len(world.hotels),
+        "rooms": len(world.rooms),
+        "clients": len(world.clients),
+        "failed_registrations": failed_registrations
+    }
+
+
+class VirtualUser:
+    """One simulated user issuing requests through a shared connection pool"""
+
+    def __init__(self, http: httpx.AsyncClient, world: World, stats: LoadStats, rng: random.Random):
+        self.http = http
+        self.world = world
+        self.stats = stats
+        self.rng = rng
+
+    async def call(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(endpoint, (time.perf_counter() - start) * 1000, None)
+            return None
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, response.status_code)
+        return response
+
+    @property
+    def hotel(self) -> str:
+        return f"{self.world.urls['hotel']}{API}"
+
+    async def browse(self):
+        await self.call("hotel GET /client/hotels", "GET", f"{self.hotel}/client/hotels")
+        hotel = self.rng.choice(self.world.hotels)
+        await self.call("hotel GET /client/hotels/{hotel_id}", "GET", f"{self.hotel}/client/hotels/{hotel['id']}")
+        await self.call("hotel GET /client/hotels/{hotel_id}/rooms", "GET", f"{self.hotel}/client/hotels/{hotel['id']}/rooms")
+        rooms = self.world.rooms_by_hotel.get(hotel["id"])
+        if rooms:
+            room = self.rng.choice(rooms)
+            await self.call("hotel GET /client/rooms/{room_id}/reviews", "GET", f"{self.hotel}/client/rooms/{room['id']}/reviews")
+
+    async def search(self):
+        params: Dict[str, Any] = {"location": self.rng.choice(LOCATIONS)}
+        if self.rng.random() < 0.5:
+            params["amenities"] = self.rng.choice(AMENITIES)
+        await self.call("hotel GET /client/search/hotels", "GET", f"{self.hotel}/client/search/hotels", params=params)
+        await self._search_rooms()
+
+    async def _search_rooms(self) -> List[Dict[str, Any]]:
+        room_type, base_price = self.rng.choice(ROOM_TYPES)
+        response = await self.call(
+            "hotel GET /client/search/rooms", "GET", f"{self.hotel}/client/search/rooms",
+            params={"room_type": room_type, "max_price": base_price + 40, "limit": 20}
+        )
+        return response.json() if response is not None and response.status_code == 200 else []
+
+    async def login(self):
+        client = self.rng.choice(self.world.clients)
+        await self.call(
+            "auth POST /auth/login", "POST", f"{self.world.urls['auth']}{API}/auth/login",
+            json={"email": client.email, "password": CLIENT_PASSWORD}
+        )
+        if client.profile_user_id:
+            await self.call(
+                "users GET /users/{user_id}/profile", "GET",
+                f"{self.world.urls['users']}{API}/users/{client.profile_user_id}/profile"
+            )
+
+    async def book(self):
+        client = self.rng.choice(self.world.clients)
+        rooms = await self._search_rooms() or self.world.rooms
+        room = self.rng.choice(rooms)
+        check_in = (datetime.now() + timedelta(days=self.rng.randint(7, 365))).replace(hour=14, minute=0, second=0, microsecond=0)
+        check_out = (check_in + timedelta(days=self.rng.randint(1, 5))).replace(hour=11)
+        dates = {"room_id": room["id"], "check_in_date": check_in.isoformat(), "check_out_date": check_out.isoformat()}
+
+        response = await self.call(
+            "hotel POST /client/reservations/check-availability", "POST",
+            f"{self.hotel}/client/reservations/check-availability", json=dates
+        )
+        if response is None or response.status_code != 200 or not response.json()["is_available"]:
+            return
+        response = await self.call(
+            "hotel POST /client/reservations/", "POST", f"{self.hotel}/client/reservations/",
+            headers=_bearer(client.token),
+            json={**dates, "client_email": client.email, "client_name": client.username}
+        )
+        if response is not None and response.status_code == 201:
+            self.world.pending_reservations.append(response.json()["id"])
+
+    async def confirm(self):
+        headers = _bearer(self.world.employee_token)
+        await self.call(
+            "hotel GET /employee/reservations/", "GET", f"{self.hotel}/employee/reservations/",
+            headers=headers, params={"limit": 50}
+        )
+        if self.world.pending_reservations:
+            reservation_id = self.world.pending_reservations.pop(self.rng.randrange(len(self.world.pending_reservations)))
+            await self.call(
+                "hotel POST /employee/reservations/{reservation_id}/confirm", "POST",
+                f"{self.hotel}/employee/reservations/{reservation_id}/confirm", headers=headers
+            )
+
+
+FLOWS = {
+    "browse": VirtualUser.browse,
+    "search": VirtualUser.search,
+    "login": VirtualUser.login,
+    "book": VirtualUser.book,
+    "confirm": VirtualUser.confirm,
+}
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse "browse=50,search=30,book=20" into flow weights"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in FLOWS:
+            raise ValueError(f"Unknown flow '{name}'; choose from {', '.join(FLOWS)}")
+        mix[name] = int(weight)
+    if not any(mix.values()):
+        raise ValueError("At least one flow needs a positive weight")
+    return mix
@@ -0,0 +1,131 @@
+"""
+Boots the three services locally, each on a scratch database
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+SERVICES_DIR = Path(__file__).resolve().parent.parent / "services"
+
+SERVICES = {
+    "auth": ("auth-service", 8001),
+    "hotel": ("hotel-service", 8002),
+    "users": ("user-management-service", 8003),
+}
+
+
+class ServiceStack:
+    """
+    Runs every service in its own working directory, so the relative SQLite
+    paths resolve to fresh databases instead of the checked-in ones. Service
+    output goes to <workdir>/<service>.out.
+
+    With workers set, services run under gunicorn with their production
+    gunicorn.conf.py and that many workers; otherwise under a single uvicorn
+    process.
+    """
+
+    def __init__(self, base_port: Optional[int] = None, workdir: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                 workers: Optional[int] = None):
+        self.base_port = base_port
+        self.workers = workers
+        self.workdir = workdir or tempfile.mkdtemp(prefix="hotel-loadtest-")
+        self._owns_workdir = workdir is None
+        self.env = {**os.environ, **(env or {})}
+        self.urls: Dict[str, str] = {}
+        self._processes: List[subprocess.Popen] = []
+        self._outputs = []
+
+    def _port(self, name: str) -> int:
+        default_port = SERVICES[name][1]
+        if self.base_port is None:
+            return default_port
+        return self.base_port + list(SERVICES).index(name)
+
+    def _command(self, directory: str, port: int) -> List[str]:
+        app_dir = str(SERVICES_DIR / directory)
+        if self.workers:
+            return [
+                sys.executable, "-m", "gunicorn", "main:app",
+                "-c", str(SERVICES_DIR / directory / "gunicorn.conf.py"),
+                "--pythonpath", app_dir,
+                "--bind", f"127.0.0.1:{port}"
+            ]
+        return [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--app-dir", app_dir,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log"
+        ]
+
+    def start(self, timeout: float = 60.0) -> Dict[str, str]:
+        env = dict(self.env)
+        if self.workers:
+            # gunicorn.conf.py sizes the per-worker DB pools from this
+            env.update({"WEB_CONCURRENCY": str(self.workers), "LOG_LEVEL": "warning"})
+        for name, (directory, _) in SERVICES.items():
+            port = self._port(name)
+            service_workdir = Path(self.workdir) / directory
+            service_workdir.mkdir(parents=True, exist_ok=True)
+            output = open(Path(self.workdir) / f"{directory}.out", "w")
+            self._outputs.append(output)
+            self._processes.append(subprocess.Popen(
+                self._command(directory, port),
+                cwd=service_workdir, env=env, stdout=output, stderr=subprocess.STDOUT
+            ))
+            self.urls[name] = f"http://127.0.0.1:{port}"
+
+        try:
+            self._wait_healthy(timeout)
+        except Exception:
+            self.stop()
+            raise
+        return self.urls
+
+    def _wait_healthy(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        pending = dict(self.urls)
+        while pending:
+            for process in self._processes:
+                if process.poll() is not None:
+                    raise RuntimeError(f"A service exited during startup; see the .out files in {self.workdir}")
+            for name, url in list(pending.items()):
+                try:
+                    if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                        del pending[name]
+                except httpx.HTTPError:
+                    pass
+            if pending and time.monotonic() > deadline:
+                raise RuntimeError(f"Services not healthy after {timeout}s: {', '.join(pending)}")
+            time.sleep(0.2)
+
+    def stop(self):
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        for output in self._outputs:
+            output.close()
+        self._processes.clear()
+        self._outputs.clear()
+
+    def cleanup(self):
+        if self._owns_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,114 @@
+"""
+Per-endpoint latency and outcome statistics for a load-test run
+"""
+import math
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class EndpointStats:
+    """Latencies and status counts of one endpoint"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies_ms: List[float] = []
+        self.statuses: Dict[int, int] = defaultdict(int)
+        self.failures = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms)
+
+    @property
+    def client_errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if 400 <= status < 500)
+
+    @property
+    def errors(self) -> int:
+        """Server errors and requests that got no response at all"""
+        return self.failures + sum(count for status, count in self.statuses.items() if status >= 500)
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "endpoint": self.name,
+            "requests": self.requests,
+            "throughput_rps": round(self.requests / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "client_errors": self.client_errors,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())}
+        }
+
+
+class LoadStats:
+    """Collects every request made during the measured window"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.flows: Dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    def record(self, endpoint: str, latency_ms: float, status: Optional[int]):
+        if not self.recording:
+            return
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats(endpoint)
+        stats.latencies_ms.append(latency_ms)
+        if status is None:
+            stats.failures += 1
+        else:
+            stats.statuses[status] += 1
+
+    def record_flow(self, flow: str):
+        if self.recording:
+            self.flows[flow] += 1
+
+    def total(self) -> EndpointStats:
+        total = EndpointStats("TOTAL")
+        for stats in self.endpoints.values():
+            total.latencies_ms.extend(stats.latencies_ms)
+            total.failures += stats.failures
+            for status, count in stats.statuses.items():
+                total.statuses[status] += count
+        return total
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "duration_s": round(elapsed, 2),
+            "flows": dict(self.flows),
+            "endpoints": [self.endpoints[name].summary(elapsed) for name in sorted(self.endpoints)],
+            "total": self.total().summary(elapsed)
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Plain-text table of a report produced by LoadStats.report"""
+    header = f"{'endpoint':<60} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'4xx':>6} {'err':>6} {'err%':>6}"
+    lines = [header, "-" * len(header)]
+    for row in report["endpoints"] + [report["total"]]:
+        if row["endpoint"] == "TOTAL":
+            lines.append("-" * len(header))
+        lines.append(
+            f"{row['endpoint']:<60} {row['requests']:>7} {row['throughput_rps']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+            f"{row['client_errors']:>6} {row['errors']:>6} {row['error_rate'] * 100:>5.1f}%"
+        )
+    flows = ", ".join(f"{flow}={count}" for flow, count in sorted(report["flows"].items()))
+    lines.append("")
+    lines.append(f"Duration {report['duration_s']}s; completed flows: {flows or 'none'}")
+    lines.append("Latencies in ms; err counts 5xx responses and requests that got no response")
+    return "\n".join(lines)
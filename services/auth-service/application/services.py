@@ -6,6 +6,8 @@ from domain.entities import User, Token, UserRole
 from domain.repositories import UserRepository
 from application.dtos import RegisterRequest, LoginRequest, UserResponse, LogoutResponse
 from fastapi import HTTPException, status
+from infrastructure.metrics import record_auth_failure
+from infrastructure.tracing import tracer
 import uuid
 import os
 
@@ -22,10 +24,12 @@ class AuthService:
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     
     def _hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+        with tracer.span("bcrypt.hash"):
+            return self.pwd_context.hash(password)
     
     def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+        with tracer.span("bcrypt.verify"):
+            return self.pwd_context.verify(plain_password, hashed_password)
     
     def _create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
         to_encode = data.copy()
@@ -35,7 +39,8 @@ class AuthService:
             expire = datetime.utcnow() + timedelta(minutes=15)
         
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
+        with tracer.span("jwt.sign"):
+            encoded_jwt = jwt.encode(to_encode, self.SECRET_KEY, algorithm=self.ALGORITHM)
         return encoded_jwt
     
     async def register_user(self, request: RegisterRequest) -> UserResponse:
@@ -90,6 +95,7 @@ class AuthService:
         # Authenticate user
         user = await self.user_repository.get_user_by_email(request.email)
         if not user or not self._verify_password(request.password, user.hashed_password):
+            record_auth_failure("bad_credentials")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
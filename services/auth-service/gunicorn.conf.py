@@ -0,0 +1,39 @@
+"""
+Auth Service multi-worker runtime
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Runs WEB_CONCURRENCY uvicorn workers (default: one per core) on uvloop and
+httptools. Workers share the SQLite database in WAL mode, so reads in one
+worker do not block the others; writes still go through one lock at a time.
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8001')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Every worker imports the app and opens its own SQLite connections;
+# connections must never be inherited across fork()
+preload_app = False
+
+# Recycle workers after a bounded number of requests; the jitter keeps them
+# from all restarting at once. In-flight requests get graceful_timeout to finish.
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = 5
+
+# Docker's /tmp may be disk backed; worker heartbeats are written here
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = "-" if os.getenv("ACCESS_LOG", "false").lower() == "true" else None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
+
+# Per-worker pool sizing: split the connection budget between the workers.
+# Set before the workers fork and import infrastructure.database.
+os.environ.setdefault("DB_POOL_SIZE", str(max(1, int(os.getenv("DB_MAX_CONNECTIONS", "20")) // workers)))
+os.environ.setdefault("DB_MAX_OVERFLOW", os.environ["DB_POOL_SIZE"])
@@ -1,14 +1,67 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import event, Column, String, Boolean, DateTime
 from datetime import datetime
 import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-worker mode, so no locking needed
+    fcntl = None
 
 # Database URL - SQLite with async support
 DATABASE_URL = "sqlite+aiosqlite:///./auth_service.db"
 
+# Connection pool of each worker process (aiosqlite otherwise opens a new
+# connection per checkout). Under gunicorn (gunicorn.conf.py) the pool size
+# defaults to DB_MAX_CONNECTIONS split between the workers
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
 # Create async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """WAL lets readers in every worker process run while one connection writes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # Wait for the write lock instead of failing with "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+@contextmanager
+def process_lock(name: str, blocking: bool = True):
+    """
+    Exclusive lock shared by all worker processes using this database file.
+    Yields False when blocking is off and another process holds the lock.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(f"{DATABASE_URL.split(':///', 1)[1]}.{name}.lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -47,5 +100,7 @@ async def get_db():
 
 # Create tables
 async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Workers start together; only one may run create_all at a time
+    with process_lock("schema"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
@@ -8,6 +8,9 @@ from typing import Dict, Any
 import logging
 import os
 
+from infrastructure.metrics import record_auth_failure
+from infrastructure.tracing import tracer
+
 logger = logging.getLogger(__name__)
 
 # JWT Configuration (should match AuthService settings)
@@ -25,7 +28,8 @@ async def get_current_user_from_token(credentials: HTTPAuthorizationCredentials
     
     try:
         # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with tracer.span("jwt.verify"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         
         # Extract user information from token
         user_id: str = payload.get("user_id")
@@ -49,6 +53,7 @@ async def get_current_user_from_token(credentials: HTTPAuthorizationCredentials
         }
         
     except JWTError as e:
+        record_auth_failure("invalid_token")
         logger.error(f"JWT validation error: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,6 +61,7 @@ async def get_current_user_from_token(credentials: HTTPAuthorizationCredentials
             headers={"WWW-Authenticate": "Bearer"},
         )
     except Exception as e:
+        record_auth_failure("error")
         logger.error(f"Token validation error: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -6,14 +6,19 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from fastapi import FastAPI
 from interfaces.api.auth_router import router as auth_router
-from infrastructure.database import create_tables
+from infrastructure.database import create_tables, engine
+from infrastructure.metrics import MetricsMiddleware, instrument_engine, registry, CONTENT_TYPE
+from infrastructure.tracing import TracingMiddleware, configure_tracing, instrument_engine_tracing
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 app = FastAPI(
     title="Auth Service",
     description="Authentication microservice for hotel chain application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -24,6 +29,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses above the size threshold for clients that accept gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+)
+
+# Request latency includes compression
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+
+# Sampled request tracing; TRACE_EXPORTER turns it on
+configure_tracing("auth-service")
+app.add_middleware(TracingMiddleware)
+instrument_engine_tracing(engine)
+
 app.include_router(auth_router, prefix="/api/v1/auth", tags=["authentication"])
 
 @app.on_event("startup")
@@ -39,6 +60,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
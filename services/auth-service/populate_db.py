@@ -1,112 +1,173 @@
 #!/usr/bin/env python3
 """
 Auth Service Database Population Script
-Populates the auth-service database with test users of various roles
+
+Creates the staff/test accounts and a deterministic set of client accounts.
+Ids and emails match the users generated by the user-management-service
+populate_db.py, and client emails are the ones hotel-service reservations
+are made under.
+
+Test accounts (always created):
+    admin@hotelchain.com / admin123        (admin)
+    manager@hotelchain.com / manager123    (manager)
+    employee@hotelchain.com / employee123  (employee)
+    client@example.com / client123         (client)
+
+Generated clients are user{i}@example.com. Bcrypt is what makes this slow:
+by default every generated client shares one hash of SYNTHETIC_PASSWORD,
+computed once. --unique-passwords gives user{i} the password password{i}
+and hashes them in a process pool, which takes hours at full scale.
+
+Usage:
+    python populate_db.py                         # scale 0.001: 1,000 clients
+    python populate_db.py --scale 1 --reset       # 1,000,000 clients
 """
-import sys
-import os
+import argparse
 import asyncio
+import os
+import sys
+import time
 import uuid
-import datetime
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
-from sqlalchemy import select
+from typing import Dict, List, Optional
 
-# Add parent directory to path to import modules
-sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent))
 
-from infrastructure.database import create_tables, UserModel, AsyncSessionLocal
+from sqlalchemy import func, insert, select, text
 from passlib.context import CryptContext
 
+from infrastructure.database import Base, create_tables, engine, UserModel
+
+FULL_SCALE_USERS = 1_000_000  # Same as the hotel and user-management generators
+CHUNK_SIZE = 50_000
+COMMIT_EVERY = 500_000
+SYNTHETIC_PASSWORD = "password123"
+
+# Identities shared with the other services' generators
+IDENTITY_NAMESPACE = uuid.UUID("6f1c2a52-3b1e-4d0e-9a57-2f5d8c9e4b10")
+
+STAFF_ACCOUNTS = [
+    ("admin", "admin@hotelchain.com", "admin123", "admin"),
+    ("manager", "manager@hotelchain.com", "manager123", "manager"),
+    ("employee", "employee@hotelchain.com", "employee123", "employee"),
+    ("client", "client@example.com", "client123", "client"),
+]
+
 # Initialize password context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
 def get_password_hash(password: str) -> str:
     """Hash password using bcrypt"""
     return pwd_context.hash(password)
 
-async def populate_auth_db():
-    """Populate auth database with test users"""
+
+def user_id_for(seed: int, email: str) -> str:
+    """Deterministic user id, identical in every service's generator"""
+    return str(uuid.uuid5(IDENTITY_NAMESPACE, f"{seed}:{email}"))
+
+
+def _user_row(seed: int, username: str, email: str, hashed_password: str, role: str, created_at: datetime) -> dict:
+    return {
+        "id": user_id_for(seed, email),
+        "email": email,
+        "username": username,
+        "hashed_password": hashed_password,
+        "role": role,
+        "is_active": True,
+        "is_verified": True,
+        "created_at": created_at,
+        "updated_at": created_at
+    }
+
+
+async def _hash_all(pool: ProcessPoolExecutor, passwords: List[str]) -> List[str]:
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(pool, get_password_hash, password) for password in passwords))
+
+
+async def populate_auth_db(scale: float, seed: int, reset: bool, workers: int,
+                           password_hash: Optional[str], unique_passwords: bool):
+    """Populate auth database with the test accounts and generated clients"""
+    engine.echo = False
+    if reset:
+        print("Dropping existing tables...")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
     print("Creating tables...")
     await create_tables()
-    
-    # Create test users
-    users = [
-        # Admin user
-        UserModel(
-            id=str(uuid.uuid4()),
-            username="admin",
-            email="admin@hotelchain.com",
-            hashed_password=get_password_hash("admin123"),
-            role="ADMIN",
-            is_active=True,
-            is_verified=True,
-            created_at=datetime.datetime.now(datetime.timezone.utc),
-            updated_at=datetime.datetime.now(datetime.timezone.utc)
-        ),
-        # Manager user
-        UserModel(
-            id=str(uuid.uuid4()),
-            username="manager",
-            email="manager@hotelchain.com",
-            hashed_password=get_password_hash("manager123"),
-            role="MANAGER",
-            is_active=True,
-            is_verified=True,
-            created_at=datetime.datetime.now(datetime.timezone.utc),
-            updated_at=datetime.datetime.now(datetime.timezone.utc)
-        ),
-        # Employee user
-        UserModel(
-            id=str(uuid.uuid4()),
-            username="employee",
-            email="employee@hotelchain.com",
-            hashed_password=get_password_hash("employee123"),
-            role="EMPLOYEE",
-            is_active=True,
-            is_verified=True,
-            created_at=datetime.datetime.now(datetime.timezone.utc),
-            updated_at=datetime.datetime.now(datetime.timezone.utc)
-        ),
-        # Client user
-        UserModel(
-            id=str(uuid.uuid4()),
-            username="client",
-            email="client@example.com",
-            hashed_password=get_password_hash("client123"),
-            role="CLIENT",
-            is_active=True,
-            is_verified=True,
-            created_at=datetime.datetime.now(datetime.timezone.utc),
-            updated_at=datetime.datetime.now(datetime.timezone.utc)
-        ),
-        # Another client user
-        UserModel(
-            id=str(uuid.uuid4()),
-            username="client2",
-            email="client2@example.com",
-            hashed_password=get_password_hash("client123"),
-            role="CLIENT",
-            is_active=True,
-            is_verified=True,
-            created_at=datetime.datetime.now(datetime.timezone.utc),
-            updated_at=datetime.datetime.now(datetime.timezone.utc)
-        ),
-    ]
-    
-    async with AsyncSessionLocal() as session:
-        # Check if users already exist
-        for user in users:
-            result = await session.execute(select(UserModel).where(UserModel.email == user.email))
-            existing_user = result.scalar_one_or_none()
-            if not existing_user:
-                session.add(user)
-                print(f"Adding user: {user.username} ({user.role})")
-            else:
-                print(f"User {user.username} with email {user.email} already exists, skipping")
-        
-        await session.commit()
-    
+
+    async with engine.connect() as conn:
+        if (await conn.execute(select(func.count()).select_from(UserModel))).scalar_one():
+            print("The database already has users; use --reset to replace them")
+            return
+        # Generated data can be regenerated, so trade durability for load speed
+        await conn.execute(text("PRAGMA synchronous = OFF"))
+
+        users = max(1, round(FULL_SCALE_USERS * scale))
+        print(f"Generating {users:,} clients with seed {seed} using {workers} workers...")
+        start = time.perf_counter()
+        # Fixed timestamps keep the output reproducible
+        created_at = datetime(2024, 1, 1)
+        counts: Dict[str, int] = {"users": 0}
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            staff_hashes = await _hash_all(pool, [password for _, _, password, _ in STAFF_ACCOUNTS])
+            rows = [
+                _user_row(seed, username, email, hashed, role, created_at)
+                for (username, email, _, role), hashed in zip(STAFF_ACCOUNTS, staff_hashes)
+            ]
+            await conn.execute(insert(UserModel.__table__), rows)
+            counts["users"] += len(rows)
+
+            shared_hash = None
+            if not unique_passwords:
+                shared_hash = password_hash or (await _hash_all(pool, [SYNTHETIC_PASSWORD]))[0]
+
+            uncommitted = 0
+            for first in range(0, users, CHUNK_SIZE):
+                indexes = range(first, min(first + CHUNK_SIZE, users))
+                if shared_hash is None:
+                    hashes = await _hash_all(pool, [f"password{i}" for i in indexes])
+                else:
+                    hashes = [shared_hash] * len(indexes)
+                rows = [
+                    _user_row(seed, f"user{i}", f"user{i}@example.com", hashed, "client",
+                              created_at + timedelta(seconds=i))
+                    for i, hashed in zip(indexes, hashes)
+                ]
+                await conn.execute(insert(UserModel.__table__), rows)
+                counts["users"] += len(rows)
+                uncommitted += len(rows)
+                if uncommitted >= COMMIT_EVERY:
+                    await conn.commit()
+                    uncommitted = 0
+                    print(f"  users: {counts['users']:,}")
+
+        await conn.commit()
+        await conn.execute(text("ANALYZE"))
+        await conn.commit()
+
+    elapsed = time.perf_counter() - start
+    total = counts["users"]
+    print(f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
     print("Auth database populated successfully!")
 
+
 if __name__ == "__main__":
-    asyncio.run(populate_auth_db())
+    parser = argparse.ArgumentParser(description="Populate the auth-service database with generated accounts")
+    parser.add_argument("--scale", type=float, default=0.001, help="1.0 = 1M client accounts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate the tables first")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="bcrypt hashing processes")
+    parser.add_argument("--password-hash", help=f"precomputed bcrypt hash for the generated clients "
+                                                f"(default: a hash of {SYNTHETIC_PASSWORD!r})")
+    parser.add_argument("--unique-passwords", action="store_true",
+                        help="give user{i} the password password{i}; one bcrypt hash per account")
+    args = parser.parse_args()
+    if args.password_hash and args.unique_passwords:
+        parser.error("--password-hash and --unique-passwords are mutually exclusive")
+    asyncio.run(populate_auth_db(args.scale, args.seed, args.reset, args.workers,
+                                 args.password_hash, args.unique_passwords))
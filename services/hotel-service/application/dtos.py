@@ -1,6 +1,8 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
+
+from domain.entities import PricingRuleKind
 
 
 # Hotel DTOs
@@ -133,3 +135,120 @@ class ReviewListResponse(BaseModel):
     average_rating: float
     page: int
     per_page: int
+
+
+# Bulk import DTOs
+class HotelBulkItem(HotelCreateRequest):
+    id: Optional[str] = None  # Existing hotel to update; a new id is generated when omitted
+
+
+class RoomBulkItem(RoomCreateRequest):
+    id: Optional[str] = None  # Only used for new rooms; existing rooms are matched by hotel_id + room_number
+
+
+class RoomImageBulkItem(BaseModel):
+    id: Optional[str] = None  # Existing image to update; a new id is generated when omitted
+    room_id: str
+    image_url: str
+    alt_text: Optional[str] = None
+    display_order: int = 1
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: str  # created, updated or error
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class RoomBulkUpdateRequest(BaseModel):
+    # Which rooms; at least one filter is required, and room numbers need hotel_id
+    hotel_id: Optional[str] = None
+    room_type: Optional[str] = None
+    room_numbers: Optional[List[str]] = None
+    room_number_from: Optional[int] = None  # Inclusive range of numeric room numbers, e.g. 101-120
+    room_number_to: Optional[int] = None
+    # What to set; omitted fields are left as they are
+    price: Optional[float] = None
+    is_available: Optional[bool] = None
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+
+
+class BulkOperationResponse(BaseModel):
+    total: int
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# Pricing DTOs
+class RoomRateItem(BaseModel):
+    room_type: str
+    night: date
+    price: float
+
+
+class RoomRatesRequest(BaseModel):
+    rates: List[RoomRateItem]
+
+
+class RateRangeUpdateRequest(BaseModel):
+    hotel_id: Optional[str] = None  # Omitted: every hotel
+    room_type: Optional[str] = None  # Omitted: every room type of the hotels
+    start_date: date  # First night
+    end_date: date  # Night after the last one
+    price: float
+
+
+class RoomRateResponse(BaseModel):
+    model_config = {"from_attributes": True}
+    
+    hotel_id: str
+    room_type: str
+    night: date
+    price: float
+    updated_at: Optional[datetime] = None
+
+
+class PricingRuleCreateRequest(BaseModel):
+    hotel_id: Optional[str] = None  # Omitted: the rule applies to every hotel
+    room_type: Optional[str] = None  # Omitted: every room type
+    kind: PricingRuleKind
+    name: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    weekdays: Optional[List[int]] = None  # 0 = Monday
+    min_nights: Optional[int] = None
+    min_occupancy: Optional[float] = None  # 0-1
+    adjustment_percent: float  # +20 raises prices by 20%, -10 is a 10% discount
+
+
+class PricingRuleResponse(BaseModel):
+    model_config = {"from_attributes": True}
+    
+    id: str
+    hotel_id: Optional[str] = None
+    room_type: Optional[str] = None
+    kind: PricingRuleKind
+    name: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    weekdays: Optional[List[int]] = None
+    min_nights: Optional[int] = None
+    min_occupancy: Optional[float] = None
+    adjustment_percent: float
+    created_at: datetime
+
+
+class StayQuoteResponse(BaseModel):
+    room_id: str
+    hotel_id: str
+    room_number: str
+    room_type: str
+    nights: int
+    total_price: float
+    average_nightly_price: float
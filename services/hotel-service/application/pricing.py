@@ -0,0 +1,326 @@
+"""
+Stay pricing: a per-night rate calendar with rule layers on top
+
+A night of a room costs its room type's calendar rate for that date, or the
+room's own price when the calendar has no rate. Rule layers then adjust it:
+
+- season rules multiply the nights in their date range and/or on their
+  weekdays (several matching seasons compound);
+- occupancy rules raise the nights on which the hotel is at least
+  ``min_occupancy`` full (the highest threshold reached applies);
+- length-of-stay rules discount the whole stay (the rule with the largest
+  ``min_nights`` the stay reaches applies).
+
+Every room of a type shares the calendar and the rules, so a stay is reduced
+once per (hotel, room type, dates) to two sums: the adjusted calendar rates,
+and the adjustment factors of the nights without a rate. A room's total is
+then ``calendar_total + room.price * base_nights`` times the stay discount,
+whatever the length of the stay; quoting a search is one multiply-add per
+room. The sums are cached per (hotel, room type, dates) for
+PRICING_CACHE_TTL_SECONDS; rate and rule changes made through
+PricingService drop the hotel's entries at once, while occupancy uplifts
+and changes made by other workers show up when the entries expire.
+"""
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from application.dtos import StayQuoteResponse
+from domain.entities import PricingRule, PricingRuleKind, RoomRate
+from domain.repositories import PricingRepository, ReservationRepository
+
+PRICING_CACHE_TTL_SECONDS = float(os.getenv("PRICING_CACHE_TTL_SECONDS", "60"))
+PRICING_CACHE_MAX_ENTRIES = int(os.getenv("PRICING_CACHE_MAX_ENTRIES", "10000"))
+# Longest date range one bulk rate update may cover
+MAX_RATE_RANGE_NIGHTS = 731
+
+
+class StayPrice(NamedTuple):
+    """Price of one stay for every room of a room type"""
+    nights: int
+    calendar_total: float  # Adjusted calendar rates of the nights that have one
+    base_nights: float  # Adjustment factors of the nights charged at the room's own price
+    multiplier: float  # Length-of-stay discount
+
+    def total(self, room_price: float) -> float:
+        return round((self.calendar_total + room_price * self.base_nights) * self.multiplier, 2)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _factor(rule: PricingRule) -> float:
+    return 1 + rule.adjustment_percent / 100
+
+
+def validate_rule(rule: PricingRule):
+    """Raise ValueError for a rule that can never apply or would make prices negative"""
+    if rule.adjustment_percent <= -100:
+        raise ValueError("adjustment_percent must be greater than -100")
+    if rule.kind == PricingRuleKind.SEASON:
+        if rule.start_date is None and rule.end_date is None and not rule.weekdays:
+            raise ValueError("Season rules need a date range or weekdays")
+        if rule.start_date and rule.end_date and rule.start_date > rule.end_date:
+            raise ValueError("start_date must not be after end_date")
+        if rule.weekdays and any(day not in range(7) for day in rule.weekdays):
+            raise ValueError("weekdays are 0 (Monday) to 6 (Sunday)")
+    elif rule.kind == PricingRuleKind.LENGTH_OF_STAY:
+        if not rule.min_nights or rule.min_nights < 1:
+            raise ValueError("Length-of-stay rules need min_nights of at least 1")
+    elif rule.kind == PricingRuleKind.OCCUPANCY:
+        if rule.min_occupancy is None or not 0 < rule.min_occupancy <= 1:
+            raise ValueError("Occupancy rules need min_occupancy between 0 and 1")
+
+
+def occupancy_by_night(stays: Iterable[Tuple[date, date]], rooms: int, start: date, nights: int) -> List[float]:
+    """Share of the hotel's rooms booked on each of the nights from start"""
+    # Difference array: +1 on the first night of a stay, -1 after its last
+    changes = [0] * (nights + 1)
+    for check_in, check_out in stays:
+        first = max((check_in - start).days, 0)
+        last = min((check_out - start).days, nights)
+        if first < last:
+            changes[first] += 1
+            changes[last] -= 1
+    occupancy, booked = [], 0
+    for change in changes[:nights]:
+        booked += change
+        occupancy.append(booked / rooms if rooms else 0.0)
+    return occupancy
+
+
+def price_stay(
+    room_type: str,
+    check_in: date,
+    nights: int,
+    rates: Dict[date, float],
+    rules: Sequence[PricingRule],
+    occupancy: Optional[Sequence[float]] = None
+) -> StayPrice:
+    """Reduce a stay of one room type to a StayPrice; ``rules`` must already be the hotel's"""
+    applicable = [rule for rule in rules if rule.room_type in (None, room_type)]
+    days = [check_in + timedelta(days=offset) for offset in range(nights)]
+    factors = [1.0] * nights
+
+    for rule in applicable:
+        if rule.kind == PricingRuleKind.SEASON:
+            factor = _factor(rule)
+            for i, day in enumerate(days):
+                if ((rule.start_date is None or rule.start_date <= day)
+                        and (rule.end_date is None or day <= rule.end_date)
+                        and (not rule.weekdays or day.weekday() in rule.weekdays)):
+                    factors[i] *= factor
+
+    if occupancy is not None:
+        # Highest threshold reached wins
+        uplifts = sorted(
+            ((rule.min_occupancy, _factor(rule)) for rule in applicable if rule.kind == PricingRuleKind.OCCUPANCY),
+            reverse=True
+        )
+        for i, booked in enumerate(occupancy):
+            for threshold, factor in uplifts:
+                if booked >= threshold:
+                    factors[i] *= factor
+                    break
+
+    discounts = [
+        rule for rule in applicable
+        if rule.kind == PricingRuleKind.LENGTH_OF_STAY and rule.min_nights <= nights
+    ]
+    multiplier = _factor(max(discounts, key=lambda rule: rule.min_nights)) if discounts else 1.0
+
+    calendar_total = base_nights = 0.0
+    for day, factor in zip(days, factors):
+        rate = rates.get(day)
+        if rate is None:
+            base_nights += factor
+        else:
+            calendar_total += rate * factor
+    return StayPrice(nights, calendar_total, base_nights, multiplier)
+
+
+class PricingEngine:
+    """Cache of StayPrice per (hotel, room type, check-in, check-out).
+
+    ``on_lookup(hit)`` and ``on_invalidate(hotel_id)`` are called for every
+    lookup and every invalidation event, for metrics.
+    """
+
+    def __init__(
+        self,
+        ttl: float = PRICING_CACHE_TTL_SECONDS,
+        max_entries: int = PRICING_CACHE_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._prices: Dict[Tuple[str, str, date, date], Tuple[StayPrice, float]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.on_lookup: Optional[Callable[[bool], None]] = None
+        self.on_invalidate: Optional[Callable[[Optional[str]], None]] = None
+
+    def get(self, hotel_id: str, room_type: str, check_in: date, check_out: date) -> Optional[StayPrice]:
+        entry = self._prices.get((hotel_id, room_type, check_in, check_out))
+        hit = entry is not None and entry[1] > time.monotonic()
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.on_lookup is not None:
+            self.on_lookup(hit)
+        return entry[0] if hit else None
+
+    def put(self, hotel_id: str, room_type: str, check_in: date, check_out: date, price: StayPrice):
+        if len(self._prices) >= self.max_entries:
+            self._prices.clear()
+        self._prices[(hotel_id, room_type, check_in, check_out)] = (price, time.monotonic() + self.ttl)
+
+    def invalidate(self, hotel_id: Optional[str] = None):
+        """Forget the hotel's prices, or every price"""
+        self.invalidations += 1
+        if self.on_invalidate is not None:
+            self.on_invalidate(hotel_id)
+        if hotel_id is None:
+            self._prices.clear()
+            return
+        for key in [key for key in self._prices if key[0] == hotel_id]:
+            del self._prices[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._prices),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl
+        }
+
+
+class PricingService:
+    """Prices stays and manages the rate calendar and pricing rules"""
+
+    def __init__(
+        self,
+        pricing_repository: PricingRepository,
+        reservation_repository: ReservationRepository,
+        engine: Optional[PricingEngine] = None
+    ):
+        self.pricing_repository = pricing_repository
+        self.reservation_repository = reservation_repository
+        self.engine = engine if engine is not None else pricing_engine
+
+    async def price_stays(self, hotel_id: str, room_types: Iterable[str], check_in, check_out) -> Dict[str, StayPrice]:
+        """StayPrice of each room type of the hotel; loads the calendar and rules only for cache misses"""
+        check_in, check_out = _as_date(check_in), _as_date(check_out)
+        nights = (check_out - check_in).days
+        if nights < 1:
+            raise ValueError("Check-in date must be before check-out date")
+
+        prices, missing = {}, []
+        for room_type in set(room_types):
+            price = self.engine.get(hotel_id, room_type, check_in, check_out)
+            if price is None:
+                missing.append(room_type)
+            else:
+                prices[room_type] = price
+        if not missing:
+            return prices
+
+        rules = await self.pricing_repository.get_rules(hotel_id)
+        calendar: Dict[str, Dict[date, float]] = {room_type: {} for room_type in missing}
+        for rate in await self.pricing_repository.get_rates(hotel_id, missing, check_in, check_out):
+            calendar[rate.room_type][rate.night] = rate.price
+        occupancy = None
+        if any(rule.kind == PricingRuleKind.OCCUPANCY for rule in rules):
+            stays = await self.reservation_repository.get_hotel_stays(hotel_id, check_in, check_out)
+            rooms = await self.pricing_repository.count_rooms(hotel_id)
+            occupancy = occupancy_by_night(stays, rooms, check_in, nights)
+
+        for room_type in missing:
+            price = price_stay(room_type, check_in, nights, calendar[room_type], rules, occupancy)
+            self.engine.put(hotel_id, room_type, check_in, check_out, price)
+            prices[room_type] = price
+        return prices
+
+    async def stay_total(self, hotel_id: str, room_type: str, room_price: float, check_in, check_out) -> float:
+        """Total price of one room for a stay"""
+        prices = await self.price_stays(hotel_id, [room_type], check_in, check_out)
+        return prices[room_type].total(room_price)
+
+    async def quote_rooms(self, rooms: Sequence[Any], check_in, check_out) -> List[StayQuoteResponse]:
+        """Totals of rooms (anything with id, hotel_id, room_number, room_type and price) for the same stay"""
+        by_hotel: Dict[str, set] = {}
+        for room in rooms:
+            by_hotel.setdefault(room.hotel_id, set()).add(room.room_type)
+        prices = {
+            hotel_id: await self.price_stays(hotel_id, room_types, check_in, check_out)
+            for hotel_id, room_types in by_hotel.items()
+        }
+        quotes = []
+        for room in rooms:
+            price = prices[room.hotel_id][room.room_type]
+            total = price.total(room.price)
+            quotes.append(StayQuoteResponse.model_construct(
+                room_id=room.id,
+                hotel_id=room.hotel_id,
+                room_number=room.room_number,
+                room_type=room.room_type,
+                nights=price.nights,
+                total_price=total,
+                average_nightly_price=round(total / price.nights, 2)
+            ))
+        return quotes
+
+    async def get_rates(self, hotel_id: str, room_type: str, start, end) -> List[RoomRate]:
+        return await self.pricing_repository.get_rates(hotel_id, [room_type], _as_date(start), _as_date(end))
+
+    async def set_rates(self, rates: List[RoomRate]) -> int:
+        if any(rate.price <= 0 for rate in rates):
+            raise ValueError("Rates must be greater than 0")
+        count = await self.pricing_repository.set_rates(rates)
+        for hotel_id in {rate.hotel_id for rate in rates}:
+            self.engine.invalidate(hotel_id)
+        return count
+
+    async def set_rate_range(
+        self,
+        price: float,
+        start,
+        end,
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None
+    ) -> int:
+        """Set one rate for a date range of a room type, a hotel or every hotel; one statement, one invalidation"""
+        start, end = _as_date(start), _as_date(end)
+        if price <= 0:
+            raise ValueError("Rates must be greater than 0")
+        if end <= start:
+            raise ValueError("end_date must be after start_date")
+        if (end - start).days > MAX_RATE_RANGE_NIGHTS:
+            raise ValueError(f"At most {MAX_RATE_RANGE_NIGHTS} nights per rate update")
+        count = await self.pricing_repository.set_rate_range(price, start, end, hotel_id, room_type)
+        self.engine.invalidate(hotel_id)
+        return count
+
+    async def get_rules(self, hotel_id: str) -> List[PricingRule]:
+        return await self.pricing_repository.get_rules(hotel_id)
+
+    async def create_rule(self, rule: PricingRule) -> PricingRule:
+        validate_rule(rule)
+        created = await self.pricing_repository.create_rule(rule)
+        self.engine.invalidate(created.hotel_id)
+        return created
+
+    async def delete_rule(self, rule_id: str) -> bool:
+        deleted = await self.pricing_repository.delete_rule(rule_id)
+        if deleted is None:
+            return False
+        self.engine.invalidate(deleted.hotel_id)
+        return True
+
+
+# Global cache shared by the requests of this worker
+pricing_engine = PricingEngine()
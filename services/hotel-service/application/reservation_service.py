@@ -1,15 +1,46 @@
+from contextlib import nullcontext
 from typing import List, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from domain.entities import Reservation, ReservationStatus
-from domain.repositories import ReservationRepository, RoomRepository
+from domain.repositories import ReservationRepository, RoomRepository, UnitOfWork
+from application.pricing import PricingService
+
+
+# Target status -> (statuses it can be reached from, error when it cannot)
+STATUS_TRANSITIONS = {
+    ReservationStatus.CONFIRMED: (
+        {ReservationStatus.PENDING},
+        "Only pending reservations can be confirmed"
+    ),
+    ReservationStatus.COMPLETED: (
+        {ReservationStatus.CONFIRMED},
+        "Only confirmed reservations can be completed"
+    ),
+    ReservationStatus.CANCELLED: (
+        {ReservationStatus.PENDING, ReservationStatus.CONFIRMED},
+        "Cannot cancel a completed or already cancelled reservation"
+    ),
+}
 
 
 class ReservationService:
     """Service for handling reservation business logic"""
     
-    def __init__(self, reservation_repo: ReservationRepository, room_repo: RoomRepository):
+    def __init__(
+        self,
+        reservation_repo: ReservationRepository,
+        room_repo: RoomRepository,
+        unit_of_work: Optional[UnitOfWork] = None,
+        pricing: Optional[PricingService] = None
+    ):
         self.reservation_repo = reservation_repo
         self.room_repo = room_repo
+        self.unit_of_work = unit_of_work
+        self.pricing = pricing
+    
+    def _transaction(self):
+        """Single transaction for a whole service call; each write commits alone without a unit of work"""
+        return self.unit_of_work if self.unit_of_work is not None else nullcontext()
     
     async def create_reservation(
         self,
@@ -37,36 +68,44 @@ class ReservationService:
         # Handle client_id - use email as fallback if not provided (for guest reservations)
         final_client_id = client_id if client_id else client_email
         
-        # Check if room exists
-        room = await self.room_repo.get_room_by_id(room_id)
-        if not room:
-            raise ValueError(f"Room with id {room_id} not found")
-        
-        # Check room availability
-        is_available = await self.reservation_repo.check_room_availability(
-            room_id, check_in_date, check_out_date
-        )
-        if not is_available:
-            raise ValueError("Room is not available for the selected dates")
-        
-        # Calculate total price (simplified - using room price per night)
-        nights = (check_out_date_only - check_in_date_only).days
-        total_price = room.price * nights
-        
-        # Create reservation
-        reservation = Reservation(
-            room_id=room_id,
-            client_id=final_client_id,
-            client_email=client_email,
-            client_name=client_name,
-            check_in_date=check_in_date_only,
-            check_out_date=check_out_date_only,
-            total_price=total_price,
-            status=ReservationStatus.PENDING,
-            notes=notes
-        )
-        
-        return await self.reservation_repo.create_reservation(reservation)
+        async with self._transaction():
+            # Check if room exists
+            room = await self.room_repo.get_room_by_id(room_id)
+            if not room:
+                raise ValueError(f"Room with id {room_id} not found")
+            if not room.is_available:
+                raise ValueError("Room is closed for booking")
+            
+            # Nightly rates and pricing rules; a flat room price per night without a pricing service.
+            # Priced before the availability check, which holds the write lock until the booking commits
+            if self.pricing is not None:
+                total_price = await self.pricing.stay_total(
+                    room.hotel_id, room.room_type, room.price, check_in_date_only, check_out_date_only
+                )
+            else:
+                total_price = room.price * (check_out_date_only - check_in_date_only).days
+            
+            # Check room availability
+            is_available = await self.reservation_repo.check_room_availability(
+                room_id, check_in_date, check_out_date
+            )
+            if not is_available:
+                raise ValueError("Room is not available for the selected dates")
+            
+            # Create reservation
+            reservation = Reservation(
+                room_id=room_id,
+                client_id=final_client_id,
+                client_email=client_email,
+                client_name=client_name,
+                check_in_date=check_in_date_only,
+                check_out_date=check_out_date_only,
+                total_price=total_price,
+                status=ReservationStatus.PENDING,
+                notes=notes
+            )
+            
+            return await self.reservation_repo.create_reservation(reservation)
     
     async def get_reservation_by_id(self, reservation_id: str) -> Optional[Reservation]:
         """Get reservation by ID"""
@@ -84,60 +123,66 @@ class ReservationService:
         """Get all reservations with pagination"""
         return await self.reservation_repo.get_reservations(skip, limit)
     
+    async def transition_reservation(
+        self,
+        reservation_id: str,
+        new_status: ReservationStatus,
+        employee_id: Optional[str] = None,
+        notes: Optional[str] = None
+    ) -> Reservation:
+        """Move a reservation to a new status, optionally updating its notes, in one write"""
+        if new_status not in STATUS_TRANSITIONS:
+            raise ValueError("Invalid status transition")
+        allowed_from, error = STATUS_TRANSITIONS[new_status]
+        
+        async with self._transaction():
+            # One conditional UPDATE; the row is only read when it did not apply
+            reservation = await self.reservation_repo.update_reservation_status(
+                reservation_id, new_status, allowed_from, employee_id=employee_id, notes=notes
+            )
+            if reservation:
+                return reservation
+            
+            if not await self.reservation_repo.get_reservation_by_id(reservation_id):
+                raise ValueError(f"Reservation with id {reservation_id} not found")
+            raise ValueError(error)
+    
     async def confirm_reservation(self, reservation_id: str, employee_id: str) -> Reservation:
         """Confirm a pending reservation"""
-        reservation = await self.reservation_repo.get_reservation_by_id(reservation_id)
-        if not reservation:
-            raise ValueError(f"Reservation with id {reservation_id} not found")
-        
-        if reservation.status != ReservationStatus.PENDING:
-            raise ValueError("Only pending reservations can be confirmed")
-        
-        reservation.status = ReservationStatus.CONFIRMED
-        reservation.employee_id = employee_id
-        
-        return await self.reservation_repo.update_reservation(reservation)
+        return await self.transition_reservation(reservation_id, ReservationStatus.CONFIRMED, employee_id)
     
     async def cancel_reservation(self, reservation_id: str, employee_id: Optional[str] = None) -> Reservation:
         """Cancel a reservation"""
-        reservation = await self.reservation_repo.get_reservation_by_id(reservation_id)
-        if not reservation:
-            raise ValueError(f"Reservation with id {reservation_id} not found")
-        
-        if reservation.status in [ReservationStatus.CANCELLED, ReservationStatus.COMPLETED]:
-            raise ValueError("Cannot cancel a completed or already cancelled reservation")
-        
-        reservation.status = ReservationStatus.CANCELLED
-        if employee_id:
-            reservation.employee_id = employee_id
-        
-        return await self.reservation_repo.update_reservation(reservation)
+        return await self.transition_reservation(reservation_id, ReservationStatus.CANCELLED, employee_id)
     
     async def complete_reservation(self, reservation_id: str, employee_id: str) -> Reservation:
         """Mark a reservation as completed"""
-        reservation = await self.reservation_repo.get_reservation_by_id(reservation_id)
-        if not reservation:
-            raise ValueError(f"Reservation with id {reservation_id} not found")
-        
-        if reservation.status != ReservationStatus.CONFIRMED:
-            raise ValueError("Only confirmed reservations can be completed")
-        
-        reservation.status = ReservationStatus.COMPLETED
-        reservation.employee_id = employee_id
-        
-        return await self.reservation_repo.update_reservation(reservation)
+        return await self.transition_reservation(reservation_id, ReservationStatus.COMPLETED, employee_id)
     
     async def update_reservation_notes(self, reservation_id: str, notes: str, employee_id: str) -> Reservation:
         """Update reservation notes"""
-        reservation = await self.reservation_repo.get_reservation_by_id(reservation_id)
-        if not reservation:
-            raise ValueError(f"Reservation with id {reservation_id} not found")
-        
-        reservation.notes = notes
-        reservation.employee_id = employee_id
-        
-        return await self.reservation_repo.update_reservation(reservation)
+        async with self._transaction():
+            reservation = await self.reservation_repo.get_reservation_by_id(reservation_id)
+            if not reservation:
+                raise ValueError(f"Reservation with id {reservation_id} not found")
+            
+            reservation.notes = notes
+            reservation.employee_id = employee_id
+            
+            return await self.reservation_repo.update_reservation(reservation)
     
     async def check_room_availability(self, room_id: str, check_in_date: datetime, check_out_date: datetime) -> bool:
         """Check if a room is available for given dates"""
         return await self.reservation_repo.check_room_availability(room_id, check_in_date, check_out_date)
+    
+    async def expire_stale_pending(self, max_age: timedelta, chunk_size: int, dry_run: bool = False) -> int:
+        """Cancel pending reservations nobody confirmed within max_age, so they stop blocking their rooms"""
+        if max_age <= timedelta(0):
+            raise ValueError("Pending reservations must be kept for a positive time")
+        return await self.reservation_repo.expire_pending_reservations(
+            datetime.utcnow() - max_age, chunk_size, dry_run
+        )
+    
+    async def complete_past_stays(self, chunk_size: int, dry_run: bool = False) -> int:
+        """Mark confirmed reservations that checked out before today as completed"""
+        return await self.reservation_repo.complete_past_reservations(date.today(), chunk_size, dry_run)
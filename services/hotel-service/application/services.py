@@ -1,15 +1,58 @@
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
 import uuid
+from pydantic import ValidationError
 from domain.entities import Hotel, Room, RoomImage, Review
 from domain.repositories import HotelRepository, RoomRepository, RoomImageRepository, ReviewRepository
 from application.dtos import (
     HotelCreateRequest, HotelUpdateRequest, HotelResponse,
     RoomCreateRequest, RoomUpdateRequest, RoomResponse,
     RoomImageCreateRequest, RoomImageResponse,
-    ReviewCreateRequest, ReviewUpdateRequest, ReviewResponse
+    ReviewCreateRequest, ReviewUpdateRequest, ReviewResponse,
+    HotelBulkItem, RoomBulkItem, RoomImageBulkItem, BulkItemResult, BulkOperationResponse,
+    RoomBulkUpdateRequest
 )
 
+# Rows written per executemany/transaction by the bulk import endpoints
+BULK_CHUNK_SIZE = 500
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}" for err in error.errors()
+    )
+
+
+async def _write_in_chunks(
+    valid: List[Tuple[int, Any]],
+    write: Callable[[List[Any]], Awaitable[List[Tuple[Any, bool]]]],
+    results: Dict[int, BulkItemResult],
+    chunk_size: int = BULK_CHUNK_SIZE
+):
+    """Write validated entities chunk by chunk; a failed chunk only fails its own items"""
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            written = await write([entity for _, entity in chunk])
+        except Exception as e:
+            for index, _ in chunk:
+                results[index] = BulkItemResult(index=index, status="error", error=f"Write failed: {e}")
+            continue
+        for (index, _), (entity, created) in zip(chunk, written):
+            results[index] = BulkItemResult(
+                index=index, status="created" if created else "updated", id=entity.id
+            )
+
+
+def _bulk_response(total: int, results: Dict[int, BulkItemResult]) -> BulkOperationResponse:
+    ordered = [results[index] for index in sorted(results)]
+    return BulkOperationResponse(
+        total=total,
+        created=sum(1 for r in ordered if r.status == "created"),
+        updated=sum(1 for r in ordered if r.status == "updated"),
+        failed=sum(1 for r in ordered if r.status == "error"),
+        results=ordered
+    )
+
 
 class HotelService:
     """Hotel management application service"""
@@ -32,38 +75,74 @@ class HotelService:
     
     async def get_hotel_by_id(self, hotel_id: str) -> Optional[HotelResponse]:
         """Get hotel by ID"""
-        hotel = await self.hotel_repository.get_hotel_by_id(hotel_id)
-        return HotelResponse.from_orm(hotel) if hotel else None
+        row = await self.hotel_repository.get_hotel_row_by_id(hotel_id)
+        return HotelResponse.model_construct(**row) if row else None
     
     async def get_hotels(self, skip: int = 0, limit: int = 100) -> List[HotelResponse]:
         """Get list of hotels"""
-        hotels = await self.hotel_repository.get_hotels(skip=skip, limit=limit)
-        return [HotelResponse.from_orm(hotel) for hotel in hotels]
+        rows = await self.hotel_repository.get_hotel_rows(skip=skip, limit=limit)
+        return [HotelResponse.model_construct(**row) for row in rows]
+    
+    async def search_hotels(
+        self,
+        query: Optional[str] = None,
+        location: Optional[str] = None,
+        amenities: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[HotelResponse]:
+        """Search hotels by text, location and required amenities"""
+        rows = await self.hotel_repository.search_hotel_rows(
+            query=query, location=location, amenities=amenities, skip=skip, limit=limit
+        )
+        return [HotelResponse.model_construct(**row) for row in rows]
     
     async def update_hotel(self, hotel_id: str, request: HotelUpdateRequest) -> Optional[HotelResponse]:
         """Update hotel"""
-        existing_hotel = await self.hotel_repository.get_hotel_by_id(hotel_id)
-        if not existing_hotel:
-            return None
-        
-        # Update fields
+        # Update fields; a missing hotel shows up as no row returned
         updated_hotel = Hotel(
-            id=existing_hotel.id,
+            id=hotel_id,
             name=request.name,
             location=request.location,
             address=request.address,
             description=request.description,
-            amenities=request.amenities,
-            created_at=existing_hotel.created_at,
-            updated_at=datetime.utcnow()
+            amenities=request.amenities
         )
         
         result = await self.hotel_repository.update_hotel(updated_hotel)
-        return HotelResponse.from_orm(result)
+        return HotelResponse.from_orm(result) if result else None
     
     async def delete_hotel(self, hotel_id: str) -> bool:
         """Delete hotel"""
         return await self.hotel_repository.delete_hotel(hotel_id)
+    
+    async def bulk_upsert_hotels(self, items: List[Any]) -> BulkOperationResponse:
+        """Validate and insert/update many hotels, reporting a result per item"""
+        results: Dict[int, BulkItemResult] = {}
+        valid: List[Tuple[int, Hotel]] = []
+        seen_ids = set()
+        
+        for index, raw in enumerate(items):
+            try:
+                item = HotelBulkItem.model_validate(raw)
+            except ValidationError as e:
+                results[index] = BulkItemResult(index=index, status="error", error=_validation_message(e))
+                continue
+            if item.id and item.id in seen_ids:
+                results[index] = BulkItemResult(index=index, status="error", error="Duplicate hotel id in request")
+                continue
+            seen_ids.add(item.id)
+            valid.append((index, Hotel(
+                id=item.id,
+                name=item.name,
+                location=item.location,
+                address=item.address,
+                description=item.description,
+                amenities=item.amenities
+            )))
+        
+        await _write_in_chunks(valid, self.hotel_repository.bulk_upsert_hotels, results)
+        return _bulk_response(len(items), results)
 
 
 class RoomService:
@@ -90,46 +169,137 @@ class RoomService:
     
     async def get_room_by_id(self, room_id: str) -> Optional[RoomResponse]:
         """Get room by ID"""
-        room = await self.room_repository.get_room_by_id(room_id)
-        return RoomResponse.from_orm(room) if room else None
+        row = await self.room_repository.get_room_row_by_id(room_id)
+        return RoomResponse.model_construct(**row) if row else None
     
     async def get_rooms_by_hotel_id(self, hotel_id: str) -> List[RoomResponse]:
         """Get rooms by hotel ID"""
-        rooms = await self.room_repository.get_rooms_by_hotel_id(hotel_id)
-        return [RoomResponse.from_orm(room) for room in rooms]
+        rows = await self.room_repository.get_room_rows_by_hotel_id(hotel_id)
+        return [RoomResponse.model_construct(**row) for row in rows]
     
     async def get_rooms(self, skip: int = 0, limit: int = 100) -> List[RoomResponse]:
         """Get all rooms with pagination"""
-        rooms = await self.room_repository.get_rooms(skip=skip, limit=limit)
-        return [RoomResponse.from_orm(room) for room in rooms]
+        rows = await self.room_repository.get_room_rows(skip=skip, limit=limit)
+        return [RoomResponse.model_construct(**row) for row in rows]
+    
+    async def search_rooms(
+        self,
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        available_only: bool = True,
+        facilities: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[RoomResponse]:
+        """Search rooms by type, price range, availability and required facilities"""
+        rows = await self.room_repository.search_room_rows(
+            hotel_id=hotel_id, room_type=room_type, min_price=min_price, max_price=max_price,
+            available_only=available_only, facilities=facilities, skip=skip, limit=limit
+        )
+        return [RoomResponse.model_construct(**row) for row in rows]
     
     async def update_room(self, room_id: str, request: RoomUpdateRequest) -> Optional[RoomResponse]:
         """Update room"""
-        existing_room = await self.room_repository.get_room_by_id(room_id)
-        if not existing_room:
-            return None
-        
-        # Update fields
+        # Update fields; a missing room shows up as no row returned
         updated_room = Room(
-            id=existing_room.id,
+            id=room_id,
             hotel_id=request.hotel_id,
             room_number=request.room_number,
             room_type=request.room_type,
             price=request.price,
             position=request.position,
             facilities=request.facilities,
-            is_available=request.is_available,
-            created_at=existing_room.created_at,
-            updated_at=datetime.utcnow()
+            is_available=request.is_available
         )
         
         result = await self.room_repository.update_room(updated_room)
-        return RoomResponse.from_orm(result)
+        return RoomResponse.from_orm(result) if result else None
+    
+    async def bulk_update_rooms(self, request: RoomBulkUpdateRequest) -> int:
+        """Set price and/or availability of every matching room in one statement; returns the rooms changed"""
+        values = request.model_dump(include={"price", "is_available"}, exclude_none=True)
+        if not values:
+            raise ValueError("Nothing to update: set price and/or is_available")
+        if "price" in values and values["price"] <= 0:
+            raise ValueError("price must be greater than 0")
+        if (request.room_number_from is None) != (request.room_number_to is None):
+            raise ValueError("room_number_from and room_number_to go together")
+        room_number_range = None
+        if request.room_number_from is not None:
+            if request.room_number_from > request.room_number_to:
+                raise ValueError("room_number_from must not be greater than room_number_to")
+            room_number_range = (request.room_number_from, request.room_number_to)
+        if not (request.hotel_id or request.room_type or request.room_numbers or room_number_range):
+            raise ValueError("Select the rooms by hotel_id, room_type or room numbers")
+        # Every hotel numbers its rooms the same way; "101-120" means one hotel's rooms
+        if (request.room_numbers or room_number_range) and not request.hotel_id:
+            raise ValueError("Room numbers select rooms within one hotel: set hotel_id as well")
+        
+        return await self.room_repository.bulk_update_rooms(
+            values,
+            hotel_id=request.hotel_id,
+            room_type=request.room_type,
+            room_numbers=request.room_numbers,
+            room_number_range=room_number_range
+        )
     
     async def delete_room(self, room_id: str) -> bool:
         """Delete room"""
         return await self.room_repository.delete_room(room_id)
     
+    async def bulk_upsert_rooms(self, items: List[Any]) -> BulkOperationResponse:
+        """Validate and insert/update many rooms, reporting a result per item"""
+        results: Dict[int, BulkItemResult] = {}
+        candidates: List[Tuple[int, Room]] = []
+        seen_keys = set()
+        seen_ids = set()
+        
+        for index, raw in enumerate(items):
+            try:
+                item = RoomBulkItem.model_validate(raw)
+            except ValidationError as e:
+                results[index] = BulkItemResult(index=index, status="error", error=_validation_message(e))
+                continue
+            key = (item.hotel_id, item.room_number)
+            if key in seen_keys:
+                results[index] = BulkItemResult(index=index, status="error", error="Duplicate room number in request")
+                continue
+            if item.id and item.id in seen_ids:
+                results[index] = BulkItemResult(index=index, status="error", error="Duplicate room id in request")
+                continue
+            seen_keys.add(key)
+            seen_ids.add(item.id)
+            candidates.append((index, Room(
+                id=item.id,
+                hotel_id=item.hotel_id,
+                room_number=item.room_number,
+                room_type=item.room_type,
+                price=item.price,
+                position=item.position,
+                facilities=item.facilities,
+                is_available=item.is_available
+            )))
+        
+        # One lookup for every referenced hotel, one for every client-supplied room id
+        hotel_ids = list({room.hotel_id for _, room in candidates})
+        existing_hotels = set(await self.room_repository.get_existing_hotel_ids(hotel_ids)) if hotel_ids else set()
+        room_ids = [room.id for _, room in candidates if room.id]
+        room_keys = await self.room_repository.get_room_keys(room_ids) if room_ids else {}
+        valid = []
+        for index, room in candidates:
+            if room.hotel_id not in existing_hotels:
+                results[index] = BulkItemResult(index=index, status="error", error=f"Hotel {room.hotel_id} not found")
+            elif room.id in room_keys and room_keys[room.id] != (room.hotel_id, room.room_number):
+                # Rooms are matched by (hotel_id, room_number); the id would collide on insert
+                results[index] = BulkItemResult(index=index, status="error", error=f"Room id {room.id} belongs to another room")
+            else:
+                valid.append((index, room))
+        
+        await _write_in_chunks(valid, self.room_repository.bulk_upsert_rooms, results)
+        return _bulk_response(len(items), results)
+    
     async def create_room_image(self, request: RoomImageCreateRequest) -> RoomImageResponse:
         """Add image to room"""
         image = RoomImage(
@@ -144,12 +314,49 @@ class RoomService:
     
     async def get_images_by_room_id(self, room_id: str) -> List[RoomImageResponse]:
         """Get room images"""
-        images = await self.room_image_repository.get_images_by_room_id(room_id)
-        return [RoomImageResponse.from_orm(image) for image in images]
+        rows = await self.room_image_repository.get_image_rows_by_room_id(room_id)
+        return [RoomImageResponse.model_construct(**row) for row in rows]
     
     async def delete_room_image(self, image_id: str) -> bool:
         """Delete room image"""
         return await self.room_image_repository.delete_room_image(image_id)
+    
+    async def bulk_upsert_room_images(self, items: List[Any]) -> BulkOperationResponse:
+        """Validate and insert/update many room images, reporting a result per item"""
+        results: Dict[int, BulkItemResult] = {}
+        candidates: List[Tuple[int, RoomImage]] = []
+        seen_ids = set()
+        
+        for index, raw in enumerate(items):
+            try:
+                item = RoomImageBulkItem.model_validate(raw)
+            except ValidationError as e:
+                results[index] = BulkItemResult(index=index, status="error", error=_validation_message(e))
+                continue
+            if item.id and item.id in seen_ids:
+                results[index] = BulkItemResult(index=index, status="error", error="Duplicate image id in request")
+                continue
+            seen_ids.add(item.id)
+            candidates.append((index, RoomImage(
+                id=item.id,
+                room_id=item.room_id,
+                image_url=item.image_url,
+                alt_text=item.alt_text,
+                display_order=item.display_order
+            )))
+        
+        # One lookup for every referenced room
+        room_ids = list({image.room_id for _, image in candidates})
+        existing_rooms = set(await self.room_image_repository.get_existing_room_ids(room_ids)) if room_ids else set()
+        valid = []
+        for index, image in candidates:
+            if image.room_id not in existing_rooms:
+                results[index] = BulkItemResult(index=index, status="error", error=f"Room {image.room_id} not found")
+            else:
+                valid.append((index, image))
+        
+        await _write_in_chunks(valid, self.room_image_repository.bulk_upsert_room_images, results)
+        return _bulk_response(len(items), results)
 
 
 class ReviewService:
@@ -181,37 +388,25 @@ class ReviewService:
     
     async def get_reviews_by_room_id(self, room_id: str) -> List[ReviewResponse]:
         """Get reviews for a room"""
-        reviews = await self.review_repository.get_reviews_by_room_id(room_id)
-        return [ReviewResponse.from_orm(review) for review in reviews]
+        rows = await self.review_repository.get_review_rows_by_room_id(room_id)
+        return [ReviewResponse.model_construct(**row) for row in rows]
     
     async def get_reviews_by_user_id(self, user_id: str) -> List[ReviewResponse]:
         """Get reviews by user"""
-        reviews = await self.review_repository.get_reviews_by_user_id(user_id)
-        return [ReviewResponse.from_orm(review) for review in reviews]
+        rows = await self.review_repository.get_review_rows_by_user_id(user_id)
+        return [ReviewResponse.model_construct(**row) for row in rows]
     
     async def update_review(self, review_id: str, request: ReviewUpdateRequest) -> Optional[ReviewResponse]:
         """Update review"""
-        existing_review = await self.review_repository.get_review_by_id(review_id)
-        if not existing_review:
-            return None
-        
         # Validate rating is between 1-5
         if request.rating < 1 or request.rating > 5:
             raise ValueError("Rating must be between 1 and 5")
         
-        # Update fields
-        updated_review = Review(
-            id=existing_review.id,
-            room_id=existing_review.room_id,
-            user_id=existing_review.user_id,
-            rating=request.rating,
-            comment=request.comment,
-            created_at=existing_review.created_at,
-            updated_at=datetime.utcnow()
-        )
+        # Only the editable fields; room and author come back from the UPDATE itself
+        updated_review = Review.model_construct(id=review_id, rating=request.rating, comment=request.comment)
         
         result = await self.review_repository.update_review(updated_review)
-        return ReviewResponse.from_orm(result)
+        return ReviewResponse.from_orm(result) if result else None
     
     async def delete_review(self, review_id: str) -> bool:
         """Delete review"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Payload size and encode time of the largest hotel-service responses
+
+For each endpoint the response is fetched once through the app (with and
+without ``Accept-Encoding: gzip``) to measure wire size, then its JSON
+content is re-encoded with the stdlib encoder FastAPI used before and with
+orjson, plus the gzip pass done by GZipMiddleware.
+
+Usage: python benchmarks/compression_benchmark.py --rooms 1000 --reservations 1000
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import orjson
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+import jwt
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+ENDPOINTS = [
+    "/api/v1/rooms?limit=100",
+    "/api/v1/rooms?limit=1000",
+    "/api/v1/client/search/rooms?limit=100&available_only=false",
+    "/api/v1/employee/reservations/?limit=1000",
+]
+
+FACILITIES = {"king_bed": True, "balcony": True, "mini_bar": True, "safe": True, "desk": True, "shower": True}
+
+
+async def seed(rooms: int, reservations: int):
+    from domain.entities import Hotel, Room
+    from infrastructure.database import AsyncSessionLocal, ReservationModel, create_tables
+    from infrastructure.repositories import SQLiteHotelRepository, SQLiteRoomRepository
+
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        [(hotel, _)] = await SQLiteHotelRepository(session).bulk_upsert_hotels([
+            Hotel(name="Benchmark Hotel", location="Cluj", address="1 Main Street", amenities={"wifi": True})
+        ])
+        saved = await SQLiteRoomRepository(session).bulk_upsert_rooms([
+            Room(hotel_id=hotel.id, room_number=str(100 + i), room_type="Deluxe",
+                 price=150.0 + i % 50, position="City View", facilities=FACILITIES,
+                 description="Spacious room with a view over the old town")
+            for i in range(rooms)
+        ])
+        room_ids = [room.id for room, _ in saved]
+        start = date(2030, 1, 1)
+        session.add_all([
+            ReservationModel(
+                id=f"bench-{i}", room_id=room_ids[i % len(room_ids)],
+                client_id=f"client-{i % 200}", client_email=f"client{i % 200}@example.com",
+                client_name=f"Client {i % 200}",
+                check_in_date=start + timedelta(days=i), check_out_date=start + timedelta(days=i + 3),
+                total_price=450.0, notes="Late arrival"
+            )
+            for i in range(reservations)
+        ])
+        await session.commit()
+
+
+def median_us(fn: Callable[[], object], iterations: int) -> float:
+    fn()  # warm up
+    timings: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2] * 1e6
+
+
+def stdlib_encode(content) -> bytes:
+    # What fastapi.responses.JSONResponse.render does
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def main(rooms: int, reservations: int, iterations: int):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # The service database URL is relative to the working directory
+        os.chdir(tmp)
+        import logging
+        logging.disable(logging.INFO)
+        from fastapi.testclient import TestClient
+        import main as service
+        from infrastructure.database import engine
+
+        engine.echo = False
+        asyncio.run(seed(rooms, reservations))
+
+        token = jwt.encode(
+            {"sub": "bench@example.com", "user_id": "bench", "role": "EMPLOYEE", "exp": time.time() + 3600},
+            os.getenv("JWT_SECRET_KEY", "your-secret-key-here"), algorithm="HS256"
+        )
+        headers = {"Authorization": f"Bearer {token}"}
+        compresslevel = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+
+        print(f"rooms={rooms} reservations={reservations} iterations={iterations} (median)")
+        print(f"{'endpoint':58} {'raw':>9} {'gzip':>9} {'ratio':>6} {'json us':>9} {'orjson us':>9} {'gzip us':>9}")
+        with TestClient(service.app) as client:
+            for endpoint in ENDPOINTS:
+                plain = client.get(endpoint, headers={**headers, "Accept-Encoding": "identity"})
+                compressed = client.get(endpoint, headers={**headers, "Accept-Encoding": "gzip"})
+                plain.raise_for_status()
+                assert compressed.headers.get("content-encoding") == "gzip", f"{endpoint} was not compressed"
+                assert compressed.json() == plain.json()
+
+                content = plain.json()
+                raw_size = plain.num_bytes_downloaded
+                gzip_size = compressed.num_bytes_downloaded
+                body = orjson.dumps(content)
+                json_us = median_us(lambda: stdlib_encode(content), iterations)
+                orjson_us = median_us(lambda: orjson.dumps(content), iterations)
+                gzip_us = median_us(lambda: gzip.compress(body, compresslevel), iterations)
+
+                print(f"{endpoint:58} {raw_size:>9} {gzip_size:>9} {raw_size / gzip_size:>5.1f}x "
+                      f"{json_us:>9.0f} {orjson_us:>9.0f} {gzip_us:>9.0f}")
+
+        asyncio.run(engine.dispose())
+        os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--reservations", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    main(args.rooms, args.reservations, args.iterations)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Repository and service read-path timings at a configurable data scale
+
+Seeds a SQLite database with the production schema and indexes, then times
+each repository/service method with randomized arguments drawn from the
+seeded data, one session per call as in a request. Results are printed and
+written as JSON so indexing and caching changes can be compared against a
+baseline run at the same scale and seed.
+
+Scale 1.0 is production size: 10,000 hotels, 1,000,000 rooms (100 per
+hotel), 5,000,000 reviews and 50,000,000 reservations (50 per room, never
+overlapping). Fan-out per hotel and per room is the same at every scale, so
+small scales keep per-call result sizes representative while tables shrink.
+
+Usage:
+    python benchmarks/repository_benchmark.py --scale 0.001 --output baseline.json
+    python benchmarks/repository_benchmark.py --scale 0.1 --db /data/bench-0.1.db --only availability
+"""
+import argparse
+import asyncio
+import json
+import orjson
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import sqlalchemy
+from sqlalchemy import func, insert, literal_column, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from application.reservation_service import ReservationService
+from application.services import HotelService, RoomService
+from infrastructure.database import Base, HotelModel, RoomModel, ReviewModel, ReservationModel
+from infrastructure.repositories import (
+    SQLiteHotelRepository, SQLiteRoomRepository, SQLiteRoomImageRepository,
+    SQLiteReviewRepository, SQLiteReservationRepository
+)
+
+FULL_SCALE_HOTELS = 10_000
+FULL_SCALE_CLIENTS = 1_000_000
+ROOMS_PER_HOTEL = 100
+REVIEWS_PER_ROOM = 5
+RESERVATIONS_PER_ROOM = 50
+CHUNK_SIZE = 20_000
+SAMPLE_SIZE = 1_000
+
+LOCATIONS = ["Cluj-Napoca", "Bucharest", "Brasov", "Sibiu", "Timisoara", "Iasi", "Constanta", "Oradea"]
+AMENITIES = ["wifi", "parking", "breakfast", "pool", "gym", "spa", "restaurant", "bar"]
+ROOM_TYPES = [("Single", 80.0), ("Double", 120.0), ("Deluxe", 180.0), ("Suite", 300.0)]
+FACILITIES = ["king_bed", "twin_beds", "balcony", "mini_bar", "coffee_machine", "safe", "bathtub", "shower"]
+FIRST_STAY = date(2024, 1, 1)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _flags(rng: random.Random, names: List[str], count: int) -> Dict[str, bool]:
+    return {name: True for name in rng.sample(names, count)}
+
+
+async def _insert_chunks(engine, table, rows):
+    """Core executemany in chunks, one transaction per chunk"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            async with engine.begin() as conn:
+                await conn.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        async with engine.begin() as conn:
+            await conn.execute(insert(table), chunk)
+
+
+async def seed(engine, scale: float, seed_value: int):
+    rng = random.Random(seed_value)
+    hotels = max(1, round(FULL_SCALE_HOTELS * scale))
+    clients = max(1, round(FULL_SCALE_CLIENTS * scale))
+    now = datetime.utcnow()
+    hotel_ids = [_uuid(rng) for _ in range(hotels)]
+
+    await _insert_chunks(engine, HotelModel.__table__, (
+        {
+            "id": hotel_id, "name": f"Hotel {i}", "location": LOCATIONS[i % len(LOCATIONS)],
+            "address": f"{i + 1} Main Street", "description": "Benchmark hotel",
+            "amenities": _flags(rng, AMENITIES, 4), "created_at": now, "updated_at": now
+        }
+        for i, hotel_id in enumerate(hotel_ids)
+    ))
+
+    room_ids: List[str] = []
+
+    def rooms():
+        for hotel_id in hotel_ids:
+            for number in range(ROOMS_PER_HOTEL):
+                room_type, base_price = ROOM_TYPES[number % len(ROOM_TYPES)]
+                room_id = _uuid(rng)
+                room_ids.append(room_id)
+                yield {
+                    "id": room_id, "hotel_id": hotel_id, "room_number": str(101 + number),
+                    "room_type": room_type, "price": base_price + rng.randint(0, 40),
+                    "position": "City View", "facilities": _flags(rng, FACILITIES, 3),
+                    "is_available": rng.random() < 0.9, "created_at": now, "updated_at": now
+                }
+
+    await _insert_chunks(engine, RoomModel.__table__, rooms())
+
+    await _insert_chunks(engine, ReviewModel.__table__, (
+        {
+            "id": _uuid(rng), "room_id": room_id, "user_id": f"client-{rng.randrange(clients)}",
+            "rating": rng.randint(1, 5), "comment": "Pleasant stay", "created_at": now, "updated_at": now
+        }
+        for room_id in room_ids
+        for _ in range(REVIEWS_PER_ROOM)
+    ))
+
+    def reservations():
+        today = date.today()
+        for room_id in room_ids:
+            # Back-to-back stays with short gaps, so a room's reservations never overlap
+            check_in = FIRST_STAY + timedelta(days=rng.randint(0, 30))
+            for _ in range(RESERVATIONS_PER_ROOM):
+                check_out = check_in + timedelta(days=rng.randint(1, 7))
+                if check_out < today:
+                    status = "cancelled" if rng.random() < 0.1 else "completed"
+                else:
+                    status = rng.choice(["pending", "confirmed", "confirmed", "cancelled"])
+                client = rng.randrange(clients)
+                yield {
+                    "id": _uuid(rng), "room_id": room_id, "client_id": f"client-{client}",
+                    "client_email": f"client{client}@example.com", "client_name": f"Client {client}",
+                    "check_in_date": check_in, "check_out_date": check_out,
+                    "total_price": 100.0 * (check_out - check_in).days, "status": status,
+                    "created_at": now, "updated_at": now
+                }
+                check_in = check_out + timedelta(days=rng.randint(0, 3))
+
+    await _insert_chunks(engine, ReservationModel.__table__, reservations())
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+
+async def _sample(conn, column, rng: random.Random) -> List[Any]:
+    """Random values of a column, picked by rowid so large tables are not scanned"""
+    table = column.table
+    rowid = literal_column("rowid")
+    max_rowid = (await conn.execute(select(func.max(rowid)).select_from(table))).scalar() or 0
+    if not max_rowid:
+        return []
+    rowids = [rng.randint(1, max_rowid) for _ in range(SAMPLE_SIZE)]
+    result = await conn.execute(select(column).select_from(table).where(rowid.in_(rowids)))
+    return [row[0] for row in result]
+
+
+async def table_counts(engine) -> Dict[str, int]:
+    async with engine.connect() as conn:
+        return {
+            model.__tablename__: (await conn.execute(select(func.count()).select_from(model))).scalar_one()
+            for model in (HotelModel, RoomModel, ReviewModel, ReservationModel)
+        }
+
+
+def build_cases(samples: Dict[str, List[Any]], rng: random.Random) -> Dict[str, Callable]:
+    """Benchmark name -> async fn(session) making one call with random arguments"""
+    hotel_ids, room_ids, client_ids = samples["hotel_ids"], samples["room_ids"], samples["client_ids"]
+    hotel_count = samples["hotels"]
+
+    def stay():
+        check_in = datetime.combine(FIRST_STAY + timedelta(days=rng.randint(0, 400)), datetime.min.time())
+        return check_in, check_in + timedelta(days=rng.randint(1, 7))
+
+    def room_service(session):
+        return RoomService(SQLiteRoomRepository(session), SQLiteRoomImageRepository(session))
+
+    def reservation_service(session):
+        return ReservationService(SQLiteReservationRepository(session), SQLiteRoomRepository(session))
+
+    return {
+        "hotel_repo.get_hotel_by_id": lambda s: SQLiteHotelRepository(s).get_hotel_by_id(rng.choice(hotel_ids)),
+        "hotel_repo.get_hotels(page)": lambda s: SQLiteHotelRepository(s).get_hotels(
+            skip=rng.randrange(max(1, hotel_count - 100)), limit=100),
+        "hotel_service.search_hotels(location, amenity)": lambda s: HotelService(SQLiteHotelRepository(s)).search_hotels(
+            location=rng.choice(LOCATIONS), amenities=[rng.choice(AMENITIES)], limit=20),
+        "room_repo.get_room_by_id": lambda s: SQLiteRoomRepository(s).get_room_by_id(rng.choice(room_ids)),
+        "room_repo.get_rooms_by_hotel_id": lambda s: SQLiteRoomRepository(s).get_rooms_by_hotel_id(rng.choice(hotel_ids)),
+        "room_repo.get_room_rows_by_hotel_id": lambda s: SQLiteRoomRepository(s).get_room_rows_by_hotel_id(rng.choice(hotel_ids)),
+        "room_service.search_rooms(type, price, facility)": lambda s: room_service(s).search_rooms(
+            room_type=rng.choice(ROOM_TYPES)[0], max_price=rng.choice(ROOM_TYPES)[1] + 40,
+            facilities=[rng.choice(FACILITIES)], limit=20),
+        "room_service.search_rooms(hotel)": lambda s: room_service(s).search_rooms(hotel_id=rng.choice(hotel_ids), limit=20),
+        "review_repo.get_reviews_by_room_id": lambda s: SQLiteReviewRepository(s).get_reviews_by_room_id(rng.choice(room_ids)),
+        "reservation_repo.check_room_availability": lambda s: SQLiteReservationRepository(s).check_room_availability(
+            rng.choice(room_ids), *stay()),
+        "reservation_service.check_room_availability": lambda s: reservation_service(s).check_room_availability(
+            rng.choice(room_ids), *stay()),
+        "reservation_repo.get_reservations_by_room_id": lambda s: SQLiteReservationRepository(s).get_reservations_by_room_id(
+            rng.choice(room_ids)),
+        "reservation_repo.get_reservations_by_client_id": lambda s: SQLiteReservationRepository(s).get_reservations_by_client_id(
+            rng.choice(client_ids)),
+        "reservation_repo.get_reservations(page)": lambda s: SQLiteReservationRepository(s).get_reservations(
+            skip=rng.randrange(1000), limit=100),
+    }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values)))]
+
+
+async def run_case(session_factory, fn, iterations: int, warmup: int) -> Dict[str, Any]:
+    timings, sizes = [], []
+    for i in range(warmup + iterations):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            result = await fn(session)
+            elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            sizes.append(len(result) if isinstance(result, list) else 1)
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        "iterations": iterations,
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(_percentile(timings, 50), 4),
+        "p95_ms": round(_percentile(timings, 95), 4),
+        "p99_ms": round(_percentile(timings, 99), 4),
+        "min_ms": round(timings[0], 4),
+        "max_ms": round(timings[-1], 4),
+        "ops_per_s": round(1000 / mean, 1),
+        "mean_rows": round(sum(sizes) / len(sizes), 1)
+    }
+
+
+async def main(args):
+    tmp = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, "bench.db")
+    reuse = os.path.exists(db_path)
+
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        json_serializer=lambda value: orjson.dumps(value).decode(),
+        json_deserializer=orjson.loads
+    )
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        if reuse:
+            print(f"Reusing seeded database {db_path}")
+        else:
+            print(f"Seeding scale {args.scale}...")
+            start = time.perf_counter()
+            await seed(engine, args.scale, args.seed)
+            print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        counts = await table_counts(engine)
+        rng = random.Random(args.seed)
+        async with engine.connect() as conn:
+            samples = {
+                "hotels": counts["hotels"],
+                "hotel_ids": await _sample(conn, HotelModel.id, rng),
+                "room_ids": await _sample(conn, RoomModel.id, rng),
+                "client_ids": await _sample(conn, ReservationModel.client_id, rng),
+            }
+
+        session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        results = {}
+        for name, fn in build_cases(samples, rng).items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            results[name] = await run_case(session_factory, fn, args.iterations, args.warmup)
+            r = results[name]
+            print(f"  {name:<52} p50 {r['p50_ms']:>9.3f} ms  p95 {r['p95_ms']:>9.3f} ms  "
+                  f"{r['ops_per_s']:>9.1f} ops/s  {r['mean_rows']:>7.1f} rows")
+    finally:
+        await engine.dispose()
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        "service": "hotel-service",
+        "timestamp": datetime.utcnow().isoformat(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "reused_database": reuse,
+        "rows": counts,
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=0.001, help="1.0 = 10k hotels, 1M rooms, 50M reservations")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="keep the seeded database here; an existing file is reused as-is")
+    parser.add_argument("--only", nargs="*", help="run benchmarks whose name contains any of these")
+    parser.add_argument("--output", help="write results as JSON")
+    asyncio.run(main(parser.parse_args()))
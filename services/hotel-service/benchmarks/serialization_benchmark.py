@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of the room list read path, before and after the fast serialization path
+
+Before: ORM model -> Room entity -> RoomResponse.from_orm ->
+        response_model re-validation -> stdlib json encoding
+After:  column tuples -> dict -> RoomResponse.model_construct ->
+        ModelJSONResponse (orjson)
+
+Usage: python benchmarks/serialization_benchmark.py --rows 1000 --iterations 20
+"""
+import argparse
+import asyncio
+import json
+import orjson
+import os
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from application.dtos import RoomResponse
+from domain.entities import Hotel, Room
+from infrastructure.database import Base
+from infrastructure.repositories import SQLiteHotelRepository, SQLiteRoomRepository
+from interfaces.api.responses import ModelJSONResponse
+
+# from_orm is what the old path called; its deprecation warning is noise here
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+FACILITIES = {"king_bed": True, "balcony": True, "mini_bar": True, "safe": True, "desk": True, "shower": True}
+
+
+async def seed(session_factory, rows: int) -> str:
+    async with session_factory() as session:
+        [(hotel, _)] = await SQLiteHotelRepository(session).bulk_upsert_hotels([
+            Hotel(name="Benchmark Hotel", location="Cluj", address="1 Main Street", amenities={"wifi": True})
+        ])
+        rooms = [
+            Room(hotel_id=hotel.id, room_number=str(100 + i), room_type="Deluxe",
+                 price=150.0 + i % 50, position="City View", facilities=FACILITIES)
+            for i in range(rows)
+        ]
+        await SQLiteRoomRepository(session).bulk_upsert_rooms(rooms)
+        return hotel.id
+
+
+async def old_path(session_factory, hotel_id: str, adapter: TypeAdapter) -> bytes:
+    async with session_factory() as session:
+        rooms = await SQLiteRoomRepository(session).get_rooms_by_hotel_id(hotel_id)
+        dtos = [RoomResponse.from_orm(room) for room in rooms]
+        # What FastAPI does with response_model=List[RoomResponse]
+        validated = adapter.validate_python(dtos, from_attributes=True)
+        content = adapter.dump_python(validated, mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+async def new_path(session_factory, hotel_id: str) -> bytes:
+    async with session_factory() as session:
+        rows = await SQLiteRoomRepository(session).get_room_rows_by_hotel_id(hotel_id)
+        dtos = [RoomResponse.model_construct(**row) for row in rows]
+        return ModelJSONResponse(dtos).body
+
+
+async def measure(fn, iterations: int) -> List[float]:
+    await fn()  # warm up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def main(rows: int, iterations: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}",
+            json_serializer=lambda value: orjson.dumps(value).decode(),
+            json_deserializer=orjson.loads
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        hotel_id = await seed(session_factory, rows)
+        adapter = TypeAdapter(List[RoomResponse])
+
+        before = await measure(lambda: old_path(session_factory, hotel_id, adapter), iterations)
+        after = await measure(lambda: new_path(session_factory, hotel_id), iterations)
+
+        old_body = await old_path(session_factory, hotel_id, adapter)
+        new_body = await new_path(session_factory, hotel_id)
+        assert json.loads(old_body) == json.loads(new_body), "fast path output differs"
+
+        await engine.dispose()
+
+    def per_row_us(timings: List[float]) -> float:
+        return sorted(timings)[len(timings) // 2] / rows * 1e6
+
+    print(f"rows={rows} iterations={iterations} (median)")
+    print(f"  before: {per_row_us(before):8.2f} us/row")
+    print(f"  after:  {per_row_us(after):8.2f} us/row")
+    print(f"  speedup: {per_row_us(before) / per_row_us(after):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.iterations))
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime, date
 from enum import Enum
 
@@ -89,3 +89,41 @@ class Reservation(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RoomRate(BaseModel):
+    """Nightly rate of a room type in a hotel on one date (the rate calendar)"""
+    hotel_id: str
+    room_type: str
+    night: date
+    price: float
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PricingRuleKind(str, Enum):
+    """Layers applied on top of the nightly rates"""
+    SEASON = "season"  # nights in a date range and/or on given weekdays
+    LENGTH_OF_STAY = "length_of_stay"  # whole stays of at least min_nights
+    OCCUPANCY = "occupancy"  # nights when the hotel is at least min_occupancy full
+
+
+class PricingRule(BaseModel):
+    """Percentage adjustment of nightly rates or stay totals"""
+    id: Optional[str] = None
+    hotel_id: Optional[str] = None  # None: every hotel
+    room_type: Optional[str] = None  # None: every room type
+    kind: PricingRuleKind
+    name: Optional[str] = None
+    start_date: Optional[date] = None  # Season, first night
+    end_date: Optional[date] = None  # Season, last night
+    weekdays: Optional[List[int]] = None  # Season, 0 = Monday
+    min_nights: Optional[int] = None  # Length of stay
+    min_occupancy: Optional[float] = None  # Occupancy, 0-1
+    adjustment_percent: float  # +20 raises prices by 20%, -10 is a 10% discount
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
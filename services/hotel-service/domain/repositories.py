@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
-from datetime import date
-from domain.entities import Hotel, Room, RoomImage, Review, Reservation
+from typing import Optional, List, Set, Tuple, Dict, Any
+from datetime import date, datetime
+from domain.entities import Hotel, Room, RoomImage, Review, Reservation, ReservationStatus, RoomRate, PricingRule
 
 
 class HotelRepository(ABC):
@@ -20,12 +20,35 @@ class HotelRepository(ABC):
         pass
     
     @abstractmethod
-    async def update_hotel(self, hotel: Hotel) -> Hotel:
+    async def get_hotel_row_by_id(self, hotel_id: str) -> Optional[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def get_hotel_rows(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def search_hotel_rows(
+        self,
+        query: Optional[str] = None,
+        location: Optional[str] = None,
+        amenities: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def update_hotel(self, hotel: Hotel) -> Optional[Hotel]:
         pass
     
     @abstractmethod
     async def delete_hotel(self, hotel_id: str) -> bool:
         pass
+    
+    @abstractmethod
+    async def bulk_upsert_hotels(self, hotels: List[Hotel]) -> List[Tuple[Hotel, bool]]:
+        pass
 
 
 class RoomRepository(ABC):
@@ -48,12 +71,61 @@ class RoomRepository(ABC):
         pass
     
     @abstractmethod
-    async def update_room(self, room: Room) -> Room:
+    async def get_room_row_by_id(self, room_id: str) -> Optional[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def get_room_rows_by_hotel_id(self, hotel_id: str) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def get_room_rows(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def search_room_rows(
+        self,
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        available_only: bool = True,
+        facilities: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def update_room(self, room: Room) -> Optional[Room]:
         pass
     
     @abstractmethod
     async def delete_room(self, room_id: str) -> bool:
         pass
+    
+    @abstractmethod
+    async def bulk_upsert_rooms(self, rooms: List[Room]) -> List[Tuple[Room, bool]]:
+        pass
+    
+    @abstractmethod
+    async def get_existing_hotel_ids(self, hotel_ids: List[str]) -> List[str]:
+        pass
+    
+    @abstractmethod
+    async def get_room_keys(self, room_ids: List[str]) -> Dict[str, Tuple[str, str]]:
+        pass
+    
+    @abstractmethod
+    async def bulk_update_rooms(
+        self,
+        values: Dict[str, Any],
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None,
+        room_numbers: Optional[List[str]] = None,
+        room_number_range: Optional[Tuple[int, int]] = None
+    ) -> int:
+        pass
 
 
 class RoomImageRepository(ABC):
@@ -71,9 +143,21 @@ class RoomImageRepository(ABC):
     async def get_images_by_room_id(self, room_id: str) -> List[RoomImage]:
         pass
     
+    @abstractmethod
+    async def get_image_rows_by_room_id(self, room_id: str) -> List[Dict[str, Any]]:
+        pass
+    
     @abstractmethod
     async def delete_room_image(self, image_id: str) -> bool:
         pass
+    
+    @abstractmethod
+    async def bulk_upsert_room_images(self, images: List[RoomImage]) -> List[Tuple[RoomImage, bool]]:
+        pass
+    
+    @abstractmethod
+    async def get_existing_room_ids(self, room_ids: List[str]) -> List[str]:
+        pass
 
 
 class ReviewRepository(ABC):
@@ -96,7 +180,15 @@ class ReviewRepository(ABC):
         pass
     
     @abstractmethod
-    async def update_review(self, review: Review) -> Review:
+    async def get_review_rows_by_room_id(self, room_id: str) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def get_review_rows_by_user_id(self, user_id: str) -> List[Dict[str, Any]]:
+        pass
+    
+    @abstractmethod
+    async def update_review(self, review: Review) -> Optional[Review]:
         pass
     
     @abstractmethod
@@ -128,7 +220,18 @@ class ReservationRepository(ABC):
         pass
     
     @abstractmethod
-    async def update_reservation(self, reservation: Reservation) -> Reservation:
+    async def update_reservation(self, reservation: Reservation) -> Optional[Reservation]:
+        pass
+    
+    @abstractmethod
+    async def update_reservation_status(
+        self,
+        reservation_id: str,
+        new_status: ReservationStatus,
+        allowed_from: Set[ReservationStatus],
+        employee_id: Optional[str] = None,
+        notes: Optional[str] = None
+    ) -> Optional[Reservation]:
         pass
     
     @abstractmethod
@@ -138,3 +241,66 @@ class ReservationRepository(ABC):
     @abstractmethod
     async def check_room_availability(self, room_id: str, check_in: date, check_out: date) -> bool:
         pass
+    
+    @abstractmethod
+    async def get_hotel_stays(self, hotel_id: str, start: date, end: date) -> List[Tuple[date, date]]:
+        pass
+    
+    @abstractmethod
+    async def expire_pending_reservations(self, created_before: datetime, chunk_size: int, dry_run: bool = False) -> int:
+        pass
+    
+    @abstractmethod
+    async def complete_past_reservations(self, checked_out_before: date, chunk_size: int, dry_run: bool = False) -> int:
+        pass
+
+
+class PricingRepository(ABC):
+    """Abstract rate calendar and pricing rule repository interface"""
+    
+    @abstractmethod
+    async def get_rates(self, hotel_id: str, room_types: List[str], start: date, end: date) -> List[RoomRate]:
+        pass
+    
+    @abstractmethod
+    async def set_rates(self, rates: List[RoomRate]) -> int:
+        pass
+    
+    @abstractmethod
+    async def set_rate_range(
+        self,
+        price: float,
+        start: date,
+        end: date,
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None
+    ) -> int:
+        pass
+    
+    @abstractmethod
+    async def get_rules(self, hotel_id: str) -> List[PricingRule]:
+        pass
+    
+    @abstractmethod
+    async def create_rule(self, rule: PricingRule) -> PricingRule:
+        pass
+    
+    @abstractmethod
+    async def delete_rule(self, rule_id: str) -> Optional[PricingRule]:
+        pass
+    
+    @abstractmethod
+    async def count_rooms(self, hotel_id: str) -> int:
+        pass
+
+
+class UnitOfWork(ABC):
+    """Abstract unit of work: repository writes inside ``async with`` commit together"""
+    
+    @abstractmethod
+    async def __aenter__(self) -> "UnitOfWork":
+        pass
+    
+    @abstractmethod
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
@@ -1,26 +1,182 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, Boolean, DateTime, Float, Integer, Text, ForeignKey, Date
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, inspect, MetaData, Column, String, Boolean, DateTime, Float, Integer, Text, ForeignKey, Date, Index, JSON, func, literal_column, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.sql import Select
+from sqlalchemy.schema import CreateColumn, CreateIndex, CreateTable
+import logging
+import orjson
+import re
 from datetime import datetime
 import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-worker mode, so no locking needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 # Database URL - SQLite with async support
 DATABASE_URL = "sqlite+aiosqlite:///./hotel_service.db"
 
+# Where read-only queries go: a Postgres/SQLite replica, or by default a
+# separate pool of read-only connections to the primary database file
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", DATABASE_URL)
+
+# Connection pool of each worker process (aiosqlite otherwise opens a new
+# connection per checkout). Under gunicorn (gunicorn.conf.py) the pool size
+# defaults to DB_MAX_CONNECTIONS split between the workers
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Catalog reads scale separately from reservation writes
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+
 # Create async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads
+)
+
+# Replica for reads; sessions from AsyncSessionLocal route to it (see RoutingSession)
+read_engine = create_async_engine(
+    READ_DATABASE_URL,
+    echo=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_READ_POOL_SIZE,
+    max_overflow=DB_READ_MAX_OVERFLOW,
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """WAL lets readers in every worker process run while one connection writes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # Wait for the write lock instead of failing with "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    # Enforce foreign keys, which also runs their ON DELETE CASCADE actions
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _make_read_only(dbapi_connection, connection_record):
+    """A write on a read connection is a bug; fail it instead of taking the lock"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+if read_engine.dialect.name == "sqlite":
+    event.listen(read_engine.sync_engine, "connect", _configure_sqlite_connection)
+    event.listen(read_engine.sync_engine, "connect", _make_read_only)
+
+
+@contextmanager
+def process_lock(name: str, blocking: bool = True):
+    """
+    Exclusive lock shared by all worker processes using this database file.
+    Yields False when blocking is off and another process holds the lock.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(f"{DATABASE_URL.split(':///', 1)[1]}.{name}.lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Session.info key set once a session must stay on the primary
+_PRIMARY_KEY = "use_primary"
+
+
+def use_primary(session) -> None:
+    """Send every later statement of the session to the primary"""
+    session.info[_PRIMARY_KEY] = True
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to read_engine and everything else to the session's bind.
+
+    The first statement that is not a plain SELECT (a flush, INSERT/UPDATE/
+    DELETE, SELECT ... FOR UPDATE, raw SQL or a bare connection()) pins the
+    session to the primary, so the rest of the request reads its own writes.
+    Pass ``bind_arguments={"read_only": True}`` to connection() for reads
+    done on a Core connection.
+    """
+
+    def get_bind(self, mapper=None, clause=None, read_only=False, **kw):
+        reads = read_only or (isinstance(clause, Select) and clause._for_update_arg is None)
+        if self._flushing or not reads:
+            use_primary(self)
+        elif not self.info.get(_PRIMARY_KEY):
+            return read_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False
 )
 
 # Base class for models
 Base = declarative_base()
 
+# JSON documents: JSON text on SQLite, binary JSONB (GIN-indexable) on Postgres
+JSONDocument = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+# Flags that search filters on often enough to deserve their own SQLite index
+INDEXED_HOTEL_AMENITIES = ("wifi", "parking", "breakfast", "pool", "gym", "spa", "restaurant", "bar")
+INDEXED_ROOM_FACILITIES = ("king_bed", "twin_beds", "balcony", "mini_bar", "coffee_machine", "safe", "bathtub", "shower")
+
+FLAG_KEY_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+def json_flag(column, key: str):
+    """json_extract(column, '$.key') for a boolean flag in a JSON document.
+
+    The path is rendered inline rather than as a bound parameter so SQLite
+    can match the expression against the json_extract indexes below.
+    """
+    if not FLAG_KEY_PATTERN.match(key):
+        raise ValueError(f"Invalid flag name: {key}")
+    return func.json_extract(column, literal_column(f"'$.{key}'"))
+
+
+def json_flag_indexes(prefix: str, column, keys) -> tuple:
+    """json_extract expression indexes on SQLite, a single GIN index on Postgres"""
+    indexes = tuple(
+        Index(f"{prefix}_{key}", json_flag(column, key)).ddl_if(dialect="sqlite")
+        for key in keys
+    )
+    gin = Index(f"{prefix}_gin", column, postgresql_using="gin").ddl_if(dialect="postgresql")
+    return indexes + (gin,)
+
 
 class HotelModel(Base):
     """SQLAlchemy Hotel model"""
@@ -31,12 +187,14 @@ class HotelModel(Base):
     location = Column(String, nullable=False)
     address = Column(String, nullable=False)
     description = Column(Text, nullable=True)
-    amenities = Column(Text, nullable=True)  # JSON string
+    amenities = Column(JSONDocument, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    rooms = relationship("RoomModel", back_populates="hotel", cascade="all, delete-orphan")
+    # Relationships; the database deletes children through ON DELETE CASCADE
+    rooms = relationship("RoomModel", back_populates="hotel", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = json_flag_indexes("ix_hotels_amenity", amenities, INDEXED_HOTEL_AMENITIES)
 
 
 class RoomModel(Base):
@@ -44,22 +202,26 @@ class RoomModel(Base):
     __tablename__ = "rooms"
     
     id = Column(String, primary_key=True, index=True)
-    hotel_id = Column(String, ForeignKey("hotels.id"), nullable=False)
+    hotel_id = Column(String, ForeignKey("hotels.id", ondelete="CASCADE"), nullable=False)
     room_number = Column(String, nullable=False)
     room_type = Column(String, nullable=False)
     price = Column(Float, nullable=False)
     position = Column(String, nullable=True)
-    facilities = Column(Text, nullable=True)  # JSON string
+    facilities = Column(JSONDocument, nullable=True)
     is_available = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     hotel = relationship("HotelModel", back_populates="rooms")
-    images = relationship("RoomImageModel", back_populates="room", cascade="all, delete-orphan")
-    reviews = relationship("ReviewModel", back_populates="room", cascade="all, delete-orphan")
-    reservations = relationship("ReservationModel", back_populates="room", cascade="all, delete-orphan")
-    reservations = relationship("ReservationModel", back_populates="room", cascade="all, delete-orphan")
+    images = relationship("RoomImageModel", back_populates="room", cascade="all, delete-orphan", passive_deletes=True)
+    reviews = relationship("ReviewModel", back_populates="room", cascade="all, delete-orphan", passive_deletes=True)
+    reservations = relationship("ReservationModel", back_populates="room", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # Natural key used by bulk upserts
+        Index("ux_rooms_hotel_id_room_number", "hotel_id", "room_number", unique=True),
+    ) + json_flag_indexes("ix_rooms_facility", facilities, INDEXED_ROOM_FACILITIES)
 
 
 class RoomImageModel(Base):
@@ -67,7 +229,7 @@ class RoomImageModel(Base):
     __tablename__ = "room_images"
     
     id = Column(String, primary_key=True, index=True)
-    room_id = Column(String, ForeignKey("rooms.id"), nullable=False)
+    room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     image_url = Column(String, nullable=False)
     alt_text = Column(String, nullable=True)
     display_order = Column(Integer, default=1)
@@ -76,13 +238,18 @@ class RoomImageModel(Base):
     # Relationships
     room = relationship("RoomModel", back_populates="images")
 
+    __table_args__ = (
+        # Lookups by room, and the ON DELETE CASCADE from rooms
+        Index("ix_room_images_room_id", "room_id"),
+    )
+
 
 class ReviewModel(Base):
     """SQLAlchemy Review model"""
     __tablename__ = "reviews"
     
     id = Column(String, primary_key=True, index=True)
-    room_id = Column(String, ForeignKey("rooms.id"), nullable=False)
+    room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(String, nullable=False)  # Reference to user service
     rating = Column(Integer, nullable=False)  # 1-5
     comment = Column(Text, nullable=False)
@@ -92,13 +259,18 @@ class ReviewModel(Base):
     # Relationships
     room = relationship("RoomModel", back_populates="reviews")
 
+    __table_args__ = (
+        # Lookups by room, and the ON DELETE CASCADE from rooms
+        Index("ix_reviews_room_id", "room_id"),
+    )
+
 
 class ReservationModel(Base):
     """SQLAlchemy Reservation model"""
     __tablename__ = "reservations"
     
     id = Column(String, primary_key=True, index=True)
-    room_id = Column(String, ForeignKey("rooms.id"), nullable=False)
+    room_id = Column(String, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     client_id = Column(String, nullable=False)  # Reference to user service
     client_email = Column(String, nullable=False)
     client_name = Column(String, nullable=False)
@@ -114,6 +286,80 @@ class ReservationModel(Base):
     # Relationships
     room = relationship("RoomModel", back_populates="reservations")
 
+    __table_args__ = (
+        # Availability checks, lookups by room, and the ON DELETE CASCADE from rooms
+        Index("ix_reservations_room_id_check_in_date", "room_id", "check_in_date"),
+        # Lifecycle sweeps: stale pending reservations and finished stays
+        Index("ix_reservations_status_created_at", "status", "created_at"),
+        Index("ix_reservations_status_check_out_date", "status", "check_out_date"),
+    )
+
+
+class RoomRateModel(Base):
+    """Rate calendar: nightly rate of a room type; nights without one charge the room's own price"""
+    __tablename__ = "room_rates"
+
+    # The key doubles as the index for a room type's nights in a date range
+    hotel_id = Column(String, ForeignKey("hotels.id", ondelete="CASCADE"), primary_key=True)
+    room_type = Column(String, primary_key=True)
+    night = Column(Date, primary_key=True)
+    price = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Rows are stored in key order, with no separate primary key index to maintain
+    __table_args__ = {"sqlite_with_rowid": False}
+
+
+class PricingRuleModel(Base):
+    """Season, length-of-stay and occupancy adjustments (see application.pricing)"""
+    __tablename__ = "pricing_rules"
+
+    id = Column(String, primary_key=True)
+    hotel_id = Column(String, ForeignKey("hotels.id", ondelete="CASCADE"), nullable=True, index=True)  # NULL: every hotel
+    room_type = Column(String, nullable=True)  # NULL: every room type
+    kind = Column(String, nullable=False)
+    name = Column(String, nullable=True)
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    weekdays = Column(JSONDocument, nullable=True)
+    min_nights = Column(Integer, nullable=True)
+    min_occupancy = Column(Float, nullable=True)
+    adjustment_percent = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class HotelShardModel(Base):
+    """Reservation shard each hotel's reservations live in (see infrastructure.sharding)"""
+    __tablename__ = "hotel_shards"
+    
+    hotel_id = Column(String, primary_key=True)
+    shard = Column(String, nullable=False, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class SchedulerLeaseModel(Base):
+    """Lease on a scheduled job, so one worker on any host runs it at a time (see infrastructure.scheduler)"""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class IdempotencyKeyModel(Base):
+    """Stored outcome of a request made with an Idempotency-Key header"""
+    __tablename__ = "idempotency_keys"
+    
+    scope = Column(String, primary_key=True)  # Client or employee the key belongs to
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=True)  # NULL while the request is still running
+    response_body = Column(JSONDocument, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # When the running request claimed the key; a claim older than the lease may be taken over
+    claimed_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
 
 # Database dependency
 async def get_db():
@@ -124,7 +370,119 @@ async def get_db():
             await session.close()
 
 
+def _create_missing_indexes(connection):
+    """Create indexes that were added after the tables already existed"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            # CreateIndex does not evaluate ddl_if() itself
+            ddl_if = getattr(index, "_ddl_if", None)
+            if ddl_if is not None and ddl_if.dialect not in (None, connection.dialect.name):
+                continue
+            try:
+                with connection.begin_nested():
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+            except IntegrityError as e:
+                # Existing duplicate rows block a unique index. Writes that rely on
+                # it (bulk upserts) cannot work without it, so refuse to start
+                raise RuntimeError(
+                    f"Could not create unique index {index.name}: {e.orig}. "
+                    f"Remove the duplicate rows first: {_duplicate_keys(connection, index)}"
+                ) from e
+
+
+def _duplicate_keys(connection, index, limit=20):
+    """The key values that appear more than once in a unique index's columns"""
+    count = func.count().label("count")
+    rows = connection.execute(
+        select(*index.columns, count)
+        .group_by(*index.columns)
+        .having(count > 1)
+        .order_by(*index.columns)
+        .limit(limit)
+    ).all()
+    names = [column.name for column in index.columns]
+    return "; ".join(
+        ", ".join(f"{name}={value!r}" for name, value in zip(names, row)) + f" ({row.count} rows)"
+        for row in rows
+    )
+
+
+def _add_missing_columns(connection):
+    """Add nullable columns that were added after the tables already existed"""
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable or column.primary_key:
+                continue
+            logger.info(f"Adding column {table.name}.{column.name}")
+            connection.exec_driver_sql(
+                f'ALTER TABLE "{table.name}" ADD COLUMN {CreateColumn(column).compile(dialect=connection.dialect)}'
+            )
+
+
+def _add_delete_cascades(connection):
+    """
+    Rebuild tables created before their foreign keys had ON DELETE CASCADE.
+
+    SQLite cannot alter a constraint, so each such table is copied into a
+    new table with the current definition and swapped in (the procedure
+    from https://www.sqlite.org/lang_altertable.html#otheralter). Indexes
+    are recreated by _create_missing_indexes afterwards.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    outdated = []
+    for table in Base.metadata.sorted_tables:
+        cascading = {fk.parent.name for fk in table.foreign_keys if fk.ondelete == "CASCADE"}
+        if not cascading:
+            continue
+        # (id, seq, table, from, to, on_update, on_delete, match)
+        existing = connection.exec_driver_sql(f'PRAGMA foreign_key_list("{table.name}")').all()
+        if any(row[3] in cascading and row[6] != "CASCADE" for row in existing):
+            outdated.append(table)
+    if not outdated:
+        return
+
+    # The rebuilt tables' foreign keys resolve against a copy of the schema
+    schema_copy = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(schema_copy)
+
+    # Must be switched off outside a transaction, or the drops would cascade
+    connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+    try:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        for table in outdated:
+            logger.info(f"Rebuilding {table.name} with ON DELETE CASCADE foreign keys")
+            columns = {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table.name}")')}
+            shared = ", ".join(f'"{column.name}"' for column in table.columns if column.name in columns)
+            rebuilt = table.to_metadata(schema_copy, name=f"_rebuild_{table.name}")
+            connection.execute(CreateTable(rebuilt))
+            connection.exec_driver_sql(
+                f'INSERT INTO "{rebuilt.name}" ({shared}) SELECT {shared} FROM "{table.name}"'
+            )
+            connection.exec_driver_sql(f'DROP TABLE "{table.name}"')
+            connection.exec_driver_sql(f'ALTER TABLE "{rebuilt.name}" RENAME TO "{table.name}"')
+        orphans = connection.exec_driver_sql("PRAGMA foreign_key_check").all()
+        if orphans:
+            logger.warning(f"{len(orphans)} rows reference deleted parents; list them with PRAGMA foreign_key_check")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
 # Create tables
 async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Workers start together; only one may run create_all at a time
+    with process_lock("schema"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with engine.begin() as conn:
+            await conn.run_sync(_add_missing_columns)
+        async with engine.connect() as conn:
+            await conn.run_sync(_add_delete_cascades)
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_missing_indexes)
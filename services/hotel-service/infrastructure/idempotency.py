@@ -0,0 +1,245 @@
+"""
+Idempotency-Key support: each (scope, key) runs its request once
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select, delete, update, func
+from sqlalchemy.exc import IntegrityError
+
+from infrastructure.database import IdempotencyKeyModel
+from infrastructure.unit_of_work import SQLAlchemyUnitOfWork, claim_writer
+from infrastructure.write_coordinator import write_coordinator
+
+logger = logging.getLogger(__name__)
+
+# (status code, JSON body) of a finished request
+StoredResponse = Tuple[int, Any]
+
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used for a different request"""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """Another worker is still executing the request for this key"""
+
+
+class _Unsuccessful(Exception):
+    """Carries a 4xx/5xx response out of the unit of work, rolling back its writes"""
+
+    def __init__(self, response: StoredResponse):
+        self.response = response
+
+
+class IdempotencyStore:
+    """Stores responses keyed by (scope, key) for ``ttl`` seconds.
+
+    The first request for a key claims a row before it runs. Retries of a
+    finished request are answered from the stored response with a single
+    lookup. Concurrent duplicates in this process wait for the original
+    instead of running again. Duplicates arriving at another worker while
+    the original is still running get IdempotencyKeyInProgress, until the
+    claim is older than ``claim_lease`` seconds: then the worker that ran it
+    is presumed dead and the next retry takes the claim over. Responses
+    with a 5xx status are not stored, so those requests may be retried.
+    Claims are written through the write coordinator.
+
+    Given the request's unit of work, the operation runs inside it and a
+    successful response is stored in the same transaction, so a takeover
+    or retry never finds the request's writes without its response. An
+    operation that ends in a 4xx or 5xx has its writes rolled back before
+    the response is stored or the claim released. (With reservation shards
+    the shard commits just before the main database; a worker dying in
+    between leaves a booking without its response.) Without a unit of work
+    each write of the operation commits on its own and the response is
+    stored afterwards.
+    """
+
+    def __init__(
+        self,
+        session_factory=write_coordinator.session,
+        ttl: float = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24")) * 3600,
+        claim_lease: float = float(os.getenv("IDEMPOTENCY_CLAIM_LEASE_SECONDS", "60")),
+        purge_interval: float = 600.0
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.claim_lease = claim_lease
+        self.purge_interval = purge_interval
+        self._in_flight: Dict[Tuple[str, str], Tuple[str, asyncio.Future]] = {}
+        self._last_purge = 0.0
+
+    async def execute(
+        self,
+        scope: str,
+        key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+        unit_of_work: Optional[SQLAlchemyUnitOfWork] = None
+    ) -> Tuple[StoredResponse, bool]:
+        """Run ``operation`` once per (scope, key). Returns the response and whether it was replayed."""
+        in_flight_key = (scope, key)
+        pending = self._in_flight.get(in_flight_key)
+        if pending is not None:
+            pending_hash, future = pending
+            if pending_hash != request_hash:
+                raise IdempotencyKeyMismatch()
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[in_flight_key] = (request_hash, future)
+        try:
+            result = await self._execute(scope, key, request_hash, operation, unit_of_work)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't warn when there are none
+            raise
+        else:
+            future.set_result(result[0])
+            return result
+        finally:
+            del self._in_flight[in_flight_key]
+
+    async def _execute(self, scope, key, request_hash, operation, unit_of_work) -> Tuple[StoredResponse, bool]:
+        now = datetime.utcnow()
+        async with self.session_factory() as session:
+            record = await self._lookup(session, scope, key, request_hash, now)
+            if record is not None and record.status_code is not None:
+                return (record.status_code, record.response_body), True
+            if record is None:
+                # Claim the key so other workers see the request as in progress
+                session.add(IdempotencyKeyModel(
+                    scope=scope,
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    claimed_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl)
+                ))
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()
+                    record = await self._lookup(session, scope, key, request_hash, now)
+                    if record is not None and record.status_code is not None:
+                        return (record.status_code, record.response_body), True
+                    raise IdempotencyKeyInProgress()
+            elif not await self._take_over(session, scope, key, now):
+                raise IdempotencyKeyInProgress()
+
+        stored = False
+        try:
+            if unit_of_work is None:
+                status_code, body = await operation()
+            else:
+                async with unit_of_work:
+                    status_code, body = await operation()
+                    if status_code >= 400:
+                        raise _Unsuccessful((status_code, body))
+                    await claim_writer(unit_of_work.session)
+                    if not await self._store(unit_of_work.session, scope, key, now, status_code, body):
+                        # Taken over while we ran: roll back and leave the request to that worker
+                        raise IdempotencyKeyInProgress()
+                stored = True
+        except _Unsuccessful as e:
+            status_code, body = e.response
+        except IdempotencyKeyInProgress:
+            raise
+        except BaseException:
+            await self._release(scope, key, now)
+            raise
+
+        if status_code >= 500:
+            await self._release(scope, key, now)
+        elif not stored:
+            async with self.session_factory() as session:
+                await self._store(session, scope, key, now, status_code, body)
+                await session.commit()
+
+        await self._purge_expired(now)
+        return (status_code, body), False
+
+    async def _store(self, session, scope: str, key: str, claimed_at: datetime, status_code: int, body) -> bool:
+        """Record the response; only while the claim is still ours, as a worker that took it over stores its own"""
+        result = await session.execute(
+            update(IdempotencyKeyModel)
+            .where(*self._claimed(scope, key, claimed_at))
+            .values(status_code=status_code, response_body=body)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def _claimed(scope: str, key: str, claimed_at: datetime) -> list:
+        return [
+            IdempotencyKeyModel.scope == scope,
+            IdempotencyKeyModel.key == key,
+            IdempotencyKeyModel.claimed_at == claimed_at,
+        ]
+
+    async def _lookup(self, session, scope, key, request_hash, now) -> Optional[IdempotencyKeyModel]:
+        """The key's live record, None if there is none; raises IdempotencyKeyMismatch for another request"""
+        result = await session.execute(
+            select(IdempotencyKeyModel).where(IdempotencyKeyModel.scope == scope, IdempotencyKeyModel.key == key)
+        )
+        record = result.scalar_one_or_none()
+        if record is None:
+            return None
+        if record.expires_at <= now:
+            await session.delete(record)
+            await session.commit()
+            return None
+        if record.request_hash != request_hash:
+            raise IdempotencyKeyMismatch()
+        return record
+
+    async def _take_over(self, session, scope: str, key: str, now: datetime) -> bool:
+        """
+        Claim a key whose request never finished, e.g. because its worker
+        died, once the claim is older than the lease. One conditional UPDATE,
+        so of several retries only one takes it over.
+        """
+        model = IdempotencyKeyModel
+        result = await session.execute(
+            update(model)
+            .where(
+                model.scope == scope,
+                model.key == key,
+                model.status_code.is_(None),
+                # Claims made before claimed_at existed count from created_at
+                func.coalesce(model.claimed_at, model.created_at) <= now - timedelta(seconds=self.claim_lease)
+            )
+            .values(claimed_at=now, expires_at=now + timedelta(seconds=self.ttl))
+        )
+        await session.commit()
+        if result.rowcount != 1:
+            return False
+        logger.warning(f"Took over the stale claim on Idempotency-Key {key!r}")
+        return True
+
+    async def _release(self, scope: str, key: str, claimed_at: datetime):
+        """Drop our claim so the request can be retried"""
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(IdempotencyKeyModel)
+                .where(*self._claimed(scope, key, claimed_at), IdempotencyKeyModel.status_code.is_(None))
+            )
+            await session.commit()
+
+    async def _purge_expired(self, now: datetime):
+        if (now.timestamp() - self._last_purge) < self.purge_interval:
+            return
+        self._last_purge = now.timestamp()
+        try:
+            async with self.session_factory() as session:
+                await session.execute(delete(IdempotencyKeyModel).where(IdempotencyKeyModel.expires_at <= now))
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to purge expired idempotency keys")
+
+
+# Global store shared by the reservation routers
+idempotency_store = IdempotencyStore()
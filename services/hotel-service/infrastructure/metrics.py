@@ -0,0 +1,315 @@
+"""
+Prometheus metrics for the service
+
+A small in-process registry rendered in the Prometheus text exposition
+format at ``/metrics``. Recording a sample is a dict lookup plus an integer
+or float update, so the middleware adds a couple of microseconds per
+request. Histogram buckets are stored per bucket and only made cumulative
+when rendered.
+"""
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Latency buckets in seconds, from a fast cached read to a slow bulk write
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+GROUP_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+QUERY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "PRAGMA", "CREATE", "EXPLAIN", "SAVEPOINT", "RELEASE"}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def _series(self, suffix: str, labels: Tuple[str, ...], value, extra: str = "") -> str:
+        text = _label_text(self.labelnames, labels)
+        if extra:
+            text = f"{text},{extra}" if text else extra
+        return f"{self.name}{suffix}{{{text}}} {value}" if text else f"{self.name}{suffix} {value}"
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        return [self._series("_total", labels, value) for labels, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. requests in flight"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> List[str]:
+        return [self._series("", labels, value) for labels, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Bucketed observations with a running sum and count"""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                lines.append(self._series("_bucket", labels, cumulative, f'le="{bound}"'))
+            cumulative += series[len(self.buckets)]
+            lines.append(self._series("_bucket", labels, cumulative, 'le="+Inf"'))
+            lines.append(self._series("_sum", labels, series[-1]))
+            lines.append(self._series("_count", labels, cumulative))
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the service metrics and renders them for scraping"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the metrics every service exposes
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being served", ("method",)
+)
+db_queries = registry.counter(
+    "db_queries", "Database statements executed by operation", ("operation",)
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Database statement latency by operation", ("operation",), QUERY_BUCKETS
+)
+cache_requests = registry.counter(
+    "cache_requests", "Cache lookups by cache and result (hit or miss)", ("cache", "result")
+)
+cache_invalidations = registry.counter(
+    "cache_invalidations", "Cache invalidation events by cache", ("cache",)
+)
+auth_failures = registry.counter(
+    "auth_failures", "Rejected authentication attempts by reason", ("reason",)
+)
+write_queue_wait = registry.histogram(
+    "db_write_queue_wait_seconds", "Time write transactions wait for the writer connection", (), QUERY_BUCKETS
+)
+write_group_size = registry.histogram(
+    "db_write_group_size", "Write transactions committed together by one group commit", (), GROUP_SIZE_BUCKETS
+)
+
+job_runs = registry.counter(
+    "scheduled_job_runs", "Scheduled job runs by job and outcome (ok, dry_run, skipped or failed)", ("job", "outcome")
+)
+job_rows = registry.counter(
+    "scheduled_job_rows", "Rows changed by scheduled jobs", ("job",)
+)
+job_duration = registry.histogram(
+    "scheduled_job_duration_seconds", "Scheduled job run time", ("job",)
+)
+job_last_success = registry.gauge(
+    "scheduled_job_last_success_timestamp_seconds", "Unix time of the last successful run by job", ("job",)
+)
+
+def record_cache_lookup(cache: str, hit: bool):
+    cache_requests.inc(cache, "hit" if hit else "miss")
+
+
+def record_cache_invalidation(cache: str):
+    cache_invalidations.inc(cache)
+
+
+def record_auth_failure(reason: str):
+    auth_failures.inc(reason)
+
+
+def record_job_run(job: str, outcome: str, rows: int = 0, duration: Optional[float] = None):
+    job_runs.inc(job, outcome)
+    if outcome == "ok":
+        job_rows.inc(job, amount=rows)
+        job_last_success.set(time.time(), job)
+    if duration is not None:
+        job_duration.observe(duration, job)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, latency and in-flight requests
+
+    Requests are labelled with the matched route template (``/rooms/{room_id}``)
+    rather than the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict[object, str]] = None
+
+    def _route_for(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_progress.dec(method)
+            route = self._route_for(scope)
+            http_requests.inc(method, route, str(status_code))
+            http_request_duration.observe(elapsed, method, route)
+
+
+def instrument_engine(engine):
+    """Count and time every statement executed through ``engine``"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        operation = statement.lstrip()[:10].split(None, 1)[0].upper() if statement else "OTHER"
+        if operation not in SQL_OPERATIONS:
+            operation = "OTHER"
+        db_queries.inc(operation)
+        db_query_duration.observe(elapsed, operation)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(context):
+        # after_cursor_execute does not run for failed statements
+        starts = context.connection.info.get("metrics_query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        db_queries.inc("ERROR")
@@ -6,6 +6,9 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 import logging
 
+from infrastructure.metrics import record_auth_failure
+from infrastructure.tracing import tracer
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -34,11 +37,12 @@ class AuthMiddleware:
         """
         try:
             # Decode the JWT token
-            payload = jwt.decode(
-                credentials.credentials,
-                self.jwt_secret,
-                algorithms=[self.jwt_algorithm]
-            )
+            with tracer.span("jwt.verify"):
+                payload = jwt.decode(
+                    credentials.credentials,
+                    self.jwt_secret,
+                    algorithms=[self.jwt_algorithm]
+                )
             
             print(f"DEBUG: JWT payload: {payload}")  # Debug logging
             
@@ -81,6 +85,7 @@ class AuthMiddleware:
             return user_info
             
         except jwt.ExpiredSignatureError:
+            record_auth_failure("expired")
             logger.warning("Token has expired")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,6 +93,7 @@ class AuthMiddleware:
                 headers={"WWW-Authenticate": "Bearer"}
             )
         except jwt.InvalidTokenError as e:
+            record_auth_failure("invalid_token")
             logger.warning(f"Invalid token: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -95,6 +101,7 @@ class AuthMiddleware:
                 headers={"WWW-Authenticate": "Bearer"}
             )
         except Exception as e:
+            record_auth_failure("error")
             logger.error(f"Authentication error: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -112,11 +119,12 @@ class AuthMiddleware:
         
         try:
             # Use the same verification logic but don't raise exceptions
-            payload = jwt.decode(
-                credentials.credentials,
-                self.jwt_secret,
-                algorithms=[self.jwt_algorithm]
-            )
+            with tracer.span("jwt.verify"):
+                payload = jwt.decode(
+                    credentials.credentials,
+                    self.jwt_secret,
+                    algorithms=[self.jwt_algorithm]
+                )
             
             # Check expiration
             exp_timestamp = payload.get("exp")
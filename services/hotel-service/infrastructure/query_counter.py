@@ -0,0 +1,124 @@
+"""
+Request-scoped query counting and N+1 detection
+
+Every statement executed on an instrumented engine is counted against the
+request that issued it (tracked with a context variable), and against any
+active ``capture_queries()`` block, which is how the pytest query-budget
+plugin sees queries run by the app under TestClient. Statements are counted
+by their SQL text, which SQLAlchemy renders identically for every execution
+of the same query shape, and normalized only when a report is produced.
+Transaction control (BEGIN, SAVEPOINT, RELEASE, ...) is not counted; the
+write coordinator wraps every write transaction in savepoints.
+
+QueryCounterMiddleware is meant for development and test runs: it adds an
+``X-Query-Count`` header and logs a warning when one statement shape runs
+more than N_PLUS_ONE_THRESHOLD times in a single request.
+"""
+import logging
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from infrastructure.slow_queries import normalize_statement
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNTER_ENABLED = os.getenv("QUERY_COUNTER_ENABLED", "false").lower() == "true"
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+
+class QueryCounts:
+    """Statements seen during one request or capture block"""
+
+    def __init__(self):
+        self.total = 0
+        self._statements: Counter = Counter()
+
+    def record(self, statement: str):
+        self.total += 1
+        self._statements[statement] += 1
+
+    def shapes(self) -> List[Tuple[str, int]]:
+        """Normalized statements with their execution counts, most frequent first"""
+        shapes: Counter = Counter()
+        for statement, count in self._statements.items():
+            shapes[normalize_statement(statement)] += count
+        return shapes.most_common()
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than ``threshold`` times"""
+        return [(shape, count) for shape, count in self.shapes() if count > threshold]
+
+
+TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT")
+
+_request_counts: ContextVar[Optional[QueryCounts]] = ContextVar("request_query_counts", default=None)
+_captures: List[QueryCounts] = []
+_instrumented = set()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip()[:9].upper().startswith(TRANSACTION_CONTROL):
+        return
+    counts = _request_counts.get()
+    if counts is not None:
+        counts.record(statement)
+    for capture in _captures:
+        capture.record(statement)
+
+
+def install_query_counter(engine):
+    """Count statements executed through ``engine``; safe to call more than once"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if id(sync_engine) in _instrumented:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    _instrumented.add(id(sync_engine))
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryCounts]:
+    """Count every statement run on an instrumented engine inside the block, from any task or thread"""
+    counts = QueryCounts()
+    _captures.append(counts)
+    try:
+        yield counts
+    finally:
+        _captures.remove(counts)
+
+
+class QueryCounterMiddleware:
+    """ASGI middleware counting queries per request and flagging N+1 patterns"""
+
+    def __init__(self, app, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counts = QueryCounts()
+        token = _request_counts.set(counts)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(counts.total).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_counts.reset(token)
+            for shape, count in counts.repeated(self.threshold):
+                logger.warning(
+                    f"Possible N+1 query on {scope['method']} {scope['path']}: "
+                    f"statement ran {count} times: {shape}"
+                )
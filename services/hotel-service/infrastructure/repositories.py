@@ -1,14 +1,118 @@
-from typing import Optional, List
+from typing import Optional, List, Set, Tuple, Dict, Any
+import asyncio
+import heapq
+from itertools import islice
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, tuple_, or_, func, literal, cast, true, Integer, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import selectinload
-import json
 import uuid
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
-from domain.entities import Hotel, Room, RoomImage, Review, Reservation, ReservationStatus
-from domain.repositories import HotelRepository, RoomRepository, RoomImageRepository, ReviewRepository, ReservationRepository
-from infrastructure.database import HotelModel, RoomModel, RoomImageModel, ReviewModel, ReservationModel
+from domain.entities import Hotel, Room, RoomImage, Review, Reservation, ReservationStatus, RoomRate, PricingRule, PricingRuleKind
+from domain.repositories import (
+    HotelRepository, RoomRepository, RoomImageRepository, ReviewRepository, ReservationRepository, PricingRepository
+)
+from infrastructure.database import (
+    HotelModel, RoomModel, RoomImageModel, ReviewModel, ReservationModel, RoomRateModel, PricingRuleModel,
+    json_flag, FLAG_KEY_PATTERN
+)
+from infrastructure.sharding import ReservationShards, ShardSessions, reservation_shards, shard_moves, shard_reservations
+from infrastructure.unit_of_work import claim_writer, enlist, in_unit_of_work
+
+
+async def _save(db: AsyncSession, instance=None):
+    """Commit pending changes, or only flush them while a unit of work owns the transaction"""
+    if in_unit_of_work(db):
+        # Python-side defaults are already populated on flush, no refresh needed
+        await db.flush()
+        return
+    await db.commit()
+    if instance is not None:
+        await db.refresh(instance)
+
+
+async def _update_returning(db: AsyncSession, model, key_column, key: str, values: Dict[str, Any]):
+    """UPDATE ... RETURNING the whole row in one statement; None when no row matched"""
+    table = model.__table__
+    result = await db.execute(
+        update(table).where(key_column == key).values(**values).returning(*table.c)
+    )
+    return result.first()
+
+
+async def _delete_returning(db: AsyncSession, model, key_column, key: str) -> bool:
+    """DELETE ... RETURNING the key in one statement; False when no row matched"""
+    result = await db.execute(
+        delete(model.__table__).where(key_column == key).returning(key_column)
+    )
+    return result.first() is not None
+
+
+async def _transition_in_chunks(
+    db: AsyncSession,
+    table,
+    conditions: list,
+    new_status: ReservationStatus,
+    chunk_size: int,
+    dry_run: bool = False
+) -> int:
+    """
+    Set new_status on every reservation matching conditions, chunk_size rows
+    per UPDATE and transaction so a large backlog never holds the write lock
+    for long. Returns the number of rows changed; a dry run only counts them.
+    """
+    if dry_run:
+        result = await db.execute(select(func.count()).select_from(table).where(*conditions))
+        return result.scalar_one()
+    total = 0
+    while True:
+        chunk = select(table.c.id).where(*conditions).limit(chunk_size)
+        result = await db.execute(
+            update(table)
+            .where(table.c.id.in_(chunk.scalar_subquery()))
+            .values(status=new_status.value, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+        total += result.rowcount
+        if result.rowcount < chunk_size:
+            return total
+
+
+def _room_filters(
+    hotel_id: Optional[str] = None,
+    room_type: Optional[str] = None,
+    room_numbers: Optional[List[str]] = None,
+    room_number_range: Optional[Tuple[int, int]] = None
+) -> list:
+    """WHERE clauses selecting rooms by hotel, type, room numbers or an inclusive numeric room number range"""
+    filters = []
+    if hotel_id is not None:
+        filters.append(RoomModel.hotel_id == hotel_id)
+    if room_type is not None:
+        filters.append(RoomModel.room_type == room_type)
+    if room_numbers:
+        filters.append(RoomModel.room_number.in_(room_numbers))
+    if room_number_range is not None:
+        # Only all-digit room numbers; "12A" would otherwise cast to 12
+        filters.append(RoomModel.room_number.op("NOT GLOB")("*[^0-9]*"))
+        filters.append(cast(RoomModel.room_number, Integer).between(*room_number_range))
+    return filters
+
+
+def _flag_filters(db: AsyncSession, column, flags: List[str]) -> list:
+    """WHERE clauses requiring every flag to be true in a JSON document column"""
+    for flag in flags:
+        if not FLAG_KEY_PATTERN.match(flag):
+            raise ValueError(f"Invalid flag name: {flag}")
+    if not flags:
+        return []
+    if db.bind.dialect.name == "postgresql":
+        # JSONB containment is answered by the GIN index
+        return [column.op("@>")(literal({flag: True for flag in flags}, JSONB))]
+    # One json_extract per flag, each matching its expression index
+    return [json_flag(column, flag) == 1 for flag in flags]
 
 
 class SQLiteHotelRepository(HotelRepository):
@@ -19,28 +123,26 @@ class SQLiteHotelRepository(HotelRepository):
     
     def _model_to_entity(self, model: HotelModel) -> Hotel:
         """Convert SQLAlchemy model to domain entity"""
-        amenities = json.loads(model.amenities) if model.amenities else None
         return Hotel(
             id=model.id,
             name=model.name,
             location=model.location,
             address=model.address,
             description=model.description,
-            amenities=amenities,
+            amenities=model.amenities,
             created_at=model.created_at,
             updated_at=model.updated_at
         )
     
     def _entity_to_model(self, hotel: Hotel) -> HotelModel:
         """Convert domain entity to SQLAlchemy model"""
-        amenities_json = json.dumps(hotel.amenities) if hotel.amenities else None
         return HotelModel(
             id=hotel.id or str(uuid.uuid4()),
             name=hotel.name,
             location=hotel.location,
             address=hotel.address,
             description=hotel.description,
-            amenities=amenities_json,
+            amenities=hotel.amenities or None,
             created_at=hotel.created_at or datetime.utcnow(),
             updated_at=hotel.updated_at or datetime.utcnow()
         )
@@ -56,8 +158,7 @@ class SQLiteHotelRepository(HotelRepository):
                 
             db_hotel = self._entity_to_model(hotel)
             self.db.add(db_hotel)
-            await self.db.commit()
-            await self.db.refresh(db_hotel)
+            await _save(self.db, db_hotel)
             return self._model_to_entity(db_hotel)
         except Exception as e:
             await self.db.rollback()
@@ -77,39 +178,123 @@ class SQLiteHotelRepository(HotelRepository):
         db_hotels = result.scalars().all()
         return [self._model_to_entity(hotel) for hotel in db_hotels]
     
-    async def update_hotel(self, hotel: Hotel) -> Hotel:
+    # Read-only fast path: plain column tuples turned into response-shaped dicts,
+    # skipping ORM identity-map bookkeeping and domain entity validation
+    _ROW_COLUMNS = (
+        HotelModel.id, HotelModel.name, HotelModel.location, HotelModel.address,
+        HotelModel.description, HotelModel.amenities, HotelModel.created_at, HotelModel.updated_at
+    )
+    
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        # JSON columns come back already decoded
+        return row._asdict()
+    
+    async def get_hotel_row_by_id(self, hotel_id: str) -> Optional[Dict[str, Any]]:
         result = await self.db.execute(
-            select(HotelModel).where(HotelModel.id == hotel.id)
+            select(*self._ROW_COLUMNS).where(HotelModel.id == hotel_id)
         )
-        db_hotel = result.scalar_one_or_none()
-        
-        if not db_hotel:
-            raise ValueError(f"Hotel with id {hotel.id} not found")
-        
-        # Update fields
-        db_hotel.name = hotel.name
-        db_hotel.location = hotel.location
-        db_hotel.address = hotel.address
-        db_hotel.description = hotel.description
-        db_hotel.amenities = json.dumps(hotel.amenities) if hotel.amenities else None
-        db_hotel.updated_at = datetime.utcnow()
-        
-        await self.db.commit()
-        await self.db.refresh(db_hotel)
-        return self._model_to_entity(db_hotel)
+        row = result.first()
+        return self._row_to_dict(row) if row else None
     
-    async def delete_hotel(self, hotel_id: str) -> bool:
+    async def get_hotel_rows(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         result = await self.db.execute(
-            select(HotelModel).where(HotelModel.id == hotel_id)
+            select(*self._ROW_COLUMNS).offset(skip).limit(limit)
         )
-        db_hotel = result.scalar_one_or_none()
+        return [self._row_to_dict(row) for row in result]
+    
+    async def search_hotel_rows(
+        self,
+        query: Optional[str] = None,
+        location: Optional[str] = None,
+        amenities: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        stmt = select(*self._ROW_COLUMNS)
+        if query:
+            query = query.lower()
+            stmt = stmt.where(or_(
+                func.lower(HotelModel.name).contains(query, autoescape=True),
+                func.lower(HotelModel.location).contains(query, autoescape=True),
+                func.lower(HotelModel.address).contains(query, autoescape=True),
+                func.lower(HotelModel.description).contains(query, autoescape=True)
+            ))
+        if location:
+            stmt = stmt.where(func.lower(HotelModel.location).contains(location.lower(), autoescape=True))
+        stmt = stmt.where(*_flag_filters(self.db, HotelModel.amenities, amenities or []))
         
-        if not db_hotel:
+        result = await self.db.execute(
+            stmt.order_by(HotelModel.created_at, HotelModel.id).offset(skip).limit(limit)
+        )
+        return [self._row_to_dict(row) for row in result]
+    
+    async def update_hotel(self, hotel: Hotel) -> Optional[Hotel]:
+        row = await _update_returning(self.db, HotelModel, HotelModel.id, hotel.id, {
+            "name": hotel.name,
+            "location": hotel.location,
+            "address": hotel.address,
+            "description": hotel.description,
+            "amenities": hotel.amenities or None,
+            "updated_at": datetime.utcnow()
+        })
+        await _save(self.db)
+        return self._model_to_entity(row) if row else None
+    
+    async def delete_hotel(self, hotel_id: str) -> bool:
+        # Rooms and their images, reviews and reservations go through ON DELETE CASCADE
+        if not await _delete_returning(self.db, HotelModel, HotelModel.id, hotel_id):
             return False
-        
-        await self.db.delete(db_hotel)
-        await self.db.commit()
+        await _save(self.db)
+        if reservation_shards.enabled:
+            await reservation_shards.purge(hotel_id=hotel_id)
         return True
+    
+    async def bulk_upsert_hotels(self, hotels: List[Hotel]) -> List[Tuple[Hotel, bool]]:
+        """Insert or update hotels by id with one executemany in one transaction"""
+        now = datetime.utcnow()
+        for hotel in hotels:
+            hotel.id = hotel.id or str(uuid.uuid4())
+            hotel.created_at = hotel.created_at or now
+            hotel.updated_at = now
+        
+        try:
+            result = await self.db.execute(
+                select(HotelModel.id).where(HotelModel.id.in_([hotel.id for hotel in hotels]))
+            )
+            existing_ids = set(result.scalars().all())
+            
+            stmt = sqlite_insert(HotelModel)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[HotelModel.id],
+                set_={
+                    "name": stmt.excluded.name,
+                    "location": stmt.excluded.location,
+                    "address": stmt.excluded.address,
+                    "description": stmt.excluded.description,
+                    "amenities": stmt.excluded.amenities,
+                    "updated_at": stmt.excluded.updated_at
+                }
+            )
+            await self.db.execute(stmt, [
+                {
+                    "id": hotel.id,
+                    "name": hotel.name,
+                    "location": hotel.location,
+                    "address": hotel.address,
+                    "description": hotel.description,
+                    "amenities": hotel.amenities or None,
+                    "created_at": hotel.created_at,
+                    "updated_at": hotel.updated_at
+                }
+                for hotel in hotels
+            ])
+            await _save(self.db)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        
+        return [(hotel, hotel.id not in existing_ids) for hotel in hotels]
 
 
 class SQLiteRoomRepository(RoomRepository):
@@ -120,7 +305,6 @@ class SQLiteRoomRepository(RoomRepository):
     
     def _model_to_entity(self, model: RoomModel) -> Room:
         """Convert SQLAlchemy model to domain entity"""
-        facilities = json.loads(model.facilities) if model.facilities else None
         return Room(
             id=model.id,
             hotel_id=model.hotel_id,
@@ -128,7 +312,7 @@ class SQLiteRoomRepository(RoomRepository):
             room_type=model.room_type,
             price=model.price,
             position=model.position,
-            facilities=facilities,
+            facilities=model.facilities,
             is_available=model.is_available,
             created_at=model.created_at,
             updated_at=model.updated_at
@@ -136,7 +320,6 @@ class SQLiteRoomRepository(RoomRepository):
     
     def _entity_to_model(self, room: Room) -> RoomModel:
         """Convert domain entity to SQLAlchemy model"""
-        facilities_json = json.dumps(room.facilities) if room.facilities else None
         return RoomModel(
             id=room.id or str(uuid.uuid4()),
             hotel_id=room.hotel_id,
@@ -144,7 +327,7 @@ class SQLiteRoomRepository(RoomRepository):
             room_type=room.room_type,
             price=room.price,
             position=room.position,
-            facilities=facilities_json,
+            facilities=room.facilities or None,
             is_available=room.is_available,
             created_at=room.created_at or datetime.utcnow(),
             updated_at=room.updated_at or datetime.utcnow()
@@ -161,8 +344,7 @@ class SQLiteRoomRepository(RoomRepository):
                 
             db_room = self._entity_to_model(room)
             self.db.add(db_room)
-            await self.db.commit()
-            await self.db.refresh(db_room)
+            await _save(self.db, db_room)
             return self._model_to_entity(db_room)
         except Exception as e:
             await self.db.rollback()
@@ -189,41 +371,189 @@ class SQLiteRoomRepository(RoomRepository):
         db_rooms = result.scalars().all()
         return [self._model_to_entity(room) for room in db_rooms]
     
-    async def update_room(self, room: Room) -> Room:
+    # Read-only fast path, see SQLiteHotelRepository._ROW_COLUMNS
+    _ROW_COLUMNS = (
+        RoomModel.id, RoomModel.hotel_id, RoomModel.room_number, RoomModel.room_type, RoomModel.price,
+        RoomModel.position, RoomModel.facilities, RoomModel.is_available, RoomModel.created_at, RoomModel.updated_at
+    )
+    
+    @staticmethod
+    def _row_to_dict(row) -> Dict[str, Any]:
+        return row._asdict()
+    
+    async def get_room_row_by_id(self, room_id: str) -> Optional[Dict[str, Any]]:
         result = await self.db.execute(
-            select(RoomModel).where(RoomModel.id == room.id)
+            select(*self._ROW_COLUMNS).where(RoomModel.id == room_id)
         )
-        db_room = result.scalar_one_or_none()
-        
-        if not db_room:
-            raise ValueError(f"Room with id {room.id} not found")
-        
-        # Update fields
-        db_room.hotel_id = room.hotel_id
-        db_room.room_number = room.room_number
-        db_room.room_type = room.room_type
-        db_room.price = room.price
-        db_room.position = room.position
-        db_room.facilities = json.dumps(room.facilities) if room.facilities else None
-        db_room.is_available = room.is_available
-        db_room.updated_at = datetime.utcnow()
-        
-        await self.db.commit()
-        await self.db.refresh(db_room)
-        return self._model_to_entity(db_room)
+        row = result.first()
+        return self._row_to_dict(row) if row else None
     
-    async def delete_room(self, room_id: str) -> bool:
+    async def get_room_rows_by_hotel_id(self, hotel_id: str) -> List[Dict[str, Any]]:
         result = await self.db.execute(
-            select(RoomModel).where(RoomModel.id == room_id)
+            select(*self._ROW_COLUMNS).where(RoomModel.hotel_id == hotel_id)
         )
-        db_room = result.scalar_one_or_none()
+        return [self._row_to_dict(row) for row in result]
+    
+    async def get_room_rows(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        result = await self.db.execute(
+            select(*self._ROW_COLUMNS).offset(skip).limit(limit)
+        )
+        return [self._row_to_dict(row) for row in result]
+    
+    async def search_room_rows(
+        self,
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        available_only: bool = True,
+        facilities: Optional[List[str]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        stmt = select(*self._ROW_COLUMNS)
+        if hotel_id:
+            stmt = stmt.where(RoomModel.hotel_id == hotel_id)
+        if available_only:
+            stmt = stmt.where(RoomModel.is_available.is_(True))
+        if room_type:
+            stmt = stmt.where(func.lower(RoomModel.room_type).contains(room_type.lower(), autoescape=True))
+        if min_price is not None:
+            stmt = stmt.where(RoomModel.price >= min_price)
+        if max_price is not None:
+            stmt = stmt.where(RoomModel.price <= max_price)
+        stmt = stmt.where(*_flag_filters(self.db, RoomModel.facilities, facilities or []))
         
-        if not db_room:
+        result = await self.db.execute(
+            stmt.order_by(RoomModel.created_at, RoomModel.id).offset(skip).limit(limit)
+        )
+        return [self._row_to_dict(row) for row in result]
+    
+    async def update_room(self, room: Room) -> Optional[Room]:
+        if reservation_shards.enabled:
+            current_hotel_id = (await self.db.execute(
+                select(RoomModel.hotel_id).where(RoomModel.id == room.id)
+            )).scalar_one_or_none()
+            # Its reservations live on, and are stamped with, the old hotel's shard
+            moving = current_hotel_id is not None and room.hotel_id is not None and room.hotel_id != current_hotel_id
+            if moving and await reservation_shards.room_has_reservations(room.id):
+                raise ValueError("A room with reservations cannot be moved to another hotel")
+        row = await _update_returning(self.db, RoomModel, RoomModel.id, room.id, {
+            "hotel_id": room.hotel_id,
+            "room_number": room.room_number,
+            "room_type": room.room_type,
+            "price": room.price,
+            "position": room.position,
+            "facilities": room.facilities or None,
+            "is_available": room.is_available,
+            "updated_at": datetime.utcnow()
+        })
+        await _save(self.db)
+        if reservation_shards.enabled:
+            reservation_shards.forget_room(room.id)
+        return self._model_to_entity(row) if row else None
+    
+    async def delete_room(self, room_id: str) -> bool:
+        # Images, reviews and reservations go through ON DELETE CASCADE
+        if not await _delete_returning(self.db, RoomModel, RoomModel.id, room_id):
             return False
-        
-        await self.db.delete(db_room)
-        await self.db.commit()
+        await _save(self.db)
+        if reservation_shards.enabled:
+            await reservation_shards.purge(room_ids=[room_id])
         return True
+    
+    async def get_existing_hotel_ids(self, hotel_ids: List[str]) -> List[str]:
+        result = await self.db.execute(
+            select(HotelModel.id).where(HotelModel.id.in_(hotel_ids))
+        )
+        return list(result.scalars().all())
+    
+    async def get_room_keys(self, room_ids: List[str]) -> Dict[str, Tuple[str, str]]:
+        """(hotel_id, room_number) of each existing room among room_ids"""
+        result = await self.db.execute(
+            select(RoomModel.id, RoomModel.hotel_id, RoomModel.room_number).where(RoomModel.id.in_(room_ids))
+        )
+        return {row.id: (row.hotel_id, row.room_number) for row in result}
+    
+    async def bulk_update_rooms(
+        self,
+        values: Dict[str, Any],
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None,
+        room_numbers: Optional[List[str]] = None,
+        room_number_range: Optional[Tuple[int, int]] = None
+    ) -> int:
+        """Set the same values on every matching room with one UPDATE; returns the number of rooms changed"""
+        filters = _room_filters(hotel_id, room_type, room_numbers, room_number_range)
+        try:
+            result = await self.db.execute(
+                update(RoomModel.__table__).where(*filters).values(**values, updated_at=datetime.utcnow())
+            )
+            await _save(self.db)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        return result.rowcount
+    
+    async def bulk_upsert_rooms(self, rooms: List[Room]) -> List[Tuple[Room, bool]]:
+        """Insert or update rooms by (hotel_id, room_number) with one executemany in one transaction"""
+        now = datetime.utcnow()
+        try:
+            # Existing rooms keep their id and created_at
+            result = await self.db.execute(
+                select(RoomModel.id, RoomModel.hotel_id, RoomModel.room_number, RoomModel.created_at).where(
+                    tuple_(RoomModel.hotel_id, RoomModel.room_number).in_(
+                        [(room.hotel_id, room.room_number) for room in rooms]
+                    )
+                )
+            )
+            existing = {(row.hotel_id, row.room_number): row for row in result}
+            
+            created_flags = []
+            for room in rooms:
+                row = existing.get((room.hotel_id, room.room_number))
+                created_flags.append(row is None)
+                if row is not None:
+                    room.id = row.id
+                    room.created_at = row.created_at
+                else:
+                    room.id = room.id or str(uuid.uuid4())
+                    room.created_at = room.created_at or now
+                room.updated_at = now
+            
+            stmt = sqlite_insert(RoomModel)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RoomModel.hotel_id, RoomModel.room_number],
+                set_={
+                    "room_type": stmt.excluded.room_type,
+                    "price": stmt.excluded.price,
+                    "position": stmt.excluded.position,
+                    "facilities": stmt.excluded.facilities,
+                    "is_available": stmt.excluded.is_available,
+                    "updated_at": stmt.excluded.updated_at
+                }
+            )
+            await self.db.execute(stmt, [
+                {
+                    "id": room.id,
+                    "hotel_id": room.hotel_id,
+                    "room_number": room.room_number,
+                    "room_type": room.room_type,
+                    "price": room.price,
+                    "position": room.position,
+                    "facilities": room.facilities or None,
+                    "is_available": room.is_available,
+                    "created_at": room.created_at,
+                    "updated_at": room.updated_at
+                }
+                for room in rooms
+            ])
+            await _save(self.db)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        
+        return list(zip(rooms, created_flags))
 
 
 class SQLiteRoomImageRepository(RoomImageRepository):
@@ -263,8 +593,7 @@ class SQLiteRoomImageRepository(RoomImageRepository):
                 
             db_image = self._entity_to_model(image)
             self.db.add(db_image)
-            await self.db.commit()
-            await self.db.refresh(db_image)
+            await _save(self.db, db_image)
             return self._model_to_entity(db_image)
         except Exception as e:
             await self.db.rollback()
@@ -286,18 +615,69 @@ class SQLiteRoomImageRepository(RoomImageRepository):
         db_images = result.scalars().all()
         return [self._model_to_entity(image) for image in db_images]
     
+    async def get_image_rows_by_room_id(self, room_id: str) -> List[Dict[str, Any]]:
+        result = await self.db.execute(
+            select(
+                RoomImageModel.id, RoomImageModel.room_id, RoomImageModel.image_url,
+                RoomImageModel.alt_text, RoomImageModel.display_order, RoomImageModel.created_at
+            )
+            .where(RoomImageModel.room_id == room_id)
+            .order_by(RoomImageModel.display_order)
+        )
+        return [row._asdict() for row in result]
+    
     async def delete_room_image(self, image_id: str) -> bool:
+        deleted = await _delete_returning(self.db, RoomImageModel, RoomImageModel.id, image_id)
+        if deleted:
+            await _save(self.db)
+        return deleted
+    
+    async def get_existing_room_ids(self, room_ids: List[str]) -> List[str]:
         result = await self.db.execute(
-            select(RoomImageModel).where(RoomImageModel.id == image_id)
+            select(RoomModel.id).where(RoomModel.id.in_(room_ids))
         )
-        db_image = result.scalar_one_or_none()
+        return list(result.scalars().all())
+    
+    async def bulk_upsert_room_images(self, images: List[RoomImage]) -> List[Tuple[RoomImage, bool]]:
+        """Insert or update room images by id with one executemany in one transaction"""
+        now = datetime.utcnow()
+        for image in images:
+            image.id = image.id or str(uuid.uuid4())
+            image.created_at = image.created_at or now
         
-        if not db_image:
-            return False
+        try:
+            result = await self.db.execute(
+                select(RoomImageModel.id).where(RoomImageModel.id.in_([image.id for image in images]))
+            )
+            existing_ids = set(result.scalars().all())
+            
+            stmt = sqlite_insert(RoomImageModel)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[RoomImageModel.id],
+                set_={
+                    "room_id": stmt.excluded.room_id,
+                    "image_url": stmt.excluded.image_url,
+                    "alt_text": stmt.excluded.alt_text,
+                    "display_order": stmt.excluded.display_order
+                }
+            )
+            await self.db.execute(stmt, [
+                {
+                    "id": image.id,
+                    "room_id": image.room_id,
+                    "image_url": image.image_url,
+                    "alt_text": image.alt_text,
+                    "display_order": image.display_order,
+                    "created_at": image.created_at
+                }
+                for image in images
+            ])
+            await _save(self.db)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
         
-        await self.db.delete(db_image)
-        await self.db.commit()
-        return True
+        return [(image, image.id not in existing_ids) for image in images]
 
 
 class SQLiteReviewRepository(ReviewRepository):
@@ -341,8 +721,7 @@ class SQLiteReviewRepository(ReviewRepository):
                 
             db_review = self._entity_to_model(review)
             self.db.add(db_review)
-            await self.db.commit()
-            await self.db.refresh(db_review)
+            await _save(self.db, db_review)
             return self._model_to_entity(db_review)
         except Exception as e:
             await self.db.rollback()
@@ -373,36 +752,60 @@ class SQLiteReviewRepository(ReviewRepository):
         db_reviews = result.scalars().all()
         return [self._model_to_entity(review) for review in db_reviews]
     
-    async def update_review(self, review: Review) -> Review:
+    _ROW_COLUMNS = (
+        ReviewModel.id, ReviewModel.room_id, ReviewModel.user_id, ReviewModel.rating,
+        ReviewModel.comment, ReviewModel.created_at, ReviewModel.updated_at
+    )
+    
+    async def get_review_rows_by_room_id(self, room_id: str) -> List[Dict[str, Any]]:
         result = await self.db.execute(
-            select(ReviewModel).where(ReviewModel.id == review.id)
+            select(*self._ROW_COLUMNS)
+            .where(ReviewModel.room_id == room_id)
+            .order_by(ReviewModel.created_at.desc())
         )
-        db_review = result.scalar_one_or_none()
-        
-        if not db_review:
-            raise ValueError(f"Review with id {review.id} not found")
-        
-        # Update fields
-        db_review.rating = review.rating
-        db_review.comment = review.comment
-        db_review.updated_at = datetime.utcnow()
-        
-        await self.db.commit()
-        await self.db.refresh(db_review)
-        return self._model_to_entity(db_review)
+        return [row._asdict() for row in result]
     
-    async def delete_review(self, review_id: str) -> bool:
+    async def get_review_rows_by_user_id(self, user_id: str) -> List[Dict[str, Any]]:
         result = await self.db.execute(
-            select(ReviewModel).where(ReviewModel.id == review_id)
+            select(*self._ROW_COLUMNS)
+            .where(ReviewModel.user_id == user_id)
+            .order_by(ReviewModel.created_at.desc())
         )
-        db_review = result.scalar_one_or_none()
-        
-        if not db_review:
-            return False
-        
-        await self.db.delete(db_review)
-        await self.db.commit()
-        return True
+        return [row._asdict() for row in result]
+    
+    async def update_review(self, review: Review) -> Optional[Review]:
+        row = await _update_returning(self.db, ReviewModel, ReviewModel.id, review.id, {
+            "rating": review.rating,
+            "comment": review.comment,
+            "updated_at": datetime.utcnow()
+        })
+        await _save(self.db)
+        return self._model_to_entity(row) if row else None
+    
+    async def delete_review(self, review_id: str) -> bool:
+        deleted = await _delete_returning(self.db, ReviewModel, ReviewModel.id, review_id)
+        if deleted:
+            await _save(self.db)
+        return deleted
+
+
+def _reservation_to_entity(model) -> Reservation:
+    """Reservation entity from a model or a reservations row"""
+    return Reservation(
+        id=model.id,
+        room_id=model.room_id,
+        client_id=model.client_id,
+        client_email=model.client_email,
+        client_name=model.client_name,
+        employee_id=model.employee_id,
+        check_in_date=model.check_in_date,
+        check_out_date=model.check_out_date,
+        total_price=model.total_price,
+        status=ReservationStatus(model.status),
+        notes=model.notes,
+        created_at=model.created_at,
+        updated_at=model.updated_at
+    )
 
 
 class SQLiteReservationRepository(ReservationRepository):
@@ -413,23 +816,10 @@ class SQLiteReservationRepository(ReservationRepository):
     
     def _model_to_entity(self, model: ReservationModel) -> Reservation:
         """Convert SQLAlchemy model to domain entity"""
-        return Reservation(
-            id=model.id,
-            room_id=model.room_id,
-            client_id=model.client_id,
-            client_email=model.client_email,
-            client_name=model.client_name,
-            employee_id=model.employee_id,
-            check_in_date=model.check_in_date,
-            check_out_date=model.check_out_date,
-            total_price=model.total_price,
-            status=ReservationStatus(model.status),
-            notes=model.notes,
-            created_at=model.created_at,
-            updated_at=model.updated_at
-        )
+        return _reservation_to_entity(model)
     
     async def create_reservation(self, reservation: Reservation) -> Reservation:
+        await claim_writer(self.db)
         db_reservation = ReservationModel(
             id=str(uuid.uuid4()),
             room_id=reservation.room_id,
@@ -447,8 +837,7 @@ class SQLiteReservationRepository(ReservationRepository):
         )
         
         self.db.add(db_reservation)
-        await self.db.commit()
-        await self.db.refresh(db_reservation)
+        await _save(self.db, db_reservation)
         return self._model_to_entity(db_reservation)
     
     async def get_reservation_by_id(self, reservation_id: str) -> Optional[Reservation]:
@@ -479,40 +868,58 @@ class SQLiteReservationRepository(ReservationRepository):
         db_reservations = result.scalars().all()
         return [self._model_to_entity(r) for r in db_reservations]
     
-    async def update_reservation(self, reservation: Reservation) -> Reservation:
+    async def update_reservation(self, reservation: Reservation) -> Optional[Reservation]:
+        await claim_writer(self.db)
+        row = await _update_returning(self.db, ReservationModel, ReservationModel.id, reservation.id, {
+            "status": reservation.status.value,
+            "notes": reservation.notes,
+            "employee_id": reservation.employee_id,
+            "updated_at": datetime.utcnow()
+        })
+        await _save(self.db)
+        return self._model_to_entity(row) if row else None
+    
+    async def update_reservation_status(
+        self,
+        reservation_id: str,
+        new_status: ReservationStatus,
+        allowed_from: Set[ReservationStatus],
+        employee_id: Optional[str] = None,
+        notes: Optional[str] = None
+    ) -> Optional[Reservation]:
+        """Compare-and-set status change; None if the reservation is missing or not in an allowed status"""
+        values = {"status": new_status.value, "updated_at": datetime.utcnow()}
+        if employee_id:
+            values["employee_id"] = employee_id
+        if notes:
+            values["notes"] = notes
+        
+        reservations = ReservationModel.__table__
+        await claim_writer(self.db)
         result = await self.db.execute(
-            select(ReservationModel).where(ReservationModel.id == reservation.id)
+            update(reservations)
+            .where(
+                reservations.c.id == reservation_id,
+                reservations.c.status.in_([status.value for status in allowed_from])
+            )
+            .values(**values)
+            .returning(*reservations.c)
         )
-        db_reservation = result.scalar_one_or_none()
-        
-        if not db_reservation:
-            raise ValueError(f"Reservation with id {reservation.id} not found")
-        
-        # Update fields
-        db_reservation.status = reservation.status.value
-        db_reservation.notes = reservation.notes
-        db_reservation.employee_id = reservation.employee_id
-        db_reservation.updated_at = datetime.utcnow()
-        
-        await self.db.commit()
-        await self.db.refresh(db_reservation)
-        return self._model_to_entity(db_reservation)
+        row = result.first()
+        await _save(self.db)
+        return self._model_to_entity(row) if row else None
     
     async def delete_reservation(self, reservation_id: str) -> bool:
-        result = await self.db.execute(
-            select(ReservationModel).where(ReservationModel.id == reservation_id)
-        )
-        db_reservation = result.scalar_one_or_none()
-        
-        if not db_reservation:
-            return False
-        
-        await self.db.delete(db_reservation)
-        await self.db.commit()
-        return True
+        await claim_writer(self.db)
+        deleted = await _delete_returning(self.db, ReservationModel, ReservationModel.id, reservation_id)
+        if deleted:
+            await _save(self.db)
+        return deleted
     
     async def check_room_availability(self, room_id: str, check_in: datetime, check_out: datetime) -> bool:
         """Check if room is available for given dates"""
+        # Held until the booking it allows commits
+        await claim_writer(self.db)
         # Check for overlapping reservations
         result = await self.db.execute(
             select(ReservationModel).where(
@@ -524,3 +931,433 @@ class SQLiteReservationRepository(ReservationRepository):
         )
         overlapping_reservations = result.scalars().all()
         return len(overlapping_reservations) == 0
+    
+    async def get_hotel_stays(self, hotel_id: str, start: date, end: date) -> List[Tuple[date, date]]:
+        """(check-in, check-out) of the hotel's pending and confirmed reservations overlapping [start, end)"""
+        result = await self.db.execute(
+            select(ReservationModel.check_in_date, ReservationModel.check_out_date)
+            .join(RoomModel, RoomModel.id == ReservationModel.room_id)
+            .where(
+                RoomModel.hotel_id == hotel_id,
+                ReservationModel.status.in_([ReservationStatus.PENDING.value, ReservationStatus.CONFIRMED.value]),
+                ReservationModel.check_in_date < end,
+                ReservationModel.check_out_date > start
+            )
+        )
+        return [tuple(row) for row in result]
+    
+    async def expire_pending_reservations(self, created_before: datetime, chunk_size: int, dry_run: bool = False) -> int:
+        """Cancel pending reservations created before created_before"""
+        reservations = ReservationModel.__table__
+        return await _transition_in_chunks(self.db, reservations, [
+            reservations.c.status == ReservationStatus.PENDING.value,
+            reservations.c.created_at < created_before
+        ], ReservationStatus.CANCELLED, chunk_size, dry_run)
+    
+    async def complete_past_reservations(self, checked_out_before: date, chunk_size: int, dry_run: bool = False) -> int:
+        """Complete confirmed reservations whose check-out date is before checked_out_before"""
+        reservations = ReservationModel.__table__
+        return await _transition_in_chunks(self.db, reservations, [
+            reservations.c.status == ReservationStatus.CONFIRMED.value,
+            reservations.c.check_out_date < checked_out_before
+        ], ReservationStatus.COMPLETED, chunk_size, dry_run)
+
+
+class ShardedReservationRepository(ReservationRepository):
+    """Reservations split across shards by hotel (see infrastructure.sharding).
+
+    Lookups by room go to the shard of the room's hotel. Lookups by id or
+    client and chain-wide listings query every shard concurrently. Inside a
+    unit of work, the first use of a shard takes its write lock (BEGIN
+    IMMEDIATE) and enlists its session, so an availability check and the
+    booking it allows are one transaction on that shard. Writes follow the
+    forwarding entry a move leaves on the old shard, read under that lock.
+    """
+    
+    def __init__(self, db: AsyncSession, shard_sessions: ShardSessions):
+        self.db = db
+        self.shard_sessions = shard_sessions
+        self.shards: ReservationShards = shard_sessions.shards
+    
+    async def _session(self, shard: str) -> AsyncSession:
+        session = self.shard_sessions.get(shard)
+        if in_unit_of_work(self.db) and enlist(self.db, session) and session.bind.dialect.name == "sqlite":
+            conn = await session.connection()
+            await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        return session
+    
+    async def _write_session(self, shard: str, hotel_id: str) -> AsyncSession:
+        """Session on the shard that holds the hotel now, following forwarding entries"""
+        seen = set()
+        while True:
+            session = await self._session(shard)
+            target = (await session.execute(
+                select(shard_moves.c.target).where(shard_moves.c.hotel_id == hotel_id)
+            )).scalar_one_or_none()
+            if target is None:
+                return session
+            if target in seen:
+                raise RuntimeError(f"Hotel {hotel_id} is forwarded in a loop through {sorted(seen)}")
+            seen.add(shard)
+            # Our route predates the move
+            self.shards.remember_route(hotel_id, target)
+            shard = target
+    
+    async def _room_shard(self, room_id: str) -> Optional[Tuple[str, str]]:
+        """(hotel_id, shard) of a room; None if the room does not exist"""
+        hotel_id = await self.shards.hotel_for_room(room_id)
+        if hotel_id is None:
+            return None
+        return hotel_id, await self.shards.shard_for_hotel(hotel_id)
+    
+    async def _save(self, session: AsyncSession):
+        """Commit the shard's changes, or leave them to the unit of work"""
+        if not in_unit_of_work(self.db):
+            await session.commit()
+    
+    async def _scatter(self, statement) -> List[List[Any]]:
+        """Rows of ``statement`` from every shard, one list per shard"""
+        async def query(shard: str):
+            return (await self.shard_sessions.get(shard).execute(statement)).all()
+        return await asyncio.gather(*(query(shard) for shard in self.shards.names))
+    
+    async def _locate(self, reservation_id: str) -> Optional[AsyncSession]:
+        """Session on the shard holding the reservation, ready for writing"""
+        results = await self._scatter(
+            select(shard_reservations.c.hotel_id).where(shard_reservations.c.id == reservation_id)
+        )
+        for shard, rows in zip(self.shards.names, results):
+            if rows:
+                # The old copy of a moving hotel forwards to the new one
+                return await self._write_session(shard, rows[0].hotel_id)
+        return None
+    
+    async def create_reservation(self, reservation: Reservation) -> Reservation:
+        routed = await self._room_shard(reservation.room_id)
+        if routed is None:
+            raise ValueError(f"Room with id {reservation.room_id} not found")
+        hotel_id, shard = routed
+        session = await self._write_session(shard, hotel_id)
+        now = datetime.utcnow()
+        result = await session.execute(
+            insert(shard_reservations).values(
+                id=str(uuid.uuid4()),
+                hotel_id=hotel_id,
+                room_id=reservation.room_id,
+                client_id=reservation.client_id,
+                client_email=reservation.client_email,
+                client_name=reservation.client_name,
+                employee_id=reservation.employee_id,
+                check_in_date=reservation.check_in_date,
+                check_out_date=reservation.check_out_date,
+                total_price=reservation.total_price,
+                status=reservation.status.value,
+                notes=reservation.notes,
+                created_at=now,
+                updated_at=now
+            ).returning(*shard_reservations.c)
+        )
+        row = result.first()
+        await self._save(session)
+        return _reservation_to_entity(row)
+    
+    async def get_reservation_by_id(self, reservation_id: str) -> Optional[Reservation]:
+        results = await self._scatter(
+            select(shard_reservations).where(shard_reservations.c.id == reservation_id)
+        )
+        rows = [row for shard_rows in results for row in shard_rows]
+        # Both copies of a hotel that is being moved; the old one stops changing
+        return _reservation_to_entity(max(rows, key=lambda row: row.updated_at)) if rows else None
+    
+    async def get_reservations_by_client_id(self, client_id: str) -> List[Reservation]:
+        results = await self._scatter(
+            select(shard_reservations)
+            .where(shard_reservations.c.client_id == client_id)
+            .order_by(shard_reservations.c.created_at, shard_reservations.c.id)
+        )
+        rows = heapq.merge(*results, key=lambda row: (row.created_at, row.id))
+        return [_reservation_to_entity(row) for row in rows]
+    
+    async def get_reservations_by_room_id(self, room_id: str) -> List[Reservation]:
+        routed = await self._room_shard(room_id)
+        if routed is None:
+            return []
+        result = await self.shard_sessions.get(routed[1]).execute(
+            select(shard_reservations).where(shard_reservations.c.room_id == room_id)
+        )
+        return [_reservation_to_entity(row) for row in result]
+    
+    async def get_reservations(self, skip: int = 0, limit: int = 100) -> List[Reservation]:
+        """One page of every shard's reservations in creation order"""
+        # Each shard contributes at most skip + limit rows to the merged page
+        results = await self._scatter(
+            select(shard_reservations)
+            .order_by(shard_reservations.c.created_at, shard_reservations.c.id)
+            .limit(skip + limit)
+        )
+        rows = heapq.merge(*results, key=lambda row: (row.created_at, row.id))
+        return [_reservation_to_entity(row) for row in islice(rows, skip, skip + limit)]
+    
+    async def update_reservation(self, reservation: Reservation) -> Optional[Reservation]:
+        session = await self._locate(reservation.id)
+        if session is None:
+            return None
+        result = await session.execute(
+            update(shard_reservations)
+            .where(shard_reservations.c.id == reservation.id)
+            .values(
+                status=reservation.status.value,
+                notes=reservation.notes,
+                employee_id=reservation.employee_id,
+                updated_at=datetime.utcnow()
+            )
+            .returning(*shard_reservations.c)
+        )
+        row = result.first()
+        await self._save(session)
+        return _reservation_to_entity(row) if row else None
+    
+    async def update_reservation_status(
+        self,
+        reservation_id: str,
+        new_status: ReservationStatus,
+        allowed_from: Set[ReservationStatus],
+        employee_id: Optional[str] = None,
+        notes: Optional[str] = None
+    ) -> Optional[Reservation]:
+        """Compare-and-set status change on the reservation's shard"""
+        session = await self._locate(reservation_id)
+        if session is None:
+            return None
+        values = {"status": new_status.value, "updated_at": datetime.utcnow()}
+        if employee_id:
+            values["employee_id"] = employee_id
+        if notes:
+            values["notes"] = notes
+        
+        result = await session.execute(
+            update(shard_reservations)
+            .where(
+                shard_reservations.c.id == reservation_id,
+                shard_reservations.c.status.in_([status.value for status in allowed_from])
+            )
+            .values(**values)
+            .returning(*shard_reservations.c)
+        )
+        row = result.first()
+        await self._save(session)
+        return _reservation_to_entity(row) if row else None
+    
+    async def delete_reservation(self, reservation_id: str) -> bool:
+        session = await self._locate(reservation_id)
+        if session is None:
+            return False
+        result = await session.execute(
+            delete(shard_reservations).where(shard_reservations.c.id == reservation_id).returning(shard_reservations.c.id)
+        )
+        deleted = result.first() is not None
+        await self._save(session)
+        return deleted
+    
+    async def check_room_availability(self, room_id: str, check_in: datetime, check_out: datetime) -> bool:
+        """Check if room is available for given dates"""
+        routed = await self._room_shard(room_id)
+        if routed is None:
+            return True
+        session = await self._write_session(routed[1], routed[0])
+        result = await session.execute(
+            select(shard_reservations.c.id).where(
+                shard_reservations.c.room_id == room_id,
+                shard_reservations.c.status.in_([ReservationStatus.PENDING.value, ReservationStatus.CONFIRMED.value]),
+                shard_reservations.c.check_in_date < check_out,
+                shard_reservations.c.check_out_date > check_in
+            ).limit(1)
+        )
+        return result.first() is None
+    
+    async def get_hotel_stays(self, hotel_id: str, start: date, end: date) -> List[Tuple[date, date]]:
+        """(check-in, check-out) of the hotel's pending and confirmed reservations overlapping [start, end)"""
+        shard = await self.shards.shard_for_hotel(hotel_id)
+        result = await self.shard_sessions.get(shard).execute(
+            select(shard_reservations.c.check_in_date, shard_reservations.c.check_out_date).where(
+                shard_reservations.c.hotel_id == hotel_id,
+                shard_reservations.c.status.in_([ReservationStatus.PENDING.value, ReservationStatus.CONFIRMED.value]),
+                shard_reservations.c.check_in_date < end,
+                shard_reservations.c.check_out_date > start
+            )
+        )
+        return [tuple(row) for row in result]
+    
+    async def _transition_all_shards(self, conditions: list, new_status: ReservationStatus, chunk_size: int, dry_run: bool) -> int:
+        """_transition_in_chunks on every shard concurrently; total rows changed"""
+        counts = await asyncio.gather(*(
+            _transition_in_chunks(self.shard_sessions.get(shard), shard_reservations, conditions, new_status,
+                                  chunk_size, dry_run)
+            for shard in self.shards.names
+        ))
+        return sum(counts)
+    
+    async def expire_pending_reservations(self, created_before: datetime, chunk_size: int, dry_run: bool = False) -> int:
+        """Cancel pending reservations created before created_before"""
+        return await self._transition_all_shards([
+            shard_reservations.c.status == ReservationStatus.PENDING.value,
+            shard_reservations.c.created_at < created_before
+        ], ReservationStatus.CANCELLED, chunk_size, dry_run)
+    
+    async def complete_past_reservations(self, checked_out_before: date, chunk_size: int, dry_run: bool = False) -> int:
+        """Complete confirmed reservations whose check-out date is before checked_out_before"""
+        return await self._transition_all_shards([
+            shard_reservations.c.status == ReservationStatus.CONFIRMED.value,
+            shard_reservations.c.check_out_date < checked_out_before
+        ], ReservationStatus.COMPLETED, chunk_size, dry_run)
+
+
+def _rule_to_entity(row) -> PricingRule:
+    """Pricing rule entity from a model or a pricing_rules row"""
+    return PricingRule(
+        id=row.id,
+        hotel_id=row.hotel_id,
+        room_type=row.room_type,
+        kind=PricingRuleKind(row.kind),
+        name=row.name,
+        start_date=row.start_date,
+        end_date=row.end_date,
+        weekdays=row.weekdays,
+        min_nights=row.min_nights,
+        min_occupancy=row.min_occupancy,
+        adjustment_percent=row.adjustment_percent,
+        created_at=row.created_at
+    )
+
+
+class SQLitePricingRepository(PricingRepository):
+    """SQLite implementation of the rate calendar and pricing rule repository"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_rates(self, hotel_id: str, room_types: List[str], start: date, end: date) -> List[RoomRate]:
+        """Calendar rates of the room types for the nights in [start, end)"""
+        rates = RoomRateModel.__table__
+        result = await self.db.execute(
+            select(rates.c.hotel_id, rates.c.room_type, rates.c.night, rates.c.price, rates.c.updated_at).where(
+                rates.c.hotel_id == hotel_id,
+                rates.c.room_type.in_(room_types),
+                rates.c.night >= start,
+                rates.c.night < end
+            )
+        )
+        return [RoomRate.model_construct(**row) for row in result.mappings()]
+    
+    async def set_rates(self, rates: List[RoomRate]) -> int:
+        """Insert or replace calendar rates with one executemany"""
+        if not rates:
+            return 0
+        now = datetime.utcnow()
+        stmt = sqlite_insert(RoomRateModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RoomRateModel.hotel_id, RoomRateModel.room_type, RoomRateModel.night],
+            set_={"price": stmt.excluded.price, "updated_at": stmt.excluded.updated_at}
+        )
+        try:
+            await self.db.execute(stmt, [
+                {"hotel_id": rate.hotel_id, "room_type": rate.room_type, "night": rate.night,
+                 "price": rate.price, "updated_at": now}
+                for rate in rates
+            ])
+            await _save(self.db)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        return len(rates)
+    
+    async def set_rate_range(
+        self,
+        price: float,
+        start: date,
+        end: date,
+        hotel_id: Optional[str] = None,
+        room_type: Optional[str] = None
+    ) -> int:
+        """Set the rate of every night in [start, end) for the room types of the matching rooms.
+
+        One INSERT ... SELECT ... ON CONFLICT: the nights come from a recursive
+        CTE and are crossed with the distinct (hotel, room type) pairs of the
+        matching rooms, so no rows are read back into Python.
+        """
+        # The CTE nests in a subquery so the statement still starts with INSERT
+        # (pysqlite reports no rowcount for statements starting with WITH)
+        nights = select(literal(start.isoformat()).label("night")).cte("nights", recursive=True, nesting=True)
+        nights = nights.union_all(
+            select(func.date(nights.c.night, "+1 day")).where(nights.c.night < (end - timedelta(days=1)).isoformat())
+        )
+        source = (
+            select(
+                RoomModel.hotel_id, RoomModel.room_type, nights.c.night,
+                literal(price).label("price"), literal(datetime.utcnow(), DateTime).label("updated_at")
+            )
+            .distinct()
+            .select_from(RoomModel)
+            .join(nights, true())
+            .where(*_room_filters(hotel_id, room_type))
+            # Insert in key order: appends to the index instead of scattered page writes
+            .order_by(RoomModel.hotel_id, RoomModel.room_type, nights.c.night)
+            .subquery()
+        )
+        # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+        stmt = sqlite_insert(RoomRateModel).from_select(
+            ["hotel_id", "room_type", "night", "price", "updated_at"], select(source).where(true())
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RoomRateModel.hotel_id, RoomRateModel.room_type, RoomRateModel.night],
+            set_={"price": stmt.excluded.price, "updated_at": stmt.excluded.updated_at}
+        )
+        try:
+            result = await self.db.execute(stmt)
+            await _save(self.db)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        return result.rowcount
+    
+    async def get_rules(self, hotel_id: str) -> List[PricingRule]:
+        """The hotel's rules and the rules for every hotel"""
+        rules = PricingRuleModel.__table__
+        result = await self.db.execute(
+            select(rules)
+            .where(or_(rules.c.hotel_id == hotel_id, rules.c.hotel_id.is_(None)))
+            .order_by(rules.c.created_at, rules.c.id)
+        )
+        return [_rule_to_entity(row) for row in result]
+    
+    async def create_rule(self, rule: PricingRule) -> PricingRule:
+        rules = PricingRuleModel.__table__
+        values = rule.model_dump(exclude={"id", "created_at"})
+        values["kind"] = rule.kind.value
+        try:
+            result = await self.db.execute(
+                insert(rules)
+                .values(id=str(uuid.uuid4()), created_at=datetime.utcnow(), **values)
+                .returning(*rules.c)
+            )
+            row = result.first()
+            await _save(self.db)
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        return _rule_to_entity(row)
+    
+    async def delete_rule(self, rule_id: str) -> Optional[PricingRule]:
+        """DELETE ... RETURNING the rule, so callers know whose prices changed"""
+        rules = PricingRuleModel.__table__
+        result = await self.db.execute(delete(rules).where(rules.c.id == rule_id).returning(*rules.c))
+        row = result.first()
+        if row is not None:
+            await _save(self.db)
+        return _rule_to_entity(row) if row else None
+    
+    async def count_rooms(self, hotel_id: str) -> int:
+        result = await self.db.execute(
+            select(func.count()).select_from(RoomModel).where(RoomModel.hotel_id == hotel_id)
+        )
+        return result.scalar_one()
@@ -0,0 +1,221 @@
+"""
+In-process scheduler for periodic batch jobs
+
+Each job is an async function taking ``dry_run`` and returning the number
+of rows it changed (or, on a dry run, would change). Every job runs in its
+own loop: run, sleep ``interval`` seconds, repeat. A run first takes the
+job's lock, so under a multi-worker server one worker runs it at a time and
+the others skip the round:
+
+- ``process``: a file lock (see ``process_lock``), for workers on one host
+  sharing the SQLite file
+- ``database``: a lease row in ``scheduler_leases``, for workers on several
+  hosts sharing one database; a worker that dies mid-run blocks the job
+  until its lease expires after SCHEDULER_LEASE_SECONDS
+- ``none``: no lock, for a single worker
+
+Jobs must be idempotent: a worker that skipped a round runs the job again
+on its own timer, and then finds little or nothing left to do.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from infrastructure.database import SchedulerLeaseModel, engine, process_lock
+from infrastructure.metrics import record_job_run
+
+logger = logging.getLogger(__name__)
+
+LOCK_MODES = ("process", "database", "none")
+
+# dry_run -> rows changed, or rows that would be changed on a dry run
+JobFunction = Callable[[bool], Awaitable[int]]
+
+
+class Job:
+    """A registered job and the outcome of its last run"""
+
+    def __init__(self, name: str, interval: float, run: JobFunction):
+        self.name = name
+        self.interval = interval
+        self.run = run
+        self.runs = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_outcome: Optional[str] = None
+        self.last_rows: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_outcome": self.last_outcome,
+            "last_rows": self.last_rows,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """Runs registered jobs periodically in the background.
+
+    SCHEDULER_ENABLED=false turns the loops off; jobs can still be run on
+    demand with ``run_job``. With SCHEDULER_DRY_RUN=true the loops only
+    count what the jobs would change.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true",
+        lock: str = os.getenv("SCHEDULER_LOCK", "process"),
+        dry_run: bool = os.getenv("SCHEDULER_DRY_RUN", "false").lower() == "true",
+        lease_seconds: float = float(os.getenv("SCHEDULER_LEASE_SECONDS", "600")),
+        db_engine: AsyncEngine = engine
+    ):
+        if lock not in LOCK_MODES:
+            raise ValueError(f"SCHEDULER_LOCK must be one of {', '.join(LOCK_MODES)}, not {lock!r}")
+        self.enabled = enabled
+        self.lock = lock
+        self.dry_run = dry_run
+        self.lease_seconds = lease_seconds
+        self.engine = db_engine
+        # Lease owner: unique per process, readable in the leases table
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, interval: float, run: JobFunction) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already registered")
+        if interval <= 0:
+            raise ValueError("Job interval must be positive")
+        job = self.jobs[name] = Job(name, interval, run)
+        return job
+
+    async def start(self):
+        """Start one background loop per job"""
+        if not self.enabled or self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._loop(job)) for job in self.jobs.values()]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "lock": self.lock,
+            "dry_run": self.dry_run,
+            "jobs": [job.stats() for job in self.jobs.values()],
+        }
+
+    async def run_job(self, name: str, dry_run: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Run a job now under its lock. Returns the outcome (ok, dry_run or
+        skipped when another worker holds the lock) and the rows changed;
+        exceptions from the job are recorded and re-raised.
+        """
+        job = self.jobs.get(name)
+        if job is None:
+            raise KeyError(name)
+        dry_run = self.dry_run if dry_run is None else dry_run
+        rows = None
+        started = time.perf_counter()
+        async with self._lock(job) as acquired:
+            if not acquired:
+                outcome = "skipped"
+            else:
+                try:
+                    rows = await job.run(dry_run)
+                except Exception as e:
+                    duration = time.perf_counter() - started
+                    record_job_run(name, "failed", duration=duration)
+                    self._finish(job, "failed", None, str(e))
+                    raise
+                outcome = "dry_run" if dry_run else "ok"
+        duration = time.perf_counter() - started
+        record_job_run(name, outcome, rows or 0, duration if acquired else None)
+        self._finish(job, outcome, rows)
+        return {"job": name, "outcome": outcome, "rows": rows, "duration_seconds": round(duration, 6)}
+
+    def _finish(self, job: Job, outcome: str, rows: Optional[int], error: Optional[str] = None):
+        job.runs += 1
+        job.last_run_at = datetime.utcnow()
+        job.last_outcome = outcome
+        job.last_rows = rows
+        job.last_error = error
+
+    async def _loop(self, job: Job):
+        while True:
+            try:
+                result = await self.run_job(job.name)
+                if result["rows"]:
+                    logger.info(f"Job {job.name}: {result['outcome']}, {result['rows']} rows")
+            except Exception:
+                logger.exception(f"Scheduled job {job.name} failed")
+            await asyncio.sleep(job.interval)
+
+    @asynccontextmanager
+    async def _lock(self, job: Job) -> AsyncIterator[bool]:
+        """Yields whether this worker may run the job"""
+        if self.lock == "none":
+            yield True
+        elif self.lock == "process":
+            with process_lock(f"job-{job.name}", blocking=False) as acquired:
+                yield acquired
+        else:
+            acquired = await self._take_lease(job.name)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    await self._release_lease(job.name)
+
+    async def _take_lease(self, name: str) -> bool:
+        """Insert or take over an expired lease in one statement; True if this worker now holds it"""
+        now = datetime.utcnow()
+        leases = SchedulerLeaseModel.__table__
+        insert = postgresql_insert if self.engine.dialect.name == "postgresql" else sqlite_insert
+        statement = insert(leases).values(
+            name=name, owner=self.owner, expires_at=now + timedelta(seconds=self.lease_seconds)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[leases.c.name],
+            set_={"owner": statement.excluded.owner, "expires_at": statement.excluded.expires_at},
+            where=leases.c.expires_at <= now
+        )
+        async with self.engine.begin() as conn:
+            result = await conn.execute(statement)
+        return result.rowcount == 1
+
+    async def _release_lease(self, name: str):
+        leases = SchedulerLeaseModel.__table__
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                update(leases)
+                .where(leases.c.name == name, leases.c.owner == self.owner)
+                .values(expires_at=datetime.utcnow())
+            )
+
+
+# Global scheduler, started and stopped by the application lifecycle
+scheduler = Scheduler()
@@ -0,0 +1,456 @@
+"""
+Per-hotel sharding of reservations
+
+With RESERVATION_SHARDS set, reservations live in that many shard databases
+(one SQLite file each by default) instead of the main database. All of a
+hotel's reservations are in one shard: the one in the hotel_shards routing
+table of the main database, or else one picked by hashing the hotel id.
+Bookings at hotels on different shards take different write locks.
+Chain-wide queries go to every shard and merge the results.
+rebalance_shards.py moves hotels between shards; a moved hotel leaves a
+forwarding entry in its old shard's hotel_moves table, so writes that still
+reach the old shard through a cached route are sent on to the new one.
+"""
+import asyncio
+import logging
+import os
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Column, Date, DateTime, Float, Index, MetaData, String, Table, Text, delete, event, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateIndex
+
+from infrastructure.database import (
+    DB_MAX_OVERFLOW, DB_POOL_SIZE, HotelModel, HotelShardModel, ReservationModel, RoomModel,
+    _configure_sqlite_connection, engine, process_lock, read_engine
+)
+
+logger = logging.getLogger(__name__)
+
+RESERVATION_SHARDS = int(os.getenv("RESERVATION_SHARDS", "0"))
+# {shard} is replaced by the shard name (shard0, shard1, ...)
+RESERVATION_SHARD_URL = os.getenv(
+    "RESERVATION_SHARD_URL", "sqlite+aiosqlite:///./hotel_service.reservations.{shard}.db"
+)
+# How long a worker trusts a cached route. Workers can still look for a moved
+# hotel on its old shard for this long (writes there are forwarded), so
+# rebalancing keeps the old copy until then.
+SHARD_ROUTE_TTL = float(os.getenv("SHARD_ROUTE_TTL_SECONDS", "30"))
+MAX_CACHED_ROUTES = 100_000
+COPY_BATCH_SIZE = 5_000
+
+shard_metadata = MetaData()
+
+# The reservations table without its foreign key (rooms stay in the main
+# database), plus the hotel each reservation belongs to
+shard_reservations = Table(
+    "reservations", shard_metadata,
+    Column("id", String, primary_key=True),
+    Column("hotel_id", String, nullable=False),
+    Column("room_id", String, nullable=False),
+    Column("client_id", String, nullable=False),
+    Column("client_email", String, nullable=False),
+    Column("client_name", String, nullable=False),
+    Column("employee_id", String, nullable=True),
+    Column("check_in_date", Date, nullable=False),
+    Column("check_out_date", Date, nullable=False),
+    Column("total_price", Float, nullable=False),
+    Column("status", String, nullable=False),
+    Column("notes", Text, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    # Availability checks and room listings
+    Index("ix_reservations_room_id_check_in_date", "room_id", "check_in_date"),
+    Index("ix_reservations_client_id", "client_id"),
+    # Rebalancing copies and deletes a hotel at a time
+    Index("ix_reservations_hotel_id_id", "hotel_id", "id"),
+    # Chain-wide listings merge every shard in creation order
+    Index("ix_reservations_created_at_id", "created_at", "id"),
+    # Lifecycle sweeps: stale pending reservations and finished stays
+    Index("ix_reservations_status_created_at", "status", "created_at"),
+    Index("ix_reservations_status_check_out_date", "status", "check_out_date"),
+)
+
+# Hotels moved off this shard and where to, until the move is finished
+shard_moves = Table(
+    "hotel_moves", shard_metadata,
+    Column("hotel_id", String, primary_key=True),
+    Column("target", String, nullable=False),
+    Column("moved_at", DateTime, nullable=False),
+)
+
+
+def _create_shard_engine(url: str) -> AsyncEngine:
+    shard_engine = create_async_engine(
+        url,
+        echo=True,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW
+    )
+    if shard_engine.dialect.name == "sqlite":
+        event.listen(shard_engine.sync_engine, "connect", _configure_sqlite_connection)
+    return shard_engine
+
+
+def _insert_for(conn):
+    """INSERT supporting ON CONFLICT for the connection's dialect"""
+    return postgresql_insert if conn.dialect.name == "postgresql" else sqlite_insert
+
+
+class ReservationShards:
+    """Shard engines and the hotel -> shard routes"""
+
+    def __init__(
+        self,
+        count: int = RESERVATION_SHARDS,
+        url_template: str = RESERVATION_SHARD_URL,
+        route_ttl: float = SHARD_ROUTE_TTL
+    ):
+        self.names = [f"shard{i}" for i in range(count)]
+        self.engines: Dict[str, AsyncEngine] = {
+            name: _create_shard_engine(url_template.format(shard=name)) for name in self.names
+        }
+        self.route_ttl = route_ttl
+        # hotel_id -> (shard, expiry) and room_id -> (hotel_id, expiry)
+        self._routes: Dict[str, Tuple[str, float]] = {}
+        self._room_hotels: Dict[str, Tuple[str, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.names)
+
+    async def create_tables(self):
+        with process_lock("shards"):
+            for shard_engine in self.engines.values():
+                async with shard_engine.begin() as conn:
+                    await conn.run_sync(shard_metadata.create_all)
+                    # Indexes added after a shard's table was created
+                    for index in shard_reservations.indexes:
+                        await conn.execute(CreateIndex(index, if_not_exists=True))
+
+    async def dispose(self):
+        for shard_engine in self.engines.values():
+            await shard_engine.dispose()
+
+    def default_shard(self, hotel_id: str) -> str:
+        """Shard of a hotel without a route; depends on the number of shards, see pin_routes()"""
+        return self.names[zlib.crc32(hotel_id.encode()) % len(self.names)]
+
+    async def shard_for_hotel(self, hotel_id: str) -> str:
+        shard = self._cached(self._routes, hotel_id)
+        if shard is None:
+            async with read_engine.connect() as conn:
+                shard = (await conn.execute(
+                    select(HotelShardModel.shard).where(HotelShardModel.hotel_id == hotel_id)
+                )).scalar_one_or_none()
+            if shard is None:
+                shard = self.default_shard(hotel_id)
+            self._remember(self._routes, hotel_id, shard)
+        if shard not in self.engines:
+            # e.g. RESERVATION_SHARDS was lowered without moving the hotels off the dropped shards
+            raise RuntimeError(f"Hotel {hotel_id} is routed to unknown shard {shard}")
+        return shard
+
+    async def hotel_for_room(self, room_id: str) -> Optional[str]:
+        hotel_id = self._cached(self._room_hotels, room_id)
+        if hotel_id is None:
+            async with read_engine.connect() as conn:
+                hotel_id = (await conn.execute(
+                    select(RoomModel.hotel_id).where(RoomModel.id == room_id)
+                )).scalar_one_or_none()
+            if hotel_id is not None:
+                self._remember(self._room_hotels, room_id, hotel_id)
+        return hotel_id
+
+    def forget_room(self, room_id: str):
+        """Drop a cached room -> hotel entry, e.g. after the room changed hotels"""
+        self._room_hotels.pop(room_id, None)
+
+    async def room_has_reservations(self, room_id: str) -> bool:
+        for shard_engine in self.engines.values():
+            async with shard_engine.connect() as conn:
+                found = (await conn.execute(
+                    select(shard_reservations.c.id).where(shard_reservations.c.room_id == room_id).limit(1)
+                )).first()
+            if found is not None:
+                return True
+        return False
+
+    async def set_route(self, hotel_id: str, shard: str):
+        async with engine.begin() as conn:
+            routes = HotelShardModel.__table__
+            statement = _insert_for(conn)(routes).values(hotel_id=hotel_id, shard=shard, updated_at=datetime.utcnow())
+            await conn.execute(statement.on_conflict_do_update(
+                index_elements=[routes.c.hotel_id],
+                set_={"shard": statement.excluded.shard, "updated_at": statement.excluded.updated_at}
+            ))
+        self._remember(self._routes, hotel_id, shard)
+
+    def remember_route(self, hotel_id: str, shard: str):
+        """Cache a route learned elsewhere, e.g. from a forwarding entry"""
+        self._remember(self._routes, hotel_id, shard)
+
+    async def pin_routes(self) -> int:
+        """
+        Record the current shard of every hotel that has no route yet.
+
+        Hotels without a route are placed by hashing their id over the
+        shards, so that placement changes with RESERVATION_SHARDS; pin the
+        routes before changing the number of shards. Returns the number of
+        routes added.
+        """
+        hotels = HotelModel.__table__
+        routes = HotelShardModel.__table__
+        added = 0
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                select(hotels.c.id).where(~select(routes.c.hotel_id).where(routes.c.hotel_id == hotels.c.id).exists())
+            )
+            now = datetime.utcnow()
+            for batch in iter(lambda: result.fetchmany(COPY_BATCH_SIZE), []):
+                rows = [{"hotel_id": hotel_id, "shard": self.default_shard(hotel_id), "updated_at": now} for hotel_id, in batch]
+                await conn.execute(routes.insert(), rows)
+                added += len(rows)
+        return added
+
+    async def remove_route(self, hotel_id: str):
+        async with engine.begin() as conn:
+            await conn.execute(delete(HotelShardModel.__table__).where(HotelShardModel.hotel_id == hotel_id))
+        self._routes.pop(hotel_id, None)
+
+    async def purge(self, hotel_id: Optional[str] = None, room_ids: Iterable[str] = ()):
+        """Delete the reservations of a deleted hotel or deleted rooms from every shard"""
+        statements = []
+        if hotel_id is not None:
+            statements.append(delete(shard_reservations).where(shard_reservations.c.hotel_id == hotel_id))
+            statements.append(delete(shard_moves).where(shard_moves.c.hotel_id == hotel_id))
+        room_ids = list(room_ids)
+        if room_ids:
+            statements.append(delete(shard_reservations).where(shard_reservations.c.room_id.in_(room_ids)))
+        for statement in statements:
+            for shard_engine in self.engines.values():
+                async with shard_engine.begin() as conn:
+                    await conn.execute(statement)
+        if hotel_id is not None:
+            await self.remove_route(hotel_id)
+
+    @staticmethod
+    def _cached(cache: Dict[str, Tuple[str, float]], key: str) -> Optional[str]:
+        entry = cache.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def _remember(self, cache: Dict[str, Tuple[str, float]], key: str, value: str):
+        if len(cache) >= MAX_CACHED_ROUTES:
+            cache.clear()
+        cache[key] = (value, time.monotonic() + self.route_ttl)
+
+
+class ShardSessions:
+    """A request's sessions on the reservation shards, opened on first use"""
+
+    def __init__(self, shards: ReservationShards):
+        self.shards = shards
+        self._sessions: Dict[str, AsyncSession] = {}
+
+    def get(self, name: str) -> AsyncSession:
+        session = self._sessions.get(name)
+        if session is None:
+            session = self._sessions[name] = AsyncSession(self.shards.engines[name], expire_on_commit=False)
+        return session
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+
+# Rebalancing
+
+async def hotel_counts(shards: ReservationShards) -> Dict[str, Dict[str, int]]:
+    """Reservations per hotel in each shard"""
+    counts: Dict[str, Dict[str, int]] = {}
+    for name, shard_engine in shards.engines.items():
+        async with shard_engine.connect() as conn:
+            result = await conn.execute(
+                select(shard_reservations.c.hotel_id, func.count()).group_by(shard_reservations.c.hotel_id)
+            )
+            counts[name] = {hotel_id: count for hotel_id, count in result}
+    return counts
+
+
+def plan_rebalance(counts: Dict[str, Dict[str, int]], max_moves: Optional[int] = None) -> List[Tuple[str, str, str]]:
+    """
+    (hotel_id, source, target) moves that even out the reservations per shard.
+
+    Greedy: repeatedly moves the hotel from the fullest to the emptiest shard
+    that brings the two closest together, until no hotel is small enough to
+    narrow the gap.
+    """
+    hotels = {shard: dict(by_hotel) for shard, by_hotel in counts.items()}
+    loads = {shard: sum(by_hotel.values()) for shard, by_hotel in hotels.items()}
+    moves: List[Tuple[str, str, str]] = []
+    while len(loads) > 1 and (max_moves is None or len(moves) < max_moves):
+        source = max(loads, key=loads.get)
+        target = min(loads, key=loads.get)
+        gap = loads[source] - loads[target]
+        # Moving n reservations leaves a gap of |gap - 2n|, smaller only if n < gap
+        candidates = [(count, hotel_id) for hotel_id, count in hotels[source].items() if 0 < count < gap]
+        if not candidates:
+            break
+        count, hotel_id = min(candidates, key=lambda candidate: (abs(gap - 2 * candidate[0]), candidate[1]))
+        hotels[target][hotel_id] = hotels[source].pop(hotel_id)
+        loads[source] -= count
+        loads[target] += count
+        moves.append((hotel_id, source, target))
+    return moves
+
+
+async def _copy_hotel(shards: ReservationShards, hotel_id: str, source: str, target: str) -> int:
+    """
+    Copy a hotel's reservations to ``target`` and leave a forwarding entry in ``source``.
+
+    Runs under the source shard's write lock, which every booking of the
+    hotel there also takes and then checks for a forwarding entry: nothing
+    is written to the source after the copy, and nothing reaches the target
+    before it, so the copy is exact. Bookings of the source's other hotels
+    wait for the copy.
+    """
+    copied = 0
+    async with shards.engines[source].begin() as source_conn:
+        if source_conn.dialect.name == "sqlite":
+            await source_conn.exec_driver_sql("BEGIN IMMEDIATE")
+        async with shards.engines[target].begin() as target_conn:
+            # Left over from an earlier move of the hotel that did not complete,
+            # or from a move away from the target that is now undone
+            stale = (await target_conn.execute(
+                delete(shard_reservations).where(shard_reservations.c.hotel_id == hotel_id)
+            )).rowcount
+            if stale:
+                logger.warning(f"Replaced {stale} stale reservations of hotel {hotel_id} in {target}")
+            await target_conn.execute(delete(shard_moves).where(shard_moves.c.hotel_id == hotel_id))
+
+            result = await source_conn.stream(
+                select(shard_reservations).where(shard_reservations.c.hotel_id == hotel_id)
+            )
+            async for rows in result.mappings().partitions(COPY_BATCH_SIZE):
+                await target_conn.execute(shard_reservations.insert(), [dict(row) for row in rows])
+                copied += len(rows)
+        await source_conn.execute(shard_moves.insert().values(hotel_id=hotel_id, target=target, moved_at=datetime.utcnow()))
+    return copied
+
+
+async def start_move(shards: ReservationShards, hotel_id: str, target: str) -> Optional[str]:
+    """Copy a hotel's reservations to ``target`` and route it there; returns the old shard, None if already there"""
+    if target not in shards.engines:
+        raise ValueError(f"Unknown shard {target}")
+    source = await shards.shard_for_hotel(hotel_id)
+    if source == target:
+        return None
+    await _copy_hotel(shards, hotel_id, source, target)
+    await shards.set_route(hotel_id, target)
+    return source
+
+
+async def finish_move(shards: ReservationShards, hotel_id: str, source: str, target: str) -> int:
+    """
+    Once no worker routes the hotel to ``source`` any more, delete the hotel
+    and its forwarding entry from it. Returns the number of reservations the
+    hotel has on ``target``.
+    """
+    async with shards.engines[source].begin() as conn:
+        await conn.execute(delete(shard_reservations).where(shard_reservations.c.hotel_id == hotel_id))
+        await conn.execute(delete(shard_moves).where(shard_moves.c.hotel_id == hotel_id))
+    async with shards.engines[target].connect() as conn:
+        moved = (await conn.execute(
+            select(func.count()).select_from(shard_reservations).where(shard_reservations.c.hotel_id == hotel_id)
+        )).scalar_one()
+    logger.info(f"Moved {moved} reservations of hotel {hotel_id} from {source} to {target}")
+    return moved
+
+
+async def move_hotel(shards: ReservationShards, hotel_id: str, target: str, grace: Optional[float] = None) -> int:
+    """
+    Move a hotel's reservations to ``target`` while the service is running.
+
+    Between switching the route and removing the hotel from its old shard,
+    waits ``grace`` seconds (the route TTL by default) for other workers'
+    cached routes to expire; until then their writes are forwarded and
+    their reads see the old copy. Returns the number of reservations moved.
+    """
+    source = await start_move(shards, hotel_id, target)
+    if source is None:
+        return 0
+    await asyncio.sleep(shards.route_ttl if grace is None else grace)
+    return await finish_move(shards, hotel_id, source, target)
+
+
+async def import_unsharded(shards: ReservationShards) -> Tuple[int, int]:
+    """
+    Copy the main database's reservations into their hotels' shards.
+
+    Safe to re-run: reservations already in a shard are left alone. Returns
+    (copied, orphaned), where orphaned reservations, whose room no longer
+    exists, are not copied. The main reservations table is left as it is.
+    """
+    reservations = ReservationModel.__table__
+    copied = 0
+    last_id = ""
+    while True:
+        async with engine.connect() as conn:
+            rows = (await conn.execute(
+                select(reservations, RoomModel.hotel_id)
+                .outerjoin(RoomModel.__table__, RoomModel.id == reservations.c.room_id)
+                .where(reservations.c.id > last_id)
+                .order_by(reservations.c.id)
+                .limit(COPY_BATCH_SIZE)
+            )).mappings().all()
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        by_shard: Dict[str, List[dict]] = {}
+        for row in rows:
+            if row["hotel_id"] is None:
+                continue
+            shard = await shards.shard_for_hotel(row["hotel_id"])
+            now = datetime.utcnow()
+            by_shard.setdefault(shard, []).append({
+                **{column.name: row[column.name] for column in reservations.c},
+                "hotel_id": row["hotel_id"],
+                "status": row["status"] or "pending",
+                "created_at": row["created_at"] or now,
+                "updated_at": row["updated_at"] or now
+            })
+        for shard, shard_rows in by_shard.items():
+            async with shards.engines[shard].begin() as conn:
+                statement = _insert_for(conn)(shard_reservations).on_conflict_do_nothing(
+                    index_elements=[shard_reservations.c.id]
+                )
+                await conn.execute(statement, shard_rows)
+            copied += len(shard_rows)
+
+    async with engine.connect() as conn:
+        total = (await conn.execute(select(func.count()).select_from(reservations))).scalar_one()
+    return copied, total - copied
+
+
+# Global shards, configured by RESERVATION_SHARDS
+reservation_shards = ReservationShards()
+
+
+async def get_shard_sessions():
+    """Per-request shard sessions, closed with the request"""
+    sessions = ShardSessions(reservation_shards)
+    try:
+        yield sessions
+    finally:
+        await sessions.close()
@@ -0,0 +1,333 @@
+"""
+Request tracing with W3C trace context propagation
+
+A minimal OpenTelemetry-style tracer: spans carry trace/span ids, a parent,
+attributes and a status, and are handed to a pluggable exporter when the
+request's root span ends. Incoming ``traceparent`` headers continue the
+caller's trace (and honour its sampling decision); ``inject_trace_headers``
+adds the header to outgoing calls so other services join the same trace.
+
+Only sampled requests create spans. For the rest, every instrumentation
+point is a single context-variable lookup.
+
+Configuration:
+    TRACE_EXPORTER      none (default), console, file, or module:Class
+    TRACE_FILE          JSON-lines output for the file exporter (./traces.jsonl)
+    TRACE_SAMPLE_RATIO  fraction of new traces to record (0.05)
+"""
+import importlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+MAX_STATEMENT_LENGTH = 500
+
+
+class SpanExporter:
+    """Receives finished spans; subclass to send them elsewhere"""
+
+    def export(self, spans: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """Writes one JSON object per span to stdout"""
+
+    def export(self, spans: List[Dict[str, Any]]):
+        for span in spans:
+            sys.stdout.write(json.dumps(span, default=str) + "\n")
+        sys.stdout.flush()
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends one JSON object per span to a JSON-lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: List[Dict[str, Any]]):
+        for span in spans:
+            self._file.write(json.dumps(span, default=str) + "\n")
+        self._file.flush()
+
+    def shutdown(self):
+        self._file.close()
+
+
+class _Trace:
+    """Spans of one trace in this process, exported together when the root ends"""
+    __slots__ = ("finished",)
+
+    def __init__(self):
+        self.finished: List[Dict[str, Any]] = []
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        trace: _Trace,
+        is_root: bool = False,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "ok"
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._trace = trace
+        self._is_root = is_root
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        self.status = "error"
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def end(self):
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        self._trace.finished.append({
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": self.tracer.service_name,
+            "start_time": self.start_time,
+            "duration_ms": round(duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        })
+        if self._is_root:
+            spans, self._trace.finished = self._trace.finished, []
+            self.tracer.export(spans)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class Tracer:
+    """Creates spans and hands finished traces to the exporter"""
+
+    def __init__(self, service_name: str = "service", exporter: Optional[SpanExporter] = None, sample_ratio: float = 0.05):
+        self.service_name = service_name
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def should_sample(self, parent_sampled: Optional[bool]) -> bool:
+        if not self.enabled:
+            return False
+        if parent_sampled is not None:
+            return parent_sampled
+        return random.random() < self.sample_ratio
+
+    def start_root_span(
+        self,
+        name: str,
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        kind: str = "server",
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Span:
+        return Span(self, name, trace_id or os.urandom(16).hex(), parent_id, _Trace(), True, kind, attributes)
+
+    def start_span(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+        """Child of the current span, or None when the request is not being traced"""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(self, name, parent.trace_id, parent.span_id, parent._trace, False, kind, attributes)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+        """Run the block as a child span of the current one; a no-op outside traced requests"""
+        span = self.start_span(name, kind, attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def export(self, spans: List[Dict[str, Any]]):
+        try:
+            self.exporter.export(spans)
+        except Exception as e:
+            logger.warning(f"Span export failed: {e}")
+
+
+# Global tracer, configured by the application at startup
+tracer = Tracer()
+
+
+def _load_exporter(name: str) -> Optional[SpanExporter]:
+    if name.lower() in ("", "none"):
+        return None
+    if name.lower() == "console":
+        return ConsoleSpanExporter()
+    if name.lower() == "file":
+        return FileSpanExporter(os.getenv("TRACE_FILE", "./traces.jsonl"))
+    # module:Class for exporters that live outside this module
+    module_name, _, class_name = name.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def configure_tracing(service_name: str, exporter: Optional[SpanExporter] = None, sample_ratio: Optional[float] = None) -> Tracer:
+    """Set up the global tracer from arguments or the TRACE_* environment"""
+    tracer.service_name = service_name
+    tracer.exporter = exporter if exporter is not None else _load_exporter(os.getenv("TRACE_EXPORTER", "none"))
+    tracer.sample_ratio = sample_ratio if sample_ratio is not None else float(os.getenv("TRACE_SAMPLE_RATIO", "0.05"))
+    if tracer.enabled:
+        logger.info(f"Tracing enabled for {service_name} (sample ratio {tracer.sample_ratio})")
+    return tracer
+
+
+def inject_trace_headers(headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+    """Add ``traceparent`` for the current span to outgoing request headers"""
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    return headers
+
+
+def _parse_traceparent(value: Optional[bytes]):
+    if not value:
+        return None, None, None
+    match = TRACEPARENT_PATTERN.match(value.decode("latin-1").strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None, None, None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per sampled request"""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Optional[Dict[object, str]] = None
+
+    def _route_for(self, scope) -> Optional[str]:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return None
+        if self._routes is None:
+            self._routes = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._routes.get(endpoint)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id, parent_sampled = _parse_traceparent(dict(scope["headers"]).get(b"traceparent"))
+        if not tracer.should_sample(parent_sampled):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        span = tracer.start_root_span(
+            f"{method} {scope['path']}", trace_id, parent_id,
+            attributes={"http.method": method, "http.target": scope["path"]}
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = "error"
+                headers = list(message.get("headers", []))
+                headers.append((b"x-trace-id", span.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = self._route_for(scope)
+            if route is not None:
+                span.name = f"{method} {route}"
+                span.set_attribute("http.route", route)
+            span.end()
+
+
+def instrument_engine_tracing(engine):
+    """Record a child span for every statement run during a traced request"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span("db.query", kind="client", attributes={
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH]
+        })
+        if span is not None and context is not None:
+            context._tracing_span = span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_tracing_span", None)
+        if span is not None:
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_tracing_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
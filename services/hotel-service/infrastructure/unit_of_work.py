@@ -0,0 +1,123 @@
+"""
+Unit of work spanning the repositories of one request
+"""
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.repositories import UnitOfWork
+from infrastructure.database import use_primary
+from infrastructure.write_coordinator import WriteCoordinator, write_coordinator
+
+# Session.info key holding the nesting depth of active units of work
+_DEPTH_KEY = "unit_of_work_depth"
+# Session.info key holding the other sessions committed with the unit of work
+_ENLISTED_KEY = "unit_of_work_sessions"
+# Session.info key holding the outermost unit of work
+_OWNER_KEY = "unit_of_work"
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """True while a unit of work owns the session's transaction"""
+    return session.info.get(_DEPTH_KEY, 0) > 0
+
+
+async def claim_writer(session: AsyncSession):
+    """
+    Take the writer for the rest of the session's unit of work.
+
+    Call it before the unit of work's first write to the main database, and
+    before reads that must not change until it commits (an availability
+    check). Everything from there to the commit runs on the write
+    coordinator's writer connection; earlier reads use a pooled connection
+    and do not hold the writer up. A no-op outside a unit of work, or once
+    the writer is taken.
+    """
+    owner = session.info.get(_OWNER_KEY)
+    if owner is not None:
+        await owner._claim_writer()
+
+
+def enlist(session: AsyncSession, other: AsyncSession) -> bool:
+    """
+    Commit or roll back ``other`` (a session on another database) together
+    with the unit of work that owns ``session``. False if already enlisted.
+    """
+    enlisted = session.info.setdefault(_ENLISTED_KEY, [])
+    if other in enlisted:
+        return False
+    enlisted.append(other)
+    return True
+
+
+class SQLAlchemyUnitOfWork(UnitOfWork):
+    """Runs everything inside ``async with uow:`` as one transaction.
+
+    Repositories sharing the session only flush while the unit of work is
+    active; leaving the outermost block commits once, or rolls back if an
+    exception escaped. Nested blocks join the outer transaction.
+
+    Repositories move the transaction onto the write coordinator's writer
+    connection with claim_writer() before their first write to the main
+    database, so it is queued behind other writes instead of competing for
+    the SQLite lock, and leaving the block waits for the group commit. A
+    unit of work that writes only to reservation shards never takes the
+    writer. Reads go to the primary: an availability check on a lagging
+    replica could double-book a room.
+
+    Sessions on other databases (reservation shards) can be enlisted; they
+    commit before the unit of work's own session, and everything left is
+    rolled back if one of the commits fails. That is not atomic across
+    databases, so a unit of work should write to one of them only.
+    """
+
+    def __init__(self, session: AsyncSession, coordinator: Optional[WriteCoordinator] = None):
+        self.session = session
+        self.coordinator = coordinator or write_coordinator
+        self._writer = None
+
+    async def __aenter__(self) -> "SQLAlchemyUnitOfWork":
+        depth = self.session.info.get(_DEPTH_KEY, 0)
+        if depth == 0:
+            use_primary(self.session)
+            self.session.info[_OWNER_KEY] = self
+        self.session.info[_DEPTH_KEY] = depth + 1
+        return self
+
+    async def _claim_writer(self):
+        if self._writer is not None or not self.coordinator.running:
+            return
+        writer = self.coordinator.session(self.session)
+        await writer.__aenter__()
+        self._writer = writer
+
+    async def __aexit__(self, exc_type, exc, tb):
+        depth = self.session.info[_DEPTH_KEY] - 1
+        self.session.info[_DEPTH_KEY] = depth
+        if depth > 0:
+            return
+        writer, self._writer = self._writer, None
+        self.session.info.pop(_OWNER_KEY, None)
+        sessions: List[AsyncSession] = self.session.info.pop(_ENLISTED_KEY, []) + [self.session]
+        try:
+            await self._finish(sessions, commit=exc_type is None)
+        except BaseException as e:
+            if writer is not None:
+                await writer.__aexit__(type(e), e, e.__traceback__)
+            raise
+        if writer is not None:
+            await writer.__aexit__(exc_type, exc, tb)
+
+    @staticmethod
+    async def _finish(sessions: List[AsyncSession], commit: bool):
+        """Commit the sessions in order, rolling back the rest after a failure; or roll them all back"""
+        for i, session in enumerate(sessions):
+            if not commit:
+                await session.rollback()
+                continue
+            try:
+                await session.commit()
+            except BaseException:
+                for rest in sessions[i + 1:]:
+                    await rest.rollback()
+                raise
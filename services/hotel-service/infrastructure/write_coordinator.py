@@ -0,0 +1,313 @@
+"""
+Single-writer queue with group commit for SQLite write transactions
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from infrastructure.database import engine
+from infrastructure.metrics import write_group_size, write_queue_wait
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream when the coordinator is shutting down
+_STOP = object()
+
+
+class _Turn:
+    """One write transaction waiting for, or holding, the writer connection"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, savepoint: bool):
+        self.savepoint = savepoint
+        self.enqueued_at = time.perf_counter()
+        self.granted: asyncio.Future = loop.create_future()
+        self.finished: asyncio.Future = loop.create_future()
+        self.committed: asyncio.Future = loop.create_future()
+
+    def finish(self, ok: bool):
+        if not self.finished.done():
+            self.finished.set_result(ok)
+
+
+class WriteCoordinator:
+    """Funnels the write transactions of this process through one connection.
+
+    SQLite allows one writer at a time; with every request committing on its
+    own pooled connection, concurrent bookings fight over the file lock and
+    fail with "database is locked" once busy_timeout runs out. Here write
+    transactions queue for a single writer connection instead. The writer
+    opens one ``BEGIN IMMEDIATE`` transaction, runs each queued transaction
+    in its own SAVEPOINT (a failing one only rolls back its own changes),
+    and commits the group once ``max_batch`` transactions ran or the queue
+    stayed empty for ``max_delay`` seconds (by default it commits as soon as
+    the queue is empty, so groups grow with load and a lone write is not
+    delayed). Callers return only after the group commit, so a committed
+    write is durable and visible to readers.
+
+    Under a multi-worker server every worker has its own coordinator; the
+    workers' writers still meet at the SQLite lock, but only one per process.
+
+    A unit of work takes the writer only from its first write to the main
+    database (or the availability check before it) until its commit; see
+    unit_of_work.claim_writer. Bookings on reservation shards lock their
+    shard instead and do not queue here.
+
+    Off unless WRITE_COORDINATOR_ENABLED=true. It pays off when commits are
+    expensive (synchronous=FULL, slow disks) or many connections fight for
+    the lock; with WAL on a fast disk a commit is cheap, and holding the
+    writer across a request's awaits can cost more than it saves, so
+    measure before turning it on.
+    """
+
+    def __init__(
+        self,
+        db_engine=engine,
+        enabled: bool = os.getenv("WRITE_COORDINATOR_ENABLED", "false").lower() == "true",
+        max_batch: int = int(os.getenv("WRITE_GROUP_MAX_SIZE", "64")),
+        max_delay: float = float(os.getenv("WRITE_GROUP_MAX_DELAY_MS", "0")) / 1000
+    ):
+        self.engine = db_engine
+        self.enabled = enabled
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._conn: Optional[AsyncConnection] = None
+
+        # Metrics
+        self.transactions = 0
+        self.rolled_back = 0
+        self.groups = 0
+        self.failed_groups = 0
+
+    @property
+    def running(self) -> bool:
+        return self._writer_task is not None
+
+    async def start(self):
+        """Check out the writer connection and start the writer"""
+        if not self.enabled or self._writer_task is not None:
+            return
+        self._conn = await self.engine.connect()
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Finish the queued transactions and release the writer connection"""
+        if self._writer_task is None:
+            return
+        await self._queue.put(_STOP)
+        try:
+            await asyncio.wait_for(self._writer_task, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Writer did not drain within {timeout}s")
+            self._writer_task.cancel()
+        self._writer_task = None
+        self._queue = None
+        await self._discard_connection()
+
+    @asynccontextmanager
+    async def transaction(self, savepoint: bool = True) -> AsyncIterator[AsyncConnection]:
+        """Run the block on the writer connection as one transaction of a group commit.
+
+        The block's changes are rolled back if it raises; pass savepoint=False
+        only if the block manages its own SAVEPOINT. Leaving the block waits
+        for the group commit and re-raises its error if it failed.
+        """
+        if not self.running:
+            raise RuntimeError("The write coordinator is not running")
+        turn = _Turn(asyncio.get_running_loop(), savepoint)
+        await self._queue.put(turn)
+        try:
+            conn = await turn.granted
+        except asyncio.CancelledError:
+            # Granted just as the caller was cancelled: hand the writer back
+            if turn.granted.done() and not turn.granted.cancelled():
+                turn.finish(False)
+            raise
+
+        try:
+            yield conn
+        except BaseException:
+            turn.finish(False)
+            raise
+        turn.finish(True)
+        await asyncio.shield(turn.committed)
+
+    @asynccontextmanager
+    async def session(self, session: Optional[AsyncSession] = None) -> AsyncIterator[AsyncSession]:
+        """
+        Bind a session to the writer for the duration of the block
+
+        Works like ``async with AsyncSessionLocal() as session``: commit()
+        keeps the changes (releasing the session's SAVEPOINT), anything not
+        committed is discarded on exit. The group commit happens on exit.
+        Falls back to a plain pooled session when the coordinator is not
+        running. An existing session (a request's) is closed first, then
+        rebound and restored afterwards, so repositories holding it need not
+        know about the writer.
+        """
+        if not self.running:
+            if session is not None:
+                yield session
+                return
+            async with AsyncSession(self.engine, expire_on_commit=False) as new_session:
+                yield new_session
+            return
+
+        if session is None:
+            session = AsyncSession(self.engine, expire_on_commit=False)
+        elif session.in_transaction():
+            # Release the pooled connection earlier reads used
+            await session.close()
+
+        sync_session = session.sync_session
+        original = session.bind, sync_session.bind, sync_session.join_transaction_mode
+        async with self.transaction(savepoint=False) as conn:
+            session.bind = conn
+            sync_session.bind = conn.sync_connection
+            # commit() and rollback() stop at a SAVEPOINT; the writer commits
+            sync_session.join_transaction_mode = "create_savepoint"
+            try:
+                yield session
+            finally:
+                await session.close()
+                session.bind, sync_session.bind, sync_session.join_transaction_mode = original
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and counters"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+            "transactions": self.transactions,
+            "rolled_back": self.rolled_back,
+            "groups": self.groups,
+            "failed_groups": self.failed_groups
+        }
+
+    async def _next_turn(self, wait: float):
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            if wait <= 0:
+                return None
+        try:
+            return await asyncio.wait_for(self._queue.get(), wait)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            turn = await self._queue.get()
+            if turn is _STOP:
+                break
+
+            group = []
+            transaction = None
+            try:
+                if self._conn is None:
+                    self._conn = await self.engine.connect()
+                transaction = await self._conn.begin()
+                # Take the write lock up front rather than upgrading a read lock mid-transaction
+                await self._conn.exec_driver_sql("BEGIN IMMEDIATE")
+                while turn is not None:
+                    if turn is _STOP:
+                        stopping = True
+                        break
+                    if await self._run_turn(turn):
+                        group.append(turn)
+                    if len(group) >= self.max_batch:
+                        break
+                    turn = await self._next_turn(self.max_delay)
+                await transaction.commit()
+            except Exception as e:
+                self.failed_groups += 1
+                logger.exception(f"Group commit of {len(group)} write transactions failed")
+                await self._recover(transaction, e)
+                # The group, and the transaction that was running if it never got the writer
+                failed = group + [turn] if turn not in (None, _STOP) and turn not in group else group
+                for member in failed:
+                    for future in (member.granted, member.committed):
+                        if not future.done():
+                            future.set_exception(e)
+                            future.exception()  # Callers that left already must not trigger a warning
+                continue
+
+            self.groups += 1
+            write_group_size.observe(len(group))
+            for member in group:
+                if not member.committed.done():
+                    member.committed.set_result(None)
+
+        # Anything that raced in behind the stop marker runs alone
+        while not self._queue.empty():
+            turn = self._queue.get_nowait()
+            if turn is _STOP:
+                continue
+            try:
+                if self._conn is None:
+                    self._conn = await self.engine.connect()
+                async with self._conn.begin():
+                    await self._run_turn(turn)
+            except Exception as e:
+                logger.exception("Write transaction after shutdown failed")
+                await self._discard_connection()
+                for future in (turn.granted, turn.committed):
+                    if not future.done():
+                        future.set_exception(e)
+                        future.exception()
+                continue
+            if not turn.committed.done():
+                turn.committed.set_result(None)
+
+    async def _recover(self, transaction, error: Exception):
+        """Roll back a failed group; give up the connection if it cannot be trusted any more"""
+        if transaction is not None and not self._conn.invalidated:
+            try:
+                if transaction.is_active:
+                    await transaction.rollback()
+                if not (isinstance(error, DBAPIError) and error.connection_invalidated):
+                    return
+            except Exception:
+                logger.exception("Rollback of the failed group failed")
+        # The connection broke (or never began a transaction): the next group opens a new one
+        logger.warning("Replacing the writer connection")
+        await self._discard_connection()
+
+    async def _discard_connection(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.close()
+        except Exception:
+            logger.exception("Closing the writer connection failed")
+        self._conn = None
+
+    async def _run_turn(self, turn: _Turn) -> bool:
+        """Hand the writer to one transaction; True if its changes were kept"""
+        if turn.granted.cancelled():
+            return False
+        savepoint = await self._conn.begin_nested() if turn.savepoint else None
+        write_queue_wait.observe(time.perf_counter() - turn.enqueued_at)
+        turn.granted.set_result(self._conn)
+        ok = await turn.finished
+        self.transactions += 1
+        if not ok:
+            self.rolled_back += 1
+        if savepoint is not None and savepoint.is_active:
+            await (savepoint.commit() if ok else savepoint.rollback())
+        return ok
+
+
+# Global coordinator, started and drained by the application lifecycle
+write_coordinator = WriteCoordinator()
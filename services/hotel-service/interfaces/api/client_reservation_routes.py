@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from infrastructure.database import get_db
-from infrastructure.repositories import SQLiteReservationRepository, SQLiteRoomRepository
+from infrastructure.repositories import (
+    ShardedReservationRepository, SQLitePricingRepository, SQLiteReservationRepository, SQLiteRoomRepository
+)
+from infrastructure.sharding import ShardSessions, get_shard_sessions, reservation_shards
+from infrastructure.unit_of_work import SQLAlchemyUnitOfWork
+from application.pricing import PricingService
 from application.reservation_service import ReservationService
 from interfaces.dto.reservation_dto import (
     CreateReservationRequest,
@@ -12,48 +17,69 @@ from interfaces.dto.reservation_dto import (
     AvailabilityResponse
 )
 from interfaces.auth import get_current_user
+from interfaces.api.idempotency import IDEMPOTENCY_KEY, run_idempotent
 
 
 router = APIRouter(prefix="/client/reservations", tags=["Client Reservations"])
 
 
-def get_reservation_service(db: AsyncSession = Depends(get_db)) -> ReservationService:
+def get_reservation_service(
+    db: AsyncSession = Depends(get_db),
+    shard_sessions: ShardSessions = Depends(get_shard_sessions)
+) -> ReservationService:
     """Dependency to get reservation service"""
-    reservation_repo = SQLiteReservationRepository(db)
+    if reservation_shards.enabled:
+        reservation_repo = ShardedReservationRepository(db, shard_sessions)
+    else:
+        reservation_repo = SQLiteReservationRepository(db)
     room_repo = SQLiteRoomRepository(db)
-    return ReservationService(reservation_repo, room_repo)
+    pricing = PricingService(SQLitePricingRepository(db), reservation_repo)
+    return ReservationService(reservation_repo, room_repo, SQLAlchemyUnitOfWork(db), pricing)
 
 
 @router.post("/", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
 async def create_reservation(
     request: CreateReservationRequest,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
     service: ReservationService = Depends(get_reservation_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new reservation as a client"""
-    try:
-        # If user is authenticated, use their user_id, otherwise allow guest reservations
-        client_id = current_user.get("sub") if current_user else request.client_id
-        
-        reservation = await service.create_reservation(
-            room_id=request.room_id,
-            client_id=client_id,
-            client_email=request.client_email,
-            client_name=request.client_name,
-            check_in_date=request.check_in_date,
-            check_out_date=request.check_out_date,
-            notes=request.notes
+    # If user is authenticated, use their user_id, otherwise allow guest reservations
+    client_id = current_user.get("sub") if current_user else request.client_id
+    
+    async def create():
+        try:
+            reservation = await service.create_reservation(
+                room_id=request.room_id,
+                client_id=client_id,
+                client_email=request.client_email,
+                client_name=request.client_name,
+                check_in_date=request.check_in_date,
+                check_out_date=request.check_out_date,
+                notes=request.notes
+            )
+            
+            return ReservationResponse.model_validate(reservation)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            # Log the actual error for debugging
+            print(f"Error creating reservation: {e}")
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to create reservation: {str(e)}")
+    
+    # A guest's client_id and email come from the request body, so any guest could pick
+    # another's scope and be handed their stored reservation; see cancel_reservation
+    if idempotency_key and not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required to use an Idempotency-Key"
         )
-        
-        return ReservationResponse.model_validate(reservation)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        # Log the actual error for debugging
-        print(f"Error creating reservation: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to create reservation: {str(e)}")
+    return await run_idempotent(
+        idempotency_key, client_id, "create_reservation", request, create, status.HTTP_201_CREATED,
+        service.unit_of_work
+    )
 
 
 @router.get("/my", response_model=List[ReservationResponse])
@@ -107,30 +133,43 @@ async def get_reservation(
 @router.delete("/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_reservation(
     reservation_id: str,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
     service: ReservationService = Depends(get_reservation_service),
     current_user: dict = Depends(get_current_user)
 ):
     """Cancel a reservation (only if it belongs to the current user)"""
-    try:
-        reservation = await service.get_reservation_by_id(reservation_id)
-        if not reservation:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
-        
-        # Check if the reservation belongs to the current user (if authenticated)
-        if current_user and reservation.client_id != current_user["sub"]:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-        
-        await service.cancel_reservation(reservation_id)
-    except HTTPException:
-        raise
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        # Log the actual error for debugging
-        print(f"Error cancelling reservation {reservation_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to cancel reservation: {str(e)}")
+    async def cancel():
+        try:
+            reservation = await service.get_reservation_by_id(reservation_id)
+            if not reservation:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found")
+            
+            # Check if the reservation belongs to the current user (if authenticated)
+            if current_user and reservation.client_id != current_user["sub"]:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+            
+            await service.cancel_reservation(reservation_id)
+        except HTTPException:
+            raise
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            # Log the actual error for debugging
+            print(f"Error cancelling reservation {reservation_id}: {e}")
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to cancel reservation: {str(e)}")
+    
+    # Guests have nothing of their own to scope a key by; a shared scope would
+    # hand one guest's stored outcome to another who picked the same key
+    if idempotency_key and not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Authentication required to use an Idempotency-Key"
+        )
+    return await run_idempotent(
+        idempotency_key, current_user["sub"] if current_user else None, "cancel_reservation", reservation_id, cancel,
+        status.HTTP_204_NO_CONTENT, service.unit_of_work
+    )
 
 
 @router.post("/check-availability", response_model=AvailabilityResponse)
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
+from datetime import date
+from application.pricing import PricingService
 from application.services import HotelService, RoomService, ReviewService
-from application.dtos import HotelResponse, RoomResponse, ReviewResponse
+from application.dtos import HotelResponse, RoomResponse, ReviewResponse, StayQuoteResponse
 from infrastructure.repositories import (
-    SQLiteHotelRepository, SQLiteRoomRepository, SQLiteRoomImageRepository, SQLiteReviewRepository
+    SQLiteHotelRepository, SQLiteRoomRepository, SQLiteRoomImageRepository, SQLiteReviewRepository,
+    SQLitePricingRepository, SQLiteReservationRepository, ShardedReservationRepository
 )
 from infrastructure.database import get_db
+from infrastructure.sharding import ShardSessions, get_shard_sessions, reservation_shards
+from interfaces.api.responses import ModelJSONResponse
 from infrastructure.middleware.auth_middleware import optional_authentication
 
 router = APIRouter(prefix="/client", tags=["Client API"])
@@ -25,6 +30,16 @@ def get_review_service(db: AsyncSession = Depends(get_db)) -> ReviewService:
     review_repo = SQLiteReviewRepository(db)
     return ReviewService(review_repo)
 
+def get_pricing_service(
+    db: AsyncSession = Depends(get_db),
+    shard_sessions: ShardSessions = Depends(get_shard_sessions)
+) -> PricingService:
+    if reservation_shards.enabled:
+        reservation_repo = ShardedReservationRepository(db, shard_sessions)
+    else:
+        reservation_repo = SQLiteReservationRepository(db)
+    return PricingService(SQLitePricingRepository(db), reservation_repo)
+
 
 @router.get("/hotels", response_model=List[HotelResponse])
 async def browse_hotels(
@@ -42,7 +57,7 @@ async def browse_hotels(
         if location:
             hotels = [hotel for hotel in hotels if location.lower() in hotel.location.lower()]
         
-        return hotels
+        return ModelJSONResponse(hotels)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -58,7 +73,7 @@ async def view_hotel_details(
         hotel = await hotel_service.get_hotel_by_id(hotel_id)
         if not hotel:
             raise HTTPException(status_code=404, detail="Hotel not found")
-        return hotel
+        return ModelJSONResponse(hotel)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -90,7 +105,33 @@ async def browse_hotel_rooms(
         if max_price is not None:
             rooms = [room for room in rooms if room.price <= max_price]
         
-        return rooms
+        return ModelJSONResponse(rooms)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/hotels/{hotel_id}/quotes", response_model=List[StayQuoteResponse])
+async def quote_hotel_rooms(
+    hotel_id: str,
+    check_in_date: date = Query(..., description="First night"),
+    check_out_date: date = Query(..., description="Departure day"),
+    room_type: Optional[str] = Query(None, description="Filter by room type"),
+    available_only: bool = Query(True, description="Show only available rooms"),
+    room_service: RoomService = Depends(get_room_service),
+    pricing_service: PricingService = Depends(get_pricing_service),
+    current_user: Dict[str, Any] = Depends(optional_authentication)
+):
+    """Stay totals of a hotel's rooms from the rate calendar and pricing rules (CLIENT VIEW - Public with optional auth)"""
+    try:
+        rooms = await room_service.get_rooms_by_hotel_id(hotel_id)
+        if available_only:
+            rooms = [room for room in rooms if room.is_available]
+        if room_type:
+            rooms = [room for room in rooms if room_type.lower() in room.room_type.lower()]
+        quotes = await pricing_service.quote_rooms(rooms, check_in_date, check_out_date)
+        return ModelJSONResponse(quotes)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -106,7 +147,7 @@ async def view_room_details(
         room = await room_service.get_room_by_id(room_id)
         if not room:
             raise HTTPException(status_code=404, detail="Room not found")
-        return room
+        return ModelJSONResponse(room)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -132,38 +173,29 @@ async def view_room_reviews(
         total_reviews = len(reviews)
         reviews = reviews[skip:skip + limit]
         
-        return reviews
+        return ModelJSONResponse(reviews)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/search/hotels", response_model=List[HotelResponse])
 async def search_hotels(
-    q: str = Query(..., min_length=2, description="Search query"),
+    q: Optional[str] = Query(None, min_length=2, description="Search query"),
+    location: Optional[str] = Query(None, description="Filter by location"),
+    amenities: Optional[List[str]] = Query(None, description="Required amenities, e.g. ?amenities=pool&amenities=parking"),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     hotel_service: HotelService = Depends(get_hotel_service),
     current_user: Dict[str, Any] = Depends(optional_authentication)
 ):
-    """Search hotels by name, location, or description (CLIENT VIEW - Public with optional auth)"""
+    """Search hotels by name, location, description or amenities (CLIENT VIEW - Public with optional auth)"""
     try:
-        all_hotels = await hotel_service.get_hotels(skip=0, limit=1000)  # Get more for searching
-        
-        # Simple text search (in a real app, you'd use a proper search engine)
-        query_lower = q.lower()
-        matching_hotels = []
-        
-        for hotel in all_hotels:
-            # Search in name, location, address, and description
-            searchable_text = f"{hotel.name} {hotel.location} {hotel.address} {hotel.description or ''}".lower()
-            if query_lower in searchable_text:
-                matching_hotels.append(hotel)
-        
-        # Apply pagination
-        total_matches = len(matching_hotels)
-        results = matching_hotels[skip:skip + limit]
-        
-        return results
+        hotels = await hotel_service.search_hotels(
+            query=q, location=location, amenities=amenities, skip=skip, limit=limit
+        )
+        return ModelJSONResponse(hotels)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -175,6 +207,7 @@ async def search_rooms(
     min_price: Optional[float] = Query(None, ge=0),
     max_price: Optional[float] = Query(None, ge=0),
     available_only: bool = Query(True),
+    facilities: Optional[List[str]] = Query(None, description="Required facilities, e.g. ?facilities=balcony&facilities=mini_bar"),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     room_service: RoomService = Depends(get_room_service),
@@ -182,27 +215,12 @@ async def search_rooms(
 ):
     """Advanced room search with filters (CLIENT VIEW - Public with optional auth)"""
     try:
-        if hotel_id:
-            rooms = await room_service.get_rooms_by_hotel_id(hotel_id)
-        else:
-            rooms = await room_service.get_rooms(skip=0, limit=1000)  # Get more for filtering
-        
-        # Apply filters
-        if available_only:
-            rooms = [room for room in rooms if room.is_available]
-        
-        if room_type:
-            rooms = [room for room in rooms if room_type.lower() in room.room_type.lower()]
-        
-        if min_price is not None:
-            rooms = [room for room in rooms if room.price >= min_price]
-        
-        if max_price is not None:
-            rooms = [room for room in rooms if room.price <= max_price]
-        
-        # Apply pagination
-        results = rooms[skip:skip + limit]
-        
-        return results
+        rooms = await room_service.search_rooms(
+            hotel_id=hotel_id, room_type=room_type, min_price=min_price, max_price=max_price,
+            available_only=available_only, facilities=facilities, skip=skip, limit=limit
+        )
+        return ModelJSONResponse(rooms)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
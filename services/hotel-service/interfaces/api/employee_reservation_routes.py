@@ -3,8 +3,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from infrastructure.database import get_db
-from infrastructure.repositories import SQLiteReservationRepository, SQLiteRoomRepository
+from infrastructure.repositories import (
+    ShardedReservationRepository, SQLitePricingRepository, SQLiteReservationRepository, SQLiteRoomRepository
+)
+from infrastructure.sharding import ShardSessions, get_shard_sessions, reservation_shards
+from infrastructure.unit_of_work import SQLAlchemyUnitOfWork
+from application.pricing import PricingService
 from application.reservation_service import ReservationService
+from domain.entities import ReservationStatus
 from interfaces.dto.reservation_dto import (
     ReservationResponse,
     UpdateReservationStatusRequest,
@@ -12,16 +18,24 @@ from interfaces.dto.reservation_dto import (
     ReservationListResponse
 )
 from interfaces.auth import get_current_user, require_employee
+from interfaces.api.idempotency import IDEMPOTENCY_KEY, run_idempotent
 
 
 router = APIRouter(prefix="/employee/reservations", tags=["Employee Reservations"])
 
 
-def get_reservation_service(db: AsyncSession = Depends(get_db)) -> ReservationService:
+def get_reservation_service(
+    db: AsyncSession = Depends(get_db),
+    shard_sessions: ShardSessions = Depends(get_shard_sessions)
+) -> ReservationService:
     """Dependency to get reservation service"""
-    reservation_repo = SQLiteReservationRepository(db)
+    if reservation_shards.enabled:
+        reservation_repo = ShardedReservationRepository(db, shard_sessions)
+    else:
+        reservation_repo = SQLiteReservationRepository(db)
     room_repo = SQLiteRoomRepository(db)
-    return ReservationService(reservation_repo, room_repo)
+    pricing = PricingService(SQLitePricingRepository(db), reservation_repo)
+    return ReservationService(reservation_repo, room_repo, SQLAlchemyUnitOfWork(db), pricing)
 
 
 @router.get("/", response_model=ReservationListResponse)
@@ -96,31 +110,30 @@ async def get_client_reservations(
 async def update_reservation_status(
     reservation_id: str,
     request: UpdateReservationStatusRequest,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
     service: ReservationService = Depends(get_reservation_service),
     current_user: dict = Depends(require_employee)
 ):
     """Update reservation status (employee only)"""
-    try:
-        employee_id = current_user["sub"]
-        
-        if request.status.value == "confirmed":
-            reservation = await service.confirm_reservation(reservation_id, employee_id)
-        elif request.status.value == "cancelled":
-            reservation = await service.cancel_reservation(reservation_id, employee_id)
-        elif request.status.value == "completed":
-            reservation = await service.complete_reservation(reservation_id, employee_id)
-        else:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid status transition")
-        
-        # Update notes if provided
-        if request.notes:
-            reservation = await service.update_reservation_notes(reservation_id, request.notes, employee_id)
-        
-        return ReservationResponse.model_validate(reservation)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update reservation status")
+    employee_id = current_user["sub"]
+    
+    async def transition():
+        try:
+            # Status and notes are written together in one transaction
+            reservation = await service.transition_reservation(
+                reservation_id, ReservationStatus(request.status.value), employee_id, notes=request.notes
+            )
+            
+            return ReservationResponse.model_validate(reservation)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update reservation status")
+    
+    return await run_idempotent(
+        idempotency_key, employee_id, "update_reservation_status", {"reservation_id": reservation_id, **request.model_dump()}, transition,
+        unit_of_work=service.unit_of_work
+    )
 
 
 @router.patch("/{reservation_id}/notes", response_model=ReservationResponse)
@@ -144,48 +157,70 @@ async def update_reservation_notes(
 @router.post("/{reservation_id}/confirm", response_model=ReservationResponse)
 async def confirm_reservation(
     reservation_id: str,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
     service: ReservationService = Depends(get_reservation_service),
     current_user: dict = Depends(require_employee)
 ):
     """Confirm a pending reservation (employee only)"""
-    try:
-        employee_id = current_user["sub"]
-        reservation = await service.confirm_reservation(reservation_id, employee_id)
-        return ReservationResponse.from_orm(reservation)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to confirm reservation")
+    employee_id = current_user["sub"]
+    
+    async def confirm():
+        try:
+            reservation = await service.confirm_reservation(reservation_id, employee_id)
+            return ReservationResponse.from_orm(reservation)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to confirm reservation")
+    
+    return await run_idempotent(
+        idempotency_key, employee_id, "confirm_reservation", reservation_id, confirm, unit_of_work=service.unit_of_work
+    )
 
 
 @router.post("/{reservation_id}/complete", response_model=ReservationResponse)
 async def complete_reservation(
     reservation_id: str,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
     service: ReservationService = Depends(get_reservation_service),
     current_user: dict = Depends(require_employee)
 ):
     """Mark a reservation as completed (employee only)"""
-    try:
-        employee_id = current_user["sub"]
-        reservation = await service.complete_reservation(reservation_id, employee_id)
-        return ReservationResponse.from_orm(reservation)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to complete reservation")
+    employee_id = current_user["sub"]
+    
+    async def complete():
+        try:
+            reservation = await service.complete_reservation(reservation_id, employee_id)
+            return ReservationResponse.from_orm(reservation)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to complete reservation")
+    
+    return await run_idempotent(
+        idempotency_key, employee_id, "complete_reservation", reservation_id, complete, unit_of_work=service.unit_of_work
+    )
 
 
 @router.delete("/{reservation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_reservation(
     reservation_id: str,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY,
     service: ReservationService = Depends(get_reservation_service),
     current_user: dict = Depends(require_employee)
 ):
     """Cancel a reservation (employee only)"""
-    try:
-        employee_id = current_user["sub"]
-        await service.cancel_reservation(reservation_id, employee_id)
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to cancel reservation")
+    employee_id = current_user["sub"]
+    
+    async def cancel():
+        try:
+            await service.cancel_reservation(reservation_id, employee_id)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to cancel reservation")
+    
+    return await run_idempotent(
+        idempotency_key, employee_id, "cancel_reservation", reservation_id, cancel, status.HTTP_204_NO_CONTENT,
+        service.unit_of_work
+    )
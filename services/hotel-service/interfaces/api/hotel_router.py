@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
+from datetime import date
+import json
 
 from application.dtos import (
     HotelCreateRequest, HotelUpdateRequest, HotelResponse,
     RoomCreateRequest, RoomUpdateRequest, RoomResponse,
     RoomImageCreateRequest, RoomImageResponse,
-    ReviewCreateRequest, ReviewUpdateRequest, ReviewResponse
+    ReviewCreateRequest, ReviewUpdateRequest, ReviewResponse,
+    BulkOperationResponse, RoomBulkUpdateRequest, BulkUpdateResponse,
+    RoomRatesRequest, RateRangeUpdateRequest, RoomRateResponse, PricingRuleCreateRequest, PricingRuleResponse
 )
+from application.pricing import PricingService
 from application.services import HotelService, RoomService, ReviewService
+from domain.entities import PricingRule, RoomRate
 from infrastructure.database import get_db
+from infrastructure.sharding import ShardSessions, get_shard_sessions, reservation_shards
+from infrastructure.scheduler import scheduler
+from infrastructure.slow_queries import slow_query_log
+from interfaces.api.responses import ModelJSONResponse
 from infrastructure.repositories import (
     SQLiteHotelRepository, SQLiteRoomRepository, 
-    SQLiteRoomImageRepository, SQLiteReviewRepository
+    SQLiteRoomImageRepository, SQLiteReviewRepository,
+    SQLitePricingRepository, SQLiteReservationRepository, ShardedReservationRepository
 )
 from infrastructure.middleware.auth_middleware import (
     require_admin, require_manager_or_admin, require_employee_or_above,
@@ -38,6 +49,39 @@ def get_review_service(db: AsyncSession = Depends(get_db)) -> ReviewService:
     review_repo = SQLiteReviewRepository(db)
     return ReviewService(review_repo)
 
+# Dependency to get pricing service
+def get_pricing_service(
+    db: AsyncSession = Depends(get_db),
+    shard_sessions: ShardSessions = Depends(get_shard_sessions)
+) -> PricingService:
+    if reservation_shards.enabled:
+        reservation_repo = ShardedReservationRepository(db, shard_sessions)
+    else:
+        reservation_repo = SQLiteReservationRepository(db)
+    return PricingService(SQLitePricingRepository(db), reservation_repo)
+
+
+MAX_BULK_ITEMS = 10000
+
+
+async def read_bulk_items(request: Request) -> List[Any]:
+    """Parse a bulk request body sent as a JSON array or as NDJSON (one object per line)"""
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed bulk payload: {e}")
+    
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Bulk payload must be a JSON array or NDJSON")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items per bulk request")
+    return items
+
 
 # Hotel endpoints
 @router.post("/hotels", response_model=HotelResponse, status_code=201)
@@ -54,6 +98,19 @@ async def create_hotel(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/hotels/bulk", response_model=BulkOperationResponse)
+async def bulk_upsert_hotels(
+    items: List[Any] = Depends(read_bulk_items),
+    hotel_service: HotelService = Depends(get_hotel_service),
+    current_user: Dict[str, Any] = Depends(require_manager_or_admin)
+):
+    """Create or update many hotels from a JSON array or NDJSON body (Manager/Admin only)"""
+    try:
+        return await hotel_service.bulk_upsert_hotels(items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/hotels", response_model=List[HotelResponse])
 async def get_hotels(
     skip: int = Query(0, ge=0),
@@ -64,7 +121,7 @@ async def get_hotels(
     """Get all hotels with pagination (Public endpoint with optional auth)"""
     try:
         hotels = await hotel_service.get_hotels(skip=skip, limit=limit)
-        return hotels
+        return ModelJSONResponse(hotels)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -80,7 +137,7 @@ async def get_hotel(
         hotel = await hotel_service.get_hotel_by_id(hotel_id)
         if not hotel:
             raise HTTPException(status_code=404, detail="Hotel not found")
-        return hotel
+        return ModelJSONResponse(hotel)
     except HTTPException:
         raise
     except Exception as e:
@@ -138,6 +195,47 @@ async def create_room(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/rooms/bulk", response_model=BulkOperationResponse)
+async def bulk_upsert_rooms(
+    items: List[Any] = Depends(read_bulk_items),
+    room_service: RoomService = Depends(get_room_service),
+    current_user: Dict[str, Any] = Depends(require_employee_or_above)
+):
+    """Create or update many rooms, matched by hotel_id + room_number, from a JSON array or NDJSON body (Employee+ only)"""
+    try:
+        return await room_service.bulk_upsert_rooms(items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rooms/images/bulk", response_model=BulkOperationResponse)
+async def bulk_upsert_room_images(
+    items: List[Any] = Depends(read_bulk_items),
+    room_service: RoomService = Depends(get_room_service),
+    current_user: Dict[str, Any] = Depends(require_employee_or_above)
+):
+    """Create or update many room images from a JSON array or NDJSON body (Employee+ only)"""
+    try:
+        return await room_service.bulk_upsert_room_images(items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/rooms/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_rooms(
+    request: RoomBulkUpdateRequest,
+    room_service: RoomService = Depends(get_room_service),
+    current_user: Dict[str, Any] = Depends(require_manager_or_admin)
+):
+    """Set price and/or availability of all matching rooms in one statement, e.g. close rooms 101-120 (Manager/Admin only)"""
+    try:
+        return BulkUpdateResponse(updated=await room_service.bulk_update_rooms(request))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/rooms", response_model=List[RoomResponse])
 async def get_rooms(
     skip: int = Query(0, ge=0),
@@ -148,7 +246,7 @@ async def get_rooms(
     """Get all rooms with pagination (Public endpoint with optional auth)"""
     try:
         rooms = await room_service.get_rooms(skip=skip, limit=limit)
-        return rooms
+        return ModelJSONResponse(rooms)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -162,7 +260,7 @@ async def get_rooms_by_hotel(
     """Get all rooms for a specific hotel (Public endpoint with optional auth)"""
     try:
         rooms = await room_service.get_rooms_by_hotel_id(hotel_id)
-        return rooms
+        return ModelJSONResponse(rooms)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -178,7 +276,7 @@ async def get_room(
         room = await room_service.get_room_by_id(room_id)
         if not room:
             raise HTTPException(status_code=404, detail="Room not found")
-        return room
+        return ModelJSONResponse(room)
     except HTTPException:
         raise
     except Exception as e:
@@ -249,7 +347,7 @@ async def get_room_images(
     """Get all images for a room (Public endpoint with optional auth)"""
     try:
         images = await room_service.get_images_by_room_id(room_id)
-        return images
+        return ModelJSONResponse(images)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -301,7 +399,7 @@ async def get_room_reviews(
     """Get all reviews for a room (Public endpoint with optional auth)"""
     try:
         reviews = await review_service.get_reviews_by_room_id(room_id)
-        return reviews
+        return ModelJSONResponse(reviews)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -323,7 +421,7 @@ async def get_user_reviews(
             )
         
         reviews = await review_service.get_reviews_by_user_id(user_id)
-        return reviews
+        return ModelJSONResponse(reviews)
     except HTTPException:
         raise
     except Exception as e:
@@ -406,3 +504,144 @@ async def delete_review(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# Pricing endpoints
+@router.put("/hotels/{hotel_id}/rates")
+async def set_room_rates(
+    hotel_id: str,
+    request: RoomRatesRequest,
+    pricing_service: PricingService = Depends(get_pricing_service),
+    current_user: Dict[str, Any] = Depends(require_manager_or_admin)
+):
+    """Set nightly rates of room types in the rate calendar (Manager/Admin only)"""
+    try:
+        updated = await pricing_service.set_rates([
+            RoomRate(hotel_id=hotel_id, room_type=item.room_type, night=item.night, price=item.price)
+            for item in request.rates
+        ])
+        return {"updated": updated}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.patch("/rates/bulk", response_model=BulkUpdateResponse)
+async def bulk_update_rates(
+    request: RateRangeUpdateRequest,
+    pricing_service: PricingService = Depends(get_pricing_service),
+    current_user: Dict[str, Any] = Depends(require_manager_or_admin)
+):
+    """Set one nightly rate for a date range of a room type, a hotel or every hotel in one statement (Manager/Admin only)"""
+    try:
+        updated = await pricing_service.set_rate_range(
+            request.price, request.start_date, request.end_date, request.hotel_id, request.room_type
+        )
+        return BulkUpdateResponse(updated=updated)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/hotels/{hotel_id}/rates", response_model=List[RoomRateResponse])
+async def get_room_rates(
+    hotel_id: str,
+    room_type: str = Query(..., description="Room type"),
+    start_date: date = Query(..., description="First night"),
+    end_date: date = Query(..., description="Night after the last one"),
+    pricing_service: PricingService = Depends(get_pricing_service),
+    current_user: Dict[str, Any] = Depends(require_employee_or_above)
+):
+    """Rate calendar of a room type; nights without a rate charge each room's own price (Employee+ only)"""
+    try:
+        rates = await pricing_service.get_rates(hotel_id, room_type, start_date, end_date)
+        return ModelJSONResponse(rates)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/pricing-rules", response_model=PricingRuleResponse, status_code=201)
+async def create_pricing_rule(
+    rule_data: PricingRuleCreateRequest,
+    pricing_service: PricingService = Depends(get_pricing_service),
+    current_user: Dict[str, Any] = Depends(require_manager_or_admin)
+):
+    """Add a season, length-of-stay or occupancy rule for a hotel or every hotel (Manager/Admin only)"""
+    try:
+        return await pricing_service.create_rule(PricingRule(**rule_data.model_dump()))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/hotels/{hotel_id}/pricing-rules", response_model=List[PricingRuleResponse])
+async def get_pricing_rules(
+    hotel_id: str,
+    pricing_service: PricingService = Depends(get_pricing_service),
+    current_user: Dict[str, Any] = Depends(require_employee_or_above)
+):
+    """Rules that apply to a hotel, including those for every hotel (Employee+ only)"""
+    try:
+        return await pricing_service.get_rules(hotel_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/pricing-rules/{rule_id}", status_code=204)
+async def delete_pricing_rule(
+    rule_id: str,
+    pricing_service: PricingService = Depends(get_pricing_service),
+    current_user: Dict[str, Any] = Depends(require_manager_or_admin)
+):
+    """Delete a pricing rule (Manager/Admin only)"""
+    try:
+        if not await pricing_service.delete_rule(rule_id):
+            raise HTTPException(status_code=404, detail="Pricing rule not found")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Diagnostics
+@router.get("/admin/slow-queries")
+async def get_slow_queries(
+    full_scans_only: bool = Query(False, description="Only queries whose plan scans a table without an index"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Slowest recent queries with their query plans (Admin only)"""
+    return {
+        **slow_query_log.stats(),
+        "queries": slow_query_log.entries(full_scans_only=full_scans_only, limit=limit)
+    }
+
+
+@router.delete("/admin/slow-queries", status_code=204)
+async def clear_slow_queries(
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Empty the slow-query buffer (Admin only)"""
+    slow_query_log.clear()
+
+
+@router.get("/admin/jobs")
+async def get_jobs(
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Scheduled jobs and the outcome of their last runs (Admin only)"""
+    return scheduler.stats()
+
+
+@router.post("/admin/jobs/{job_name}/run")
+async def run_job(
+    job_name: str,
+    dry_run: bool = Query(False, description="Only count the rows the job would change"),
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Run a scheduled job now; skipped while another worker runs it (Admin only)"""
+    if job_name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail=f"Job {job_name} not found")
+    try:
+        return await scheduler.run_job(job_name, dry_run=dry_run)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,78 @@
+"""
+Idempotency-Key handling for write endpoints
+"""
+import hashlib
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+from fastapi import Header, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from infrastructure.idempotency import idempotency_store, IdempotencyKeyMismatch, IdempotencyKeyInProgress
+from infrastructure.metrics import record_cache_lookup
+from infrastructure.unit_of_work import SQLAlchemyUnitOfWork
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Optional Idempotency-Key header parameter for write endpoints
+IDEMPOTENCY_KEY = Header(None, description="Retries with the same key return the first response instead of running again")
+
+
+def _request_hash(operation: str, payload: Any) -> str:
+    body = orjson.dumps({"operation": operation, "payload": jsonable_encoder(payload)}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(body).hexdigest()
+
+
+async def run_idempotent(
+    idempotency_key: Optional[str],
+    scope: str,
+    operation: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    status_code: int = status.HTTP_200_OK,
+    unit_of_work: Optional[SQLAlchemyUnitOfWork] = None
+) -> Any:
+    """Run ``handler`` at most once per (scope, Idempotency-Key).
+
+    Without a key the handler simply runs. With one, the first outcome,
+    including 4xx errors, is stored and replayed to retries that send the
+    same key and payload; replays carry an ``Idempotent-Replayed`` header.
+    Pass the unit of work the handler's service writes in, so the outcome
+    is stored in the same transaction (see IdempotencyStore).
+    """
+    if not idempotency_key:
+        return await handler()
+    if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be at most {MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+        )
+
+    async def execute():
+        try:
+            result = await handler()
+        except HTTPException as e:
+            return e.status_code, {"detail": e.detail}
+        return status_code, jsonable_encoder(result)
+
+    try:
+        (response_status, body), replayed = await idempotency_store.execute(
+            scope, idempotency_key, _request_hash(operation, payload), execute, unit_of_work
+        )
+    except IdempotencyKeyMismatch:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    except IdempotencyKeyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+
+    record_cache_lookup("idempotency", replayed)
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    if response_status == status.HTTP_204_NO_CONTENT:
+        return Response(status_code=response_status, headers=headers)
+    return JSONResponse(body, status_code=response_status, headers=headers)
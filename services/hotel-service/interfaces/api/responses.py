@@ -0,0 +1,29 @@
+"""
+Pre-serialized JSON responses for read endpoints
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def _serialize_model(obj: Any) -> Any:
+    # Response DTOs are built with model_construct from already-typed rows,
+    # so their field values can be written out as-is
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ModelJSONResponse(Response):
+    """JSON response for response DTOs, encoded with orjson.
+
+    Returning a Response from an endpoint makes FastAPI skip re-validating the
+    result against ``response_model``; the declared model still documents the
+    schema.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_serialize_model)
@@ -0,0 +1,57 @@
+"""
+Reservation lifecycle jobs run by the scheduler
+
+- expire_pending_reservations cancels pending reservations nobody confirmed
+  within RESERVATION_PENDING_TTL_HOURS, so they stop blocking their rooms
+- complete_past_stays marks confirmed reservations that checked out before
+  today as completed
+
+Both run every RESERVATION_SWEEP_INTERVAL_SECONDS and change at most
+RESERVATION_SWEEP_CHUNK_SIZE rows per transaction.
+"""
+import os
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator
+
+from application.reservation_service import ReservationService
+from infrastructure.database import AsyncSessionLocal
+from infrastructure.repositories import ShardedReservationRepository, SQLiteReservationRepository, SQLiteRoomRepository
+from infrastructure.scheduler import Scheduler
+from infrastructure.sharding import ShardSessions, reservation_shards
+
+RESERVATION_PENDING_TTL_HOURS = float(os.getenv("RESERVATION_PENDING_TTL_HOURS", "24"))
+RESERVATION_SWEEP_INTERVAL_SECONDS = float(os.getenv("RESERVATION_SWEEP_INTERVAL_SECONDS", "300"))
+RESERVATION_SWEEP_CHUNK_SIZE = int(os.getenv("RESERVATION_SWEEP_CHUNK_SIZE", "500"))
+
+
+@asynccontextmanager
+async def _reservation_service() -> AsyncIterator[ReservationService]:
+    """Reservation service on sessions of its own, like a request's"""
+    async with AsyncSessionLocal() as session:
+        shard_sessions = ShardSessions(reservation_shards)
+        try:
+            if reservation_shards.enabled:
+                reservation_repo = ShardedReservationRepository(session, shard_sessions)
+            else:
+                reservation_repo = SQLiteReservationRepository(session)
+            yield ReservationService(reservation_repo, SQLiteRoomRepository(session))
+        finally:
+            await shard_sessions.close()
+
+
+async def expire_pending_reservations(dry_run: bool = False) -> int:
+    async with _reservation_service() as service:
+        return await service.expire_stale_pending(
+            timedelta(hours=RESERVATION_PENDING_TTL_HOURS), RESERVATION_SWEEP_CHUNK_SIZE, dry_run
+        )
+
+
+async def complete_past_stays(dry_run: bool = False) -> int:
+    async with _reservation_service() as service:
+        return await service.complete_past_stays(RESERVATION_SWEEP_CHUNK_SIZE, dry_run)
+
+
+def register_reservation_jobs(scheduler: Scheduler):
+    scheduler.add_job("expire_pending_reservations", RESERVATION_SWEEP_INTERVAL_SECONDS, expire_pending_reservations)
+    scheduler.add_job("complete_past_stays", RESERVATION_SWEEP_INTERVAL_SECONDS, complete_past_stays)
@@ -9,14 +9,28 @@ from interfaces.api.hotel_router import router as hotel_router
 from interfaces.api.client_router import router as client_router
 from interfaces.api.client_reservation_routes import router as client_reservation_router
 from interfaces.api.employee_reservation_routes import router as employee_reservation_router
-from infrastructure.database import create_tables
+from infrastructure.database import create_tables, engine, read_engine
+from infrastructure.metrics import (
+    MetricsMiddleware, instrument_engine, record_cache_invalidation, record_cache_lookup, registry, CONTENT_TYPE
+)
+from infrastructure.tracing import TracingMiddleware, configure_tracing, instrument_engine_tracing
+from infrastructure.slow_queries import slow_query_log
+from infrastructure.query_counter import QueryCounterMiddleware, install_query_counter, QUERY_COUNTER_ENABLED
+from infrastructure.write_coordinator import write_coordinator
+from infrastructure.sharding import reservation_shards
+from infrastructure.scheduler import scheduler
+from interfaces.jobs import register_reservation_jobs
+from application.pricing import pricing_engine
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 app = FastAPI(
     title="Hotel Service",
     description="Hotel management microservice for hotel chain application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -27,6 +41,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses above the size threshold for clients that accept gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+)
+
+# Primary, read replica and reservation shards
+DB_ENGINES = [engine, read_engine, *reservation_shards.engines.values()]
+
+# Development and test runs: per-request query counts and N+1 warnings
+if QUERY_COUNTER_ENABLED:
+    app.add_middleware(QueryCounterMiddleware)
+    for db_engine in DB_ENGINES:
+        install_query_counter(db_engine)
+
+# Request latency includes compression
+app.add_middleware(MetricsMiddleware)
+for db_engine in DB_ENGINES:
+    instrument_engine(db_engine)
+    if slow_query_log.enabled:
+        slow_query_log.install(db_engine)
+pricing_engine.on_lookup = lambda hit: record_cache_lookup("pricing", hit)
+pricing_engine.on_invalidate = lambda hotel_id: record_cache_invalidation("pricing")
+
+# Expire stale pending reservations and complete past stays in the background
+register_reservation_jobs(scheduler)
+
+# Sampled request tracing; TRACE_EXPORTER turns it on
+configure_tracing("hotel-service")
+app.add_middleware(TracingMiddleware)
+for db_engine in DB_ENGINES:
+    instrument_engine_tracing(db_engine)
+
 # Include routers
 app.include_router(hotel_router, prefix="/api/v1", tags=["admin"])
 app.include_router(client_router, prefix="/api/v1", tags=["client"])
@@ -37,6 +85,17 @@ app.include_router(employee_reservation_router, prefix="/api/v1")
 async def startup_event():
     """Initialize database on startup"""
     await create_tables()
+    if reservation_shards.enabled:
+        await reservation_shards.create_tables()
+    await write_coordinator.start()
+    await scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the background jobs and commit queued writes before exiting"""
+    await scheduler.stop()
+    await write_coordinator.stop()
+    await reservation_shards.dispose()
 
 @app.get("/")
 async def root():
@@ -46,6 +105,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8002)
@@ -1,54 +1,75 @@
 #!/usr/bin/env python3
 """
 Hotel Service Database Population Script
-Populates the hotel-service database with test hotels, rooms, reviews, and reservations
+
+Generates a deterministic data set of hotels, rooms, room images,
+reservations and reviews. The same --seed and --scale always produce the
+same rows, and client identities match the users generated by the auth and
+user-management populate_db.py scripts.
+
+Scale 1.0 is production size: 10,000 hotels and 1,000,000 rooms with about
+70 reservations each over the year before and the six months after the
+--as-of date (a fixed date by default, so the output does not change from
+day to day). A room's
+reservations never overlap. Reviews come from a share of completed stays.
+Rows are generated in a process pool and inserted with Core executemany in
+large transactions.
+
+Usage:
+    python populate_db.py                         # scale 0.001: 10 hotels, 1,000 rooms
+    python populate_db.py --scale 0.1 --reset     # replace existing data
+    python populate_db.py --as-of 2026-06-01      # timelines around another date
 """
-import sys
-import os
+import argparse
 import asyncio
-import uuid
-import json
+import os
 import random
-from datetime import datetime, timedelta
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import accumulate
 from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent))
 
-# Add parent directory to path to import modules
-sys.path.append(str(Path(__file__).parent.parent))
+from sqlalchemy import func, insert, select, text
 
 from infrastructure.database import (
-    create_tables, AsyncSessionLocal, 
+    Base, create_tables, engine,
     HotelModel, RoomModel, RoomImageModel, ReviewModel, ReservationModel
 )
 from domain.entities import ReservationStatus
 
+FULL_SCALE_HOTELS = 10_000
+FULL_SCALE_USERS = 1_000_000  # Same as the auth and user-management generators
+ROOMS_PER_HOTEL = 100
+HISTORY_DAYS = 365
+HORIZON_DAYS = 180
+# "Today" of the generated data; fixed so every run produces the same rows
+DEFAULT_AS_OF = date(2025, 1, 1)
+HOTELS_PER_BATCH = 5
+CHUNK_SIZE = 50_000
+COMMIT_EVERY = 500_000
+
+# Identities shared with the other services' generators
+IDENTITY_NAMESPACE = uuid.UUID("6f1c2a52-3b1e-4d0e-9a57-2f5d8c9e4b10")
+EMPLOYEE_EMAIL = "employee@hotelchain.com"
+
 # Sample data
-HOTEL_LOCATIONS = ["New York", "Los Angeles", "Miami", "Chicago", "Las Vegas"]
-ROOM_TYPES = ["Standard", "Deluxe", "Suite", "Executive Suite", "Penthouse"]
+HOTEL_BRANDS = ["Grand", "Plaza", "Central", "Riverside", "Park", "Royal", "Boutique", "Harbor"]
+HOTEL_LOCATIONS = [
+    "New York", "Los Angeles", "Miami", "Chicago", "Las Vegas", "Cluj-Napoca", "Bucharest",
+    "Brasov", "Sibiu", "London", "Paris", "Berlin", "Vienna", "Rome", "Barcelona", "Prague"
+]
+AMENITIES = ["wifi", "parking", "breakfast", "pool", "gym", "spa", "restaurant", "bar", "room_service", "conference_room"]
+ROOM_TYPES = [("Standard", 100.0, 45), ("Deluxe", 160.0, 30), ("Suite", 260.0, 15), ("Executive Suite", 380.0, 8), ("Penthouse", 900.0, 2)]
+ROOM_TYPE_CUM_WEIGHTS = list(accumulate(weight for _, _, weight in ROOM_TYPES))
 ROOM_POSITIONS = ["City View", "Garden View", "Ocean View", "Mountain View", "Pool View"]
-AMENITIES = {
-    "wifi": True,
-    "parking": True,
-    "breakfast": True,
-    "pool": True,
-    "gym": True,
-    "spa": False,
-    "restaurant": True,
-    "bar": True,
-    "room_service": True,
-    "conference_room": False
-}
-FACILITIES = {
-    "king_bed": True,
-    "twin_beds": False,
-    "sofa": True,
-    "balcony": True,
-    "mini_bar": True,
-    "coffee_machine": True,
-    "safe": True,
-    "desk": True,
-    "bathtub": False,
-    "shower": True
-}
+FACILITIES = ["king_bed", "twin_beds", "sofa", "balcony", "mini_bar", "coffee_machine", "safe", "desk", "bathtub", "shower"]
 IMAGE_URLS = [
     "https://images.unsplash.com/photo-1566073771259-6a8506099945",
     "https://images.unsplash.com/photo-1522798514-97ceb8c4f1c8",
@@ -57,149 +78,233 @@ IMAGE_URLS = [
     "https://images.unsplash.com/photo-1578683010236-d716f9a3f461",
     "https://images.unsplash.com/photo-1595576508898-0ad5c879a061"
 ]
+STAY_NIGHTS = [1, 2, 3, 4, 5, 6, 7, 10, 14]
+STAY_CUM_WEIGHTS = list(accumulate([20, 25, 18, 12, 8, 5, 7, 3, 2]))
+GAP_DAYS = [0, 1, 2, 3, 5, 8, 13, 21]
+GAP_CUM_WEIGHTS = list(accumulate([25, 15, 12, 12, 12, 10, 8, 6]))
+FUTURE_STATUSES = [ReservationStatus.CONFIRMED, ReservationStatus.PENDING, ReservationStatus.CANCELLED]
+FUTURE_STATUS_CUM_WEIGHTS = list(accumulate([6, 3, 1]))
+RATINGS = [1, 2, 3, 4, 5]
+RATING_CUM_WEIGHTS = list(accumulate([3, 5, 12, 35, 45]))
+REVIEW_COMMENTS = [
+    "Amazing stay, would definitely come back.",
+    "Great room and very comfortable bed.",
+    "Clean and quiet, friendly staff.",
+    "Good value for money.",
+    "Room was smaller than expected.",
+    "Noisy at night, but a great location."
+]
+
+
+def user_id_for(seed: int, email: str) -> str:
+    """Deterministic user id, identical in every service's generator"""
+    return str(uuid.uuid5(IDENTITY_NAMESPACE, f"{seed}:{email}"))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_hotels(seed: int, users: int, first: int, last: int, as_of: date = DEFAULT_AS_OF) -> Dict[str, List[dict]]:
+    """
+    Rows for hotels ``first`` to ``last - 1`` and everything belonging to them.
 
-async def populate_hotel_db():
-    """Populate hotel database with test data"""
+    Every hotel has its own random stream, so the output does not depend on
+    how hotels are split across worker processes.
+    """
+    tables = {"hotels": [], "rooms": [], "room_images": [], "reservations": [], "reviews": []}
+    today = as_of
+    now = datetime.combine(as_of, datetime.min.time())
+    timeline_start = today - timedelta(days=HISTORY_DAYS)
+    timeline_end = today + timedelta(days=HORIZON_DAYS)
+
+    for h in range(first, last):
+        rng = random.Random(f"{seed}:hotel:{h}")
+        hotel_id = _uuid(rng)
+        location = HOTEL_LOCATIONS[h % len(HOTEL_LOCATIONS)]
+        price_factor = rng.uniform(0.7, 1.6)
+        tables["hotels"].append({
+            "id": hotel_id,
+            "name": f"{rng.choice(HOTEL_BRANDS)} Hotel {location} {h // len(HOTEL_LOCATIONS) + 1}",
+            "location": location,
+            "address": f"{rng.randint(1, 999)} Main Street, {location}",
+            "description": f"A beautiful hotel in {location}. Perfect for your stay!",
+            "amenities": {name: rng.random() < 0.7 for name in AMENITIES},
+            "created_at": now - timedelta(days=rng.randint(HISTORY_DAYS, 3 * HISTORY_DAYS)),
+            "updated_at": now
+        })
+
+        for r in range(ROOMS_PER_HOTEL):
+            room_id = _uuid(rng)
+            room_type, base_price = rng.choices(ROOM_TYPES, cum_weights=ROOM_TYPE_CUM_WEIGHTS)[0][:2]
+            price = round(base_price * price_factor, 2)
+            position = rng.choice(ROOM_POSITIONS)
+            tables["rooms"].append({
+                "id": room_id,
+                "hotel_id": hotel_id,
+                "room_number": f"{r // 20 + 1}{r % 20 + 1:02d}",
+                "room_type": room_type,
+                "price": price,
+                "position": position,
+                "facilities": {name: rng.random() < 0.6 for name in FACILITIES},
+                "is_available": rng.random() < 0.95,
+                "created_at": now - timedelta(days=HISTORY_DAYS),
+                "updated_at": now
+            })
+            for order in range(rng.randint(1, 3)):
+                tables["room_images"].append({
+                    "id": _uuid(rng),
+                    "room_id": room_id,
+                    "image_url": rng.choice(IMAGE_URLS),
+                    "alt_text": f"{room_type} {position} image {order + 1}",
+                    "display_order": order + 1,
+                    "created_at": now
+                })
+            _room_reservations(tables, rng, room_id, price, users, seed, timeline_start, timeline_end, today, now)
+
+    return tables
+
+
+def _room_reservations(tables, rng, room_id, price, users, seed, start, end, today, now):
+    """Back-to-back stays along the room's timeline, so they can never overlap"""
+    check_in = start + timedelta(days=rng.randint(0, 10))
+    while check_in < end:
+        nights = rng.choices(STAY_NIGHTS, cum_weights=STAY_CUM_WEIGHTS)[0]
+        check_out = check_in + timedelta(days=nights)
+        if check_out <= today:
+            status = ReservationStatus.CANCELLED if rng.random() < 0.1 else ReservationStatus.COMPLETED
+        elif check_in <= today:
+            status = ReservationStatus.CONFIRMED
+        else:
+            status = rng.choices(FUTURE_STATUSES, cum_weights=FUTURE_STATUS_CUM_WEIGHTS)[0]
+        client = rng.randrange(users)
+        email = f"user{client}@example.com"
+        booked_at = datetime.combine(check_in, datetime.min.time()) - timedelta(days=rng.randint(1, 90), minutes=rng.randint(0, 1439))
+        tables["reservations"].append({
+            "id": _uuid(rng),
+            "room_id": room_id,
+            # Reservations are keyed by the token subject, which is the client's email
+            "client_id": email,
+            "client_email": email,
+            "client_name": f"User {client}",
+            "employee_id": EMPLOYEE_EMAIL if status != ReservationStatus.PENDING else None,
+            "check_in_date": check_in,
+            "check_out_date": check_out,
+            "total_price": round(price * nights, 2),
+            "status": status.value,
+            "notes": "Late check-out requested" if rng.random() < 0.05 else None,
+            "created_at": min(booked_at, now),
+            "updated_at": min(booked_at + timedelta(days=1), now)
+        })
+        if status == ReservationStatus.COMPLETED and rng.random() < 0.2:
+            reviewed_at = datetime.combine(check_out, datetime.min.time()) + timedelta(days=rng.randint(0, 14))
+            tables["reviews"].append({
+                "id": _uuid(rng),
+                "room_id": room_id,
+                "user_id": user_id_for(seed, email),
+                "rating": rng.choices(RATINGS, cum_weights=RATING_CUM_WEIGHTS)[0],
+                "comment": rng.choice(REVIEW_COMMENTS),
+                "created_at": min(reviewed_at, now),
+                "updated_at": min(reviewed_at, now)
+            })
+        check_in = check_out + timedelta(days=rng.choices(GAP_DAYS, cum_weights=GAP_CUM_WEIGHTS)[0])
+
+
+class BulkWriter:
+    """Writes row batches with Core executemany, committing every COMMIT_EVERY rows"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.counts: Dict[str, int] = {}
+        self.uncommitted = 0
+
+    async def write(self, table, rows: List[dict]):
+        for i in range(0, len(rows), CHUNK_SIZE):
+            chunk = rows[i:i + CHUNK_SIZE]
+            await self.conn.execute(insert(table), chunk)
+            self.counts[table.name] = self.counts.get(table.name, 0) + len(chunk)
+            self.uncommitted += len(chunk)
+        if self.uncommitted >= COMMIT_EVERY:
+            await self.conn.commit()
+            self.uncommitted = 0
+            print("  " + ", ".join(f"{name}: {count:,}" for name, count in self.counts.items()))
+
+    async def close(self):
+        await self.conn.commit()
+
+
+async def generate(writer: BulkWriter, scale: float, seed: int, workers: int, as_of: date = DEFAULT_AS_OF):
+    """Generate hotel batches in worker processes and insert them in order as they finish"""
+    hotels = max(1, round(FULL_SCALE_HOTELS * scale))
+    users = max(1, round(FULL_SCALE_USERS * scale))
+    tables = {table.name: table for table in (
+        HotelModel.__table__, RoomModel.__table__, RoomImageModel.__table__,
+        ReservationModel.__table__, ReviewModel.__table__
+    )}
+    batches = [(first, min(first + HOTELS_PER_BATCH, hotels)) for first in range(0, hotels, HOTELS_PER_BATCH)]
+
+    if workers <= 1:
+        for first, last in batches:
+            for name, rows in generate_hotels(seed, users, first, last, as_of).items():
+                await writer.write(tables[name], rows)
+        return
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first, last in batches:
+            pending.append(loop.run_in_executor(pool, generate_hotels, seed, users, first, last, as_of))
+            # Keep every worker busy while the main process inserts
+            if len(pending) < workers * 2:
+                continue
+            for name, rows in (await pending.popleft()).items():
+                await writer.write(tables[name], rows)
+        while pending:
+            for name, rows in (await pending.popleft()).items():
+                await writer.write(tables[name], rows)
+
+
+async def populate_hotel_db(scale: float, seed: int, reset: bool, workers: int, as_of: date = DEFAULT_AS_OF):
+    """Populate hotel database with generated data"""
+    engine.echo = False
+    if reset:
+        print("Dropping existing tables...")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
     print("Creating tables...")
     await create_tables()
-    
-    async with AsyncSessionLocal() as session:
-        # Create hotels
-        hotels = []
-        for i in range(5):
-            hotel_id = str(uuid.uuid4())
-            location = HOTEL_LOCATIONS[i % len(HOTEL_LOCATIONS)]
-            amenities_subset = {k: v for k, v in AMENITIES.items() if random.choice([True, True, True, False])}
-            
-            hotel = HotelModel(
-                id=hotel_id,
-                name=f"Hotel {location} {i+1}",
-                location=location,
-                address=f"{random.randint(100, 999)} Main Street, {location}",
-                description=f"A beautiful hotel in {location}. Perfect for your stay!",
-                amenities=json.dumps(amenities_subset),
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            hotels.append(hotel)
-            session.add(hotel)
-            print(f"Adding hotel: {hotel.name}")
-        
-        # Save hotels to get IDs
-        await session.commit()
-        
-        # Create rooms for each hotel
-        rooms = []
-        for hotel in hotels:
-            for i in range(random.randint(5, 10)):
-                room_id = str(uuid.uuid4())
-                room_type = random.choice(ROOM_TYPES)
-                position = random.choice(ROOM_POSITIONS)
-                price = round(random.uniform(100, 500), 2)
-                facilities_subset = {k: v for k, v in FACILITIES.items() if random.choice([True, True, True, False])}
-                
-                room = RoomModel(
-                    id=room_id,
-                    hotel_id=hotel.id,
-                    room_number=str(100 + i),
-                    room_type=room_type,
-                    price=price,
-                    position=position,
-                    facilities=json.dumps(facilities_subset),
-                    is_available=True,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                rooms.append(room)
-                session.add(room)
-                print(f"Adding room: {room.room_number} ({room_type}) to {hotel.name}")
-                
-                # Add 1-3 images per room
-                for j in range(random.randint(1, 3)):
-                    image = RoomImageModel(
-                        id=str(uuid.uuid4()),
-                        room_id=room_id,
-                        image_url=random.choice(IMAGE_URLS),
-                        alt_text=f"{room_type} {position} image {j+1}",
-                        display_order=j+1,
-                        created_at=datetime.utcnow()
-                    )
-                    session.add(image)
-        
-        # Save rooms to get IDs
-        await session.commit()
-        
-        # Create reviews for some rooms
-        client_ids = ["client1-uuid", "client2-uuid", "client3-uuid", "client4-uuid"]
-        client_names = ["John Doe", "Jane Smith", "Bob Johnson", "Alice Brown"]
-        
-        for room in rooms:
-            # 50% chance to have reviews
-            if random.choice([True, False]):
-                num_reviews = random.randint(1, 5)
-                for i in range(num_reviews):
-                    client_idx = random.randint(0, len(client_ids)-1)
-                    review = ReviewModel(
-                        id=str(uuid.uuid4()),
-                        room_id=room.id,
-                        user_id=client_ids[client_idx],
-                        rating=random.randint(3, 5),  # Mostly positive reviews
-                        comment=f"This room was {'amazing' if random.choice([True, False]) else 'great'}! {'Would definitely stay again.' if random.choice([True, False]) else 'Very comfortable.'}",
-                        created_at=datetime.utcnow() - timedelta(days=random.randint(1, 60)),
-                        updated_at=datetime.utcnow() - timedelta(days=random.randint(1, 60))
-                    )
-                    session.add(review)
-                    print(f"Adding review for room {room.room_number} in {room.hotel_id}")
-        
-        # Save reviews
-        await session.commit()
-        
-        # Create reservations for some rooms
-        for room in rooms:
-            # 30% chance to have reservations
-            if random.random() < 0.3:
-                num_reservations = random.randint(1, 3)
-                for i in range(num_reservations):
-                    # Past reservation (completed)
-                    if i == 0:
-                        check_in = datetime.now() - timedelta(days=random.randint(30, 60))
-                        check_out = check_in + timedelta(days=random.randint(1, 7))
-                        status = ReservationStatus.COMPLETED.value
-                    # Current reservation (confirmed)
-                    elif i == 1:
-                        check_in = datetime.now() - timedelta(days=random.randint(1, 3))
-                        check_out = datetime.now() + timedelta(days=random.randint(1, 4))
-                        status = ReservationStatus.CONFIRMED.value
-                    # Future reservation (confirmed)
-                    else:
-                        check_in = datetime.now() + timedelta(days=random.randint(7, 30))
-                        check_out = check_in + timedelta(days=random.randint(1, 14))
-                        status = ReservationStatus.CONFIRMED.value
-                    
-                    client_idx = random.randint(0, len(client_ids)-1)
-                    nights = (check_out - check_in).days
-                    reservation = ReservationModel(
-                        id=str(uuid.uuid4()),
-                        room_id=room.id,
-                        client_id=client_ids[client_idx],
-                        client_email=f"client{client_idx+1}@example.com",
-                        client_name=client_names[client_idx],
-                        employee_id="employee-uuid" if random.choice([True, False]) else None,
-                        check_in_date=check_in,
-                        check_out_date=check_out,
-                        total_price=room.price * nights,
-                        status=status,
-                        notes="Special request: Late check-out" if random.choice([True, False]) else None,
-                        created_at=datetime.utcnow() - timedelta(days=random.randint(30, 90)),
-                        updated_at=datetime.utcnow() - timedelta(days=random.randint(0, 30))
-                    )
-                    session.add(reservation)
-                    print(f"Adding reservation for room {room.room_number} ({check_in.date()} to {check_out.date()})")
-        
-        # Save reservations
-        await session.commit()
-    
+
+    async with engine.connect() as conn:
+        if (await conn.execute(select(func.count()).select_from(HotelModel))).scalar_one():
+            print("The database already has hotels; use --reset to replace them")
+            return
+        # Generated data can be regenerated, so trade durability for load speed
+        await conn.execute(text("PRAGMA synchronous = OFF"))
+
+        print(f"Generating scale {scale} with seed {seed} as of {as_of} using {workers} workers...")
+        start = time.perf_counter()
+        writer = BulkWriter(conn)
+        await generate(writer, scale, seed, workers, as_of)
+        await writer.close()
+        await conn.execute(text("ANALYZE"))
+        await conn.commit()
+
+    elapsed = time.perf_counter() - start
+    total = sum(writer.counts.values())
+    print(f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s):")
+    for name, count in writer.counts.items():
+        print(f"  {name}: {count:,}")
     print("Hotel database populated successfully!")
 
+
 if __name__ == "__main__":
-    asyncio.run(populate_hotel_db())
+    parser = argparse.ArgumentParser(description="Populate the hotel-service database with generated data")
+    parser.add_argument("--scale", type=float, default=0.001, help="1.0 = 10k hotels, 1M rooms, ~70M reservations")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate the tables first")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=DEFAULT_AS_OF,
+                        help=f"date the generated timelines are centred on (default {DEFAULT_AS_OF})")
+    # The main process inserts, so leave it a core
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1), help="row generator processes")
+    args = parser.parse_args()
+    asyncio.run(populate_hotel_db(args.scale, args.seed, args.reset, args.workers, args.as_of))
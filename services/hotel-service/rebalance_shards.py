@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Reservation shard maintenance
+
+Works on the shards configured by RESERVATION_SHARDS / RESERVATION_SHARD_URL
+(see infrastructure/sharding.py) and can run while the service is up: moves
+copy a hotel and switch its route, wait SHARD_ROUTE_TTL_SECONDS for the
+workers' cached routes to expire (meanwhile the old shard forwards writes to
+the new one), then remove the hotel from its old shard. Every
+command first records a route for hotels that have none, so run any of them
+(e.g. status) before changing RESERVATION_SHARDS.
+
+Usage:
+    RESERVATION_SHARDS=4 python rebalance_shards.py status
+    RESERVATION_SHARDS=4 python rebalance_shards.py import       # copy the unsharded reservations table
+    RESERVATION_SHARDS=4 python rebalance_shards.py rebalance --dry-run
+    RESERVATION_SHARDS=4 python rebalance_shards.py move HOTEL_ID shard2
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from infrastructure.database import create_tables, engine, read_engine
+from infrastructure.sharding import (
+    finish_move, hotel_counts, import_unsharded, move_hotel, plan_rebalance, reservation_shards, start_move
+)
+
+
+def print_status(counts):
+    total = sum(sum(by_hotel.values()) for by_hotel in counts.values()) or 1
+    print(f"{'shard':<10} {'hotels':>8} {'reservations':>14} {'share':>7}")
+    for shard, by_hotel in counts.items():
+        reservations = sum(by_hotel.values())
+        print(f"{shard:<10} {len(by_hotel):>8} {reservations:>14,} {reservations / total:>7.1%}")
+
+
+async def main(args):
+    if not reservation_shards.enabled:
+        sys.exit("RESERVATION_SHARDS is not set; there are no shards to work on")
+    for db_engine in (engine, read_engine, *reservation_shards.engines.values()):
+        db_engine.echo = False
+    await create_tables()
+    await reservation_shards.create_tables()
+
+    try:
+        pinned = await reservation_shards.pin_routes()
+        if pinned:
+            print(f"Recorded routes for {pinned:,} hotels")
+
+        if args.command == "status":
+            print_status(await hotel_counts(reservation_shards))
+
+        elif args.command == "import":
+            copied, orphaned = await import_unsharded(reservation_shards)
+            print(f"Copied {copied:,} reservations into {len(reservation_shards.names)} shards"
+                  f"{f'; skipped {orphaned:,} whose room no longer exists' if orphaned else ''}")
+            print_status(await hotel_counts(reservation_shards))
+
+        elif args.command == "move":
+            moved = await move_hotel(reservation_shards, args.hotel_id, args.shard, args.grace)
+            print(f"Moved {moved:,} reservations of hotel {args.hotel_id} to {args.shard}")
+
+        elif args.command == "rebalance":
+            counts = await hotel_counts(reservation_shards)
+            print_status(counts)
+            moves = plan_rebalance(counts, args.max_moves)
+            if not moves:
+                print("Shards are balanced")
+                return
+            for hotel_id, source, target in moves:
+                print(f"  {hotel_id}: {source} -> {target} ({counts[source][hotel_id]:,} reservations)")
+            if args.dry_run:
+                return
+            # Switch every route first, then wait out the cached routes once for all moves
+            started = []
+            for hotel_id, _, target in moves:
+                source = await start_move(reservation_shards, hotel_id, target)
+                if source is not None:
+                    started.append((hotel_id, source, target))
+            await asyncio.sleep(reservation_shards.route_ttl if args.grace is None else args.grace)
+            for hotel_id, source, target in started:
+                await finish_move(reservation_shards, hotel_id, source, target)
+            print_status(await hotel_counts(reservation_shards))
+    finally:
+        await reservation_shards.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect, fill and rebalance the reservation shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="hotels and reservations per shard")
+    commands.add_parser("import", help="copy the unsharded reservations table into the shards")
+    move = commands.add_parser("move", help="move one hotel to another shard")
+    move.add_argument("hotel_id")
+    move.add_argument("shard")
+    rebalance = commands.add_parser("rebalance", help="move hotels until the shards hold similar numbers of reservations")
+    rebalance.add_argument("--dry-run", action="store_true", help="only print the planned moves")
+    rebalance.add_argument("--max-moves", type=int)
+    for command in (move, rebalance):
+        command.add_argument("--grace", type=float,
+                             help="seconds to wait for cached routes to expire (default: SHARD_ROUTE_TTL_SECONDS)")
+    asyncio.run(main(parser.parse_args()))
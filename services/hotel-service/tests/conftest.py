@@ -0,0 +1,82 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import jwt
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The database URL is relative to the working directory and resolved when the
+# engine is created, so move to a scratch directory before anything imports it
+_ORIGINAL_CWD = os.getcwd()
+# Background jobs would run statements in the middle of the tests' query budgets;
+# the tests run them on demand instead
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+_TEST_DIR = tempfile.mkdtemp(prefix="hotel-service-tests-")
+os.chdir(_TEST_DIR)
+
+pytest_plugins = ["query_budget"]
+
+
+def pytest_unconfigure(config):
+    os.chdir(_ORIGINAL_CWD)
+    shutil.rmtree(_TEST_DIR, ignore_errors=True)
+
+
+def make_token(role: str, user_id: str = "test-user") -> dict:
+    token = jwt.encode(
+        {"sub": f"{user_id}@example.com", "user_id": user_id, "role": role, "exp": time.time() + 3600},
+        os.getenv("JWT_SECRET_KEY", "your-secret-key-here"),
+        algorithm="HS256"
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+ADMIN = make_token("ADMIN", "admin-1")
+EMPLOYEE = make_token("EMPLOYEE", "employee-1")
+CLIENT = make_token("CLIENT", "client-1")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient on a fresh database in the scratch directory"""
+    from fastapi.testclient import TestClient
+    from infrastructure.database import engine, read_engine
+    import main
+
+    engine.echo = False
+    read_engine.echo = False
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def seeded(client):
+    """One hotel with rooms, reviews and reservations"""
+    hotel = client.post("/api/v1/hotels", headers=ADMIN, json={
+        "name": "Budget Hotel", "location": "Cluj", "address": "1 Main Street",
+        "amenities": {"wifi": True, "pool": True}
+    }).json()
+    rooms = [
+        client.post("/api/v1/rooms", headers=ADMIN, json={
+            "hotel_id": hotel["id"], "room_number": str(100 + i), "room_type": "Deluxe",
+            "price": 100.0 + i, "position": "City View", "facilities": {"balcony": i % 2 == 0}
+        }).json()
+        for i in range(10)
+    ]
+    for room in rooms:
+        client.post(f"/api/v1/rooms/{room['id']}/reviews", headers=CLIENT, json={
+            "user_id": "client-1", "rating": 5, "comment": "Great"
+        })
+    reservations = [
+        client.post("/api/v1/client/reservations/", headers=CLIENT, json={
+            "room_id": room["id"], "client_email": "client-1@example.com", "client_name": "Client One",
+            "check_in_date": f"2031-01-{i + 1:02d}T14:00:00", "check_out_date": f"2031-01-{i + 3:02d}T11:00:00"
+        }).json()
+        for i, room in enumerate(rooms)
+    ]
+    return {"hotel": hotel, "rooms": rooms, "reservations": reservations}
@@ -0,0 +1,59 @@
+"""
+pytest plugin failing tests that exceed their database query budget
+
+    @pytest.mark.query_budget(3)
+    def test_list_rooms(client):
+        client.get("/api/v1/rooms")
+
+A marked test fails when it runs more statements than its budget, or when
+one statement shape runs more than ``n_plus_one`` times (default
+N_PLUS_ONE_THRESHOLD), which is the signature of a per-row lookup. Only
+queries issued while the test body runs are counted, so fixture setup and
+seeding are free.
+"""
+import pytest
+
+from infrastructure.database import engine, read_engine
+from infrastructure.query_counter import capture_queries, install_query_counter, N_PLUS_ONE_THRESHOLD
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, n_plus_one=None): fail if the test runs more database statements than allowed"
+    )
+    install_query_counter(engine)
+    install_query_counter(read_engine)
+
+
+def _report(counts) -> str:
+    return "\n".join(f"  {count:>4} x {shape}" for shape, count in counts.shapes())
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    max_queries = marker.args[0] if marker.args else marker.kwargs["max_queries"]
+    n_plus_one = marker.kwargs.get("n_plus_one", N_PLUS_ONE_THRESHOLD)
+
+    # A failing test raises out of the yield and is reported as it is
+    with capture_queries() as counts:
+        result = yield
+
+    repeated = counts.repeated(n_plus_one)
+    if repeated:
+        shape, count = repeated[0]
+        pytest.fail(
+            f"N+1 query pattern: one statement ran {count} times (limit {n_plus_one}):\n"
+            f"  {shape}\nAll statements:\n{_report(counts)}",
+            pytrace=False
+        )
+    if counts.total > max_queries:
+        pytest.fail(
+            f"Query budget exceeded: {counts.total} statements, budget {max_queries}:\n{_report(counts)}",
+            pytrace=False
+        )
+    return result
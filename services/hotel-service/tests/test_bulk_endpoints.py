@@ -0,0 +1,109 @@
+"""
+Bulk insert/update endpoints for hotels, rooms and room images
+"""
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from conftest import ADMIN
+from infrastructure.database import Base, _create_missing_indexes
+
+
+@pytest.fixture
+def bulk_hotels(client):
+    """Two hotels created through /hotels/bulk, removed again afterwards"""
+    response = client.post("/api/v1/hotels/bulk", headers=ADMIN, json=[
+        {"name": "Bulk North", "location": "Cluj", "address": "1 North Street"},
+        {"name": "Bulk South", "location": "Brasov", "address": "2 South Street"},
+    ])
+    assert response.status_code == 200
+    ids = [result["id"] for result in response.json()["results"]]
+    yield ids
+    for hotel_id in ids:
+        client.delete(f"/api/v1/hotels/{hotel_id}", headers=ADMIN)
+
+
+def test_bulk_hotels_create_update_and_report_per_item(client, bulk_hotels):
+    # NDJSON: one update, one invalid item, one duplicate id
+    body = "\n".join(json.dumps(item) for item in [
+        {"id": bulk_hotels[0], "name": "Bulk North Renamed", "location": "Cluj", "address": "1 North Street"},
+        {"name": "No address", "location": "Iasi"},
+        {"id": bulk_hotels[0], "name": "Again", "location": "Cluj", "address": "1 North Street"},
+    ])
+    response = client.post("/api/v1/hotels/bulk", headers={**ADMIN, "Content-Type": "application/x-ndjson"},
+                           content=body).json()
+    assert (response["total"], response["updated"], response["failed"]) == (3, 1, 2)
+    assert [result["status"] for result in response["results"]] == ["updated", "error", "error"]
+    assert client.get(f"/api/v1/hotels/{bulk_hotels[0]}").json()["name"] == "Bulk North Renamed"
+    assert client.post("/api/v1/hotels/bulk", headers=ADMIN, content="{not json").status_code == 400
+
+
+def test_bulk_rooms_match_by_room_number_and_reject_foreign_ids(client, bulk_hotels):
+    north, south = bulk_hotels
+    first = client.post("/api/v1/rooms/bulk", headers=ADMIN, json=[
+        {"hotel_id": north, "room_number": "1", "room_type": "Double", "price": 100.0},
+        {"hotel_id": north, "room_number": "2", "room_type": "Double", "price": 100.0},
+    ]).json()
+    assert first["created"] == 2
+    room_one, room_two = (result["id"] for result in first["results"])
+
+    fresh_id = str(uuid.uuid4())
+    response = client.post("/api/v1/rooms/bulk", headers=ADMIN, json=[
+        # Existing room, matched by hotel and number
+        {"hotel_id": north, "room_number": "1", "room_type": "Suite", "price": 150.0},
+        # New room with its own id
+        {"id": fresh_id, "hotel_id": south, "room_number": "1", "room_type": "Single", "price": 70.0},
+        # Id of room 2 on a different room: fails alone instead of failing the chunk
+        {"id": room_two, "hotel_id": south, "room_number": "2", "room_type": "Single", "price": 70.0},
+        {"hotel_id": str(uuid.uuid4()), "room_number": "1", "room_type": "Single", "price": 70.0},
+    ]).json()
+    assert [result["status"] for result in response["results"]] == ["updated", "created", "error", "error"]
+    assert response["results"][0]["id"] == room_one and response["results"][1]["id"] == fresh_id
+    assert "belongs to another room" in response["results"][2]["error"]
+    assert client.get(f"/api/v1/rooms/{room_one}").json()["room_type"] == "Suite"
+    assert client.get(f"/api/v1/rooms/{room_two}").json()["hotel_id"] == north
+
+
+def test_bulk_room_images(client, bulk_hotels):
+    room = client.post("/api/v1/rooms", headers=ADMIN, json={
+        "hotel_id": bulk_hotels[0], "room_number": "9", "room_type": "Double", "price": 100.0
+    }).json()
+    created = client.post("/api/v1/rooms/images/bulk", headers=ADMIN, json=[
+        {"room_id": room["id"], "image_url": "https://example.com/1.jpg"},
+        {"room_id": room["id"], "image_url": "https://example.com/2.jpg", "display_order": 2},
+        {"room_id": "missing-room", "image_url": "https://example.com/3.jpg"},
+    ]).json()
+    assert [result["status"] for result in created["results"]] == ["created", "created", "error"]
+
+    image_id = created["results"][0]["id"]
+    updated = client.post("/api/v1/rooms/images/bulk", headers=ADMIN, json=[
+        {"id": image_id, "room_id": room["id"], "image_url": "https://example.com/1b.jpg"},
+    ]).json()
+    assert updated["updated"] == 1
+    images = client.get(f"/api/v1/rooms/{room['id']}/images").json()
+    assert sorted(image["image_url"] for image in images) == ["https://example.com/1b.jpg", "https://example.com/2.jpg"]
+
+
+def test_startup_refuses_duplicate_room_numbers(tmp_path):
+    # A database from before the (hotel_id, room_number) unique index, holding a duplicate
+    async def scenario():
+        db_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/old.db")
+        try:
+            async with db_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.exec_driver_sql("DROP INDEX ux_rooms_hotel_id_room_number")
+                await conn.exec_driver_sql(
+                    "INSERT INTO rooms (id, hotel_id, room_number, room_type, price) VALUES "
+                    "('r1', 'h1', '101', 'single', 100), ('r2', 'h1', '101', 'double', 150), "
+                    "('r3', 'h1', '102', 'single', 100)"
+                )
+            async with db_engine.begin() as conn:
+                await conn.run_sync(_create_missing_indexes)
+        finally:
+            await db_engine.dispose()
+
+    with pytest.raises(RuntimeError, match=r"hotel_id='h1', room_number='101' \(2 rows\)$"):
+        asyncio.run(scenario())
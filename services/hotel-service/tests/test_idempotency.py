@@ -0,0 +1,116 @@
+"""
+Idempotency-Key handling on the reservation endpoints
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from application.reservation_service import ReservationService
+from infrastructure.database import IdempotencyKeyModel, engine
+from interfaces.api.idempotency import _request_hash
+from interfaces.dto.reservation_dto import ReservationResponse
+
+from conftest import ADMIN, CLIENT
+
+
+@pytest.fixture
+def room(client):
+    hotel = client.post("/api/v1/hotels", headers=ADMIN, json={
+        "name": "Retry Hotel", "location": "Oradea", "address": "6 Main Street"
+    }).json()
+    yield client.post("/api/v1/rooms", headers=ADMIN, json={
+        "hotel_id": hotel["id"], "room_number": "1", "room_type": "Double", "price": 100.0
+    }).json()
+    client.delete(f"/api/v1/hotels/{hotel['id']}", headers=ADMIN)
+
+
+def booking(room, day: int) -> dict:
+    return {
+        "room_id": room["id"], "client_email": "client-1@example.com", "client_name": "Client One",
+        "check_in_date": f"2035-02-{day:02d}T14:00:00", "check_out_date": f"2035-02-{day + 1:02d}T11:00:00"
+    }
+
+
+def keyed(key: str) -> dict:
+    return {**CLIENT, "Idempotency-Key": key}
+
+
+def store_claim(client, key: str, operation: str, payload, claimed_at: datetime):
+    """A claim row as left behind by a worker that is running, or died running, the request"""
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(insert(IdempotencyKeyModel).values(
+                scope="client-1", key=key, request_hash=_request_hash(operation, payload),
+                created_at=claimed_at, claimed_at=claimed_at, expires_at=claimed_at + timedelta(hours=24)
+            ))
+    client.portal.call(run)
+
+
+def test_retries_replay_the_first_response(client, room):
+    first = client.post("/api/v1/client/reservations/", headers=keyed("book-1"), json=booking(room, 1))
+    retry = client.post("/api/v1/client/reservations/", headers=keyed("book-1"), json=booking(room, 1))
+    assert first.status_code == retry.status_code == 201
+    assert retry.json()["id"] == first.json()["id"]
+    assert retry.headers["Idempotent-Replayed"] == "true" and "Idempotent-Replayed" not in first.headers
+
+    # 4xx outcomes are stored too: the room is taken for these dates under another key
+    taken = client.post("/api/v1/client/reservations/", headers=keyed("book-2"), json=booking(room, 1))
+    assert taken.status_code == 400
+    replayed = client.post("/api/v1/client/reservations/", headers=keyed("book-2"), json=booking(room, 1))
+    assert replayed.status_code == 400 and replayed.headers["Idempotent-Replayed"] == "true"
+
+
+def test_key_reused_for_another_request_is_rejected(client, room):
+    assert client.post("/api/v1/client/reservations/", headers=keyed("book-3"), json=booking(room, 3)).status_code == 201
+    reused = client.post("/api/v1/client/reservations/", headers=keyed("book-3"), json=booking(room, 5))
+    assert reused.status_code == 422
+
+
+def test_server_errors_release_the_key(client, room, monkeypatch):
+    original = ReservationService.create_reservation
+
+    async def failing(self, *args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(ReservationService, "create_reservation", failing)
+    assert client.post("/api/v1/client/reservations/", headers=keyed("book-7"), json=booking(room, 7)).status_code == 500
+    monkeypatch.setattr(ReservationService, "create_reservation", original)
+    retry = client.post("/api/v1/client/reservations/", headers=keyed("book-7"), json=booking(room, 7))
+    assert retry.status_code == 201 and "Idempotent-Replayed" not in retry.headers
+
+
+def test_server_errors_after_the_booking_roll_it_back(client, room, monkeypatch):
+    def failing(cls, *args, **kwargs):
+        raise RuntimeError("response does not validate")
+
+    # The booking is written, then the response fails: the retry must not find the room taken
+    with monkeypatch.context() as patch:
+        patch.setattr(ReservationResponse, "model_validate", classmethod(failing))
+        assert client.post("/api/v1/client/reservations/", headers=keyed("book-13"), json=booking(room, 13)).status_code == 500
+    retry = client.post("/api/v1/client/reservations/", headers=keyed("book-13"), json=booking(room, 13))
+    assert retry.status_code == 201 and "Idempotent-Replayed" not in retry.headers
+
+
+def test_running_claims_conflict_and_stale_claims_are_taken_over(client, room):
+    reservation = client.post("/api/v1/client/reservations/", headers=CLIENT, json=booking(room, 9)).json()
+    url = f"/api/v1/client/reservations/{reservation['id']}"
+
+    # Another worker is still running the request
+    store_claim(client, "cancel-1", "cancel_reservation", reservation["id"], datetime.utcnow())
+    assert client.delete(url, headers=keyed("cancel-1")).status_code == 409
+
+    # The worker that claimed this key died long ago; the retry runs the request itself
+    store_claim(client, "cancel-2", "cancel_reservation", reservation["id"], datetime.utcnow() - timedelta(hours=1))
+    taken_over = client.delete(url, headers=keyed("cancel-2"))
+    assert taken_over.status_code == 204 and "Idempotent-Replayed" not in taken_over.headers
+    assert client.delete(url, headers=keyed("cancel-2")).headers["Idempotent-Replayed"] == "true"
+
+
+def test_guests_need_authentication_to_send_a_key(client, room):
+    reservation = client.post("/api/v1/client/reservations/", json={**booking(room, 11), "client_id": None}).json()
+    url = f"/api/v1/client/reservations/{reservation['id']}"
+    assert client.delete(url, headers={"Idempotency-Key": "cancel-3"}).status_code == 401
+    # client_id and client_email are the guest's own say-so, not a scope
+    guest_booking = {**booking(room, 15), "client_id": "client-1"}
+    assert client.post("/api/v1/client/reservations/", headers={"Idempotency-Key": "book-15"}, json=guest_booking).status_code == 401
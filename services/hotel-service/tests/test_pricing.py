@@ -0,0 +1,146 @@
+"""
+Stay pricing: rate calendar, rule layers and the quote/booking endpoints
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from application.pricing import occupancy_by_night, price_stay
+from domain.entities import PricingRule, PricingRuleKind
+
+from conftest import ADMIN, CLIENT
+
+
+def test_price_stay_layers():
+    check_in = date(2031, 7, 3)  # Thursday
+    rules = [
+        PricingRule(kind=PricingRuleKind.SEASON, start_date=date(2031, 7, 1), end_date=date(2031, 8, 31),
+                    adjustment_percent=50),
+        PricingRule(kind=PricingRuleKind.SEASON, weekdays=[4, 5], adjustment_percent=10),
+        PricingRule(kind=PricingRuleKind.SEASON, room_type="Suite", weekdays=[0], adjustment_percent=100),
+        PricingRule(kind=PricingRuleKind.OCCUPANCY, min_occupancy=0.5, adjustment_percent=20),
+        PricingRule(kind=PricingRuleKind.OCCUPANCY, min_occupancy=0.9, adjustment_percent=40),
+        PricingRule(kind=PricingRuleKind.LENGTH_OF_STAY, min_nights=2, adjustment_percent=-5),
+        PricingRule(kind=PricingRuleKind.LENGTH_OF_STAY, min_nights=3, adjustment_percent=-10),
+    ]
+    # Thursday at the room's price, Friday from the calendar, Saturday at the room's price
+    rates = {check_in + timedelta(days=1): 200.0}
+    occupancy = occupancy_by_night([(date(2031, 7, 1), date(2031, 7, 5))] * 5 + [(date(2031, 7, 5), date(2031, 7, 9))] * 4,
+                                   10, check_in, 3)
+    assert occupancy == [0.5, 0.5, 0.4]
+
+    price = price_stay("Double", check_in, 3, rates, rules, occupancy)
+    assert price.nights == 3
+    assert price.calendar_total == pytest.approx(200 * 1.5 * 1.1 * 1.2)
+    assert price.base_nights == pytest.approx(1.5 * 1.2 + 1.5 * 1.1)
+    assert price.multiplier == 0.9
+    assert price.total(100) == 666.9
+    # Without rules and rates the total is the room's price per night
+    assert price_stay("Double", check_in, 3, {}, []).total(80) == 240
+
+
+@pytest.fixture
+def hotel(client):
+    """A hotel removed again afterwards, so the catalog counts of later tests hold"""
+    hotel = client.post("/api/v1/hotels", headers=ADMIN, json={
+        "name": "Seasonal Hotel", "location": "Sibiu", "address": "4 Main Street"
+    }).json()
+    yield hotel
+    client.delete(f"/api/v1/hotels/{hotel['id']}", headers=ADMIN)
+
+
+def test_rates_and_rules_price_quotes_and_bookings(client, hotel):
+    rooms = [
+        client.post("/api/v1/rooms", headers=ADMIN, json={
+            "hotel_id": hotel["id"], "room_number": str(number), "room_type": "Double", "price": price
+        }).json()
+        for number, price in ((1, 100.0), (2, 120.0))
+    ]
+    assert client.put(f"/api/v1/hotels/{hotel['id']}/rates", headers=ADMIN, json={"rates": [
+        {"room_type": "Double", "night": "2033-06-01", "price": 150.0}
+    ]}).json() == {"updated": 1}
+    rule = client.post("/api/v1/pricing-rules", headers=ADMIN, json={
+        "hotel_id": hotel["id"], "kind": "length_of_stay", "min_nights": 2, "adjustment_percent": -10
+    })
+    assert rule.status_code == 201
+    assert client.post("/api/v1/pricing-rules", headers=ADMIN, json={
+        "hotel_id": hotel["id"], "kind": "season", "adjustment_percent": 10
+    }).status_code == 400
+
+    stay = {"check_in_date": "2033-06-01", "check_out_date": "2033-06-03"}
+    quotes = client.get(f"/api/v1/client/hotels/{hotel['id']}/quotes", params=stay).json()
+    assert {quote["room_number"]: quote["total_price"] for quote in quotes} == {
+        "1": round((150 + 100) * 0.9, 2), "2": round((150 + 120) * 0.9, 2)
+    }
+
+    reservation = client.post("/api/v1/client/reservations/", headers=CLIENT, json={
+        "room_id": rooms[0]["id"], "client_email": "client-1@example.com", "client_name": "Client One",
+        "check_in_date": "2033-06-01T14:00:00", "check_out_date": "2033-06-03T11:00:00"
+    }).json()
+    assert reservation["total_price"] == 225.0
+
+    # Deleting the rule drops the cached prices at once
+    assert client.delete(f"/api/v1/pricing-rules/{rule.json()['id']}", headers=ADMIN).status_code == 204
+    quotes = client.get(f"/api/v1/client/hotels/{hotel['id']}/quotes", params=stay).json()
+    assert sorted(quote["total_price"] for quote in quotes) == [250.0, 270.0]
+
+
+@pytest.fixture
+def hotel_rooms(client, hotel):
+    """Three Deluxe rooms 101-103 and a Single room 201"""
+    rooms = {}
+    for number, room_type, price in (("101", "Deluxe", 100.0), ("102", "Deluxe", 100.0), ("103", "Deluxe", 100.0),
+                                     ("201", "Single", 80.0)):
+        rooms[number] = client.post("/api/v1/rooms", headers=ADMIN, json={
+            "hotel_id": hotel["id"], "room_number": number, "room_type": room_type, "price": price
+        }).json()
+    return rooms
+
+
+# One set-based statement per bulk update, however many rooms and nights it covers
+@pytest.mark.query_budget(2)
+def test_bulk_updates_are_one_statement_each(client, hotel, hotel_rooms):
+    rates = client.patch("/api/v1/rates/bulk", headers=ADMIN, json={
+        "hotel_id": hotel["id"], "room_type": "Deluxe", "start_date": "2033-09-01", "end_date": "2033-10-01", "price": 180.0
+    })
+    assert rates.json() == {"updated": 30}
+    closed = client.patch("/api/v1/rooms/bulk", headers=ADMIN, json={
+        "hotel_id": hotel["id"], "room_number_from": 101, "room_number_to": 102, "is_available": False
+    })
+    assert closed.json() == {"updated": 2}
+
+
+def test_bulk_updates_reprice_and_close_rooms(client, hotel, hotel_rooms):
+    stay = {"check_in_date": "2033-09-29", "check_out_date": "2033-10-02"}
+    # Warm the price cache; the bulk update must drop it
+    client.get(f"/api/v1/client/hotels/{hotel['id']}/quotes", params=stay)
+    assert client.patch("/api/v1/rates/bulk", headers=ADMIN, json={
+        "hotel_id": hotel["id"], "room_type": "Deluxe", "start_date": "2033-09-01", "end_date": "2033-10-01", "price": 180.0
+    }).status_code == 200
+    assert client.patch("/api/v1/rooms/bulk", headers=ADMIN, json={
+        "room_numbers": ["101", "102"], "hotel_id": hotel["id"], "is_available": False
+    }).json() == {"updated": 2}
+
+    quotes = {quote["room_number"]: quote["total_price"]
+              for quote in client.get(f"/api/v1/client/hotels/{hotel['id']}/quotes", params=stay).json()}
+    # Two nights at the new rate, then one at the room's own price; closed rooms are not offered
+    assert quotes == {"103": 460.0, "201": 240.0}
+    rates = client.get(f"/api/v1/hotels/{hotel['id']}/rates", headers=ADMIN, params={
+        "room_type": "Deluxe", "start_date": "2033-09-01", "end_date": "2033-10-01"
+    }).json()
+    assert len(rates) == 30 and {rate["price"] for rate in rates} == {180.0}
+
+    booking = client.post("/api/v1/client/reservations/", headers=CLIENT, json={
+        "room_id": hotel_rooms["101"]["id"], "client_email": "client-1@example.com", "client_name": "Client One",
+        "check_in_date": "2033-09-29T14:00:00", "check_out_date": "2033-10-02T11:00:00"
+    })
+    assert booking.status_code == 400 and "closed" in booking.json()["detail"]
+
+    # Without any room filter nothing is updated
+    assert client.patch("/api/v1/rooms/bulk", headers=ADMIN, json={"is_available": True}).status_code == 400
+    # Room numbers repeat across hotels, so they never select rooms chain-wide
+    for selector in ({"room_numbers": ["101"]}, {"room_number_from": 101, "room_number_to": 120},
+                     {"room_type": "Deluxe", "room_numbers": ["101"]}):
+        response = client.patch("/api/v1/rooms/bulk", headers=ADMIN, json={**selector, "is_available": True})
+        assert response.status_code == 400 and "hotel_id" in response.json()["detail"]
+    assert client.get(f"/api/v1/rooms/{hotel_rooms['101']['id']}").json()["is_available"] is False
@@ -0,0 +1,174 @@
+"""
+Query budgets for the hotel-service routers
+
+Budgets are the statement counts of the current implementation (COMMIT is
+not a statement). A change that adds a query to an endpoint, or turns a
+lookup into a per-row loop, fails here.
+"""
+import pytest
+
+from infrastructure.sharding import reservation_shards
+
+from conftest import ADMIN, EMPLOYEE, CLIENT
+
+
+# Catalog reads: one SELECT each, however many rows come back
+
+@pytest.mark.query_budget(1)
+def test_list_hotels(client, seeded):
+    assert client.get("/api/v1/hotels").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_get_hotel(client, seeded):
+    assert client.get(f"/api/v1/hotels/{seeded['hotel']['id']}").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_list_rooms(client, seeded):
+    response = client.get("/api/v1/rooms?limit=100")
+    assert response.status_code == 200
+    assert len(response.json()) == len(seeded["rooms"])
+
+
+@pytest.mark.query_budget(1)
+def test_list_hotel_rooms(client, seeded):
+    assert client.get(f"/api/v1/hotels/{seeded['hotel']['id']}/rooms").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_get_room(client, seeded):
+    assert client.get(f"/api/v1/rooms/{seeded['rooms'][0]['id']}").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_list_room_images(client, seeded):
+    assert client.get(f"/api/v1/rooms/{seeded['rooms'][0]['id']}/images").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_list_room_reviews(client, seeded):
+    assert client.get(f"/api/v1/rooms/{seeded['rooms'][0]['id']}/reviews").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_list_user_reviews(client, seeded):
+    response = client.get("/api/v1/users/client-1/reviews", headers=CLIENT)
+    assert response.status_code == 200
+    assert len(response.json()) == len(seeded["rooms"])
+
+
+@pytest.mark.query_budget(1)
+def test_client_browse_hotels(client, seeded):
+    assert client.get("/api/v1/client/hotels").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_client_browse_hotel_rooms(client, seeded):
+    assert client.get(f"/api/v1/client/hotels/{seeded['hotel']['id']}/rooms").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_client_search_hotels(client, seeded):
+    assert client.get("/api/v1/client/search/hotels?q=Budget&amenities=pool").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_client_search_rooms(client, seeded):
+    assert client.get("/api/v1/client/search/rooms?facilities=balcony&max_price=200").status_code == 200
+
+
+# Reservations
+
+@pytest.mark.query_budget(1)
+def test_my_reservations(client, seeded):
+    assert client.get("/api/v1/client/reservations/my", headers=CLIENT).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_employee_list_reservations(client, seeded):
+    assert client.get("/api/v1/employee/reservations/", headers=EMPLOYEE).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_employee_room_reservations(client, seeded):
+    room_id = seeded["rooms"][0]["id"]
+    assert client.get(f"/api/v1/employee/reservations/room/{room_id}", headers=EMPLOYEE).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_employee_client_reservations(client, seeded):
+    assert client.get("/api/v1/employee/reservations/client/client-1", headers=EMPLOYEE).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_check_availability(client, seeded):
+    response = client.post("/api/v1/client/reservations/check-availability", headers=CLIENT, json={
+        "room_id": seeded["rooms"][0]["id"],
+        "check_in_date": "2033-02-01T14:00:00", "check_out_date": "2033-02-03T11:00:00"
+    })
+    assert response.status_code == 200
+
+
+# Room, availability and INSERT, plus the pricing rules and rate calendar on a price cache miss
+@pytest.mark.query_budget(5)
+def test_create_reservation(client, seeded):
+    response = client.post("/api/v1/client/reservations/", headers=CLIENT, json={
+        "room_id": seeded["rooms"][1]["id"], "client_email": "client-1@example.com", "client_name": "Client One",
+        "check_in_date": "2032-02-01T14:00:00", "check_out_date": "2032-02-03T11:00:00"
+    })
+    assert response.status_code == 201
+
+
+@pytest.mark.query_budget(1)
+def test_update_reservation_status(client, seeded):
+    reservation_id = seeded["reservations"][2]["id"]
+    response = client.patch(
+        f"/api/v1/employee/reservations/{reservation_id}/status", headers=EMPLOYEE, json={"status": "confirmed"}
+    )
+    assert response.status_code == 200
+
+
+# Writes
+
+# With sharding, the room's current hotel is read first: a room with reservations cannot change hotels
+@pytest.mark.query_budget(1 + reservation_shards.enabled)
+def test_update_room(client, seeded):
+    room = seeded["rooms"][3]
+    response = client.put(f"/api/v1/rooms/{room['id']}", headers=ADMIN, json={
+        "hotel_id": room["hotel_id"], "room_number": room["room_number"], "room_type": "Suite",
+        "price": 250.0, "position": "Sea View", "facilities": {"balcony": True}, "is_available": True
+    })
+    assert response.status_code == 200
+
+
+@pytest.fixture
+def doomed_hotel(client):
+    """A hotel with a room that has an image, a review and a reservation"""
+    hotel = client.post("/api/v1/hotels", headers=ADMIN, json={
+        "name": "Doomed Hotel", "location": "Iasi", "address": "9 Main Street"
+    }).json()
+    room = client.post("/api/v1/rooms", headers=ADMIN, json={
+        "hotel_id": hotel["id"], "room_number": "1", "room_type": "Single", "price": 60.0
+    }).json()
+    children = [
+        client.post(f"/api/v1/rooms/{room['id']}/images", headers=ADMIN, json={"image_url": "https://example.com/1.jpg"}),
+        client.post(f"/api/v1/rooms/{room['id']}/reviews", headers=CLIENT, json={
+            "user_id": "client-1", "rating": 4, "comment": "Fine"
+        }),
+        client.post("/api/v1/client/reservations/", headers=CLIENT, json={
+            "room_id": room["id"], "client_email": "client-1@example.com", "client_name": "Client One",
+            "check_in_date": "2034-01-01T14:00:00", "check_out_date": "2034-01-03T11:00:00"
+        })
+    ]
+    assert [response.status_code for response in children] == [201, 201, 201]
+    return hotel, room
+
+
+# Children are removed by ON DELETE CASCADE inside the one DELETE; the GET checks the room went too.
+# Sharded reservations live in other databases and take one DELETE per shard.
+@pytest.mark.query_budget(2 + len(reservation_shards.names))
+def test_delete_hotel_cascades(client, doomed_hotel):
+    hotel, room = doomed_hotel
+    assert client.delete(f"/api/v1/hotels/{hotel['id']}", headers=ADMIN).status_code in (200, 204)
+    assert client.get(f"/api/v1/rooms/{room['id']}").status_code == 404
@@ -0,0 +1,128 @@
+"""
+Scheduled reservation lifecycle jobs and the scheduler's job lock
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import interfaces.jobs as jobs
+from infrastructure.database import ReservationModel, engine
+from infrastructure.scheduler import Scheduler
+from infrastructure.sharding import reservation_shards, shard_reservations
+
+from conftest import ADMIN, CLIENT, EMPLOYEE
+
+
+def set_reservation_columns(reservation_id: str, **values):
+    """Rewrite a reservation's timestamps or dates, which the API never moves into the past"""
+    async def run():
+        if reservation_shards.enabled:
+            targets = [(shard_engine, shard_reservations) for shard_engine in reservation_shards.engines.values()]
+        else:
+            targets = [(engine, ReservationModel.__table__)]
+        for db_engine, table in targets:
+            async with db_engine.begin() as conn:
+                await conn.execute(update(table).where(table.c.id == reservation_id).values(**values))
+    asyncio.run(run())
+
+
+@pytest.fixture
+def stays(client):
+    """A hotel with two stale pending, one fresh pending and one past confirmed reservation"""
+    hotel = client.post("/api/v1/hotels", headers=ADMIN, json={
+        "name": "Sweep Hotel", "location": "Iasi", "address": "5 Main Street"
+    }).json()
+    rooms = [
+        client.post("/api/v1/rooms", headers=ADMIN, json={
+            "hotel_id": hotel["id"], "room_number": str(number), "room_type": "Double", "price": 90.0
+        }).json()
+        for number in (1, 2)
+    ]
+
+    def book(room, check_in, check_out):
+        return client.post("/api/v1/client/reservations/", headers=CLIENT, json={
+            "room_id": room["id"], "client_email": "sweep@example.com", "client_name": "Sweep Client",
+            "check_in_date": f"{check_in}T14:00:00", "check_out_date": f"{check_out}T11:00:00"
+        }).json()
+
+    stale = [book(rooms[0], "2034-03-01", "2034-03-03"), book(rooms[1], "2034-03-01", "2034-03-03")]
+    for reservation in stale:
+        set_reservation_columns(reservation["id"], created_at=datetime.utcnow() - timedelta(hours=48))
+    fresh = book(rooms[0], "2034-04-01", "2034-04-03")
+    past = book(rooms[1], "2034-05-01", "2034-05-03")
+    assert client.post(f"/api/v1/employee/reservations/{past['id']}/confirm", headers=EMPLOYEE).status_code == 200
+    set_reservation_columns(past["id"], check_in_date=date(2020, 1, 1), check_out_date=date(2020, 1, 3))
+    yield {"rooms": rooms, "stale": stale, "fresh": fresh, "past": past}
+    client.delete(f"/api/v1/hotels/{hotel['id']}", headers=ADMIN)
+
+
+def test_jobs_expire_stale_pending_and_complete_past_stays(client, stays, monkeypatch):
+    # Several chunks for the two stale reservations
+    monkeypatch.setattr(jobs, "RESERVATION_SWEEP_CHUNK_SIZE", 1)
+
+    def run(job, dry_run):
+        response = client.post(f"/api/v1/admin/jobs/{job}/run", headers=ADMIN, params={"dry_run": dry_run})
+        assert response.status_code == 200
+        return response.json()
+
+    assert run("expire_pending_reservations", True)["rows"] == 2
+    assert run("complete_past_stays", True)["rows"] == 1
+
+    def status(reservation):
+        return client.get(f"/api/v1/employee/reservations/{reservation['id']}", headers=EMPLOYEE).json()["status"]
+
+    # A dry run changes nothing
+    assert [status(reservation) for reservation in stays["stale"]] == ["pending", "pending"]
+
+    assert run("expire_pending_reservations", False)["rows"] == 2
+    # Nothing left for the next round
+    again = run("expire_pending_reservations", False)
+    assert again["outcome"] == "ok" and again["rows"] == 0
+    assert run("complete_past_stays", False)["rows"] == 1
+
+    assert [status(reservation) for reservation in stays["stale"]] == ["cancelled", "cancelled"]
+    assert status(stays["fresh"]) == "pending"
+    assert status(stays["past"]) == "completed"
+
+    # The expired reservation no longer blocks its room
+    rebooked = client.post("/api/v1/client/reservations/", headers=CLIENT, json={
+        "room_id": stays["rooms"][0]["id"], "client_email": "sweep@example.com", "client_name": "Sweep Client",
+        "check_in_date": "2034-03-01T14:00:00", "check_out_date": "2034-03-03T11:00:00"
+    })
+    assert rebooked.status_code == 201
+
+    job_stats = {job["name"]: job for job in client.get("/api/v1/admin/jobs", headers=ADMIN).json()["jobs"]}
+    assert job_stats["complete_past_stays"]["last_outcome"] == "ok"
+    assert client.post("/api/v1/admin/jobs/unknown/run", headers=ADMIN).status_code == 404
+
+
+@pytest.mark.parametrize("lock", ["process", "database"])
+def test_one_worker_runs_a_job_at_a_time(client, lock):
+    async def scenario():
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_job(dry_run):
+            started.set()
+            await release.wait()
+            return 3
+
+        async def other_job(dry_run):
+            return 0
+
+        # Two workers with the same job
+        first, second = Scheduler(enabled=False, lock=lock), Scheduler(enabled=False, lock=lock)
+        first.add_job("lock-test", 60, slow_job)
+        second.add_job("lock-test", 60, other_job)
+        running = asyncio.create_task(first.run_job("lock-test"))
+        await started.wait()
+        skipped = await second.run_job("lock-test")
+        release.set()
+        return skipped, await running, await second.run_job("lock-test")
+
+    skipped, finished, after = asyncio.run(scenario())
+    assert skipped["outcome"] == "skipped" and skipped["rows"] is None
+    assert finished["outcome"] == "ok" and finished["rows"] == 3
+    # The lock is released once the run ends
+    assert after["outcome"] == "ok"
@@ -0,0 +1,201 @@
+"""
+Reservations sharded by hotel: routing, scatter-gather and moving hotels
+"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from application.reservation_service import ReservationService
+from domain.entities import ReservationStatus
+from infrastructure import repositories
+from infrastructure.database import AsyncSessionLocal
+from infrastructure.repositories import ShardedReservationRepository, SQLiteReservationRepository, SQLiteRoomRepository
+from infrastructure.sharding import (
+    ReservationShards, ShardSessions, finish_move, hotel_counts, move_hotel, plan_rebalance, start_move
+)
+from infrastructure.unit_of_work import SQLAlchemyUnitOfWork
+from infrastructure.write_coordinator import WriteCoordinator
+
+from conftest import ADMIN
+
+
+def test_plan_rebalance_evens_out_shards():
+    counts = {"shard0": {"a": 50, "b": 30, "c": 20}, "shard1": {"d": 10}, "shard2": {}}
+    moves = plan_rebalance(counts)
+    loads = {shard: sum(by_hotel.values()) for shard, by_hotel in counts.items()}
+    for hotel_id, source, target in moves:
+        size = counts[source][hotel_id]
+        loads[source] -= size
+        loads[target] += size
+    assert max(loads.values()) - min(loads.values()) < 110 - 10
+    assert plan_rebalance({"shard0": {"a": 5}, "shard1": {"b": 5}}) == []
+
+
+@pytest.fixture
+def hotels(client):
+    """Two hotels with one room each"""
+    rooms = []
+    for name in ("North", "South"):
+        hotel = client.post("/api/v1/hotels", headers=ADMIN, json={
+            "name": f"{name} Shard Hotel", "location": "Cluj", "address": "3 Main Street"
+        }).json()
+        rooms.append(client.post("/api/v1/rooms", headers=ADMIN, json={
+            "hotel_id": hotel["id"], "room_number": "1", "room_type": "Single", "price": 80.0
+        }).json())
+    yield rooms
+    for room in rooms:
+        client.delete(f"/api/v1/hotels/{room['hotel_id']}", headers=ADMIN)
+
+
+def make_shards(tmp_path, **kwargs) -> ReservationShards:
+    """Two shards in tmp_path; separate instances stand for separate workers"""
+    shards = ReservationShards(count=2, url_template=f"sqlite+aiosqlite:///{tmp_path}/reservations.{{shard}}.db", **kwargs)
+    for shard_engine in shards.engines.values():
+        shard_engine.echo = False
+    return shards
+
+
+async def book(shards, room, day, coordinator=None):
+    async with AsyncSessionLocal() as session:
+        shard_sessions = ShardSessions(shards)
+        if shards.enabled:
+            reservation_repo = ShardedReservationRepository(session, shard_sessions)
+        else:
+            reservation_repo = SQLiteReservationRepository(session)
+        service = ReservationService(
+            reservation_repo, SQLiteRoomRepository(session),
+            SQLAlchemyUnitOfWork(session, coordinator=coordinator or WriteCoordinator(enabled=False))
+        )
+        try:
+            return await service.create_reservation(
+                room["id"], "shard-client", "shard-client@example.com", "Shard Client",
+                datetime(2032, 3, day, 14), datetime(2032, 3, day + 2, 11)
+            )
+        finally:
+            await shard_sessions.close()
+
+
+def test_reservations_follow_their_hotel(hotels, tmp_path):
+    shards = make_shards(tmp_path)
+
+    async def scenario():
+        await shards.create_tables()
+        north, south = hotels
+        first = await book(shards, north, 1)
+        await book(shards, south, 1)
+        with pytest.raises(ValueError, match="not available"):
+            await book(shards, north, 2)
+
+        async with AsyncSessionLocal() as session:
+            shard_sessions = ShardSessions(shards)
+            repo = ShardedReservationRepository(session, shard_sessions)
+            assert (await repo.get_reservation_by_id(first.id)).room_id == north["id"]
+            assert len(await repo.get_reservations_by_client_id("shard-client")) == 2
+            page = await repo.get_reservations(skip=1, limit=5)
+            confirmed = await repo.update_reservation_status(
+                first.id, ReservationStatus.CONFIRMED, {ReservationStatus.PENDING}, employee_id="employee-1"
+            )
+            await shard_sessions.close()
+        assert len(page) == 1
+        assert confirmed.status == ReservationStatus.CONFIRMED
+
+        source = await shards.shard_for_hotel(north["hotel_id"])
+        target = next(name for name in shards.names if name != source)
+        assert await move_hotel(shards, north["hotel_id"], target, grace=0) == 1
+        counts = await hotel_counts(shards)
+        assert north["hotel_id"] in counts[target] and north["hotel_id"] not in counts[source]
+
+        # Still booked after the move
+        with pytest.raises(ValueError, match="not available"):
+            await book(shards, north, 2)
+        await shards.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_bookings_through_a_stale_route_follow_a_moving_hotel(hotels, tmp_path):
+    mover = make_shards(tmp_path)
+    # Another worker, whose cached routes outlive the move
+    stale = make_shards(tmp_path, route_ttl=3600)
+    room = hotels[0]
+    hotel_id = room["hotel_id"]
+
+    async def set_status(shards, reservation_id, status):
+        async with AsyncSessionLocal() as session:
+            shard_sessions = ShardSessions(shards)
+            try:
+                return await ShardedReservationRepository(session, shard_sessions).update_reservation_status(
+                    reservation_id, status, {ReservationStatus.PENDING}
+                )
+            finally:
+                await shard_sessions.close()
+
+    async def scenario():
+        await mover.create_tables()
+        before = await book(mover, room, 20)
+        source = await stale.shard_for_hotel(hotel_id)
+        target = next(name for name in mover.names if name != source)
+        assert await start_move(mover, hotel_id, target) == source
+
+        # The stale worker books on the old shard, which forwards to the new one
+        await book(stale, room, 1)
+        with pytest.raises(ValueError, match="not available"):
+            await book(mover, room, 1)
+        await book(mover, room, 5)
+        with pytest.raises(ValueError, match="not available"):
+            await book(stale, room, 5)
+        # A change to a reservation copied before the move lands on the new copy
+        assert (await set_status(stale, before.id, ReservationStatus.CONFIRMED)).status == ReservationStatus.CONFIRMED
+        assert (await hotel_counts(mover))[source] == {hotel_id: 1}
+
+        assert await finish_move(mover, hotel_id, source, target) == 3
+        async with AsyncSessionLocal() as session:
+            shard_sessions = ShardSessions(mover)
+            assert (await ShardedReservationRepository(session, shard_sessions).get_reservation_by_id(before.id)).status \
+                == ReservationStatus.CONFIRMED
+            await shard_sessions.close()
+        await mover.dispose()
+        await stale.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_rooms_with_reservations_keep_their_hotel(client, hotels, tmp_path, monkeypatch):
+    shards = make_shards(tmp_path)
+    monkeypatch.setattr(repositories, "reservation_shards", shards)
+    north, south = hotels
+    asyncio.run(shards.create_tables())
+    asyncio.run(book(shards, north, 1))
+
+    def put(room, hotel_id, room_number="1"):
+        return client.put(f"/api/v1/rooms/{room['id']}", headers=ADMIN, json={
+            "hotel_id": hotel_id, "room_number": room_number, "room_type": "Single", "price": 90.0, "is_available": True
+        })
+
+    # Its reservations would stay on the other hotel's shard
+    moved = put(north, south["hotel_id"], "3")
+    assert moved.status_code == 400 and "cannot be moved" in moved.json()["detail"]
+    assert put(north, north["hotel_id"]).json()["price"] == 90.0
+    # Without reservations the room may change hotels
+    assert put(south, north["hotel_id"], "2").json()["hotel_id"] == north["hotel_id"]
+    asyncio.run(shards.dispose())
+
+
+def test_bookings_on_shards_leave_the_main_writer_alone(hotels, tmp_path):
+    async def scenario():
+        coordinator = WriteCoordinator(enabled=True)
+        await coordinator.start()
+        try:
+            shards = make_shards(tmp_path)
+            await shards.create_tables()
+            await book(shards, hotels[0], 24, coordinator)
+            await shards.dispose()
+            sharded = coordinator.stats()["transactions"]
+            # Unsharded, the availability check and the booking run on the writer
+            await book(ReservationShards(count=0), hotels[1], 24, coordinator)
+            return sharded, coordinator.stats()["transactions"]
+        finally:
+            await coordinator.stop()
+
+    assert asyncio.run(scenario()) == (0, 1)
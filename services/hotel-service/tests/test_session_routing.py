@@ -0,0 +1,57 @@
+"""
+Read/write routing of request sessions between the primary and read_engine
+"""
+import asyncio
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+
+from infrastructure.database import AsyncSessionLocal, HotelModel, engine, read_engine
+
+
+@contextmanager
+def statements_by_engine():
+    """Statements run on each engine while the block is active"""
+    seen = {"primary": [], "replica": []}
+    listeners = [
+        (engine.sync_engine, lambda *args: seen["primary"].append(args[2])),
+        (read_engine.sync_engine, lambda *args: seen["replica"].append(args[2])),
+    ]
+    for target, listener in listeners:
+        event.listen(target, "before_cursor_execute", listener)
+    try:
+        yield seen
+    finally:
+        for target, listener in listeners:
+            event.remove(target, "before_cursor_execute", listener)
+
+
+def test_reads_use_replica_until_the_session_writes(client):
+    async def scenario():
+        hotel_id = str(uuid.uuid4())
+        async with AsyncSessionLocal() as session:
+            with statements_by_engine() as before_write:
+                await session.execute(select(HotelModel).limit(1))
+            session.add(HotelModel(id=hotel_id, name="Routed", location="Cluj", address="2 Main Street"))
+            await session.commit()
+            with statements_by_engine() as after_write:
+                hotel = await session.get(HotelModel, hotel_id, populate_existing=True)
+        return before_write, after_write, hotel
+
+    before_write, after_write, hotel = asyncio.run(scenario())
+    assert before_write["replica"] and not before_write["primary"]
+    # Read-your-writes: once pinned, reads stay on the primary
+    assert after_write["primary"] and not after_write["replica"]
+    assert hotel.name == "Routed"
+
+
+def test_locking_reads_use_primary(client):
+    async def scenario():
+        async with AsyncSessionLocal() as session:
+            with statements_by_engine() as seen:
+                await session.execute(select(HotelModel).limit(1).with_for_update())
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert seen["primary"] and not seen["replica"]
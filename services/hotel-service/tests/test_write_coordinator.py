@@ -0,0 +1,43 @@
+"""
+Single-writer group commit: recovering from a broken writer connection
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from infrastructure.write_coordinator import WriteCoordinator
+
+
+def test_writer_replaces_a_broken_connection(tmp_path):
+    async def scenario():
+        db_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/writer.db")
+        coordinator = WriteCoordinator(db_engine, enabled=True)
+        await coordinator.start()
+        try:
+            async with coordinator.transaction() as conn:
+                await conn.exec_driver_sql("CREATE TABLE notes (body TEXT)")
+
+            # The database closes the writer's connection under it
+            broken = coordinator._conn
+            raw = await broken.get_raw_connection()
+            await raw.driver_connection.close()
+            with pytest.raises(Exception):
+                async with coordinator.transaction() as conn:
+                    await conn.exec_driver_sql("INSERT INTO notes VALUES ('lost')")
+
+            # The writer survived and the next transactions run on a new connection
+            for body in ("first", "second"):
+                async with asyncio.timeout(5):
+                    async with coordinator.transaction() as conn:
+                        await conn.exec_driver_sql(f"INSERT INTO notes VALUES ('{body}')")
+            assert coordinator._conn is not broken
+            assert coordinator.stats()["failed_groups"] == 1
+        finally:
+            await coordinator.stop()
+            await db_engine.dispose()
+
+        async with db_engine.connect() as conn:
+            return [row[0] for row in await conn.exec_driver_sql("SELECT body FROM notes")]
+
+    assert asyncio.run(scenario()) == ["first", "second"]
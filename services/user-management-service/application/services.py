@@ -18,11 +18,14 @@ class UserService:
         self,
         user_repository: UserRepository,
         profile_repository: UserProfileRepository,
-        activity_repository: UserActivityRepository
+        activity_repository: UserActivityRepository,
+        activity_queue=None
     ):
         self.user_repository = user_repository
         self.profile_repository = profile_repository
         self.activity_repository = activity_repository
+        # Optional ActivityLogQueue; without one, activities are written inline
+        self.activity_queue = activity_queue
     
     async def create_user(self, request: CreateUserRequest) -> UserResponse:
         """Create a new user"""
@@ -92,33 +95,20 @@ class UserService:
     
     async def update_user(self, user_id: str, request: UpdateUserRequest) -> UserResponse:
         """Update user"""
-        user = await self.user_repository.get_user_by_id(user_id)
-        if not user:
+        # Only the fields that were provided; existence is checked by the UPDATE itself
+        changes = request.model_dump(exclude_none=True)
+        for field in ("role", "status"):
+            if field in changes:
+                changes[field] = changes[field].value
+        changes["updated_at"] = datetime.utcnow()
+        
+        updated_user = await self.user_repository.update_user_fields(user_id, changes)
+        if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Update fields
-        if request.first_name is not None:
-            user.first_name = request.first_name
-        if request.last_name is not None:
-            user.last_name = request.last_name
-        if request.phone_number is not None:
-            user.phone_number = request.phone_number
-        if request.date_of_birth is not None:
-            user.date_of_birth = request.date_of_birth
-        if request.role is not None:
-            user.role = request.role
-        if request.status is not None:
-            user.status = request.status
-        if request.preferences is not None:
-            user.preferences = request.preferences
-        
-        user.updated_at = datetime.utcnow()
-        
-        updated_user = await self.user_repository.update_user(user)
-        
         # Log activity
         await self._log_activity(
             updated_user.id,
@@ -130,21 +120,21 @@ class UserService:
     
     async def delete_user(self, user_id: str) -> bool:
         """Delete user"""
-        user = await self.user_repository.get_user_by_id(user_id)
-        if not user:
+        deleted_user = await self.user_repository.delete_user(user_id)
+        if not deleted_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Log activity before deletion
+        # Log activity
         await self._log_activity(
-            user.id,
+            deleted_user.id,
             "user_deleted",
-            f"User {user.username} was deleted"
+            f"User {deleted_user.username} was deleted"
         )
         
-        return await self.user_repository.delete_user(user_id)
+        return True
     
     async def get_users_by_role(self, role: UserRole) -> List[UserResponse]:
         """Get users by role"""
@@ -156,6 +146,20 @@ class UserService:
         users = await self.user_repository.get_users_by_status(status)
         return [self._user_to_response(user) for user in users]
     
+    async def search_users(
+        self,
+        role: Optional[UserRole] = None,
+        status: Optional[UserStatus] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[UserResponse]:
+        """Get a filtered page of users, optionally matching a name/email prefix"""
+        users = await self.user_repository.search_users(
+            role=role, status=status, search=search, skip=skip, limit=limit
+        )
+        return [self._user_to_response(user) for user in users]
+    
     def _user_to_response(self, user: User) -> UserResponse:
         """Convert User entity to UserResponse DTO"""
         return UserResponse(
@@ -184,7 +188,10 @@ class UserService:
                 metadata=metadata,
                 timestamp=datetime.utcnow()
             )
-            await self.activity_repository.create_activity(activity)
+            if self.activity_queue is not None and self.activity_queue.running:
+                await self.activity_queue.enqueue(activity)
+            else:
+                await self.activity_repository.create_activity(activity)
         except Exception:
             # Don't fail the main operation if logging fails
             pass
@@ -196,10 +203,13 @@ class UserProfileService:
     def __init__(
         self,
         profile_repository: UserProfileRepository,
-        activity_repository: UserActivityRepository
+        activity_repository: UserActivityRepository,
+        activity_queue=None
     ):
         self.profile_repository = profile_repository
         self.activity_repository = activity_repository
+        # Optional ActivityLogQueue; without one, activities are written inline
+        self.activity_queue = activity_queue
     
     async def create_profile(self, user_id: str, request: CreateProfileRequest) -> UserProfileResponse:
         """Create user profile"""
@@ -247,31 +257,17 @@ class UserProfileService:
     
     async def update_profile(self, user_id: str, request: UpdateProfileRequest) -> UserProfileResponse:
         """Update user profile"""
-        profile = await self.profile_repository.get_profile_by_user_id(user_id)
-        if not profile:
+        # Only the fields that were provided; existence is checked by the UPDATE itself
+        changes = request.model_dump(exclude_none=True)
+        changes["updated_at"] = datetime.utcnow()
+        
+        updated_profile = await self.profile_repository.update_profile_fields(user_id, changes)
+        if not updated_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found"
             )
         
-        # Update fields
-        if request.avatar_url is not None:
-            profile.avatar_url = request.avatar_url
-        if request.bio is not None:
-            profile.bio = request.bio
-        if request.nationality is not None:
-            profile.nationality = request.nationality
-        if request.address is not None:
-            profile.address = request.address
-        if request.preferred_language is not None:
-            profile.preferred_language = request.preferred_language
-        if request.notification_preferences is not None:
-            profile.notification_preferences = request.notification_preferences
-        
-        profile.updated_at = datetime.utcnow()
-        
-        updated_profile = await self.profile_repository.update_profile(profile)
-        
         # Log activity
         await self._log_activity(
             user_id,
@@ -283,21 +279,20 @@ class UserProfileService:
     
     async def delete_profile(self, user_id: str) -> bool:
         """Delete user profile"""
-        profile = await self.profile_repository.get_profile_by_user_id(user_id)
-        if not profile:
+        if not await self.profile_repository.delete_profile(user_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profile not found"
             )
         
-        # Log activity before deletion
+        # Log activity
         await self._log_activity(
             user_id,
             "profile_deleted",
             "User profile was deleted"
         )
         
-        return await self.profile_repository.delete_profile(user_id)
+        return True
     
     def _profile_to_response(self, profile: UserProfile) -> UserProfileResponse:
         """Convert UserProfile entity to UserProfileResponse DTO"""
@@ -325,7 +320,10 @@ class UserProfileService:
                 metadata=metadata,
                 timestamp=datetime.utcnow()
             )
-            await self.activity_repository.create_activity(activity)
+            if self.activity_queue is not None and self.activity_queue.running:
+                await self.activity_queue.enqueue(activity)
+            else:
+                await self.activity_repository.create_activity(activity)
         except Exception:
             # Don't fail the main operation if logging fails
             pass
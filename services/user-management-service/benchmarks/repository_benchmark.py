@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Repository and service read-path timings at a configurable data scale
+
+Seeds a SQLite database with the production schema, indexes and monthly
+activity partitions, then times each repository/service method with
+randomized arguments drawn from the seeded data, one session per call as in
+a request. Results are printed and written as JSON so indexing and caching
+changes can be compared against a baseline run at the same scale and seed.
+
+Scale 1.0 is production size: 1,000,000 users, 500,000 profiles and
+20,000,000 activities (20 per user spread over the last 12 monthly
+partitions).
+
+Usage:
+    python benchmarks/repository_benchmark.py --scale 0.01 --output baseline.json
+    python benchmarks/repository_benchmark.py --scale 0.1 --db /data/users-0.1.db --only get_users
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import sqlalchemy
+from sqlalchemy import func, insert, literal_column, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from application.services import UserService
+from domain.entities import UserRole, UserStatus
+from infrastructure.activity_partitions import ensure_partition, list_partitions, partition_name_for
+from infrastructure.database import Base, UserModel, UserProfileModel
+from infrastructure.repositories import (
+    SQLiteUserRepository, SQLiteUserProfileRepository, SQLiteUserActivityRepository
+)
+
+FULL_SCALE_USERS = 1_000_000
+PROFILE_RATIO = 0.5
+ACTIVITIES_PER_USER = 20
+ACTIVITY_MONTHS = 12
+CHUNK_SIZE = 20_000
+SAMPLE_SIZE = 1_000
+
+FIRST_NAMES = ["Ana", "Andrei", "Maria", "Ion", "Elena", "Mihai", "Ioana", "Alexandru", "Cristina", "Stefan"]
+LAST_NAMES = ["Popescu", "Ionescu", "Popa", "Dumitru", "Stan", "Stoica", "Gheorghe", "Rusu", "Munteanu", "Matei"]
+ROLE_WEIGHTS = [(UserRole.GUEST, 60), (UserRole.CUSTOMER, 35), (UserRole.STAFF, 4), (UserRole.MANAGER, 0.9), (UserRole.ADMIN, 0.1)]
+STATUS_WEIGHTS = [(UserStatus.ACTIVE, 80), (UserStatus.INACTIVE, 10), (UserStatus.PENDING, 8), (UserStatus.SUSPENDED, 2)]
+ACTIVITY_TYPES = ["login", "profile_update", "reservation_created", "reservation_cancelled", "review_posted"]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+async def _insert_chunks(engine, table, rows):
+    """Core executemany in chunks, one transaction per chunk"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            async with engine.begin() as conn:
+                await conn.execute(insert(table), chunk)
+            chunk = []
+    if chunk:
+        async with engine.begin() as conn:
+            await conn.execute(insert(table), chunk)
+
+
+async def seed(engine, scale: float, seed_value: int):
+    rng = random.Random(seed_value)
+    users = max(1, round(FULL_SCALE_USERS * scale))
+    now = datetime.utcnow()
+    roles, role_weights = zip(*ROLE_WEIGHTS)
+    statuses, status_weights = zip(*STATUS_WEIGHTS)
+    user_ids = [_uuid(rng) for _ in range(users)]
+
+    def user_rows():
+        for i, user_id in enumerate(user_ids):
+            created_at = now - timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+            yield {
+                "id": user_id, "email": f"user{i}@example.com", "username": f"user{i}",
+                "first_name": rng.choice(FIRST_NAMES), "last_name": rng.choice(LAST_NAMES),
+                "phone_number": f"+4070{i:07d}",
+                "role": rng.choices(roles, role_weights)[0].value,
+                "status": rng.choices(statuses, status_weights)[0].value,
+                "preferences": {"newsletter": rng.random() < 0.3},
+                "created_at": created_at, "updated_at": created_at
+            }
+
+    await _insert_chunks(engine, UserModel.__table__, user_rows())
+
+    await _insert_chunks(engine, UserProfileModel.__table__, (
+        {
+            "user_id": user_id, "bio": "Frequent traveller", "nationality": "RO",
+            "address": {"city": "Cluj-Napoca"}, "loyalty_points": rng.randint(0, 5000),
+            "preferred_language": "en", "notification_preferences": {"email": True},
+            "created_at": now, "updated_at": now
+        }
+        for user_id in user_ids
+        if rng.random() < PROFILE_RATIO
+    ))
+
+    # Activities go into their monthly partitions, filled one partition at a time
+    by_partition: Dict[str, List[dict]] = {}
+    for user_id in user_ids:
+        for _ in range(ACTIVITIES_PER_USER):
+            timestamp = now - timedelta(seconds=rng.randint(0, ACTIVITY_MONTHS * 30 * 86400))
+            by_partition.setdefault(partition_name_for(timestamp), []).append({
+                "id": _uuid(rng), "user_id": user_id, "activity_type": rng.choice(ACTIVITY_TYPES),
+                "description": "Benchmark activity", "activity_metadata": None, "timestamp": timestamp
+            })
+        if sum(len(rows) for rows in by_partition.values()) >= CHUNK_SIZE * 5:
+            await _flush_activities(engine, by_partition)
+    await _flush_activities(engine, by_partition)
+
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+
+
+async def _flush_activities(engine, by_partition: Dict[str, List[dict]]):
+    async with engine.begin() as conn:
+        for name, rows in by_partition.items():
+            table = await ensure_partition(conn, name)
+            await conn.execute(insert(table), rows)
+    by_partition.clear()
+
+
+async def _sample(conn, column, rng: random.Random) -> List[Any]:
+    """Random values of a column, picked by rowid so large tables are not scanned"""
+    table = column.table
+    rowid = literal_column("rowid")
+    max_rowid = (await conn.execute(select(func.max(rowid)).select_from(table))).scalar() or 0
+    if not max_rowid:
+        return []
+    rowids = [rng.randint(1, max_rowid) for _ in range(SAMPLE_SIZE)]
+    result = await conn.execute(select(column).select_from(table).where(rowid.in_(rowids)))
+    return [row[0] for row in result]
+
+
+async def table_counts(engine) -> Dict[str, int]:
+    async with engine.connect() as conn:
+        counts = {
+            model.__tablename__: (await conn.execute(select(func.count()).select_from(model))).scalar_one()
+            for model in (UserModel, UserProfileModel)
+        }
+        partitions = await list_partitions(conn)
+        counts["activity_partitions"] = len(partitions)
+        counts["activities"] = sum([
+            (await conn.execute(text(f"SELECT count(*) FROM {name}"))).scalar_one()
+            for name in partitions
+        ])
+        return counts
+
+
+def build_cases(samples: Dict[str, Any], rng: random.Random) -> Dict[str, Callable]:
+    """Benchmark name -> async fn(session) making one call with random arguments"""
+    users, emails = samples["user_ids"], samples["emails"]
+    profile_user_ids, user_count = samples["profile_user_ids"], samples["users"]
+
+    def deep_skip():
+        return rng.randrange(max(1, user_count - 100))
+
+    def user_service(session):
+        return UserService(
+            SQLiteUserRepository(session), SQLiteUserProfileRepository(session), SQLiteUserActivityRepository(session)
+        )
+
+    return {
+        "user_repo.get_user_by_id": lambda s: SQLiteUserRepository(s).get_user_by_id(rng.choice(users)),
+        "user_repo.get_user_by_email": lambda s: SQLiteUserRepository(s).get_user_by_email(rng.choice(emails)),
+        "user_repo.get_users(first page)": lambda s: SQLiteUserRepository(s).get_users(skip=0, limit=100),
+        "user_repo.get_users(deep page)": lambda s: SQLiteUserRepository(s).get_users(skip=deep_skip(), limit=100),
+        "user_service.get_users(deep page)": lambda s: user_service(s).get_users(skip=deep_skip(), limit=100),
+        "user_repo.search_users(role, status)": lambda s: SQLiteUserRepository(s).search_users(
+            role=rng.choice([UserRole.STAFF, UserRole.MANAGER]), status=UserStatus.ACTIVE, limit=50),
+        "user_repo.search_users(prefix)": lambda s: SQLiteUserRepository(s).search_users(
+            search=rng.choice(LAST_NAMES)[:3], limit=50),
+        "profile_repo.get_profile_by_user_id": lambda s: SQLiteUserProfileRepository(s).get_profile_by_user_id(
+            rng.choice(profile_user_ids)),
+        "activity_repo.get_activities_by_user_id": lambda s: SQLiteUserActivityRepository(s).get_activities_by_user_id(
+            rng.choice(users), limit=20),
+        "activity_repo.get_activities_by_user_id(skip)": lambda s: SQLiteUserActivityRepository(s).get_activities_by_user_id(
+            rng.choice(users), skip=10, limit=5),
+    }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values)))]
+
+
+def _size(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    return len(result.users) if hasattr(result, "users") else 1
+
+
+async def run_case(session_factory, fn, iterations: int, warmup: int) -> Dict[str, Any]:
+    timings, sizes = [], []
+    for i in range(warmup + iterations):
+        async with session_factory() as session:
+            start = time.perf_counter()
+            result = await fn(session)
+            elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            sizes.append(_size(result))
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    return {
+        "iterations": iterations,
+        "mean_ms": round(mean, 4),
+        "p50_ms": round(_percentile(timings, 50), 4),
+        "p95_ms": round(_percentile(timings, 95), 4),
+        "p99_ms": round(_percentile(timings, 99), 4),
+        "min_ms": round(timings[0], 4),
+        "max_ms": round(timings[-1], 4),
+        "ops_per_s": round(1000 / mean, 1),
+        "mean_rows": round(sum(sizes) / len(sizes), 1)
+    }
+
+
+async def main(args):
+    tmp = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, "bench.db")
+    reuse = os.path.exists(db_path)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        if reuse:
+            print(f"Reusing seeded database {db_path}")
+        else:
+            print(f"Seeding scale {args.scale}...")
+            start = time.perf_counter()
+            await seed(engine, args.scale, args.seed)
+            print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        counts = await table_counts(engine)
+        rng = random.Random(args.seed)
+        async with engine.connect() as conn:
+            samples = {
+                "users": counts["users"],
+                "user_ids": await _sample(conn, UserModel.id, rng),
+                "emails": await _sample(conn, UserModel.email, rng),
+                "profile_user_ids": await _sample(conn, UserProfileModel.user_id, rng),
+            }
+
+        session_factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        results = {}
+        for name, fn in build_cases(samples, rng).items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            results[name] = await run_case(session_factory, fn, args.iterations, args.warmup)
+            r = results[name]
+            print(f"  {name:<52} p50 {r['p50_ms']:>9.3f} ms  p95 {r['p95_ms']:>9.3f} ms  "
+                  f"{r['ops_per_s']:>9.1f} ops/s  {r['mean_rows']:>7.1f} rows")
+    finally:
+        await engine.dispose()
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = {
+        "service": "user-management-service",
+        "timestamp": datetime.utcnow().isoformat(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "reused_database": reuse,
+        "rows": counts,
+        "environment": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=0.01, help="1.0 = 1M users, 500k profiles, 20M activities")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="keep the seeded database here; an existing file is reused as-is")
+    parser.add_argument("--only", nargs="*", help="run benchmarks whose name contains any of these")
+    parser.add_argument("--output", help="write results as JSON")
+    asyncio.run(main(parser.parse_args()))
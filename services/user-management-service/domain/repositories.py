@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from domain.entities import User, UserProfile, UserActivity, UserRole, UserStatus
 
 
@@ -31,7 +31,11 @@ class UserRepository(ABC):
         pass
     
     @abstractmethod
-    async def delete_user(self, user_id: str) -> bool:
+    async def update_user_fields(self, user_id: str, changes: Dict[str, Any]) -> Optional[User]:
+        pass
+    
+    @abstractmethod
+    async def delete_user(self, user_id: str) -> Optional[User]:
         pass
     
     @abstractmethod
@@ -41,6 +45,17 @@ class UserRepository(ABC):
     @abstractmethod
     async def get_users_by_status(self, status: UserStatus) -> List[User]:
         pass
+    
+    @abstractmethod
+    async def search_users(
+        self,
+        role: Optional[UserRole] = None,
+        status: Optional[UserStatus] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[User]:
+        pass
 
 
 class UserProfileRepository(ABC):
@@ -58,6 +73,10 @@ class UserProfileRepository(ABC):
     async def update_profile(self, profile: UserProfile) -> UserProfile:
         pass
     
+    @abstractmethod
+    async def update_profile_fields(self, user_id: str, changes: Dict[str, Any]) -> Optional[UserProfile]:
+        pass
+    
     @abstractmethod
     async def delete_profile(self, user_id: str) -> bool:
         pass
@@ -70,6 +89,10 @@ class UserActivityRepository(ABC):
     async def create_activity(self, activity: UserActivity) -> UserActivity:
         pass
     
+    @abstractmethod
+    async def create_activities(self, activities: List[UserActivity]) -> int:
+        pass
+    
     @abstractmethod
     async def get_activities_by_user_id(self, user_id: str, skip: int = 0, limit: int = 100) -> List[UserActivity]:
         pass
@@ -0,0 +1,224 @@
+"""
+Monthly partitions for user activity storage
+
+Activities live in one table per month (``user_activities_YYYYMM``), each
+with a composite (user_id, timestamp) index. Reads walk partitions from the
+newest month backwards and stop as soon as the page is filled, so hot
+queries only touch recent data. Partitions older than the retention window
+are exported to gzipped JSON-lines archives and dropped by a background
+compaction task, which runs in one worker process at a time.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Column, String, DateTime, JSON, Index, MetaData, Table, select, insert, delete, text, func
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from infrastructure.database import engine, process_lock, UserActivityModel
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "user_activities_"
+PARTITION_NAME_PATTERN = re.compile(r"^user_activities_(\d{4})(\d{2})$")
+
+# Partition tables are created on demand, so they get their own metadata
+# instead of being part of Base.metadata.create_all()
+partition_metadata = MetaData()
+
+
+def partition_name_for(timestamp: datetime) -> str:
+    """Name of the partition holding activities logged at ``timestamp``"""
+    return f"{PARTITION_PREFIX}{timestamp.year:04d}{timestamp.month:02d}"
+
+
+def is_partition_name(name: str) -> bool:
+    return PARTITION_NAME_PATTERN.match(name) is not None
+
+
+def partition_table(name: str) -> Table:
+    """Table definition for a monthly partition"""
+    if not is_partition_name(name):
+        raise ValueError(f"Invalid activity partition name: {name}")
+    if name in partition_metadata.tables:
+        return partition_metadata.tables[name]
+    return Table(
+        name,
+        partition_metadata,
+        Column("id", String, primary_key=True),
+        Column("user_id", String, nullable=False),
+        Column("activity_type", String, nullable=False),
+        Column("description", String, nullable=False),
+        Column("activity_metadata", JSON),
+        Column("timestamp", DateTime, nullable=False),
+        Index(f"ix_{name}_user_id_timestamp", "user_id", "timestamp"),
+    )
+
+
+async def list_partitions(conn: AsyncConnection) -> List[str]:
+    """Existing partition names, newest month first"""
+    result = await conn.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :prefix"),
+        {"prefix": f"{PARTITION_PREFIX}%"}
+    )
+    names = [row[0] for row in result if is_partition_name(row[0])]
+    return sorted(names, reverse=True)
+
+
+async def ensure_partition(conn: AsyncConnection, name: str) -> Table:
+    """Create the partition table and its index if they do not exist yet"""
+    table = partition_table(name)
+    await conn.run_sync(table.create, checkfirst=True)
+    return table
+
+
+def _months_between(newer: datetime, name: str) -> int:
+    match = PARTITION_NAME_PATTERN.match(name)
+    year, month = int(match.group(1)), int(match.group(2))
+    return (newer.year - year) * 12 + (newer.month - month)
+
+
+class ActivityPartitionManager:
+    """Retention, archiving and compaction of activity partitions"""
+
+    def __init__(
+        self,
+        db_engine=engine,
+        retention_months: int = int(os.getenv("ACTIVITY_RETENTION_MONTHS", "12")),
+        archive_dir: str = os.getenv("ACTIVITY_ARCHIVE_DIR", "./activity_archive"),
+        compaction_interval: float = float(os.getenv("ACTIVITY_COMPACTION_INTERVAL_HOURS", "24")) * 3600,
+        migration_chunk_size: int = 5000
+    ):
+        self.engine = db_engine
+        self.retention_months = retention_months
+        self.archive_dir = Path(archive_dir)
+        self.compaction_interval = compaction_interval
+        self.migration_chunk_size = migration_chunk_size
+        self._task: Optional[asyncio.Task] = None
+
+    def is_expired(self, name: str, now: Optional[datetime] = None) -> bool:
+        """True if the partition is older than the retention window"""
+        return _months_between(now or datetime.utcnow(), name) >= self.retention_months
+
+    async def get_partitions(self) -> List[Dict[str, Any]]:
+        """Partitions with their row counts and retention state"""
+        now = datetime.utcnow()
+        partitions = []
+        async with self.engine.connect() as conn:
+            for name in await list_partitions(conn):
+                table = partition_table(name)
+                rows = (await conn.execute(select(func.count()).select_from(table))).scalar_one()
+                partitions.append({"name": name, "rows": rows, "expired": self.is_expired(name, now)})
+        return partitions
+
+    async def migrate_legacy_activities(self) -> int:
+        """Move rows from the unpartitioned user_activities table into monthly partitions"""
+        legacy = UserActivityModel.__table__
+        moved = 0
+        while True:
+            async with self.engine.begin() as conn:
+                result = await conn.execute(select(legacy).limit(self.migration_chunk_size))
+                rows = [dict(row._mapping) for row in result]
+                if not rows:
+                    break
+
+                by_partition: Dict[str, List[Dict[str, Any]]] = {}
+                for row in rows:
+                    row["timestamp"] = row["timestamp"] or datetime.utcnow()
+                    by_partition.setdefault(partition_name_for(row["timestamp"]), []).append(row)
+
+                for name, partition_rows in by_partition.items():
+                    table = await ensure_partition(conn, name)
+                    await conn.execute(insert(table).prefix_with("OR IGNORE"), partition_rows)
+
+                await conn.execute(delete(legacy).where(legacy.c.id.in_([row["id"] for row in rows])))
+                moved += len(rows)
+
+        if moved:
+            logger.info(f"Migrated {moved} legacy activities into monthly partitions")
+        return moved
+
+    async def export_partition(self, name: str) -> Path:
+        """Write a partition to a gzipped JSON-lines archive and return its path"""
+        async with self.engine.connect() as conn:
+            if name not in await list_partitions(conn):
+                # Checked before partition_table() registers a definition for it
+                raise LookupError(f"Activity partition {name} does not exist")
+        table = partition_table(name)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self.archive_dir / f"{name}.jsonl.gz"
+        tmp_path = path.with_suffix(".tmp")
+
+        async with self.engine.connect() as conn:
+            result = await conn.stream(select(table).order_by(table.c.timestamp))
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as archive:
+                async for row in result:
+                    record = dict(row._mapping)
+                    record["timestamp"] = record["timestamp"].isoformat() if record["timestamp"] else None
+                    archive.write(json.dumps(record) + "\n")
+
+        # Only a complete archive replaces the final file
+        os.replace(tmp_path, path)
+        return path
+
+    async def drop_partition(self, name: str):
+        table = partition_table(name)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(table.drop, checkfirst=True)
+        partition_metadata.remove(table)
+
+    async def compact(self) -> Dict[str, Any]:
+        """Archive and drop expired partitions, then reclaim the freed space"""
+        async with self.engine.connect() as conn:
+            expired = [name for name in await list_partitions(conn) if self.is_expired(name)]
+
+        archived = []
+        for name in expired:
+            path = await self.export_partition(name)
+            await self.drop_partition(name)
+            archived.append({"partition": name, "archive": str(path)})
+            logger.info(f"Archived activity partition {name} to {path}")
+
+        if archived:
+            # VACUUM cannot run inside a transaction
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("VACUUM"))
+
+        return {"archived": archived, "retention_months": self.retention_months}
+
+    async def start(self):
+        """Start periodic background compaction"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # Under a multi-worker server the other workers skip this round
+                with process_lock("compaction", blocking=False) as acquired:
+                    if acquired:
+                        await self.compact()
+            except Exception:
+                logger.exception("Activity partition compaction failed")
+            await asyncio.sleep(self.compaction_interval)
+
+
+# Global manager instance, started by the application lifecycle
+activity_partitions = ActivityPartitionManager()
@@ -0,0 +1,168 @@
+"""
+Asynchronous, batched writer for user activity logs
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from domain.entities import UserActivity
+from infrastructure.database import AsyncSessionLocal
+from infrastructure.repositories import SQLiteUserActivityRepository
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream when the queue is shutting down
+_STOP = object()
+
+
+class ActivityLogQueue:
+    """In-process activity queue drained by a single background writer.
+
+    Requests only enqueue activities; the writer collects them into batches
+    (flushed when ``batch_size`` is reached or ``flush_interval`` seconds have
+    passed since the first item of the batch) and inserts each batch with one
+    executemany in one transaction.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        max_size: int = int(os.getenv("ACTIVITY_QUEUE_MAX_SIZE", "10000")),
+        batch_size: int = int(os.getenv("ACTIVITY_QUEUE_BATCH_SIZE", "500")),
+        flush_interval: float = float(os.getenv("ACTIVITY_QUEUE_FLUSH_INTERVAL", "1.0")),
+        enqueue_timeout: float = float(os.getenv("ACTIVITY_QUEUE_ENQUEUE_TIMEOUT", "0.05"))
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # How long a request may wait for space before its activity is dropped
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._accepting = False
+
+        # Metrics
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.overflowed = 0
+        self.failed = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self._accepting
+
+    async def start(self):
+        """Start the background writer"""
+        if self._writer_task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._accepting = True
+        self._writer_task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop accepting activities and drain everything already queued"""
+        if self._writer_task is None:
+            return
+        self._accepting = False
+        await self._queue.put(_STOP)
+        try:
+            await asyncio.wait_for(self._writer_task, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Activity writer did not drain within {timeout}s, {self._queue.qsize()} activities lost")
+            self._writer_task.cancel()
+        self._writer_task = None
+        self._queue = None
+
+    async def enqueue(self, activity: UserActivity) -> bool:
+        """Queue an activity for writing. Returns False if it was dropped."""
+        if not self._accepting:
+            self.dropped += 1
+            return False
+
+        try:
+            self._queue.put_nowait(activity)
+        except asyncio.QueueFull:
+            # Backpressure: wait briefly for the writer, then shed load
+            self.overflowed += 1
+            try:
+                await asyncio.wait_for(self._queue.put(activity), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                return False
+
+        self.enqueued += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and counters"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "overflowed": self.overflowed,
+            "failed": self.failed,
+            "batches": self.batches
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        # Anything that raced in behind the stop marker
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            await self._flush(leftover[start:start + self.batch_size])
+
+    async def _flush(self, batch: List[UserActivity]):
+        try:
+            async with self.session_factory() as session:
+                await SQLiteUserActivityRepository(session).create_activities(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception:
+            # Never let a bad batch kill the writer
+            self.failed += len(batch)
+            logger.exception(f"Failed to write batch of {len(batch)} activities")
+
+
+# Global queue instance, started and drained by the application lifecycle
+activity_queue = ActivityLogQueue()
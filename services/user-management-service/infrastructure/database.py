@@ -1,25 +1,155 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, JSON
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy import event, Column, String, Boolean, DateTime, Integer, Text, JSON, Index, bindparam, func, inspect, select, update
+from sqlalchemy.schema import CreateIndex
 from datetime import datetime
+from typing import Any, Dict, Optional
 import os
+import unicodedata
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-worker mode, so no locking needed
+    fcntl = None
 
 # Database URL - SQLite with async support
 DATABASE_URL = "sqlite+aiosqlite:///./user_management_service.db"
 
+# Where read-only queries go: a Postgres/SQLite replica, or by default a
+# separate pool of read-only connections to the primary database file
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL", DATABASE_URL)
+
+# Connection pool of each worker process (aiosqlite otherwise opens a new
+# connection per checkout). Under gunicorn (gunicorn.conf.py) the pool size
+# defaults to DB_MAX_CONNECTIONS split between the workers
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_READ_MAX_OVERFLOW = int(os.getenv("DB_READ_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+
 # Create async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
+)
+
+# Replica for reads; sessions from AsyncSessionLocal route to it (see RoutingSession)
+read_engine = create_async_engine(
+    READ_DATABASE_URL,
+    echo=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=DB_READ_POOL_SIZE,
+    max_overflow=DB_READ_MAX_OVERFLOW
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """WAL lets readers in every worker process run while one connection writes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # Wait for the write lock instead of failing with "database is locked"
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def _make_read_only(dbapi_connection, connection_record):
+    """A write on a read connection is a bug; fail it instead of taking the lock"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+if read_engine.dialect.name == "sqlite":
+    event.listen(read_engine.sync_engine, "connect", _configure_sqlite_connection)
+    event.listen(read_engine.sync_engine, "connect", _make_read_only)
+
+
+@contextmanager
+def process_lock(name: str, blocking: bool = True):
+    """
+    Exclusive lock shared by all worker processes using this database file.
+    Yields False when blocking is off and another process holds the lock.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(f"{DATABASE_URL.split(':///', 1)[1]}.{name}.lock", "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Session.info key set once a session must stay on the primary
+_PRIMARY_KEY = "use_primary"
+
+
+def use_primary(session) -> None:
+    """Send every later statement of the session to the primary"""
+    session.info[_PRIMARY_KEY] = True
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to read_engine and everything else to the session's bind.
+
+    The first statement that is not a plain SELECT (a flush, INSERT/UPDATE/
+    DELETE, SELECT ... FOR UPDATE, raw SQL or a bare connection()) pins the
+    session to the primary, so the rest of the request reads its own writes.
+    Pass ``bind_arguments={"read_only": True}`` to connection() for reads
+    done on a Core connection.
+    """
+
+    def get_bind(self, mapper=None, clause=None, read_only=False, **kw):
+        reads = read_only or (isinstance(clause, Select) and clause._for_update_arg is None)
+        if self._flushing or not reads:
+            use_primary(self)
+        elif not self.info.get(_PRIMARY_KEY):
+            return read_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
 
 # Create session factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False
 )
 
 # Base class for models
 Base = declarative_base()
 
+# Searchable column -> its case-folded copy. SQLite's lower() only folds
+# ASCII, so "ÉLISE" would not match "élise"; the copies are folded in Python.
+FOLDED_COLUMNS = {"email": "email_folded", "first_name": "first_name_folded", "last_name": "last_name_folded"}
+FOLD_BATCH_SIZE = 5000
+
+
+def fold_case(value: Optional[str]) -> Optional[str]:
+    """Form of a name or email that case-insensitive search compares"""
+    return unicodedata.normalize("NFC", value).casefold() if value is not None else None
+
+
+def folded_values(values: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """The folded copies to write along with the searchable columns among ``values``"""
+    return {FOLDED_COLUMNS[name]: fold_case(value) for name, value in values.items() if name in FOLDED_COLUMNS}
+
 
 class UserModel(Base):
     """SQLAlchemy User model"""
@@ -37,6 +167,20 @@ class UserModel(Base):
     preferences = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Case-folded copies for search, see fold_case(); written with the columns they copy
+    email_folded = Column(String)
+    first_name_folded = Column(String)
+    last_name_folded = Column(String)
+
+    __table_args__ = (
+        # Admin listing filters by role and/or status and pages in creation order
+        Index("ix_users_role_status_created_at", "role", "status", "created_at"),
+        Index("ix_users_status_created_at", "status", "created_at"),
+        # Case-insensitive prefix search on name and email
+        Index("ix_users_email_folded", "email_folded"),
+        Index("ix_users_first_name_folded", "first_name_folded"),
+        Index("ix_users_last_name_folded", "last_name_folded"),
+    )
 
 
 class UserProfileModel(Base):
@@ -56,7 +200,12 @@ class UserProfileModel(Base):
 
 
 class UserActivityModel(Base):
-    """SQLAlchemy User Activity model"""
+    """Legacy unpartitioned activity table.
+
+    New activities are stored in monthly partitions (see
+    infrastructure.activity_partitions); rows left here are migrated into
+    them on startup.
+    """
     __tablename__ = "user_activities"
     
     id = Column(String, primary_key=True, index=True)
@@ -76,10 +225,45 @@ async def get_db():
             await session.close()
 
 
+def _create_missing_indexes(connection):
+    """Create indexes that were added after the tables already existed"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
+    # Replaced by the indexes on the folded columns
+    for name in ("ix_users_lower_email", "ix_users_lower_first_name", "ix_users_lower_last_name"):
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
+def _fold_existing_users(connection):
+    """Add the folded search columns to a users table created before them, and fill them in"""
+    users = UserModel.__table__
+    existing = {column["name"] for column in inspect(connection).get_columns("users")}
+    for column in FOLDED_COLUMNS.values():
+        if column not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE users ADD COLUMN {column} VARCHAR")
+    while True:
+        rows = connection.execute(
+            select(users.c.id, users.c.email, users.c.first_name, users.c.last_name)
+            .where(users.c.email_folded.is_(None))
+            .limit(FOLD_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        connection.execute(
+            update(users).where(users.c.id == bindparam("user_id")),
+            [{"user_id": row.id, **folded_values(row._asdict())} for row in rows]
+        )
+
+
 # Create tables
 async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Workers start together; only one may run create_all at a time
+    with process_lock("schema"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_fold_existing_users)
+            await conn.run_sync(_create_missing_indexes)
 
 
 class Database:
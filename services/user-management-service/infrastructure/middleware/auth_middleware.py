@@ -8,6 +8,9 @@ from typing import Dict, Any, Optional
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from infrastructure.metrics import record_auth_failure
+from infrastructure.tracing import tracer
+
 
 class AuthMiddleware:
     """Simple JWT authentication middleware"""
@@ -20,11 +23,12 @@ class AuthMiddleware:
         """Verify JWT token and return user info"""
         try:
             # Decode the JWT token
-            payload = jwt.decode(
-                credentials.credentials,
-                self.jwt_secret,
-                algorithms=[self.jwt_algorithm]
-            )
+            with tracer.span("jwt.verify"):
+                payload = jwt.decode(
+                    credentials.credentials,
+                    self.jwt_secret,
+                    algorithms=[self.jwt_algorithm]
+                )
             
             # Check if token has expired
             exp_timestamp = payload.get("exp")
@@ -53,16 +57,19 @@ class AuthMiddleware:
             return user_info
             
         except jwt.ExpiredSignatureError:
+            record_auth_failure("expired")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
         except jwt.InvalidTokenError:
+            record_auth_failure("invalid_token")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication token"
             )
         except Exception:
+            record_auth_failure("error")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Authentication failed"
@@ -1,9 +1,11 @@
-from typing import Optional, List, Dict
+from datetime import datetime
+from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, insert, update, delete, and_, or_, func
 from domain.entities import User, UserProfile, UserActivity, UserRole, UserStatus
 from domain.repositories import UserRepository, UserProfileRepository, UserActivityRepository
-from infrastructure.database import UserModel, UserProfileModel, UserActivityModel
+from infrastructure.database import UserModel, UserProfileModel, fold_case, folded_values
+from infrastructure.activity_partitions import partition_name_for, partition_table, ensure_partition, list_partitions
 
 
 class InMemoryUserRepository(UserRepository):
@@ -36,7 +38,15 @@ class InMemoryUserRepository(UserRepository):
         # TODO: Implement user update
         pass
     
-    async def delete_user(self, user_id: str) -> bool:
+    async def update_user_fields(self, user_id: str, changes: Dict[str, Any]) -> Optional[User]:
+        """Apply column changes (enums as their values, like the SQL UPDATE); None if the user does not exist"""
+        user = self._users.get(user_id)
+        if user is None:
+            return None
+        updated = self._users[user_id] = User.model_validate({**user.model_dump(), **changes})
+        return updated
+    
+    async def delete_user(self, user_id: str) -> Optional[User]:
         # TODO: Implement user deletion
         pass
     
@@ -47,6 +57,29 @@ class InMemoryUserRepository(UserRepository):
     async def get_users_by_status(self, status: UserStatus) -> List[User]:
         # TODO: Implement get users by status
         pass
+    
+    async def search_users(
+        self,
+        role: Optional[UserRole] = None,
+        status: Optional[UserStatus] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[User]:
+        """Same filters, prefix search and order as SQLiteUserRepository.search_users"""
+        prefix = fold_case(search.strip()) if search else ""
+        matches = [
+            user for user in self._users.values()
+            if (role is None or user.role == role)
+            and (status is None or user.status == status)
+            and (not prefix or any(
+                fold_case(value or "").startswith(prefix) for value in (user.email, user.first_name, user.last_name)
+            ))
+        ]
+        # Newest first, like the SQL ORDER BY created_at DESC, id
+        matches.sort(key=lambda user: user.id or "")
+        matches.sort(key=lambda user: user.created_at or datetime.min, reverse=True)
+        return matches[skip:skip + limit]
 
 
 class SQLiteUserRepository(UserRepository):
@@ -86,7 +119,8 @@ class SQLiteUserRepository(UserRepository):
             status=user.status.value,
             preferences=user.preferences,
             created_at=user.created_at,
-            updated_at=user.updated_at
+            updated_at=user.updated_at,
+            **folded_values({"email": user.email, "first_name": user.first_name, "last_name": user.last_name})
         )
     
     async def create_user(self, user: User) -> User:
@@ -125,42 +159,41 @@ class SQLiteUserRepository(UserRepository):
         return [self._model_to_entity(db_user) for db_user in db_users]
     
     async def update_user(self, user: User) -> User:
+        updated_user = await self.update_user_fields(user.id, {
+            "email": user.email,
+            "username": user.username,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "phone_number": user.phone_number,
+            "date_of_birth": user.date_of_birth,
+            "role": user.role.value,
+            "status": user.status.value,
+            "preferences": user.preferences,
+            "updated_at": user.updated_at
+        })
+        if not updated_user:
+            raise ValueError(f"User with id {user.id} not found")
+        return updated_user
+    
+    async def update_user_fields(self, user_id: str, changes: Dict[str, Any]) -> Optional[User]:
+        """Apply column changes with one UPDATE ... RETURNING; None if the user does not exist"""
+        users = UserModel.__table__
         result = await self.db.execute(
-            select(UserModel).where(UserModel.id == user.id)
+            update(users).where(users.c.id == user_id).values(**changes, **folded_values(changes)).returning(*users.c)
         )
-        db_user = result.scalar_one_or_none()
-        
-        if not db_user:
-            raise ValueError(f"User with id {user.id} not found")
-        
-        # Update fields
-        db_user.email = user.email
-        db_user.username = user.username
-        db_user.first_name = user.first_name
-        db_user.last_name = user.last_name
-        db_user.phone_number = user.phone_number
-        db_user.date_of_birth = user.date_of_birth
-        db_user.role = user.role.value
-        db_user.status = user.status.value
-        db_user.preferences = user.preferences
-        db_user.updated_at = user.updated_at
-        
+        row = result.first()
         await self.db.commit()
-        await self.db.refresh(db_user)
-        return self._model_to_entity(db_user)
+        return self._model_to_entity(row) if row else None
     
-    async def delete_user(self, user_id: str) -> bool:
+    async def delete_user(self, user_id: str) -> Optional[User]:
+        """Delete with one DELETE ... RETURNING; the deleted user, or None if it did not exist"""
+        users = UserModel.__table__
         result = await self.db.execute(
-            select(UserModel).where(UserModel.id == user_id)
+            delete(users).where(users.c.id == user_id).returning(*users.c)
         )
-        db_user = result.scalar_one_or_none()
-        
-        if not db_user:
-            return False
-        
-        await self.db.delete(db_user)
+        row = result.first()
         await self.db.commit()
-        return True
+        return self._model_to_entity(row) if row else None
     
     async def get_users_by_role(self, role: UserRole) -> List[User]:
         result = await self.db.execute(
@@ -175,6 +208,44 @@ class SQLiteUserRepository(UserRepository):
         )
         db_users = result.scalars().all()
         return [self._model_to_entity(db_user) for db_user in db_users]
+    
+    @staticmethod
+    def _prefix_match(column, prefix: str):
+        """Prefix match on a folded column that can use its index"""
+        # A half-open range instead of LIKE so SQLite can seek the index
+        return and_(column >= prefix, column < prefix + "\uffff")
+    
+    async def search_users(
+        self,
+        role: Optional[UserRole] = None,
+        status: Optional[UserStatus] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[User]:
+        """Filter, search and paginate users in a single query"""
+        query = select(UserModel)
+        
+        if role is not None:
+            query = query.where(UserModel.role == role.value)
+        if status is not None:
+            query = query.where(UserModel.status == status.value)
+        
+        prefix = fold_case(search.strip()) if search else ""
+        if prefix:
+            query = query.where(or_(
+                self._prefix_match(UserModel.email_folded, prefix),
+                self._prefix_match(UserModel.first_name_folded, prefix),
+                self._prefix_match(UserModel.last_name_folded, prefix)
+            ))
+        
+        result = await self.db.execute(
+            query.order_by(UserModel.created_at.desc(), UserModel.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        db_users = result.scalars().all()
+        return [self._model_to_entity(db_user) for db_user in db_users]
 
 
 class SQLiteUserProfileRepository(UserProfileRepository):
@@ -228,94 +299,131 @@ class SQLiteUserProfileRepository(UserProfileRepository):
         return self._model_to_entity(db_profile) if db_profile else None
     
     async def update_profile(self, profile: UserProfile) -> UserProfile:
+        updated_profile = await self.update_profile_fields(profile.user_id, {
+            "avatar_url": profile.avatar_url,
+            "bio": profile.bio,
+            "nationality": profile.nationality,
+            "address": profile.address,
+            "loyalty_points": profile.loyalty_points,
+            "preferred_language": profile.preferred_language,
+            "notification_preferences": profile.notification_preferences,
+            "updated_at": profile.updated_at
+        })
+        if not updated_profile:
+            raise ValueError(f"Profile for user {profile.user_id} not found")
+        return updated_profile
+    
+    async def update_profile_fields(self, user_id: str, changes: Dict[str, Any]) -> Optional[UserProfile]:
+        """Apply column changes with one UPDATE ... RETURNING; None if the profile does not exist"""
+        profiles = UserProfileModel.__table__
         result = await self.db.execute(
-            select(UserProfileModel).where(UserProfileModel.user_id == profile.user_id)
+            update(profiles).where(profiles.c.user_id == user_id).values(**changes).returning(*profiles.c)
         )
-        db_profile = result.scalar_one_or_none()
-        
-        if not db_profile:
-            raise ValueError(f"Profile for user {profile.user_id} not found")
-        
-        # Update fields
-        db_profile.avatar_url = profile.avatar_url
-        db_profile.bio = profile.bio
-        db_profile.nationality = profile.nationality
-        db_profile.address = profile.address
-        db_profile.loyalty_points = profile.loyalty_points
-        db_profile.preferred_language = profile.preferred_language
-        db_profile.notification_preferences = profile.notification_preferences
-        db_profile.updated_at = profile.updated_at
-        
+        row = result.first()
         await self.db.commit()
-        await self.db.refresh(db_profile)
-        return self._model_to_entity(db_profile)
+        return self._model_to_entity(row) if row else None
     
     async def delete_profile(self, user_id: str) -> bool:
+        profiles = UserProfileModel.__table__
         result = await self.db.execute(
-            select(UserProfileModel).where(UserProfileModel.user_id == user_id)
+            delete(profiles).where(profiles.c.user_id == user_id).returning(profiles.c.user_id)
         )
-        db_profile = result.scalar_one_or_none()
-        
-        if not db_profile:
-            return False
-        
-        await self.db.delete(db_profile)
+        deleted = result.first() is not None
         await self.db.commit()
-        return True
+        return deleted
 
 
 class SQLiteUserActivityRepository(UserActivityRepository):
-    """SQLite implementation of user activity repository"""
+    """SQLite implementation of user activity repository over monthly partitions"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    def _model_to_entity(self, model: UserActivityModel) -> UserActivity:
-        """Convert SQLAlchemy model to domain entity"""
+    def _row_to_entity(self, row) -> UserActivity:
+        """Convert a partition row to domain entity"""
         return UserActivity(
-            id=model.id,
-            user_id=model.user_id,
-            activity_type=model.activity_type,
-            description=model.description,
-            metadata=model.activity_metadata,
-            timestamp=model.timestamp
+            id=row.id,
+            user_id=row.user_id,
+            activity_type=row.activity_type,
+            description=row.description,
+            metadata=row.activity_metadata,
+            timestamp=row.timestamp
         )
     
-    def _entity_to_model(self, activity: UserActivity) -> UserActivityModel:
-        """Convert domain entity to SQLAlchemy model"""
-        return UserActivityModel(
-            id=activity.id,
-            user_id=activity.user_id,
-            activity_type=activity.activity_type,
-            description=activity.description,
-            activity_metadata=activity.metadata,
-            timestamp=activity.timestamp
-        )
+    def _entity_to_row(self, activity: UserActivity) -> dict:
+        """Convert domain entity to partition row values"""
+        return {
+            "id": activity.id,
+            "user_id": activity.user_id,
+            "activity_type": activity.activity_type,
+            "description": activity.description,
+            "activity_metadata": activity.metadata,
+            "timestamp": activity.timestamp
+        }
     
     async def create_activity(self, activity: UserActivity) -> UserActivity:
-        db_activity = self._entity_to_model(activity)
-        self.db.add(db_activity)
-        await self.db.commit()
-        await self.db.refresh(db_activity)
-        return self._model_to_entity(db_activity)
+        await self.create_activities([activity])
+        return activity
+    
+    async def create_activities(self, activities: List[UserActivity]) -> int:
+        """Insert a batch of activities with one executemany per partition in one transaction"""
+        if not activities:
+            return 0
+        by_partition: Dict[str, List[dict]] = {}
+        for activity in activities:
+            by_partition.setdefault(partition_name_for(activity.timestamp), []).append(
+                self._entity_to_row(activity)
+            )
+        try:
+            conn = await self.db.connection()
+            for name, rows in by_partition.items():
+                table = await ensure_partition(conn, name)
+                await conn.execute(insert(table), rows)
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            raise e
+        return len(activities)
     
     async def get_activities_by_user_id(self, user_id: str, skip: int = 0, limit: int = 100) -> List[UserActivity]:
-        result = await self.db.execute(
-            select(UserActivityModel)
-            .where(UserActivityModel.user_id == user_id)
-            .order_by(UserActivityModel.timestamp.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        db_activities = result.scalars().all()
-        return [self._model_to_entity(db_activity) for db_activity in db_activities]
+        """Newest activities first, reading older partitions only until the page is full"""
+        conn = await self.db.connection(bind_arguments={"read_only": True})
+        activities: List[UserActivity] = []
+        remaining_skip = skip
+        
+        for name in await list_partitions(conn):
+            table = partition_table(name)
+            if remaining_skip:
+                # Index-only count on (user_id, timestamp) to skip whole partitions
+                in_partition = (await conn.execute(
+                    select(func.count()).select_from(table).where(table.c.user_id == user_id)
+                )).scalar_one()
+                if in_partition <= remaining_skip:
+                    remaining_skip -= in_partition
+                    continue
+            
+            result = await conn.execute(
+                select(table)
+                .where(table.c.user_id == user_id)
+                .order_by(table.c.timestamp.desc())
+                .offset(remaining_skip)
+                .limit(limit - len(activities))
+            )
+            remaining_skip = 0
+            activities.extend(self._row_to_entity(row) for row in result)
+            if len(activities) >= limit:
+                break
+        
+        return activities
     
     async def get_activity_by_id(self, activity_id: str) -> Optional[UserActivity]:
-        result = await self.db.execute(
-            select(UserActivityModel).where(UserActivityModel.id == activity_id)
-        )
-        db_activity = result.scalar_one_or_none()
-        return self._model_to_entity(db_activity) if db_activity else None
+        conn = await self.db.connection(bind_arguments={"read_only": True})
+        for name in await list_partitions(conn):
+            table = partition_table(name)
+            row = (await conn.execute(select(table).where(table.c.id == activity_id))).first()
+            if row:
+                return self._row_to_entity(row)
+        return None
 
 
 # Legacy in-memory implementations (keeping for compatibility)
@@ -337,6 +445,10 @@ class InMemoryUserProfileRepository(UserProfileRepository):
         # TODO: Implement profile update
         pass
     
+    async def update_profile_fields(self, user_id: str, changes: Dict[str, Any]) -> Optional[UserProfile]:
+        # TODO: Implement partial profile update
+        pass
+    
     async def delete_profile(self, user_id: str) -> bool:
         # TODO: Implement profile deletion
         pass
@@ -353,6 +465,10 @@ class InMemoryUserActivityRepository(UserActivityRepository):
         # TODO: Implement activity creation
         pass
     
+    async def create_activities(self, activities: List[UserActivity]) -> int:
+        # TODO: Implement batch activity creation
+        pass
+    
     async def get_activities_by_user_id(self, user_id: str, skip: int = 0, limit: int = 100) -> List[UserActivity]:
         # TODO: Implement get activities by user ID
         pass
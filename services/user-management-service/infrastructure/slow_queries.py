@@ -0,0 +1,164 @@
+"""
+Slow-query log with query-plan capture
+
+When enabled, every statement slower than the threshold is recorded in a
+bounded ring buffer with its normalized SQL, the shape of its parameters,
+duration, row count and an ``EXPLAIN QUERY PLAN`` sample. Plans are
+captured once per statement shape and reused, so a hot slow query costs one
+extra EXPLAIN in total rather than one per execution. Entries whose plan
+scans a table without an index are flagged as full scans.
+
+Opt-in through SLOW_QUERY_LOG_ENABLED; the admin API serves the buffer.
+"""
+import logging
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:\?|:\w+|%\(\w+\)s)(?:\s*,\s*(?:\?|:\w+|%\(\w+\)s))*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_FULL_SCAN = re.compile(r"^SCAN (?!.*\bUSING (?:COVERING )?INDEX\b)(?!.*\bVIRTUAL TABLE\b)", re.IGNORECASE)
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse literals, IN lists and whitespace so equivalent queries group together"""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _value_type(value: Any) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+def parameters_shape(parameters: Any, executemany: bool = False) -> str:
+    """Types of the bound parameters, without their values"""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameters_shape(rows[0]) if rows else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {_value_type(value)}" for key, value in sorted(parameters.items())) + "}"
+    if isinstance(parameters, (list, tuple)):
+        types = [_value_type(value) for value in parameters]
+        if len(types) > 8 and len(set(types)) == 1:
+            return f"({types[0]} x {len(types)})"
+        return "(" + ", ".join(types) + ")"
+    return _value_type(parameters)
+
+
+class SlowQueryLog:
+    """Ring buffer of statements slower than ``threshold_ms``"""
+
+    def __init__(
+        self,
+        enabled: bool = os.getenv("SLOW_QUERY_LOG_ENABLED", "false").lower() == "true",
+        threshold_ms: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100")),
+        capacity: int = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200")),
+        plan_cache_size: int = 500
+    ):
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.capacity = capacity
+        self.plan_cache_size = plan_cache_size
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._plans: "OrderedDict[str, List[str]]" = OrderedDict()
+        self.recorded = 0
+
+    def install(self, engine):
+        """Attach the timing hooks to ``engine`` (sync or async)"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        self.enabled = True
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+        logger.info(f"Slow-query log enabled (threshold {self.threshold_ms} ms)")
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _handle_error(self, context):
+        if context.connection is not None:
+            starts = context.connection.info.get("slow_query_start")
+            if starts:
+                starts.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        normalized = normalize_statement(statement)
+        plan = None if executemany else self._plan_for(conn, normalized, statement, parameters)
+        # The aiosqlite adapter buffers result rows on the cursor; DML reports rowcount
+        rows = getattr(cursor, "_rows", None)
+        row_count = len(rows) if rows is not None and cursor.description else cursor.rowcount
+
+        self._entries.append({
+            "timestamp": datetime.utcnow().isoformat(),
+            "statement": normalized,
+            "parameters": parameters_shape(parameters, executemany),
+            "duration_ms": round(duration_ms, 3),
+            "rows": row_count,
+            "plan": plan,
+            "full_scan": any(_FULL_SCAN.match(step) for step in plan or ())
+        })
+        self.recorded += 1
+
+    def _plan_for(self, conn, normalized: str, statement: str, parameters) -> Optional[List[str]]:
+        if normalized in self._plans:
+            self._plans.move_to_end(normalized)
+            return self._plans[normalized]
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return None
+
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        # Run on the raw DBAPI connection so the EXPLAIN is not itself timed and logged
+        explain_cursor = conn.connection.cursor()
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            # SQLite rows are (id, parent, notused, detail); other databases return one text column
+            plan = [str(row[-1]) for row in explain_cursor.fetchall()]
+        except Exception as e:
+            logger.warning(f"Could not capture query plan: {e}")
+            plan = None
+        finally:
+            explain_cursor.close()
+
+        self._plans[normalized] = plan
+        if len(self._plans) > self.plan_cache_size:
+            self._plans.popitem(last=False)
+        return plan
+
+    def entries(self, full_scans_only: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Recorded slow queries, newest first"""
+        entries = [entry for entry in reversed(self._entries) if entry["full_scan"] or not full_scans_only]
+        return entries[:limit] if limit is not None else entries
+
+    def clear(self):
+        self._entries.clear()
+        self._plans.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "capacity": self.capacity,
+            "buffered": len(self._entries),
+            "recorded": self.recorded
+        }
+
+
+# Global slow-query log, installed on the engine at startup when enabled
+slow_query_log = SlowQueryLog()
@@ -14,6 +14,9 @@ from infrastructure.repositories import (
     SQLiteUserRepository, SQLiteUserProfileRepository, SQLiteUserActivityRepository
 )
 from infrastructure.database import get_db
+from infrastructure.activity_queue import activity_queue
+from infrastructure.activity_partitions import activity_partitions, is_partition_name
+from infrastructure.slow_queries import slow_query_log
 from infrastructure.middleware.auth_middleware import require_admin
 
 router = APIRouter()
@@ -23,7 +26,7 @@ async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     user_repository = SQLiteUserRepository(db)
     profile_repository = SQLiteUserProfileRepository(db)
     activity_repository = SQLiteUserActivityRepository(db)
-    return UserService(user_repository, profile_repository, activity_repository)
+    return UserService(user_repository, profile_repository, activity_repository, activity_queue)
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -50,6 +53,7 @@ async def create_user_account(
 async def list_users(
     role: Optional[UserRole] = Query(None, description="Filter by user role"),
     status_filter: Optional[UserStatus] = Query(None, alias="status", description="Filter by user status"),
+    search: Optional[str] = Query(None, min_length=1, max_length=100, description="Name or email prefix"),
     skip: int = Query(0, ge=0, description="Number of users to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Number of users to return"),
     user_service: UserService = Depends(get_user_service),
@@ -57,22 +61,13 @@ async def list_users(
 ):
     """List all users with filtering (Admin only)"""
     try:
-        # Get all users using existing method
-        user_list_response = await user_service.get_users(skip=skip, limit=limit)
-        users = user_list_response.users
-        
-        # Apply filters
-        filtered_users = []
-        for user in users:
-            # Role filter
-            if role and user.role != role:
-                continue
-            # Status filter
-            if status_filter and user.status != status_filter:
-                continue
-            filtered_users.append(user)
-        
-        return filtered_users
+        return await user_service.search_users(
+            role=role,
+            status=status_filter,
+            search=search,
+            skip=skip,
+            limit=limit
+        )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch users")
 
@@ -117,23 +112,20 @@ async def delete_user(
 async def export_users_csv(
     role: Optional[UserRole] = Query(None, description="Filter by user role"),
     status_filter: Optional[UserStatus] = Query(None, alias="status", description="Filter by user status"),
+    search: Optional[str] = Query(None, min_length=1, max_length=100, description="Name or email prefix"),
     user_service: UserService = Depends(get_user_service),
     current_user: Dict[str, Any] = Depends(require_admin)
 ):
     """Export users list as CSV (Admin only)"""
     try:
-        # Get all users for export using existing method
-        user_list_response = await user_service.get_users(skip=0, limit=10000)  # Large limit for export
-        users = user_list_response.users
-        
-        # Apply filters
-        filtered_users = []
-        for user in users:
-            if role and user.role != role:
-                continue
-            if status_filter and user.status != status_filter:
-                continue
-            filtered_users.append(user)
+        # Filtering happens in SQL so the export limit applies to matching users only
+        filtered_users = await user_service.search_users(
+            role=role,
+            status=status_filter,
+            search=search,
+            skip=0,
+            limit=10000  # Large limit for export
+        )
         
         # Create CSV content
         output = io.StringIO()
@@ -174,3 +166,71 @@ async def export_users_csv(
         
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to export users")
+
+
+@router.get("/activity-queue")
+async def get_activity_queue_stats(
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Activity logging queue depth, throughput and drop counters (Admin only)"""
+    return activity_queue.stats()
+
+
+@router.get("/activity-partitions")
+async def list_activity_partitions(
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Monthly activity partitions with row counts and retention state (Admin only)"""
+    return {
+        "retention_months": activity_partitions.retention_months,
+        "partitions": await activity_partitions.get_partitions()
+    }
+
+
+@router.post("/activity-partitions/{partition}/archive")
+async def archive_activity_partition(
+    partition: str,
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Export one activity partition to the archive directory without dropping it (Admin only)"""
+    if not is_partition_name(partition):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid partition name")
+    try:
+        path = await activity_partitions.export_partition(partition)
+        return {"partition": partition, "archive": str(path)}
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to archive partition")
+
+
+@router.post("/activity-partitions/compact")
+async def compact_activity_partitions(
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Archive and drop partitions past the retention window now (Admin only)"""
+    try:
+        return await activity_partitions.compact()
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to compact activity partitions")
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    full_scans_only: bool = Query(False, description="Only queries whose plan scans a table without an index"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Slowest recent queries with their query plans (Admin only)"""
+    return {
+        **slow_query_log.stats(),
+        "queries": slow_query_log.entries(full_scans_only=full_scans_only, limit=limit)
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries(
+    current_user: Dict[str, Any] = Depends(require_admin)
+):
+    """Empty the slow-query buffer (Admin only)"""
+    slow_query_log.clear()
@@ -11,6 +11,7 @@ from infrastructure.repositories import (
     SQLiteUserRepository, SQLiteUserProfileRepository, SQLiteUserActivityRepository
 )
 from infrastructure.database import get_db
+from infrastructure.activity_queue import activity_queue
 
 router = APIRouter()
 
@@ -19,12 +20,12 @@ async def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
     user_repository = SQLiteUserRepository(db)
     profile_repository = SQLiteUserProfileRepository(db)
     activity_repository = SQLiteUserActivityRepository(db)
-    return UserService(user_repository, profile_repository, activity_repository)
+    return UserService(user_repository, profile_repository, activity_repository, activity_queue)
 
 async def get_profile_service(db: AsyncSession = Depends(get_db)) -> UserProfileService:
     profile_repository = SQLiteUserProfileRepository(db)
     activity_repository = SQLiteUserActivityRepository(db)
-    return UserProfileService(profile_repository, activity_repository)
+    return UserProfileService(profile_repository, activity_repository, activity_queue)
 
 async def get_activity_service(db: AsyncSession = Depends(get_db)) -> UserActivityService:
     activity_repository = SQLiteUserActivityRepository(db)
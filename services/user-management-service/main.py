@@ -1,15 +1,25 @@
+import os
 from fastapi import FastAPI
 from interfaces.api.user_router import router as user_router
 from interfaces.api.admin_router import router as admin_router
-from infrastructure.database import Database
+from infrastructure.database import Database, engine, read_engine
+from infrastructure.metrics import MetricsMiddleware, instrument_engine, registry, CONTENT_TYPE
+from infrastructure.tracing import TracingMiddleware, configure_tracing, instrument_engine_tracing
+from infrastructure.slow_queries import slow_query_log
+from infrastructure.query_counter import QueryCounterMiddleware, install_query_counter, QUERY_COUNTER_ENABLED
+from infrastructure.activity_queue import activity_queue
+from infrastructure.activity_partitions import activity_partitions
 import asyncio
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
 app = FastAPI(
     title="User Management Service",
     description="User management microservice for hotel chain application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -20,6 +30,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses above the size threshold for clients that accept gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1024")),
+    compresslevel=int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+)
+
+# Development and test runs: per-request query counts and N+1 warnings
+if QUERY_COUNTER_ENABLED:
+    app.add_middleware(QueryCounterMiddleware)
+    install_query_counter(engine)
+    install_query_counter(read_engine)
+
+# Request latency includes compression
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+instrument_engine(read_engine)
+if slow_query_log.enabled:
+    slow_query_log.install(engine)
+    slow_query_log.install(read_engine)
+
+# Sampled request tracing; TRACE_EXPORTER turns it on
+configure_tracing("user-management-service")
+app.add_middleware(TracingMiddleware)
+instrument_engine_tracing(engine)
+instrument_engine_tracing(read_engine)
+
 app.include_router(user_router, prefix="/api/v1/users", tags=["users"])
 app.include_router(admin_router, prefix="/api/v1/admin", tags=["admin"])
 
@@ -28,6 +65,15 @@ async def startup_event():
     """Initialize database on startup"""
     database = Database()
     await database.init_db()
+    await activity_partitions.migrate_legacy_activities()
+    await activity_partitions.start()
+    await activity_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued activity logs before exiting"""
+    await activity_queue.stop()
+    await activity_partitions.stop()
 
 @app.get("/")
 async def root():
@@ -37,6 +83,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8003)
@@ -1,148 +1,269 @@
 #!/usr/bin/env python3
 """
 User Management Service Database Population Script
-Populates the user-management-service database with test users
+
+Generates a deterministic set of users, profiles and activity history. The
+same --seed and --scale always produce the same rows; ids and emails match
+the accounts generated by the auth-service populate_db.py and the clients
+referenced by hotel-service reservations.
+
+Scale 1.0 is production size: 1,000,000 users, profiles for half of the
+customers (guests have none), and 20 activities per user over the 12 months
+before the --as-of date, stored in the monthly activity partitions. --as-of
+is a fixed date by default so the output does not change from day to day;
+pass a recent date to get activity inside the retention window. The four staff/test accounts are always added.
+Rows are generated in a process pool and inserted with Core executemany in
+large transactions.
+
+Usage:
+    python populate_db.py                         # scale 0.001: 1,000 users
+    python populate_db.py --scale 0.1 --reset     # replace existing data
+    python populate_db.py --as-of 2026-06-01      # activity up to another date
 """
-import sys
-import os
+import argparse
 import asyncio
-import uuid
+import os
 import random
-from datetime import datetime, timedelta
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import accumulate
 from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent))
 
-# Add parent directory to path to import modules
-sys.path.append(str(Path(__file__).parent.parent))
+from sqlalchemy import func, insert, select, text
 
-from infrastructure.database import create_tables, AsyncSessionLocal, UserModel
-from application.services import get_password_hash
+from infrastructure.database import Base, create_tables, engine, folded_values, UserModel, UserProfileModel
+from infrastructure.activity_partitions import ensure_partition, list_partitions, partition_name_for
+from domain.entities import UserRole, UserStatus
+
+FULL_SCALE_USERS = 1_000_000  # Same as the auth and hotel generators
+PROFILE_RATIO = 0.5
+ACTIVITIES_PER_USER = 20
+ACTIVITY_DAYS = 365
+USERS_PER_BATCH = 5_000
+CHUNK_SIZE = 50_000
+COMMIT_EVERY = 500_000
+# "Today" of the generated data; fixed so every run produces the same rows
+DEFAULT_AS_OF = date(2025, 1, 1)
+
+# Identities shared with the other services' generators
+IDENTITY_NAMESPACE = uuid.UUID("6f1c2a52-3b1e-4d0e-9a57-2f5d8c9e4b10")
+
+# Accounts that also exist in auth-service, with their user-management role
+STAFF_ACCOUNTS = [
+    ("admin", "admin@hotelchain.com", "Admin", UserRole.ADMIN),
+    ("manager", "manager@hotelchain.com", "Manager", UserRole.MANAGER),
+    ("employee", "employee@hotelchain.com", "Employee", UserRole.STAFF),
+    ("client", "client@example.com", "Client", UserRole.CUSTOMER),
+]
 
 # Sample data
-FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "William", "Elizabeth"]
-LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez"]
-ROLES = ["ADMIN", "MANAGER", "EMPLOYEE", "CLIENT"]
-STATUSES = ["active", "inactive", "suspended", "pending"]
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+               "Andrei", "Ioana", "Mihai", "Elena", "Stefan", "Ana", "Alexandru", "Maria", "Cristina", "Ion"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Popescu", "Ionescu", "Popa", "Dumitru", "Stan", "Stoica", "Gheorghe", "Rusu", "Munteanu", "Matei"]
+NATIONALITIES = ["US", "RO", "GB", "DE", "FR", "IT", "ES", "NL"]
+LANGUAGES = ["en", "ro", "de", "fr", "it", "es"]
+CITIES = ["New York", "Cluj-Napoca", "Bucharest", "London", "Berlin", "Paris", "Rome", "Madrid"]
+ROLES = [UserRole.CUSTOMER, UserRole.GUEST]
+ROLE_CUM_WEIGHTS = list(accumulate([70, 30]))
+STATUSES = [UserStatus.ACTIVE, UserStatus.INACTIVE, UserStatus.PENDING, UserStatus.SUSPENDED]
+STATUS_CUM_WEIGHTS = list(accumulate([80, 10, 8, 2]))
+ACTIVITY_TYPES = ["login", "logout", "profile_updated", "reservation_created", "reservation_cancelled", "review_posted"]
+ACTIVITY_CUM_WEIGHTS = list(accumulate([40, 20, 5, 20, 5, 10]))
+
+
+def user_id_for(seed: int, email: str) -> str:
+    """Deterministic user id, identical in every service's generator"""
+    return str(uuid.uuid5(IDENTITY_NAMESPACE, f"{seed}:{email}"))
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _user_rows(tables, rng, seed, username, email, first_name, last_name, role, status, now):
+    user_id = user_id_for(seed, email)
+    created_at = now - timedelta(days=rng.randint(ACTIVITY_DAYS, 3 * ACTIVITY_DAYS), seconds=rng.randint(0, 86399))
+    tables["users"].append({
+        "id": user_id,
+        "email": email,
+        "username": username,
+        "first_name": first_name,
+        "last_name": last_name,
+        "phone_number": f"+1555{rng.randint(0, 9_999_999):07d}",
+        "date_of_birth": datetime(rng.randint(1950, 2005), rng.randint(1, 12), rng.randint(1, 28)),
+        "role": role.value,
+        "status": status.value,
+        "preferences": {"newsletter": rng.random() < 0.3, "currency": rng.choice(["USD", "EUR", "RON"])},
+        "created_at": created_at,
+        "updated_at": created_at + timedelta(days=rng.randint(0, ACTIVITY_DAYS)),
+        **folded_values({"email": email, "first_name": first_name, "last_name": last_name})
+    })
+
+    if role != UserRole.GUEST and (rng.random() < PROFILE_RATIO or email.endswith("@hotelchain.com")):
+        tables["user_profiles"].append({
+            "user_id": user_id,
+            "avatar_url": None,
+            "bio": f"{first_name} likes to travel.",
+            "nationality": rng.choice(NATIONALITIES),
+            "address": {"city": rng.choice(CITIES), "street": f"{rng.randint(1, 999)} Main Street"},
+            "loyalty_points": rng.randint(0, 10_000),
+            "preferred_language": rng.choice(LANGUAGES),
+            "notification_preferences": {"email": True, "sms": rng.random() < 0.2},
+            "created_at": created_at,
+            "updated_at": created_at
+        })
 
-async def populate_user_management_db():
-    """Populate user management database with test users"""
+    for _ in range(ACTIVITIES_PER_USER):
+        timestamp = now - timedelta(seconds=rng.randint(0, ACTIVITY_DAYS * 86400))
+        activity_type = rng.choices(ACTIVITY_TYPES, cum_weights=ACTIVITY_CUM_WEIGHTS)[0]
+        tables.setdefault(partition_name_for(timestamp), []).append({
+            "id": _uuid(rng),
+            "user_id": user_id,
+            "activity_type": activity_type,
+            "description": activity_type.replace("_", " ").capitalize(),
+            "activity_metadata": None,
+            "timestamp": timestamp
+        })
+
+
+def generate_users(seed: int, first: int, last: int, as_of: date = DEFAULT_AS_OF) -> Dict[str, List[dict]]:
+    """
+    Rows for synthetic users ``first`` to ``last - 1``: users, user_profiles
+    and one entry per activity partition.
+
+    Each batch has its own random stream, so the output does not depend on
+    how batches are split across worker processes.
+    """
+    rng = random.Random(f"{seed}:users:{first}")
+    now = datetime.combine(as_of, datetime.min.time())
+    tables: Dict[str, List[dict]] = {"users": [], "user_profiles": []}
+    for i in range(first, last):
+        _user_rows(
+            tables, rng, seed, f"user{i}", f"user{i}@example.com",
+            rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+            rng.choices(ROLES, cum_weights=ROLE_CUM_WEIGHTS)[0],
+            rng.choices(STATUSES, cum_weights=STATUS_CUM_WEIGHTS)[0],
+            now
+        )
+    return tables
+
+
+def generate_staff(seed: int, as_of: date = DEFAULT_AS_OF) -> Dict[str, List[dict]]:
+    rng = random.Random(f"{seed}:staff")
+    now = datetime.combine(as_of, datetime.min.time())
+    tables: Dict[str, List[dict]] = {"users": [], "user_profiles": []}
+    for username, email, first_name, role in STAFF_ACCOUNTS:
+        _user_rows(tables, rng, seed, username, email, first_name, "User", role, UserStatus.ACTIVE, now)
+    return tables
+
+
+class BulkWriter:
+    """Writes row batches with Core executemany, committing every COMMIT_EVERY rows"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.counts: Dict[str, int] = {}
+        self.uncommitted = 0
+        self.tables = {
+            UserModel.__tablename__: UserModel.__table__,
+            UserProfileModel.__tablename__: UserProfileModel.__table__
+        }
+
+    async def write(self, tables: Dict[str, List[dict]]):
+        for name, rows in tables.items():
+            table = self.tables.get(name)
+            if table is None:
+                table = self.tables[name] = await ensure_partition(self.conn, name)
+            key = name if name in (UserModel.__tablename__, UserProfileModel.__tablename__) else "activities"
+            for i in range(0, len(rows), CHUNK_SIZE):
+                chunk = rows[i:i + CHUNK_SIZE]
+                await self.conn.execute(insert(table), chunk)
+                self.counts[key] = self.counts.get(key, 0) + len(chunk)
+                self.uncommitted += len(chunk)
+        if self.uncommitted >= COMMIT_EVERY:
+            await self.conn.commit()
+            self.uncommitted = 0
+            print("  " + ", ".join(f"{name}: {count:,}" for name, count in self.counts.items()))
+
+    async def close(self):
+        await self.conn.commit()
+
+
+async def generate(writer: BulkWriter, scale: float, seed: int, workers: int, as_of: date = DEFAULT_AS_OF):
+    """Generate user batches in worker processes and insert them in order as they finish"""
+    users = max(1, round(FULL_SCALE_USERS * scale))
+    batches = [(first, min(first + USERS_PER_BATCH, users)) for first in range(0, users, USERS_PER_BATCH)]
+    await writer.write(generate_staff(seed, as_of))
+
+    if workers <= 1:
+        for first, last in batches:
+            await writer.write(generate_users(seed, first, last, as_of))
+        return
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for first, last in batches:
+            pending.append(loop.run_in_executor(pool, generate_users, seed, first, last, as_of))
+            # Keep every worker busy while the main process inserts
+            if len(pending) < workers * 2:
+                continue
+            await writer.write(await pending.popleft())
+        while pending:
+            await writer.write(await pending.popleft())
+
+
+async def populate_user_management_db(scale: float, seed: int, reset: bool, workers: int, as_of: date = DEFAULT_AS_OF):
+    """Populate user management database with generated data"""
+    engine.echo = False
+    if reset:
+        print("Dropping existing tables...")
+        async with engine.begin() as conn:
+            for name in await list_partitions(conn):
+                await conn.execute(text(f'DROP TABLE "{name}"'))
+            await conn.run_sync(Base.metadata.drop_all)
     print("Creating tables...")
     await create_tables()
-    
-    async with AsyncSessionLocal() as session:
-        # Create a fixed set of users (one for each role)
-        # These should match users in auth service
-        fixed_users = [
-            UserModel(
-                id=str(uuid.uuid4()),
-                username="admin",
-                email="admin@hotelchain.com",
-                password_hash=get_password_hash("admin123"),
-                role="ADMIN",
-                status="active",
-                first_name="Admin",
-                last_name="User",
-                created_at=datetime.utcnow() - timedelta(days=100),
-                updated_at=datetime.utcnow() - timedelta(days=10),
-                last_login=datetime.utcnow() - timedelta(hours=2)
-            ),
-            UserModel(
-                id=str(uuid.uuid4()),
-                username="manager",
-                email="manager@hotelchain.com",
-                password_hash=get_password_hash("manager123"),
-                role="MANAGER",
-                status="active",
-                first_name="Manager",
-                last_name="User",
-                created_at=datetime.utcnow() - timedelta(days=90),
-                updated_at=datetime.utcnow() - timedelta(days=5),
-                last_login=datetime.utcnow() - timedelta(days=1)
-            ),
-            UserModel(
-                id=str(uuid.uuid4()),
-                username="employee",
-                email="employee@hotelchain.com",
-                password_hash=get_password_hash("employee123"),
-                role="EMPLOYEE",
-                status="active",
-                first_name="Employee",
-                last_name="User",
-                created_at=datetime.utcnow() - timedelta(days=60),
-                updated_at=datetime.utcnow() - timedelta(days=3),
-                last_login=datetime.utcnow() - timedelta(hours=5)
-            ),
-            UserModel(
-                id=str(uuid.uuid4()),
-                username="client",
-                email="client@example.com",
-                password_hash=get_password_hash("client123"),
-                role="CLIENT",
-                status="active",
-                first_name="Client",
-                last_name="User",
-                created_at=datetime.utcnow() - timedelta(days=30),
-                updated_at=datetime.utcnow() - timedelta(days=30),
-                last_login=datetime.utcnow() - timedelta(days=2)
-            ),
-        ]
-        
-        for user in fixed_users:
-            # Check if user already exists
-            stmt = f"SELECT id FROM users WHERE email = '{user.email}'"
-            result = await session.execute(stmt)
-            existing_user = result.first()
-            
-            if not existing_user:
-                session.add(user)
-                print(f"Adding user: {user.username} ({user.role})")
-            else:
-                print(f"User {user.username} already exists, skipping")
-        
-        await session.commit()
-        
-        # Create additional random users
-        for i in range(20):
-            first_name = random.choice(FIRST_NAMES)
-            last_name = random.choice(LAST_NAMES)
-            # 70% clients, 20% employees, 5% managers, 5% admins
-            role_weights = [0.05, 0.05, 0.2, 0.7]
-            role = random.choices(ROLES, weights=role_weights)[0]
-            
-            # 80% active, 10% inactive, 5% suspended, 5% pending
-            status_weights = [0.8, 0.1, 0.05, 0.05]
-            status = random.choices(STATUSES, weights=status_weights)[0]
-            
-            # Username is usually firstinitial_lastname
-            username = f"{first_name[0].lower()}{last_name.lower()}{random.randint(1, 99)}"
-            
-            user = UserModel(
-                id=str(uuid.uuid4()),
-                username=username,
-                email=f"{username}@example.com",
-                password_hash=get_password_hash("password123"),
-                role=role,
-                status=status,
-                first_name=first_name,
-                last_name=last_name,
-                created_at=datetime.utcnow() - timedelta(days=random.randint(1, 365)),
-                updated_at=datetime.utcnow() - timedelta(days=random.randint(0, 30)),
-                last_login=datetime.utcnow() - timedelta(days=random.randint(0, 60))
-            )
-            
-            # Check if user already exists
-            stmt = f"SELECT id FROM users WHERE email = '{user.email}'"
-            result = await session.execute(stmt)
-            existing_user = result.first()
-            
-            if not existing_user:
-                session.add(user)
-                print(f"Adding user: {user.username} ({user.role})")
-            else:
-                print(f"User {user.username} already exists, skipping")
-        
-        await session.commit()
-    
-    print("User Management database populated successfully!")
+
+    async with engine.connect() as conn:
+        if (await conn.execute(select(func.count()).select_from(UserModel))).scalar_one():
+            print("The database already has users; use --reset to replace them")
+            return
+        # Generated data can be regenerated, so trade durability for load speed
+        await conn.execute(text("PRAGMA synchronous = OFF"))
+
+        print(f"Generating scale {scale} with seed {seed} as of {as_of} using {workers} workers...")
+        start = time.perf_counter()
+        writer = BulkWriter(conn)
+        await generate(writer, scale, seed, workers, as_of)
+        await writer.close()
+        await conn.execute(text("ANALYZE"))
+        await conn.commit()
+
+    elapsed = time.perf_counter() - start
+    total = sum(writer.counts.values())
+    print(f"Inserted {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s):")
+    for name, count in writer.counts.items():
+        print(f"  {name}: {count:,}")
+    print("User management database populated successfully!")
+
 
 if __name__ == "__main__":
-    asyncio.run(populate_user_management_db())
+    parser = argparse.ArgumentParser(description="Populate the user-management-service database with generated data")
+    parser.add_argument("--scale", type=float, default=0.001, help="1.0 = 1M users, ~350k profiles, 20M activities")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate the tables first")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=DEFAULT_AS_OF,
+                        help=f"date the activity history ends on (default {DEFAULT_AS_OF})")
+    # The main process inserts, so leave it a core
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1), help="row generator processes")
+    args = parser.parse_args()
+    asyncio.run(populate_user_management_db(args.scale, args.seed, args.reset, args.workers, args.as_of))
@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import jwt
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The database URL is relative to the working directory and resolved when the
+# engine is created, so move to a scratch directory before anything imports it
+_ORIGINAL_CWD = os.getcwd()
+_TEST_DIR = tempfile.mkdtemp(prefix="user-management-tests-")
+os.chdir(_TEST_DIR)
+
+# Activity logs are written in the background; flush them only at shutdown
+# so they do not land inside a test's query count
+os.environ.setdefault("ACTIVITY_QUEUE_FLUSH_INTERVAL", "3600")
+os.environ.setdefault("ACTIVITY_QUEUE_BATCH_SIZE", "100000")
+
+pytest_plugins = ["query_budget"]
+
+
+def pytest_unconfigure(config):
+    os.chdir(_ORIGINAL_CWD)
+    shutil.rmtree(_TEST_DIR, ignore_errors=True)
+
+
+ADMIN = {"Authorization": "Bearer " + jwt.encode(
+    {"sub": "admin-1", "role": "ADMIN", "exp": time.time() + 3600},
+    os.getenv("JWT_SECRET_KEY", "your-secret-key-here"),
+    algorithm="HS256"
+)}
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient on a fresh database in the scratch directory"""
+    from fastapi.testclient import TestClient
+    from infrastructure.database import engine, read_engine
+    from infrastructure.activity_partitions import activity_partitions
+    import main
+
+    engine.echo = False
+    read_engine.echo = False
+    with TestClient(main.app) as test_client:
+        # Background compaction would otherwise query in the middle of a test
+        test_client.portal.call(activity_partitions.stop)
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def seeded(client):
+    """Twenty staff users, the first ten with profiles"""
+    users = [
+        client.post("/api/v1/users/", json={
+            "email": f"user{i}@example.com", "username": f"user{i}",
+            "first_name": f"First{i}", "last_name": f"Last{i}", "role": "staff"
+        }).json()
+        for i in range(20)
+    ]
+    for user in users[:10]:
+        client.post(f"/api/v1/users/{user['id']}/profile", json={"bio": "Front desk", "nationality": "RO"})
+    return {"users": users}
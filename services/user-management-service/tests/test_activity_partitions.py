@@ -0,0 +1,82 @@
+"""
+Monthly activity partitions: routing by timestamp, archiving and retention
+"""
+import gzip
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from domain.entities import UserActivity
+from infrastructure.activity_partitions import activity_partitions, list_partitions, partition_metadata
+from infrastructure.database import AsyncSessionLocal, engine
+from infrastructure.repositories import SQLiteUserActivityRepository
+
+from conftest import ADMIN
+
+
+def activity(user_id: str, timestamp: datetime) -> UserActivity:
+    return UserActivity(
+        id=str(uuid.uuid4()), user_id=user_id, activity_type="login", description="Logged in", timestamp=timestamp
+    )
+
+
+@pytest.fixture
+def old_activities(client, tmp_path, monkeypatch):
+    """Activities of one user in March and April 2021, long past the retention window"""
+    monkeypatch.setattr(activity_partitions, "archive_dir", tmp_path)
+    activities = [
+        activity("partition-user", datetime(2021, 3, 10)),
+        activity("partition-user", datetime(2021, 4, 2)),
+        activity("partition-user", datetime(2021, 4, 20)),
+    ]
+
+    async def create():
+        async with AsyncSessionLocal() as session:
+            await SQLiteUserActivityRepository(session).create_activities(activities)
+
+    client.portal.call(create)
+    yield activities
+    for name in ("user_activities_202103", "user_activities_202104"):
+        client.portal.call(activity_partitions.drop_partition, name)
+
+
+def test_activities_are_routed_to_their_month(client, old_activities):
+    async def read(skip, limit):
+        async with AsyncSessionLocal() as session:
+            return await SQLiteUserActivityRepository(session).get_activities_by_user_id("partition-user", skip, limit)
+
+    async def partitions():
+        async with engine.connect() as conn:
+            return await list_partitions(conn)
+
+    assert {"user_activities_202103", "user_activities_202104"} <= set(client.portal.call(partitions))
+    # Newest first across partitions; the skip passes over the whole April partition
+    assert [a.timestamp.day for a in client.portal.call(read, 0, 10)] == [20, 2, 10]
+    assert [a.timestamp.day for a in client.portal.call(read, 2, 10)] == [10]
+
+
+def test_archive_partition(client, old_activities, tmp_path):
+    response = client.post("/api/v1/admin/activity-partitions/user_activities_202104/archive", headers=ADMIN)
+    assert response.status_code == 200
+    with gzip.open(response.json()["archive"], "rt") as archive:
+        assert sorted(json.loads(line)["id"] for line in archive) == sorted(a.id for a in old_activities[1:])
+
+    # A well-formed name without a table is a 404, and leaves no table definition behind
+    missing = client.post("/api/v1/admin/activity-partitions/user_activities_199901/archive", headers=ADMIN)
+    assert missing.status_code == 404
+    assert "user_activities_199901" not in partition_metadata.tables
+    assert client.post("/api/v1/admin/activity-partitions/users/archive", headers=ADMIN).status_code == 400
+
+
+def test_compaction_archives_and_drops_expired_partitions(client, old_activities, tmp_path):
+    listed = client.get("/api/v1/admin/activity-partitions", headers=ADMIN).json()["partitions"]
+    assert {p["name"]: p["expired"] for p in listed}["user_activities_202103"] is True
+    assert activity_partitions.is_expired(f"user_activities_{datetime.utcnow():%Y%m}") is False
+
+    compacted = client.post("/api/v1/admin/activity-partitions/compact", headers=ADMIN).json()
+    assert {"user_activities_202103", "user_activities_202104"} <= {a["partition"] for a in compacted["archived"]}
+    assert (tmp_path / "user_activities_202103.jsonl.gz").exists()
+    listed = client.get("/api/v1/admin/activity-partitions", headers=ADMIN).json()["partitions"]
+    assert not any(p["expired"] for p in listed)
@@ -0,0 +1,50 @@
+"""
+InMemoryUserRepository matches the SQLite repository on the methods the services use
+"""
+import asyncio
+from datetime import datetime
+
+from domain.entities import User, UserRole, UserStatus
+from infrastructure.repositories import InMemoryUserRepository
+
+
+def make_repository() -> InMemoryUserRepository:
+    repository = InMemoryUserRepository()
+    for i, (first_name, role, status) in enumerate([
+        ("Ana", UserRole.CUSTOMER, UserStatus.ACTIVE),
+        ("Andrei", UserRole.STAFF, UserStatus.ACTIVE),
+        ("Bogdan", UserRole.CUSTOMER, UserStatus.INACTIVE),
+        ("anca", UserRole.CUSTOMER, UserStatus.ACTIVE),
+    ]):
+        user_id = f"user-{i}"
+        repository._users[user_id] = User(
+            id=user_id, email=f"{first_name.lower()}@example.com", username=first_name.lower(),
+            first_name=first_name, last_name="Pop", role=role, status=status, created_at=datetime(2030, 1, i + 1)
+        )
+    return repository
+
+
+def test_search_users_filters_and_orders_newest_first():
+    repository = make_repository()
+    found = asyncio.run(repository.search_users(role=UserRole.CUSTOMER, status=UserStatus.ACTIVE, search=" AN "))
+    assert [user.first_name for user in found] == ["anca", "Ana"]
+    assert [user.id for user in asyncio.run(repository.search_users(skip=1, limit=2))] == ["user-2", "user-1"]
+    assert asyncio.run(repository.search_users(search="pop")) and not asyncio.run(repository.search_users(search="x"))
+
+
+def test_update_user_fields_applies_column_values():
+    repository = make_repository()
+    updated = asyncio.run(repository.update_user_fields("user-0", {"status": "suspended", "last_name": "Ionescu"}))
+    assert updated.status == UserStatus.SUSPENDED and updated.last_name == "Ionescu"
+    assert asyncio.run(repository.search_users(status=UserStatus.SUSPENDED)) == [updated]
+    assert asyncio.run(repository.update_user_fields("missing", {"last_name": "Pop"})) is None
+
+
+def test_search_folds_case_beyond_ascii():
+    repository = make_repository()
+    repository._users["user-9"] = User(
+        id="user-9", email="elise@example.com", username="elise", first_name="Élise", last_name="Ștefănescu",
+        role=UserRole.CUSTOMER, status=UserStatus.ACTIVE, created_at=datetime(2030, 2, 1)
+    )
+    for search in ("ÉLISE", "élise", "ștef", "ȘTEFĂ"):
+        assert [user.id for user in asyncio.run(repository.search_users(search=search))] == ["user-9"]
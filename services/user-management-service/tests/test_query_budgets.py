@@ -0,0 +1,96 @@
+"""
+Query budgets for the user-management routers
+
+Budgets are the statement counts of the current implementation (COMMIT is
+not a statement). A change that adds a query to an endpoint, or turns a
+lookup into a per-row loop, fails here.
+"""
+import pytest
+
+from conftest import ADMIN
+
+
+# User API
+
+@pytest.mark.query_budget(1)
+def test_list_users(client, seeded):
+    response = client.get("/api/v1/users/")
+    assert response.status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_users_by_role(client, seeded):
+    assert client.get("/api/v1/users/role/staff").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_users_by_status(client, seeded):
+    assert client.get("/api/v1/users/status/pending").status_code == 200
+
+
+@pytest.mark.query_budget(4)
+def test_create_user(client, seeded):
+    response = client.post("/api/v1/users/", json={
+        "email": "budget@example.com", "username": "budget",
+        "first_name": "Budget", "last_name": "Test", "role": "staff"
+    })
+    assert response.status_code == 201
+
+
+@pytest.mark.query_budget(1)
+def test_update_user(client, seeded):
+    user_id = seeded["users"][0]["id"]
+    assert client.put(f"/api/v1/users/{user_id}", json={"first_name": "Renamed"}).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_delete_user(client, seeded):
+    assert client.delete(f"/api/v1/users/{seeded['users'][19]['id']}").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_get_profile(client, seeded):
+    assert client.get(f"/api/v1/users/{seeded['users'][0]['id']}/profile").status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_update_profile(client, seeded):
+    user_id = seeded["users"][0]["id"]
+    assert client.put(f"/api/v1/users/{user_id}/profile", json={"bio": "Night shift"}).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_user_activities(client, seeded):
+    assert client.get(f"/api/v1/users/{seeded['users'][0]['id']}/activities").status_code == 200
+
+
+# Admin API
+
+@pytest.mark.query_budget(1)
+def test_admin_list_users_by_role(client, seeded):
+    assert client.get("/api/v1/admin/users?role=staff&status=pending", headers=ADMIN).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_admin_search_users(client, seeded):
+    response = client.get("/api/v1/admin/users?search=first1", headers=ADMIN)
+    assert response.status_code == 200
+    assert len(response.json()) > 1
+
+
+@pytest.mark.query_budget(1)
+def test_admin_update_user(client, seeded):
+    user_id = seeded["users"][1]["id"]
+    assert client.put(f"/api/v1/admin/users/{user_id}", headers=ADMIN, json={"last_name": "Updated"}).status_code == 200
+
+
+@pytest.mark.query_budget(1)
+def test_admin_delete_user(client, seeded):
+    assert client.delete(f"/api/v1/admin/users/{seeded['users'][18]['id']}", headers=ADMIN).status_code == 204
+
+
+@pytest.mark.query_budget(1)
+def test_admin_export_users(client, seeded):
+    response = client.get("/api/v1/admin/users/export", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.text.count("\n") > len(seeded["users"]) // 2
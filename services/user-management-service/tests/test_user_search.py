@@ -0,0 +1,23 @@
+"""
+Admin user search: case-insensitive prefix match on names and email, including non-ASCII letters
+"""
+from conftest import ADMIN
+
+
+def test_search_matches_names_with_diacritics(client):
+    user = client.post("/api/v1/users/", json={
+        "email": "Elise.Stefanescu@example.com", "username": "elise-stefanescu",
+        "first_name": "Élise", "last_name": "Ștefănescu", "role": "staff"
+    }).json()
+    try:
+        # SQLite's lower() would leave "É" and "Ș" as they are
+        for search in ("ÉLISE", "élise", "ștefă", "ȘTEF", "elise.s"):
+            found = client.get("/api/v1/admin/users", headers=ADMIN, params={"search": search}).json()
+            assert [match["id"] for match in found] == [user["id"]], search
+
+        # Renamed users are found by their new name
+        client.put(f"/api/v1/users/{user['id']}", json={"first_name": "Ioana"})
+        assert client.get("/api/v1/admin/users", headers=ADMIN, params={"search": "élise"}).json() == []
+        assert len(client.get("/api/v1/admin/users", headers=ADMIN, params={"search": "IOANA"}).json()) == 1
+    finally:
+        client.delete(f"/api/v1/users/{user['id']}")